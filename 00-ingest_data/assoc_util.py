@@ -0,0 +1,230 @@
+# categorical association engine behind explore_util.cat_relationships
+#
+# every categorical column is integer encoded once, each pair's contingency table is one bincount of the two code
+# arrays, and the chi-squared test, Cramer's V, and Theil's U of the pair are computed from that table with numpy.
+# the statistics match the chi_squared, cramers_v, and theils_u functions of 00-data_audit-pandas-util.ipynb (nulls
+# replaced by 0.0 for Cramer's V and Theil's U, dropped for the chi-squared test), and batches of pairs are spread
+# across worker processes for wide or long frames
+
+# import needed packages
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+# create list of the dtypes of the categorical columns
+assoc_dtypes = ['string', 'object', 'category', 'boolean']
+
+# create list of the columns of the relationships dataframe
+assoc_columns = ['x1', 'x2', 'test_stat', 'p_value', 'dof', 'chi_result', 'cramers', 'theils (x2 predicts x1)',
+                 'rev_theils (x1 predicts x2)']
+
+# create number of (pair x row) cells below which the pairs are computed in this process
+parallel_min_cells = 5000000
+
+# create number of pairs sent to a worker process at a time
+pairs_per_batch = 64
+
+# create codes of the columns being paired (set once per worker process by set_codes)
+worker_codes = {}
+
+# create function to integer encode a categorical column
+def encode_column(values, nan_replace_value=0.0):
+    '''
+    Function to integer encode a categorical column
+
+    param values: pandas series
+    param nan_replace_value: value the nulls are counted as when they are replaced (the nulls are folded into this
+                             value's code when the column has it)
+
+    returns: tuple of the codes array (the nulls coded as the number of distinct values), the number of distinct
+             values, and the code of nan_replace_value (None when the column does not have it)
+    '''
+
+    codes, uniques = pd.factorize(values, sort = False)
+    num_codes = len(uniques)
+    codes = np.where(codes < 0, num_codes, codes).astype(np.int64)
+    merge_code = pd.Index(uniques).get_indexer([nan_replace_value])[0]
+    return codes, num_codes, (None if merge_code < 0 else int(merge_code))
+
+# create function to drop the empty rows and columns of a contingency table
+def drop_empty(table):
+    return table[table.sum(axis = 1) > 0][:, table.sum(axis = 0) > 0]
+
+# create function to build the two contingency tables of a pair of encoded columns
+def pair_tables(x, y):
+    '''
+    Function to build the contingency tables of a pair of columns with one bincount
+
+    param x: tuple returned by encode_column for the first column (the rows of the tables)
+    param y: tuple returned by encode_column for the second column (the columns of the tables)
+
+    returns: tuple of the table with the nulls replaced and the table with the nulls dropped
+    '''
+
+    (x_codes, x_num, x_merge), (y_codes, y_num, y_merge) = x, y
+    table = np.bincount(x_codes * (y_num + 1) + y_codes, minlength = (x_num + 1) * (y_num + 1)).reshape(x_num + 1, y_num + 1)
+    dropped = drop_empty(table[:-1, :-1])
+
+    # the nulls count as nan_replace_value, which is its own row / column when the column does not have it
+    replaced = table.copy()
+    if x_merge is not None:
+        replaced[x_merge] += replaced[-1]
+        replaced[-1] = 0
+    if y_merge is not None:
+        replaced[:, y_merge] += replaced[:, -1]
+        replaced[:, -1] = 0
+    return drop_empty(replaced), dropped
+
+# create function to compute the chi-squared test statistic of a contingency table
+def chi_squared_table(table, correction=True):
+    '''
+    Function to compute the chi-squared test statistic of independence the way scipy's chi2_contingency does
+
+    The p-values are left to chi2.sf, which cat_associations calls once for every pair together.
+
+    param table: 2d array of observed counts without empty rows or columns
+    param correction: whether to apply Yates' continuity correction to 2x2 tables
+
+    returns: tuple of the test statistic, degrees of freedom, and array of expected counts
+    '''
+
+    observed = table.astype(np.float64)
+    n = observed.sum()
+    expected = np.outer(observed.sum(axis = 1), observed.sum(axis = 0)) / n
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    if dof == 0:
+        return 0.0, 0, expected
+
+    if dof == 1 and correction:
+        diff = expected - observed
+        observed = observed + np.minimum(0.5, np.abs(diff)) * np.sign(diff)
+    return ((observed - expected) ** 2 / expected).sum(), dof, expected
+
+# create function to compute Cramer's V with bias correction from a contingency table
+def cramers_v_table(table):
+    n = table.sum()
+    r, k = table.shape
+    phi2 = chi_squared_table(table)[0] / n
+    phi2corr = max(0, phi2 - ((k - 1) * (r - 1)) / (n - 1))
+    rcorr = r - ((r - 1) ** 2) / (n - 1)
+    kcorr = k - ((k - 1) ** 2) / (n - 1)
+    if min((kcorr - 1), (rcorr - 1)) == 0:
+        return np.nan
+    v = np.sqrt(phi2corr / min((kcorr - 1), (rcorr - 1)))
+    return 0. if -1e-13 <= v < 0. else 1. if 1. < v <= 1. + 1e-13 else v
+
+# create function to compute Theil's U of the rows given the columns of a contingency table
+def theils_u_table(table):
+    '''
+    Function to compute Theil's U, the share of the entropy of the rows variable explained by the columns variable
+
+    param table: 2d array of observed counts without empty rows or columns
+
+    returns: float in the range of [0,1] (transpose the table for the reverse direction)
+    '''
+
+    n = table.sum()
+    p_x = table.sum(axis = 1) / n
+    s_x = -(p_x * np.log(p_x)).sum()
+    if s_x == 0:
+        return 1.
+
+    nonzero = table > 0
+    p_xy = table[nonzero] / n
+    p_y = np.broadcast_to(table.sum(axis = 0) / n, table.shape)[nonzero]
+    s_xy = (p_xy * np.log(p_y / p_xy)).sum()
+    u = (s_x - s_xy) / s_x
+    return 0. if -1e-13 <= u < 0. else 1. if 1. < u <= 1. + 1e-13 else u
+
+# create function to compute every statistic of one pair of encoded columns but the p-value
+def pair_stats(x, y):
+    replaced, dropped = pair_tables(x, y)
+
+    # chi-squared test of independence on the table without nulls, like pd.crosstab
+    if dropped.size == 0:
+        test_stat, dof, assumption_flag = np.nan, 0, False
+    else:
+        test_stat, dof, expected = chi_squared_table(dropped)
+        assumption_flag = not ((expected < 1).sum() > 0 and (expected < 5).mean() > 0.2) \
+                          and not (dropped.shape[1] < 2 and dropped.shape[0] < 2)
+
+    return test_stat, dof, assumption_flag, cramers_v_table(replaced), theils_u_table(replaced), \
+           theils_u_table(replaced.T)
+
+# create function to keep the encoded columns in a worker process
+def set_codes(encoded):
+    worker_codes.clear()
+    worker_codes.update(encoded)
+
+# create function to compute a batch of pairs in a worker process
+def pair_batch(pairs):
+    return [pair_stats(worker_codes[i], worker_codes[j]) for i, j in pairs]
+
+# create function to compute the categorical relationships of every pair of columns
+def cat_associations(data, columns=None, nan_replace_value=0.0, prob=0.95, processes=None):
+    '''
+    Function to compute the chi-squared test, Cramer's V, and Theil's U of every pair of categorical columns
+
+    param data: pandas dataframe
+    param columns: list of the columns to pair (defaults to every string/object/category/boolean column)
+    param nan_replace_value: value the nulls are counted as for Cramer's V and Theil's U
+    param prob: confidence level of the chi-squared test
+    param processes: number of worker processes (defaults to one per cpu for large frames and none for small ones)
+
+    returns: tuple of the relationships dataframe (one row per pair, same columns as run_cat_rel_func), the Cramer's V
+             dataframe, and the Theil's U dataframe (row variable given column variable)
+    '''
+
+    if columns is None:
+        columns = [i for i in (data.select_dtypes(include=assoc_dtypes).columns)]
+    encoded = {i: encode_column(data[i], nan_replace_value) for i in columns}
+    pairs = list(itertools.combinations(range(len(columns)), 2))
+    pairs = [(columns[i], columns[j]) for i, j in pairs]
+
+    if processes is None:
+        processes = 1 if len(pairs) * len(data) < parallel_min_cells else os.cpu_count() or 1
+    if processes <= 1 or len(pairs) <= pairs_per_batch:
+        stats = [pair_stats(encoded[i], encoded[j]) for i, j in pairs]
+    else:
+        batches = [pairs[i:i + pairs_per_batch] for i in range(0, len(pairs), pairs_per_batch)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=set_codes, initargs=(encoded,)) as executor:
+            stats = [i for batch in executor.map(pair_batch, batches) for i in batch]
+
+    # p-values and critical values of every pair in one call each (a table with no degrees of freedom has p-value 1)
+    test_stat = np.array([i[0] for i in stats], dtype = np.float64)
+    dof = np.array([i[1] for i in stats], dtype = np.int64)
+    assumption_flag = np.array([i[2] for i in stats], dtype = bool)
+    p_value = np.where(dof > 0, chi2.sf(test_stat, np.maximum(dof, 1)), np.where(np.isnan(test_stat), np.nan, 1.0))
+    critical = np.where(dof > 0, chi2.ppf(prob, np.maximum(dof, 1)), np.nan)
+    dependent_var = (np.abs(test_stat) >= critical) | (p_value <= 1.0 - prob)
+    chi_result = np.where(dependent_var & assumption_flag, 'Dependent (reject H0)',
+                          np.where(assumption_flag, 'Independent (fail to reject H0)', 'Chi-Squared Assumptions Not Met'))
+
+    df = pd.DataFrame({'x1': [i[0] for i in pairs],
+                       'x2': [i[1] for i in pairs],
+                       'test_stat': test_stat,
+                       'p_value': p_value,
+                       'dof': dof,
+                       'chi_result': chi_result.astype(object),
+                       'cramers': [i[3] for i in stats],
+                       'theils (x2 predicts x1)': [i[4] for i in stats],
+                       'rev_theils (x1 predicts x2)': [i[5] for i in stats]
+                      }, columns = assoc_columns)
+
+    # the heatmap matrices, each variable fully associated with itself
+    cramers, theils = np.zeros((len(columns), len(columns))), np.zeros((len(columns), len(columns)))
+    if len(pairs):
+        np.fill_diagonal(cramers, 1.00)
+        np.fill_diagonal(theils, 1.00)
+        i, j = np.array(list(itertools.combinations(range(len(columns)), 2))).T
+        cramers[i, j] = cramers[j, i] = df['cramers'].to_numpy()
+        theils[i, j] = df['theils (x2 predicts x1)'].to_numpy()
+        theils[j, i] = df['rev_theils (x1 predicts x2)'].to_numpy()
+    cramers_df = pd.DataFrame(cramers, columns = columns, index = columns)
+    theils_df = pd.DataFrame(theils, columns = columns, index = columns)
+
+    return df, cramers_df, theils_df
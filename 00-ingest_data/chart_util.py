@@ -0,0 +1,184 @@
+# batch chart rendering behind explore_util.plot_hist and explore_util.corr_matrix
+#
+# the histogram counts of every numerical column are computed in one vectorized pass, the pdf pages are drawn by
+# reusing one figure (split across worker processes for wide frames and merged back in column order), and the
+# correlation matrix is computed block by block with matrix products instead of column pair by column pair
+
+# import needed packages
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+# pypdf (in requirements.txt) merges the pages drawn by worker processes, without it every page is drawn in this process
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    PdfWriter = None
+
+# create number of histogram pages below which the pages are drawn in this process
+parallel_min_pages = 40
+
+# create number of columns of each block of the correlation matrix
+corr_block_size = 256
+
+# create function to compute the histogram counts of many columns at once
+def hist_bins(values, bins=50):
+    '''
+    Function to compute the histogram of every column of a 2d array in one pass
+
+    The bin edges and counts are the ones np.histogram (and so plt.hist) computes for each column on its own.
+
+    param values: 2d float array with one column per variable, NaN for missing values
+    param bins: number of equal width bins of each histogram
+
+    returns: tuple of a (columns, bins + 1) array of bin edges and a (columns, bins) array of counts
+    '''
+
+    num_rows, num_columns = values.shape
+    valid = ~np.isnan(values)
+    has_values = valid.any(axis = 0)
+
+    # equal width edges between each column's min and max, widened by 0.5 on each side when they are equal
+    with np.errstate(invalid = 'ignore'):
+        first_edge = np.where(has_values, np.nanmin(np.where(valid, values, np.inf), axis = 0), 0.0)
+        last_edge = np.where(has_values, np.nanmax(np.where(valid, values, -np.inf), axis = 0), 1.0)
+    same = first_edge == last_edge
+    first_edge, last_edge = np.where(same, first_edge - 0.5, first_edge), np.where(same, last_edge + 0.5, last_edge)
+    edges = np.linspace(first_edge, last_edge, bins + 1, axis = 1)
+
+    # bin index of every value, corrected against the edges exactly like np.histogram
+    norm = bins / (last_edge - first_edge)
+    with np.errstate(invalid = 'ignore'):
+        f_indices = (values - first_edge) * norm
+    indices = np.where(valid, f_indices, 0).astype(np.intp)
+    indices[indices == bins] -= 1
+    column = np.broadcast_to(np.arange(num_columns), values.shape)
+    indices[valid & (values < edges[column, indices])] -= 1
+    indices[valid & (values >= edges[column, indices + 1]) & (indices != bins - 1)] += 1
+
+    # one bincount over every column, each column's bins offset by its position
+    flat = (indices + column * bins)[valid]
+    counts = np.bincount(flat, minlength = num_columns * bins).reshape(num_columns, bins)
+    return edges, counts
+
+# create function to draw histogram pages into a pdf
+def draw_hist_pages(pdf_path, columns, edges, counts):
+    '''
+    Function to draw one histogram page per column into a pdf
+
+    One figure is reused for every page, and each histogram is drawn as a single filled step patch from its
+    precomputed counts.
+
+    param pdf_path: path of the pdf file to write
+    param columns: list of the column names (the page titles)
+    param edges: array of bin edges returned by hist_bins
+    param counts: array of counts returned by hist_bins
+    '''
+
+    # clearing the axes would rebuild every tick on every page, so the same step patch is updated instead
+    fig = plt.figure()
+    ax = fig.add_subplot()
+    patch = ax.stairs([0], [0, 1], fill = True, color = 'green')
+    with PdfPages(pdf_path) as pdf_obj:
+        for col, col_edges, col_counts in zip(columns, edges, counts):
+            patch.set_data(col_counts, col_edges)
+            patch.set_visible(bool(col_counts.any()))
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_title(f'{col}')
+            pdf_obj.savefig(fig)
+    plt.close(fig)
+
+# create function to write histograms of many columns to one pdf
+def write_histograms(data, columns, pdf_path, bins=50, processes=None):
+    '''
+    Function to write a pdf with a histogram page for each column
+
+    param data: pandas dataframe
+    param columns: list of the numerical columns to plot, one page each in this order
+    param pdf_path: path of the pdf file to write
+    param bins: number of bins of each histogram
+    param processes: number of worker processes drawing pages (defaults to one per cpu for wide frames when pypdf is
+                     installed, otherwise 1)
+    '''
+
+    values = np.column_stack([data[i].to_numpy(dtype = np.float64, na_value = np.nan) for i in columns]) \
+             if len(columns) else np.empty((len(data), 0))
+    edges, counts = hist_bins(values, bins)
+
+    if processes is None:
+        processes = 1 if len(columns) < parallel_min_pages else os.cpu_count() or 1
+    processes = min(processes, len(columns))
+    if processes <= 1 or PdfWriter is None:
+        draw_hist_pages(pdf_path, columns, edges, counts)
+        return
+
+    # each worker draws a contiguous slice of the pages into its own pdf, then the pdfs are merged in column order
+    slices = np.array_split(np.arange(len(columns)), processes)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        part_paths = [os.path.join(tmp_dir, f'part_{i}.pdf') for i in range(len(slices))]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            list(executor.map(draw_hist_pages, part_paths, [[columns[j] for j in i] for i in slices],
+                              [edges[i] for i in slices], [counts[i] for i in slices]))
+        writer = PdfWriter()
+        for path in part_paths:
+            writer.append(path)
+        with open(pdf_path, 'wb') as f:
+            writer.write(f)
+
+# create function to compute a correlation matrix that handles missing values
+def nan_corr(data, block_size=corr_block_size):
+    '''
+    Function to compute the pearson correlation of every pair of numerical columns
+
+    Like DataFrame.corr, each pair is correlated over the rows where both columns have a value.  The pairwise counts,
+    sums, and cross products are matrix products of blocks of columns, so hundreds of columns cost a few BLAS calls
+    instead of one loop per pair.  Columns are centered first so the sums stay accurate.
+
+    param data: pandas dataframe
+    param block_size: number of columns per block (bounds the memory used to rows x block_size per array)
+
+    returns: pandas dataframe of correlations with the numerical columns as index and columns
+    '''
+
+    numeric = data.select_dtypes(include = ['number', 'bool'])
+    columns = numeric.columns
+    values = np.column_stack([numeric[i].to_numpy(dtype = np.float64, na_value = np.nan) for i in columns]) \
+             if len(columns) else np.empty((len(data), 0))
+    mask = ~np.isnan(values)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        values = np.where(mask, values - np.nanmean(np.where(mask, values, np.nan), axis = 0), 0.0)
+    weights = mask.astype(np.float64)
+    squares = values * values
+
+    num_columns = len(columns)
+    corr = np.empty((num_columns, num_columns))
+    for i in range(0, num_columns, block_size):
+        x, x_mask, x_squares = values[:, i:i + block_size], weights[:, i:i + block_size], squares[:, i:i + block_size]
+        for j in range(i, num_columns, block_size):
+            y, y_mask, y_squares = values[:, j:j + block_size], weights[:, j:j + block_size], squares[:, j:j + block_size]
+
+            # pairwise row counts, sums, sums of squares, and cross products over the rows both columns have
+            n = x_mask.T @ y_mask
+            sum_x, sum_y = x.T @ y_mask, x_mask.T @ y
+            sum_xx, sum_yy = x_squares.T @ y_mask, x_mask.T @ y_squares
+            sum_xy = x.T @ y
+
+            with np.errstate(invalid = 'ignore', divide = 'ignore'):
+                cov = sum_xy - sum_x * sum_y / n
+                var_x, var_y = sum_xx - sum_x * sum_x / n, sum_yy - sum_y * sum_y / n
+                block = cov / np.sqrt(var_x * var_y)
+            block[(n < 1) | (var_x <= 0) | (var_y <= 0)] = np.nan
+            block = np.clip(block, -1.0, 1.0)
+            corr[i:i + block_size, j:j + block_size] = block
+            corr[j:j + block_size, i:i + block_size] = block.T
+
+    # a column with any variance correlates exactly 1 with itself
+    diagonal = np.diagonal(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return pd.DataFrame(corr, index = columns, columns = columns)
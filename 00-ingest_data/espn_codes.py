@@ -0,0 +1,370 @@
+# codes of the espn fantasy football api, copied from the dictionaries section of 00-scrape_espn_ff_api_v3_util.ipynb so
+# the ingest modules can import them
+
+# import needed packages
+import numpy as np
+
+# create dictionary of owner ids, owner team names, and owner names
+owner_team_codes = {1:  ['Happy Rock Homewreckers', 'Blainer'],               
+                    2:  ["Bench Don't Kill My Vibe", 'Padge'],
+                    4:  ['Seattle rainier riot', 'Boob'],
+                    6:  ['Sticky Icky', 'T-$'],
+                    7:  ['Springfield Atoms', 'Duvi'],
+                    8:  ['Beacon Hill Posterizers', 'Bup'],
+                    9:  ['Brookside Shokunin', 'Cheese'], 
+                    10: ['CoMo FightinCamlToes', 'Doisy'],
+                    11: ['Pixel Whippers','Sembower'],
+                    15: ['Bud Lathrop Drive', 'Farmer']
+}
+
+# create dictionary of lineup slot ids and lineup names
+lineup_slot_codes = {0:  'QB',
+                     2:  'RB',
+                     3:  'Flex',
+                     4:  'WR',
+                     6:  'TE', 
+                     16: 'Def', 
+                     17: 'K',
+                     20: 'Bench', 
+                     21: 'IR',
+                     23: 'Flex'
+}
+
+# create dictionary of position ids and position names
+position_codes = {1:  'QB',
+                  2:  'RB',
+                  3:  'WR',
+                  4:  'TE',
+                  5:  'KR',
+                  16: 'DEF'
+    
+}
+
+# create dictionary of team ids and team names
+pro_team_codes = {0:  ['Free Agent', np.nan],
+                  1:  ['Atlanta Falcons', 'ATL'],
+                  2:  ['Buffalo Bills', 'BUF'],
+                  3:  ['Chicago Bears', 'CHI'],
+                  4:  ['Cincinnati Bengals', 'CIN'],
+                  5:  ['Cleveland Browns', 'CLE'],
+                  6:  ['Dallas Cowboys', 'DAL'],
+                  7:  ['Denver Broncs', 'DEN'],
+                  8:  ['Detroit Lions', 'DET'],
+                  9:  ['Greenbay Packers', 'GB'],
+                  10: ['Tennessee Titans', 'TEN'],
+                  11: ['Indianapolis Colts', 'IND'],
+                  12: ['Kansas City Chiefs', 'KC'],
+                  13: ['Las Vegas Raiders', 'LV'],
+                  14: ['Los Angeles Rams', 'LA'],
+                  15: ['Miami Dolphins', 'MIA'],
+                  16: ['Minnesota Vikings', 'MIN'],
+                  17: ['New Engalnd Patriots', 'NE'],
+                  18: ['New Orleans Saints', 'NO'],
+                  19: ['New York Giants', 'NYG'],
+                  20: ['New York Jets', 'NYJ'],
+                  21: ['Philadelphia Eagles', 'PHI'],
+                  22: ['Arizona Cardinals', 'ARI'],
+                  23: ['Pittsburgh Steelers', 'PIT'],
+                  24: ['Los Angeles Chargers', 'LAC'],
+                  25: ['San Francisco 49ers', 'SF'],
+                  26: ['Seattle Seahawks', 'SEA'],
+                  27: ['Tampa Bay Buccaneers', 'TB'],
+                  28: ['Washington Commanders', 'WAS'],
+                  29: ['Carolina Panthers', 'CAR'],
+                  30: ['Jacksonville Jaguars', 'JAX'],
+                  33: ['Baltimore Ravens', 'BAL'],
+                  34: ['Houston Texans', 'HOU']
+}
+
+# create dictionary of real game statistics codes
+player_stat_codes = {0:   'pass_att',
+                     1:   'pass_comp',
+                     2:   'pass_incomp',
+                     3:   'pass_yrd',
+                     4:   'pass_td',
+                     5:   'pass_5_yrd',
+                     6:   'unk6',
+                     7:   'unk7',
+                     8:   'unk8',
+                     9:   'unk9',
+                     10:  'unk10',
+                     11:  'unk11',
+                     12:  'unk12',
+                     13:  'unk13',
+                     14:  'unk14',
+                     15:  'unk15',
+                     16:  'pass_50_yrd_td',
+                     17:  'pass_yrd_300_399',
+                     18:  'pass_yrd_400+',
+                     19:  'unk19',
+                     19:  'pass_2pt_con',
+                     20:  'pass_int',
+                     21:  'unk21',
+                     22:  'pass_yrd_dupe',
+                     23:  'rush_att',
+                     24:  'rush_yrd',
+                     25:  'rush_td',
+                     26:  'rush_2pt_con',
+                     27:  'rush_5_yrd',
+                     28:  'unk28',
+                     29:  'unk29',
+                     30:  'unk30',
+                     31:  'unk31',
+                     32:  'unk32',
+                     33:  'unk33',
+                     34:  'unk34',
+                     35:  'unk35',
+                     36:  'rush_50_yrd_td',
+                     37:  'rush_yrd_100_199',
+                     38:  'rush_yrd_200+',
+                     39:  'unk39',
+                     40:  'unk40',
+                     41:  'receptions_dupe',
+                     42:  'rec_yrd',
+                     43:  'rec_td',
+                     44:  'rec_2pt_con',
+                     45:  'unk45',
+                     46:  'rec_50_yrd_td',
+                     47:  'rec_5_yrd',
+                     48:  'unk48',
+                     49:  'unk49',
+                     50:  'unk50',
+                     51:  'unk51',
+                     52:  'unk52',
+                     53:  'receptions',
+                     54:  'unk54',
+                     55:  'unk55',
+                     56:  'rec_yrd_100_199',
+                     57:  'rec_yrd_200+',
+                     58:  'rec_tar',
+                     59:  'yac',
+                     60:  'yrd_per_rec',
+                     61:  'rec_yrd_dupe',
+                     62:  'unk62',
+                     64:  'unk64',
+                     65:  'unk65',
+                     66:  'unk66',
+                     67:  'unk67',
+                     68:  'unk68',
+                     69:  'unk69',
+                     70:  'unk70',
+                     71:  'unk71',
+                     72:  'fum_lost',
+                     73:  'unk73',
+                     74:  'fg_made_50+',
+                     75:  'unk75',
+                     76:  'unk76',
+                     77:  'fg_made_40_49',
+                     78:  'unk78',
+                     79:  'fg_miss_40_49',
+                     80:  'fg_made_0_39',
+                     81:  'unk81',
+                     82:  'fg_miss_0_39',
+                     83:  'fg_con',
+                     84:  'fg_att',  
+                     85:  'fg_miss_tot',
+                     86:  'pat_con',
+                     87:  'pat_att',
+                     88:  'pat_miss_tot',
+                     89:  'def_st_0_pts_alw',
+                     90:  'def_st_1_6_pts_alw',
+                     91:  'def_st_7_13_pts_alw',
+                     92:  'def_st_14_17_pts_alw',
+                     93:  'def_st_blk_td',
+                     94:  'unk94',
+                     95:  'def_st_int',
+                     96:  'def_st_fum',
+                     97:  'def_st_blk_kick',
+                     98:  'def_st_safety',
+                     99:  'def_st_sack',
+                     100: 'unk100',
+                     101: 'def_st_kick_ret_td',
+                     102: 'def_st_punt_ret_td',
+                     103: 'def_st_int_td',
+                     104: 'def_st_fum_ret_td',
+                     105: 'unk105',
+                     106: 'unk106',
+                     107: 'unk107',
+                     108: 'unk108',
+                     109: 'unk109',
+                     110: 'unk110',
+                     111: 'unk111',
+                     112: 'unk112',
+                     113: 'unk113',
+                     114: 'unk114',
+                     115: 'unk115',
+                     116: 'unk116',
+                     117: 'unk117',
+                     118: 'unk118',
+                     119: 'unk119',
+                     120: 'def_pts_alw',
+                     121: 'unk121',
+                     122: 'def_st_22_27_pts_alw',
+                     123: 'def_st_28_34_pts_alw',
+                     124: 'def_st_35_45_pts_alw',
+                     125: 'def_st_46+_pts_alw',
+                     127: 'def_tot_yrd_alw',
+                     128: 'def_st_0_99_yrd_alw',
+                     129: 'def_st_100_199_yrd_alw',
+                     130: 'def_st_200_299_yrd_alw',
+                     131: 'unk131',
+                     132: 'def_st_350_399_yrd_alw',
+                     133: 'def_st_400_449_yrd_alw',
+                     134: 'def_st_450_499_yrd_alw',
+                     135: 'def_st_500_549_yrd_alw',
+                     136: 'def_st_550+_yrd_alw',
+                     155: 'unk155',
+                     156: 'unk156',
+                     158: 'unk158',
+                     175: 'unk175',
+                     176: 'unk176',
+                     177: 'unk177',
+                     178: 'unk178',
+                     179: 'unk179',
+                     180: 'unk180',
+                     181: 'unk181',
+                     182: 'unk182',
+                     183: 'unk183',
+                     184: 'unk184',
+                     185: 'unk185',
+                     186: 'unk186',
+                     187: 'unk187',
+                     188: 'unk188',
+                     189: 'unk189',
+                     190: 'unk190',
+                     191: 'unk191',
+                     192: 'unk192',
+                     193: 'unk193',
+                     194: 'unk194',
+                     195: 'unk195',
+                     196: 'unk196',
+                     197: 'unk197',
+                     198: 'fg_made_50_59',
+                     199: 'unk199',
+                     200: 'unk200',
+                     202: 'unk202',
+                     203: 'unk203',
+                     210: 'unk210',
+}
+
+# create dictionary of fantasy football specific statistics codes
+ff_scoring_codes = {1:   'pass_comp_ff',
+                    2:   'pass_incomp_ff',
+                    4:   'pass_td_ff',
+                    5:   'pass_5_yrd_ff',
+                    16:  'pass_50_yrd_td_ff',
+                    17:  'pass_yrd_300_399_ff',
+                    18:  'pass_yrd_400+_ff',
+                    19:  'pass_2pt_con_ff',
+                    20:  'pass_int_ff',
+                    25:  'rush_td_ff',
+                    26:  'rush_2pt_con_ff',
+                    27:  'rush_5_yrd_ff',
+                    36:  'rush_50_yrd_td_ff',
+                    37:  'rush_yrd_100_199_ff',
+                    38:  'rush_yrd_200+_ff',
+                    43:  'rec_td_ff',
+                    44:  'rec_2pt_con_ff_ff',
+                    46:  'rec_50_yrd_td_ff',
+                    47:  'rec_5_yrd_ff',
+                    53:  'receptions_ff',
+                    56:  'rec_yrd_100_199_ff',
+                    57:  'rec_yrd_200+_ff',
+                    72:  'fum_lost_ff',
+                    77:  'fg_made_40_49_ff',
+                    79:  'fg_miss_40_49_ff',
+                    80:  'fg_made_0_39_ff',
+                    82:  'fg_miss_0_39_ff',
+                    86:  'pat_made_ff',
+                    88:  'pat_miss_ff',
+                    89:  'def_st_0_pts_alw_ff',
+                    90:  'def_st_1_6_pts_alw_ff',
+                    91:  'def_st_7_13_pts_alw_ff',
+                    92:  'def_st_14_17_pts_alw_ff',
+                    93:  'def_st_blk_td_ff',
+                    95:  'def_st_int_ff',
+                    96:  'def_st_fum_ff',
+                    97:  'def_st_blk_kick_ff',
+                    98:  'def_st_safety_ff',
+                    99:  'def_st_sack_ff',
+                    101: 'def_st_kick_ret_td_ff',
+                    102: 'def_st_punt_ret_td_ff',
+                    103: 'def_st_int_td_ff',
+                    104: 'def_st_fum_ret_td_ff',
+                    122: 'def_st_22_27_pts_alw_ff',
+                    123: 'def_st_28_34_pts_alw_ff',
+                    124: 'def_st_35_45_pts_alw_ff',
+                    125: 'def_st_46+_pts_alw_ff',
+                    128: 'def_st_0_99_yrd_alw_ff',
+                    129: 'def_st_100_199_yrd_alw_ff',
+                    130: 'def_st_200_299_yrd_alw_ff',
+                    132: 'def_st_350_399_yrd_alw_ff',
+                    133: 'def_st_400_449_yrd_alw_ff',
+                    134: 'def_st_450_499_yrd_alw_ff',
+                    135: 'def_st_500_549_yrd_alw_ff',
+                    136: 'def_st_550+_yrd_alw_ff',
+                    198: 'fg_made_50_59_ff'
+}
+
+# create dictionary of fantasy football scoring values
+scoring_dict = {'pass_5_yrd':            0.1,
+                'pass_comp':             0.4,
+                'pass_incomp':           -0.2,
+                'pass_td':                6,
+                'pass_50_yrd_td':         3,
+                'pass_int':               -2,
+                'pass_2pt_con':           2,
+                'pass_yrd_300_399':       3,
+                'P400':                   5,
+                'rush_5_yrd':             0.6,
+                'rush_td':                6,
+                'RTD50':                  3,
+                'rush_2pt_con':           2,
+                'rush_yrd_100_199':       3,
+                'RY200':                  5,
+                'rec_5_yrd':              0.6,
+                'receptions':             1,
+                'rec_td':                 6,
+                'rec_50_yrd_td':          3,
+                'rec_2pt_con':            2,
+                'rec_yrd_100_199':        3,
+                'REY200':                 5,
+                'pat_made':               1,
+                'pat_miss':               -1,
+                'fg_made_0_39':           3,
+                'fg_made_40_49':          4,
+                'fg_miss_0_39':           -2,
+                'fg_miss_40_49':          -1,
+                'fg_made_50':             5,
+                'FG60':                   5,
+                'def_st_kick_ret_td':     6,
+                'def_st_punt_ret_td':     6,
+                'def_st_int_td':          5,
+                'def_st_fum_ret_td':      5,
+                'def_st_blk_td':          6,
+                'def_st_sack':            1,
+                'def_st_blk_kick':        2,
+                'def_st_int':             3,
+                'def_st_fum':             3,
+                'def_st_safety':          2,
+                'def_st_0_pts_alw':       10,
+                'def_st_1_6_pts_alw':     7,
+                'def_st_7_13_pts_alw':    3,
+                'def_st_14_17_pts_alw':   1,
+                'def_st_22_27_pts_alw':   -1,
+                'def_st_28_34_pts_alw':   -3,
+                'def_st_35_45_pts_alw':   -5,
+                'PA46':                   -7,
+                'def_st_0_99_yrd_alw':    7,
+                'def_st_100_199_yrd_alw': 3,
+                'def_st_200_299_yrd_alw': 1,
+                'def_st_400_449_yrd_alw': -1,
+                'def_st_450_499_yrd_alw': -1.5,
+                'def_st_500_549_yrd_alw': -2,
+                'def_st_550+_yrd_alw':    -3,
+                'misc_kick_ret_td':       6,
+                'misc_punt_ret_td':       6,
+                'misc_fum_rec_td':        6,
+                'misc_fum_lost':          -2,
+                'misc_fum_ret_td':        6
+}
@@ -0,0 +1,266 @@
+# concurrent, incremental scraper for the espn fantasy football api
+#
+# each (season, week) is saved to ../data/<season>/<season>_matchups_week_<week>.json just like the
+# 00-scrape_espn_ff_api_v3_util.ipynb data_ingest class, so load_data_from_disk and the create_rosters /
+# create_matchups classes read the files unchanged
+
+# import needed packages
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+# create base url of the espn fantasy football api
+espn_url = 'https://fantasy.espn.com/apis/v3/games/ffl'
+
+# create list of api views holding the matchup data
+matchup_views = ['mMatchup', 'mMatchupScore']
+
+# create list of http statuses retried with backoff
+retry_statuses = [429, 500, 502, 503, 504]
+
+# create name of the file in each season directory that records what was downloaded
+manifest_name = '_ingest_manifest.json'
+
+# create function to build the path of a week's json file
+def week_file(data_dir, season, week):
+    return os.path.join(data_dir, str(season), f'{season}_matchups_week_{week}.json')
+
+# create function to build the league url of a season
+def league_url(base_url, season, league_id):
+    return f'{base_url}/seasons/{season}/segments/0/leagues/{league_id}'
+
+# create function to build a pooled session that retries failed requests with exponential backoff
+def make_session(swid=None, espn_s2=None, max_workers=8, retries=5, backoff_factor=0.5):
+    '''
+    Function to create a requests session shared by every download
+
+    param swid: SWID cookie of a private league (None for public leagues)
+    param espn_s2: espn_s2 cookie of a private league (None for public leagues)
+    param max_workers: number of concurrent downloads (the connection pool keeps this many connections open)
+    param retries: number of retries of a connection error or a 429/5xx response
+    param backoff_factor: seconds to back off before the second retry, doubling on every retry after that
+
+    returns: requests session
+    '''
+
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=retry_statuses)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if swid is not None:
+        session.cookies.update({'SWID': swid, 'espn_s2': espn_s2})
+    return session
+
+# create function to check whether espn has finished scoring a week, after which its rosters and stats no longer change
+# (the season schedule in the response still does, which create_matchups reads from the latest week's file)
+def is_final(payload, week):
+    status = payload.get('status', {})
+    return status.get('isActive') is False or week < status.get('latestScoringPeriod', 0)
+
+# create function to mark the weeks of a season final by the newest season status among its manifest entries, since a
+# week answering 304 has no payload of its own to tell that espn finished scoring it
+def refresh_final(manifest):
+    statuses = [i['status'] for i in manifest.values() if i.get('status')]
+    if not statuses:
+        return
+    status = max(statuses, key = lambda i: (i.get('isActive') is False, i.get('latestScoringPeriod', 0)))
+    for week, entry in manifest.items():
+        entry['final'] = bool(entry.get('final')) or is_final({'status': status}, int(week))
+
+# create function to read the download manifest of a season
+def read_manifest(data_dir, season):
+    path = os.path.join(data_dir, str(season), manifest_name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+# create function to write bytes to a file so readers never see a partly written file
+def write_atomic(path, content):
+    tmp_path = f'{path}.tmp-{os.getpid()}-{id(content)}'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+# create function to download one week and save it when it changed
+def fetch_week(session, base_url, league_id, season, week, data_dir, entry=None, timeout=30):
+    '''
+    Function to download one week of matchup data
+
+    The week is requested with the ETag/Last-Modified of the previous download so an unchanged week costs a 304, and
+    the response is only written when its content differs from the file on disk.  A 304 keeps the previous entry (with
+    the validators of the response), its final flag is refreshed by scrape_weeks from the season status of the
+    other weeks.
+
+    param session: session returned by make_session
+    param base_url: base url of the api
+    param league_id: espn league id
+    param season: season year
+    param week: scoring period
+    param data_dir: data directory
+    param entry: manifest entry of the previous download of this week (None if never downloaded)
+    param timeout: seconds to wait for the server
+
+    returns: tuple of ('written' or 'unchanged', new manifest entry)
+    '''
+
+    path = week_file(data_dir, season, week)
+    on_disk = entry is not None and os.path.exists(path)
+
+    headers = {}
+    if on_disk and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if on_disk and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    r = session.get(league_url(base_url, season, league_id),
+                    params = {'view': matchup_views, 'scoringPeriodId': week},
+                    headers = headers,
+                    timeout = timeout)
+    if r.status_code == 304 and on_disk:
+        return 'unchanged', dict(entry,
+                                 etag = r.headers.get('ETag') or entry.get('etag'),
+                                 last_modified = r.headers.get('Last-Modified') or entry.get('last_modified'))
+    r.raise_for_status()
+
+    payload = r.json()
+    content = json.dumps(payload, ensure_ascii = False, separators = (',', ':')).encode('utf-8')
+    sha1 = hashlib.sha1(content).hexdigest()
+    new_entry = {'sha1': sha1,
+                 'etag': r.headers.get('ETag'),
+                 'last_modified': r.headers.get('Last-Modified'),
+                 'final': is_final(payload, week),
+                 'status': {k: v for k, v in payload.get('status', {}).items()
+                            if k in ['isActive', 'latestScoringPeriod']},
+                 'bytes': len(content)
+                }
+
+    if on_disk and entry.get('sha1') == sha1:
+        return 'unchanged', new_entry
+
+    write_atomic(path, content)
+    return 'written', new_entry
+
+# create function to download every (season, week) pair concurrently
+def scrape_weeks(pairs, league_id, swid=None, espn_s2=None, data_dir='../data', base_url=espn_url, max_workers=8,
+                 retries=5, backoff_factor=0.5, force=False, timeout=30, session=None):
+    '''
+    Function to download the matchup data of many weeks at once
+
+    Weeks already on disk that espn had finished scoring when they were downloaded are skipped without a request.
+    Every other week is requested (conditionally when it is already on disk) by at most max_workers threads sharing
+    one pooled session.  A week that still fails after every retry is reported and left as it was on disk.
+
+    param pairs: list of (season, week) tuples
+    param league_id: espn league id
+    param swid: SWID cookie of a private league
+    param espn_s2: espn_s2 cookie of a private league
+    param data_dir: data directory
+    param base_url: base url of the api (point it at espn_mock_server to run offline)
+    param max_workers: most downloads in flight at once
+    param retries: number of retries of a connection error or a 429/5xx response
+    param backoff_factor: backoff factor of the retries
+    param force: whether to request every week, including finished weeks already on disk
+    param timeout: seconds to wait for the server
+    param session: session to use instead of creating one with make_session
+
+    returns: dictionary with lists of the (season, week) pairs written, unchanged, and skipped, a list of
+             (season, week, error) for the failed pairs, and the seconds taken
+    '''
+
+    start = time.perf_counter()
+    if session is None:
+        session = make_session(swid, espn_s2, max_workers, retries, backoff_factor)
+
+    seasons = sorted(set(season for season, _ in pairs))
+    manifests = {season: read_manifest(data_dir, season) for season in seasons}
+    for season in seasons:
+        os.makedirs(os.path.join(data_dir, str(season)), exist_ok=True)
+
+    summary = {'written': [], 'unchanged': [], 'skipped': [], 'failed': []}
+    todo = []
+    for season, week in pairs:
+        entry = manifests[season].get(str(week))
+        if not force and entry is not None and entry.get('final') and os.path.exists(week_file(data_dir, season, week)):
+            summary['skipped'].append((season, week))
+        else:
+            todo.append((season, week, entry))
+
+    def fetch(task):
+        season, week, entry = task
+        try:
+            return fetch_week(session, base_url, league_id, season, week, data_dir, entry, timeout)
+        except (requests.RequestException, ValueError) as e:
+            return 'failed', e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (season, week, _), (status, result) in zip(todo, executor.map(fetch, todo)):
+            if status == 'failed':
+                summary['failed'].append((season, week, repr(result)))
+                continue
+            summary[status].append((season, week))
+            manifests[season][str(week)] = result
+
+    for season in seasons:
+        refresh_final(manifests[season])
+        path = os.path.join(data_dir, str(season), manifest_name)
+        write_atomic(path, json.dumps(manifests[season], indent = 1, sort_keys = True).encode('utf-8'))
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+# create data ingestion class with the same interface as the one in 00-scrape_espn_ff_api_v3_util.ipynb
+class data_ingest(object):
+
+    # create __init__ function
+    def __init__(self, swid, espn_s2, league_id, season, week, data_dir='../data', max_workers=8, base_url=espn_url):
+        self.swid = swid
+        self.espn_s2 = espn_s2
+        self.league_id = league_id
+        self.season = season
+        self.week = week
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.base_url = base_url
+
+    # create function to scrape espn data and save to json
+    def scrape_espn_data(self, force=False):
+        summary = scrape_weeks([(self.season, i) for i in range(1, self.week + 1)], self.league_id,
+                               swid = self.swid,
+                               espn_s2 = self.espn_s2,
+                               data_dir = self.data_dir,
+                               base_url = self.base_url,
+                               max_workers = self.max_workers,
+                               force = force)
+
+        print(f"season: {self.season}, weeks written: {len(summary['written'])}, unchanged: "
+              f"{len(summary['unchanged'])}, skipped: {len(summary['skipped'])}, failed: {len(summary['failed'])} "
+              f"({summary['seconds']:.1f}s)")
+        for season, week, error in summary['failed']:
+            print(f'season: {season}, week: {week} failed: {error}')
+        return summary
+
+    # create function to load json data from disk
+    def load_data_from_disk(self):
+
+        # create empty list to store each week's matchups data
+        matchups_list = []
+
+        # load JSON file for each's week matchups data
+        for i in range(1, self.week + 1):
+            with open(week_file(self.data_dir, self.season, i), encoding = 'utf-8') as f:
+
+                # returns JSON object as a dictionary
+                data = json.load(f)
+
+            # add each JSON object to list created above
+            matchups_list.append(data)
+
+        return matchups_list, data
@@ -0,0 +1,154 @@
+# local stand-in for the espn fantasy football api that replays saved week json files
+#
+# serve ../data on port 8000:   python espn_mock_server.py ../data 8000
+# then scrape it with:          scrape_weeks(pairs, league_id, base_url='http://127.0.0.1:8000/apis/v3/games/ffl')
+
+# import needed packages
+import hashlib
+import os
+import random
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from espn_ingest import week_file
+
+# create pattern of the league url of a season
+league_path = re.compile(r'^/apis/v3/games/ffl/seasons/(\d+)/segments/0/leagues/(\d+)$')
+
+# create class to serve saved week files the way the espn api serves them
+class mock_espn_server(object):
+    '''
+    Threaded http server replaying <data_dir>/<season>/<season>_matchups_week_<week>.json
+
+    Responses carry an ETag and Last-Modified header and conditional requests get a 304, so resume behaviour can be
+    checked.  A fixed latency and a random rate of 503 responses mimic a slow, flaky api.
+
+    param data_dir: data directory holding the season directories
+    param host: host to listen on
+    param port: port to listen on (0 picks a free port)
+    param latency: seconds each response is delayed
+    param fail_rate: fraction of requests answered with a 503
+    param seed: random seed of the failures
+    '''
+
+    # create __init__ function
+    def __init__(self, data_dir, host='127.0.0.1', port=0, latency=0.0, fail_rate=0.0, seed=0):
+        self.data_dir = data_dir
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    # create function to build the request handler class bound to this server
+    def _make_handler(self):
+        mock = self
+
+        class handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, body = mock.respond(self.path, self.headers)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return handler
+
+    # create function to count a response by status
+    def _count(self, status):
+        with self.lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+    # create function to answer one request
+    def respond(self, path, headers):
+        '''
+        Function to build the response to a request
+
+        param path: request path with its query string
+        param headers: request headers
+
+        returns: tuple of (status, response headers, body bytes)
+        '''
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            fail = self.fail_rate and self.random.random() < self.fail_rate
+        if fail:
+            self._count(503)
+            return 503, {}, b''
+
+        url = urlparse(path)
+        match = league_path.match(url.path)
+        week = parse_qs(url.query).get('scoringPeriodId', [None])[0]
+        file = week_file(self.data_dir, match.group(1), week) if match and week and week.isdigit() else None
+        if file is None or not os.path.exists(file):
+            self._count(404)
+            return 404, {}, b''
+
+        with open(file, 'rb') as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        response_headers = {'ETag': etag,
+                            'Last-Modified': formatdate(os.path.getmtime(file), usegmt=True),
+                            'Content-Type': 'application/json'}
+
+        if headers.get('If-None-Match') == etag:
+            self._count(304)
+            return 304, response_headers, b''
+
+        self._count(200)
+        return 200, response_headers, body
+
+    # create function to return the base url to pass to scrape_weeks
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/apis/v3/games/ffl'
+
+    # create function to start serving on a background thread
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    # create function to stop serving
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: python espn_mock_server.py <data_dir> [port]')
+        sys.exit(1)
+
+    server = mock_espn_server(sys.argv[1], port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+    print(f'serving {sys.argv[1]} at {server.url}')
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
@@ -0,0 +1,370 @@
+# single pass parser from the espn week json files to the rosters, scoring, and matchups dataframes
+#
+# parse and save every season:   python espn_parser.py 2018 2019 2020 2021
+#
+# builds the same dataframes (and csv files) as create_rosters.create_weekly_rosters,
+# create_rosters.create_weekly_rosters_w_scoring, and create_matchups.create_weekly_matchups in
+# 00-scrape_espn_ff_api_v3_util.ipynb
+
+# import needed packages
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from espn_codes import ff_scoring_codes, lineup_slot_codes, owner_team_codes, player_stat_codes, position_codes, \
+                       pro_team_codes
+
+# create list of rosters dataframe columns
+rosters_columns = ['year', 'week', 'owner_team', 'owner', 'player', 'pro_team', 'pro_team_abv', 'current_inj_status',
+                   'lineup_slot_name', 'position_name', 'proj_points', 'actual_points', 'slot_id']
+
+# create list of matchups dataframe columns
+matchups_columns = ['week', 'owner_team_name', 'owner', 'score', 'win', 'opp_owner_team_name', 'opp_owner', 'opp_score']
+
+# create list of the scoring and player stat columns added to the rosters dataframe, in the notebook's order
+scoring_columns = list(ff_scoring_codes.values()) + list(player_stat_codes.values())
+
+# create class to translate integer espn codes to names with array lookups instead of a dictionary get per row
+class code_lookup(object):
+    '''
+    Vectorized lookup table for one of the espn code dictionaries
+
+    param codes: dictionary of integer code to a name or a list of names (e.g. owner_team_codes)
+    '''
+
+    # create __init__ function
+    def __init__(self, codes):
+        keys = np.array(list(codes), dtype=np.int64)
+        values = [v if isinstance(v, list) else [v] for v in codes.values()]
+        self.index = np.full(keys.max() + 1, -1, dtype=np.int64)
+        self.index[keys] = np.arange(len(keys))
+        self.names = [np.array([v[i] for v in values], dtype=object) for i in range(len(values[0]))]
+
+    # create function to find the table position of every code, failing on unknown codes like the dictionaries do
+    def positions(self, codes):
+        codes = np.asarray(codes, dtype=np.int64)
+        pos = np.full(len(codes), -1, dtype=np.int64)
+        known = (codes >= 0) & (codes < len(self.index))
+        pos[known] = self.index[codes[known]]
+        if (pos < 0).any():
+            raise KeyError(f'unknown codes {sorted(set(codes[pos < 0].tolist()))}')
+        return pos
+
+    # create function to translate an array of codes to an array of names
+    def take(self, codes, field=0):
+        return self.names[field][self.positions(codes)]
+
+# create lookup tables for each code dictionary
+owner_lookup = code_lookup(owner_team_codes)
+slot_lookup = code_lookup(lineup_slot_codes)
+position_lookup = code_lookup(position_codes)
+pro_team_lookup = code_lookup(pro_team_codes)
+
+# create lookup tables from scoring / player stat code to scoring column number (-1 for codes the notebook ignores)
+scoring_column = np.full(max(ff_scoring_codes) + 1, -1, dtype=np.int64)
+scoring_column[list(ff_scoring_codes)] = np.arange(len(ff_scoring_codes))
+stat_column = np.full(max(player_stat_codes) + 1, -1, dtype=np.int64)
+stat_column[list(player_stat_codes)] = [scoring_columns.index(v) for v in player_stat_codes.values()]
+
+# create function to list a season's week files in week order
+def week_files(season, data_dir='../data'):
+    files = glob.glob(os.path.join(data_dir, str(season), f'{season}_matchups_week_*.json'))
+    return sorted(files, key=lambda i: int(re.search(r'_week_(\d+)\.json$', i).group(1)))
+
+# create function to parse the rosters of one week into pre-sized column arrays
+def parse_week_rosters(data, state, events, row_offset=0):
+    '''
+    Function to parse every roster entry of one week's json in a single pass
+
+    Each player's stat lines are walked once, picking up the actual points, projected points, and pro team the same
+    way create_weekly_rosters does.  As in the notebook, a player whose stat lines carry no pro team keeps the pro team
+    of the entry before it, so the last pro team id is kept in state across weeks.
+
+    param data: dictionary loaded from a week's json file
+    param state: dictionary holding the last pro team id (carried from week to week)
+    param events: dictionary of lists the scoring events of the week are appended to, or None to skip them
+    param row_offset: rosters dataframe row of the week's first entry (the row the events point at)
+
+    returns: dictionary of column name to array with one value per roster entry
+    '''
+
+    week = data['scoringPeriodId']
+    teams = data['teams']
+    n = sum(len(tm['roster']['entries']) for tm in teams)
+
+    team_id = np.empty(n, dtype=np.int64)
+    slot_id = np.empty(n, dtype=np.int64)
+    position_id = np.empty(n, dtype=np.int64)
+    pro_team_id = np.empty(n, dtype=np.int64)
+    player_name = np.empty(n, dtype=object)
+    current_inj = np.empty(n, dtype=object)
+    proj_points = np.full(n, np.nan)
+    actual_points = np.full(n, np.nan)
+
+    row = 0
+    pro_team = state.get('pro_team_id')
+    for tm in teams:
+        for p in tm['roster']['entries']:
+            player = p['playerPoolEntry']['player']
+            proj, actual = None, None
+            for stat in player['stats']:
+                if stat['scoringPeriodId'] != week:
+                    continue
+                if stat['statSourceId'] == 0:
+                    actual = stat['appliedTotal']
+                    if stat['proTeamId'] != 0:
+                        pro_team = stat['proTeamId']
+
+                    # keep every scoring event and player stat of the actual stat line
+                    if events is not None:
+                        applied, stats = stat.get('appliedStats', {}), stat.get('stats', {})
+                        events['row'].append(row_offset + row)
+                        events['scoring_count'].append(len(applied))
+                        events['stat_count'].append(len(stats))
+                        events['scoring_code'].extend(applied.keys())
+                        events['scoring_value'].extend(applied.values())
+                        events['stat_code'].extend(stats.keys())
+                        events['stat_value'].extend(stats.values())
+                elif stat['statSourceId'] == 1:
+                    proj = stat['appliedTotal']
+                    if stat['proTeamId'] != 0:
+                        pro_team = stat['proTeamId']
+                    elif (proj < 1) & (not actual):
+                        pro_team = player['proTeamId']
+                    elif not pro_team:
+                        pro_team = player['proTeamId']
+
+            team_id[row] = tm['id']
+            slot_id[row] = p['lineupSlotId']
+            position_id[row] = player['defaultPositionId']
+            pro_team_id[row] = player['proTeamId'] if pro_team is None else pro_team
+            player_name[row] = player['fullName']
+            current_inj[row] = player.get('injuryStatus', np.nan)
+            if proj is not None:
+                proj_points[row] = proj
+            if actual is not None:
+                actual_points[row] = actual
+            row += 1
+
+    state['pro_team_id'] = pro_team
+    return {'year': np.full(n, data['seasonId'], dtype=np.int64),
+            'week': np.full(n, week, dtype=np.int64),
+            'owner_team': owner_lookup.take(team_id, 0),
+            'owner': owner_lookup.take(team_id, 1),
+            'player': player_name,
+            'pro_team': pro_team_lookup.take(pro_team_id, 0),
+            'pro_team_abv': pro_team_lookup.take(pro_team_id, 1),
+            'current_inj_status': current_inj,
+            'lineup_slot_name': slot_lookup.take(slot_id),
+            'position_name': position_lookup.take(position_id),
+            'proj_points': proj_points,
+            'actual_points': actual_points,
+            'slot_id': slot_id
+           }
+
+# create function to turn the collected scoring events into a long dataframe
+def events_frame(events):
+    '''
+    Function to build the scoring events dataframe of a season
+
+    param events: dictionary of lists filled by parse_week_rosters
+
+    returns: pandas dataframe with one row per scoring event / player stat the notebook keeps, in the order the
+             notebook applies them: row (rosters dataframe row), column (position in scoring_columns), and value
+    '''
+
+    rows = np.asarray(events['row'], dtype=np.int64)
+    frames = []
+    for kind, lookup in [('scoring', scoring_column), ('stat', stat_column)]:
+        codes = np.asarray(events[f'{kind}_code'], dtype=np.int64)
+        column = np.full(len(codes), -1, dtype=np.int64)
+        known = (codes >= 0) & (codes < len(lookup))
+        column[known] = lookup[codes[known]]
+        keep = column >= 0
+        frames.append(pd.DataFrame({'row': np.repeat(rows, events[f'{kind}_count'])[keep],
+                                    'column': column[keep],
+                                    'value': np.asarray(events[f'{kind}_value'], dtype=np.float64)[keep]
+                                   }))
+
+    # scoring and player stat columns never overlap, so keeping each kind in stat line order keeps the notebook's
+    # last-write-wins order within every column
+    return pd.concat(frames, ignore_index=True)
+
+# create function to start an empty set of scoring event lists
+def new_events():
+    return {'row': [], 'scoring_count': [], 'stat_count': [], 'scoring_code': [], 'scoring_value': [], 'stat_code': [],
+            'stat_value': []}
+
+# create function to add the scoring and player stat columns to a rosters dataframe
+def rosters_with_scoring(rosters_df, events_df):
+    '''
+    Function to build the rosters dataframe with scoring columns from the rosters and scoring events dataframes
+
+    Like create_weekly_rosters_w_scoring, every event is written to each row of the same player, week, and year (the
+    last event wins) and every null (including current_inj_status) is replaced with 0.
+
+    param rosters_df: pandas dataframe returned by parse_season
+    param events_df: scoring events dataframe returned by parse_season
+
+    returns: pandas dataframe with the rosters columns followed by the scoring_columns
+    '''
+
+    values = np.zeros((len(rosters_df), len(scoring_columns)))
+
+    # number every (player, week, year) and keep the last event of each key and column
+    key = rosters_df.groupby(['player', 'week', 'year'], sort=False).ngroup().to_numpy()
+    events = pd.DataFrame({'key': key[events_df['row'].to_numpy()], 'column': events_df['column'].to_numpy(),
+                           'value': events_df['value'].to_numpy()}).drop_duplicates(['key', 'column'], keep='last')
+
+    # fan each event out to every row of its key
+    ev_key, ev_column, ev_value = (events[i].to_numpy() for i in ['key', 'column', 'value'])
+    key_rows = np.argsort(key, kind='stable')
+    key_counts = np.bincount(key, minlength=key.max() + 1 if len(key) else 0)
+    key_start = np.cumsum(key_counts) - key_counts
+    n = key_counts[ev_key]
+    ev = np.repeat(np.arange(len(ev_key)), n)
+    offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    values[key_rows[key_start[ev_key[ev]] + offset], ev_column[ev]] = ev_value[ev]
+
+    rosters_df_w_scoring = pd.concat([rosters_df, pd.DataFrame(values, columns=scoring_columns, index=rosters_df.index)],
+                                     axis = 1)
+
+    # replace nulls with 0
+    rosters_df_w_scoring.replace(np.nan, 0, inplace=True)
+    return rosters_df_w_scoring
+
+# create function to build the matchups dataframe from the schedule of a week's json
+def parse_matchups(data):
+    '''
+    Function to parse the season schedule into the weekly matchups dataframe in a single pass
+
+    param data: dictionary loaded from a week's json file (the latest week holds every decided matchup)
+
+    returns: pandas dataframe with the matchups_columns, two rows (away then home) per decided scoring period
+    '''
+
+    schedule = [m for m in data['schedule'] if m['winner'] != 'UNDECIDED']
+    n = 2 * sum(min(len(m['away']['pointsByScoringPeriod']), len(m['home']['pointsByScoringPeriod'])) for m in schedule)
+
+    week = np.empty(n, dtype=np.int64)
+    team_id = np.empty(n, dtype=np.int64)
+    opp_id = np.empty(n, dtype=np.int64)
+    score = np.empty(n, dtype=np.float64)
+    opp_score = np.empty(n, dtype=np.float64)
+    win = np.zeros(n, dtype=np.int64)
+
+    row = 0
+    for m in schedule:
+        away, home = m['away'], m['home']
+        away_points, home_points = away['pointsByScoringPeriod'], home['pointsByScoringPeriod']
+
+        # with a multi week matchup period the win is only given on its second scoring period
+        for index, ((key_away, value_away), (key_home, value_home)) in enumerate(zip(away_points.items(),
+                                                                                    home_points.items())):
+            week[row], week[row + 1] = int(key_away), int(key_home)
+            team_id[row], team_id[row + 1] = away['teamId'], home['teamId']
+            opp_id[row], opp_id[row + 1] = home['teamId'], away['teamId']
+            score[row], score[row + 1] = float(value_away), float(value_home)
+            opp_score[row], opp_score[row + 1] = float(value_home), float(value_away)
+            win[row] = m['winner'] == 'AWAY' and (len(away_points) == 1 or index == 1)
+            win[row + 1] = m['winner'] == 'HOME' and (len(home_points) == 1 or index == 1)
+            row += 2
+
+    return pd.DataFrame({'week': week,
+                         'owner_team_name': owner_lookup.take(team_id, 0),
+                         'owner': owner_lookup.take(team_id, 1),
+                         'score': score,
+                         'win': win,
+                         'opp_owner_team_name': owner_lookup.take(opp_id, 0),
+                         'opp_owner': owner_lookup.take(opp_id, 1),
+                         'opp_score': opp_score
+                        }, columns=matchups_columns)
+
+# create function to parse every week of a season
+def parse_season(season, data_dir='../data', weeks=None, scoring=True):
+    '''
+    Function to parse a season's week json files, reading each file once
+
+    param season: season year
+    param data_dir: data directory
+    param weeks: number of weeks to parse (defaults to every week file on disk)
+    param scoring: whether to collect the scoring events and build the rosters dataframe with scoring columns
+
+    returns: dictionary with the 'rosters', 'matchups', and (when scoring) 'events' and 'rosters_w_scoring' dataframes
+    '''
+
+    files = week_files(season, data_dir)
+    if weeks is not None:
+        files = files[:weeks]
+    if not files:
+        raise FileNotFoundError(f'no week json files for {season} in {data_dir}')
+
+    state = {}
+    events = new_events() if scoring else None
+    weeks_columns = []
+    row_offset = 0
+    for file in files:
+        with open(file, encoding = 'utf-8') as f:
+            data = json.load(f)
+
+        columns = parse_week_rosters(data, state, events, row_offset)
+        row_offset += len(columns['year'])
+        weeks_columns.append(columns)
+
+    rosters_df = pd.DataFrame({c: np.concatenate([w[c] for w in weeks_columns]) for c in rosters_columns},
+                              columns=rosters_columns)
+
+    # the notebook builds the matchups from the last week it loaded
+    frames = {'rosters': rosters_df, 'matchups': parse_matchups(data)}
+    if scoring:
+        frames['events'] = events_frame(events)
+        frames['rosters_w_scoring'] = rosters_with_scoring(rosters_df, frames['events'])
+    return frames
+
+# create function to parse many seasons at once, one process per season
+def parse_seasons(seasons, data_dir='../data', processes=None, scoring=True):
+    '''
+    Function to parse several seasons in parallel
+
+    param seasons: list of season years
+    param data_dir: data directory
+    param processes: number of worker processes (defaults to one per season up to the cpu count, 1 parses in this
+                     process)
+    param scoring: whether to build the scoring events and rosters dataframe with scoring columns
+
+    returns: dictionary of season to the dictionary returned by parse_season
+    '''
+
+    if processes is None:
+        processes = min(len(seasons), os.cpu_count() or 1)
+    if processes <= 1:
+        return {season: parse_season(season, data_dir, scoring=scoring) for season in seasons}
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = executor.map(parse_season, seasons, [data_dir] * len(seasons), [None] * len(seasons),
+                               [scoring] * len(seasons))
+        return dict(zip(seasons, results))
+
+# create function to save a season's dataframes to the csv files the notebook writes
+def write_season(frames, season, data_dir='../data'):
+    frames['rosters'].to_csv(os.path.join(data_dir, str(season), f'rosters_df_{season}.csv'), index = False)
+    frames['matchups'].to_csv(os.path.join(data_dir, str(season), f'matchups_df_{season}.csv'), index = False)
+    if 'rosters_w_scoring' in frames:
+        frames['rosters_w_scoring'].to_csv(os.path.join(data_dir, str(season), f'rosters_df_w_scoring_{season}.csv'),
+                                           index = False)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: python espn_parser.py <season> [<season> ...]')
+        sys.exit(1)
+
+    seasons = [int(i) for i in sys.argv[1:]]
+    for season, frames in parse_seasons(seasons).items():
+        write_season(frames, season)
+        print(f"season: {season}, rosters: {frames['rosters'].shape}, matchups: {frames['matchups'].shape}")
@@ -3,16 +3,19 @@ import numpy as np
 import pandas as pd
 import os
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
 import seaborn as sns
+from profile_util import profile_columns
+from chart_util import nan_corr, write_histograms
+from assoc_util import cat_associations
 
 # create function to explore numerical data
-def explore_num_data(data, n):
+def explore_num_data(data, n, processes=None):
     '''
     Function to explore numerical data
     
-    param data: pandas dataframe
+    param data: pandas dataframe, or an iterable of dataframe chunks (e.g. pd.read_csv with chunksize)
     param n: integer to determine the number of first and last values to return (when sorted) for each numerical variable
+    param processes: number of worker processes to profile the columns with (see profile_util.profile_columns)
     
     returns: for each numerical variable a pandas dataframe which includes row count, number of distinct values, 5-number
              summary, mean, standard deviation, sum, percentage null, percentage zero, percentage positive, and percentage
@@ -22,107 +25,16 @@ def explore_num_data(data, n):
              and the last n values
     '''
     
-    # create list of numerical columns
-    columns = [i for i in (data.select_dtypes(include=['float64', 'int64']).columns)]
-    
-    # select numerical columns within dataframe
-    data = data[columns]
-    
-    # call describe function to calculate count, mean, std, and 5-number summary
-    describe_df = data.describe()
-    
-    # create list of number of distinct values within each numerical column
-    dist_num = [len(data[i].dropna().unique()) for i in columns]
-    
-    # create list of the sum of all values within each numerical column
-    total_sum = [data[i].sum() for i in columns]
-    
-    # calculate total number of rows
-    total_count = len(data)
-    
-    # calculate percentage null for each numerical column
-    null_perc = [100.0 * data[i].isna().sum() / total_count for i in columns]
-    
-    # calculate percentage zero for each numerical column
-    zero_perc = [100.0 * len(data.loc[data[i] == 0, i]) / total_count for i in columns]
-    
-    # calculate percentage positive for each numerical column
-    pos_perc = [100.0 * len(data.loc[data[i] > 0, i]) / total_count for i in columns]
-    
-    # calculate percentage negative for each numerical column
-    neg_perc = [100.0 * len(data.loc[data[i] < 0, i]) / total_count for i in columns]
-    
-    # create temporary dataframe for statistics created above
-    temp_df = pd.DataFrame({'dist_num': dist_num
-                           ,'total_sum': total_sum
-                           ,'null_perc': null_perc
-                           ,'zero_perc': zero_perc
-                           ,'pos_perc': pos_perc
-                           ,'neg_perc': neg_perc
-                           }).transpose()
-    
-    # set columns
-    temp_df.columns = columns
-    
-    # concatenate describe_df and temp_df
-    df = pd.concat([describe_df, temp_df], sort = False)
-    
-    # set index name
-    df.index.set_names('summary', inplace = True)
-    
-    # transpose dataframe
-    df = df.transpose()
-    
-    # reorder dataframe
-    df = df[['count'
-            ,'dist_num'
-            ,'min'
-            ,'25%'
-            ,'50%'
-            ,'75%'
-            ,'max'
-            ,'mean'
-            ,'std'
-            ,'total_sum'
-            ,'null_perc'
-            ,'zero_perc'
-            ,'pos_perc'
-            ,'neg_perc'
-            ]]
-    
-    # rename count column
-    df.rename(columns={'count':'row_count'}, inplace=True)
-    
-    # calculate most frequent values within each numerical column
-    freq = []
-    for i in columns:
-        temp_freq = data.groupby(i).agg(count = (i, 'count')).sort_values('count', ascending = False).reset_index().head(n)
-        temp_freq['freq'] = temp_freq['count'] / total_count
-        freq.append(temp_freq)
-    
-    # calculate the first n values within each numerical column when sorted
-    first_values = []
-    for j in columns:
-        temp_first_values = data.groupby(j).agg(count = (j, 'count')).sort_values(j, ascending = True).reset_index().head(n)
-        temp_first_values['freq'] = temp_first_values['count'] / total_count
-        first_values.append(temp_first_values)
+    return profile_columns(data, 'num', n, processes)
     
-    # calculate the last n values within each numerical column when sorted
-    last_values = []
-    for k in columns:
-        temp_last_values = data.groupby(k).agg(count = (k, 'count')).sort_values(k, ascending = False).reset_index().head(n)
-        temp_last_values['freq'] = temp_last_values['count'] / total_count
-        last_values.append(temp_last_values)
-    
-    return df, freq, first_values, last_values
-	
 # create function to explore categorical data
-def explore_cat_data(data, n):
+def explore_cat_data(data, n, processes=None):
     '''
     Function to explore categorical data
     
-    param data: pandas dataframe
+    param data: pandas dataframe, or an iterable of dataframe chunks (e.g. pd.read_csv with chunksize)
     param n: integer to determine the number of first and last values to return (when sorted) for each categorical variable
+    param processes: number of worker processes to profile the columns with (see profile_util.profile_columns)
     
     returns: for each categorical variable a pandas dataframe which includes minimum string length, maximum string length, row count, number of 
              distince values, percent null, and percent empty
@@ -131,84 +43,15 @@ def explore_cat_data(data, n):
              and the last n values
     '''
     
-    # create list of categorical columns
-    columns = [i for i in (data.select_dtypes(include=['string', 'object', 'category']).columns)]
-    
-    # select categorical columns within dataframe
-    data = data[columns]
-    
-    # calculate row count
-    count_rows = [data[i].dropna().count() for i in columns]
-    
-    # calculate number of distinct values
-    dist_num = [data[i].dropna().value_counts().count() for i in columns]
-    
-    # calculate total number of rows
-    total_count = len(data)
-    
-    # calculate minimum length for each categorical column
-    min_length = [data[i].astype(str).str.len().min() for i in columns]
-    
-    # calculate maximum length for each categorical column
-    max_length = [data[i].astype(str).str.len().max() for i in columns]
-    
-    # calculate percentage null for each categorical column
-    null_perc = [100.0 * data[i].isna().sum() / total_count for i in columns]
-    
-    # calculate percentage empty for each categorical column
-    empty_perc = [100.0 * len(data.loc[data[i] == '', i]) / total_count for i in columns]    
-    
-    # combine above stats into a pandas dataframe
-    df = pd.DataFrame({'row_count': count_rows
-                      ,'dist_num': dist_num
-                      ,'min_length': min_length
-                      ,'max_length': max_length
-                      ,'null_perc': null_perc
-                      ,'empty_perc': empty_perc
-                      }).transpose()
-					  
-    # add column names
-    df.columns = columns
+    return profile_columns(data, 'cat', n, processes)
     
-    # calculate most frequent values within each categorical column
-    freq = []
-    for i in columns:
-        temp_freq = data.groupby(i).agg(count = (i, 'count')).sort_values('count', ascending = False).reset_index().head(n)
-        temp_freq['freq'] = temp_freq['count'] / total_count
-        freq.append(temp_freq)
-    
-    # calculate the first n values within each categorical column when sorted
-    first_values = []
-    for j in columns:
-        temp_first_values = data.groupby(j).agg(count = (j, 'count')).sort_values(j, ascending = True).reset_index().head(n)
-        temp_first_values['freq'] = temp_first_values['count'] / total_count
-        first_values.append(temp_first_values)
-    
-    # calculate the last n values within each categorical column when sorted
-    last_values = []
-    for k in columns:
-        temp_last_values = data.groupby(k).agg(count = (k, 'count')).sort_values(k, ascending = False).reset_index().head(n)
-        temp_last_values['freq'] = temp_last_values['count'] / total_count
-        last_values.append(temp_last_values)
-    
-    return df, freq, first_values, last_values
-	
 # create function to plot histograms for each numerical variable
-def plot_hist(data, file_name, output_dir):
+def plot_hist(data, file_name, output_dir, processes=None):
     # create list of numerical columns
     columns = [i for i in (data.select_dtypes(include=['float64', 'int64']).columns)]
     
-    # create pdf object
-    pdf_obj = PdfPages(output_dir + '/{}_histograms.pdf'.format(file_name))
-    
-    # create histogram for each numerical variable
-    for col in columns:
-        f = plt.figure()
-        plt.hist(data['{}'.format(col)].dropna(), bins = 50, color = 'green')
-        plt.title('{}'.format(col))
-        pdf_obj.savefig(f)
-        plt.close()
-    pdf_obj.close()
+    # create histogram for each numerical variable, drawn from counts binned for every column at once
+    write_histograms(data, columns, output_dir + '/{}_histograms.pdf'.format(file_name), bins = 50, processes = processes)
 
 # create function to plot correlation matrix	
 def corr_matrix(data, file_name, output_dir):
@@ -217,7 +60,7 @@ def corr_matrix(data, file_name, output_dir):
     if len(columns) != 0:
         
         # create a correlation matrix for all numerical columns and export to csv
-        corr = data.corr()
+        corr = nan_corr(data)
         
         # save to cvs
         corr.to_csv(output_dir + '/{}_correlation_analysis.csv'.format(file_name), index = True)
@@ -229,9 +72,34 @@ def corr_matrix(data, file_name, output_dir):
             fig, ax = plt.subplots(figsize = (8, 8))
             g = sns.heatmap(corr, annot = True, fmt = '.2f', cmap = plt.get_cmap('coolwarm'), cbar = False, ax = ax)
             plt.savefig(output_dir + '{}_correlation_analysis.png'.format(file_name), bbox_inches='tight', pad_inches=0.0)
+            plt.close(fig)
     else: 
         print("no numerical columns")
 
+# create function to compute the relationships between categorical variables
+def cat_relationships(data, file_name, output_dir, processes=None):
+    
+    # run the chi-squared test, Cramer's V, and Theil's U on every pair of categorical columns
+    df, cramers_df, theils_df = cat_associations(data, processes = processes)
+    
+    if len(df) != 0:
+        
+        # save to csv
+        df.to_csv(output_dir + '/{}_categorical_relationships.csv'.format(file_name), index = False)
+        
+        # create Cramer's V and Theil's U heatmaps if the columns are less than or equal 15, otherwise, the heatmaps are too big to easily read
+        if len(cramers_df) <= 15:
+            for matrix, title, name in [(cramers_df, "Cramér's V", 'cramers_v'), (theils_df, "Theil's U", 'theils_u')]:
+                fig, ax = plt.subplots(figsize = (8, 8))
+                g = sns.heatmap(matrix, annot = True, fmt = '.2f', cmap = plt.get_cmap('coolwarm'), cbar = False, ax = ax)
+                ax.set_title(title)
+                plt.xticks(rotation=45)
+                plt.yticks(rotation=45)
+                plt.savefig(output_dir + '/{}_{}.pdf'.format(file_name, name), bbox_inches='tight', pad_inches=0.0)
+                plt.close(fig)
+    else:
+        print("less than two categorical columns")
+
 # create function to run the exploration functions created above 		
 def run_explore_func(data, func, func_var, positional_group, print_flag, output_dir):
     
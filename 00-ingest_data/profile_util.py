@@ -0,0 +1,229 @@
+# single pass column profiler behind explore_util.explore_num_data and explore_util.explore_cat_data
+#
+# every statistic of a column is derived from one value_counts of the column plus its sum and variance, columns are
+# profiled in parallel worker processes, and a frame too large for memory can be profiled chunk by chunk, e.g.
+#
+#   profile_columns(pd.read_csv('play_by_play_2021.csv', chunksize=500000), 'num')
+
+# import needed packages
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# create dictionary of the dtypes profiled as numerical and as categorical columns
+profile_dtypes = {'num': ['float64', 'int64'], 'cat': ['string', 'object', 'category']}
+
+# create list of the numerical summary columns in the order explore_num_data returns them
+num_summary_columns = ['row_count', 'dist_num', 'min', '25%', '50%', '75%', 'max', 'mean', 'std', 'total_sum', 'null_perc',
+                       'zero_perc', 'pos_perc', 'neg_perc']
+
+# create list of the categorical summary rows in the order explore_cat_data returns them
+cat_summary_rows = ['row_count', 'dist_num', 'min_length', 'max_length', 'null_perc', 'empty_perc']
+
+# create number of cells below which columns are profiled in this process (a worker process costs more than it saves)
+parallel_min_cells = 2000000
+
+# create function to profile one chunk of a numerical column
+def profile_num_column(values):
+    '''
+    Function to collect the mergeable statistics of a numerical column
+
+    param values: pandas series
+
+    returns: dictionary with the row count, value counts (nulls dropped), non-null count, sum, sum of squared
+             deviations from the mean, and number of chunks merged
+    '''
+
+    counts = values.value_counts(sort=False)
+    count = int(counts.sum())
+    total = values.sum()
+    return {'rows': len(values),
+            'counts': counts,
+            'count': count,
+            'sum': total,
+            'm2': values.var() * (count - 1) if count > 1 else 0.0,
+            'chunks': 1
+           }
+
+# create function to profile one chunk of a categorical column
+def profile_cat_column(values):
+    '''
+    Function to collect the mergeable statistics of a categorical column
+
+    param values: pandas series
+
+    returns: dictionary with the row count, value counts (nulls dropped), the string lengths of the nulls as
+             astype(str) prints them, and the number of chunks merged
+    '''
+
+    nulls = values[values.isna()]
+    null_lengths = nulls.astype(str).str.len().unique().tolist() if len(nulls) else []
+    return {'rows': len(values),
+            'counts': values.value_counts(sort=False),
+            'null_lengths': null_lengths,
+            'chunks': 1
+           }
+
+# create function to merge the statistics of two chunks of the same column
+def merge_profiles(a, b):
+    '''
+    Function to merge the statistics of two chunks of a column
+
+    The sums of squared deviations are combined with Chan's parallel update so the variance of the whole column is
+    exact up to floating point rounding.
+
+    param a: dictionary returned by profile_num_column / profile_cat_column (or an earlier merge)
+    param b: dictionary returned by profile_num_column / profile_cat_column
+
+    returns: dictionary of the statistics of both chunks together
+    '''
+
+    # categoricals of different chunks can have different categories, so merge their counts by value
+    counts = [i['counts'] for i in [a, b]]
+    if any(isinstance(i.index, pd.CategoricalIndex) for i in counts):
+        counts = [pd.Series(i.to_numpy(), index=i.index.astype(object)) for i in counts]
+    merged = {'rows': a['rows'] + b['rows'],
+              'counts': pd.concat(counts).groupby(level=0, sort=False).sum(),
+              'chunks': a['chunks'] + b['chunks']
+             }
+
+    if 'null_lengths' in a:
+        merged['null_lengths'] = sorted(set(a['null_lengths']) | set(b['null_lengths']))
+        return merged
+
+    count = a['count'] + b['count']
+    merged['count'] = count
+    merged['sum'] = a['sum'] + b['sum']
+    if a['count'] and b['count']:
+        delta = b['sum'] / b['count'] - a['sum'] / a['count']
+        merged['m2'] = a['m2'] + b['m2'] + delta * delta * a['count'] * b['count'] / count
+    else:
+        merged['m2'] = a['m2'] + b['m2']
+    return merged
+
+# create function to pick the quantiles of a column from its value counts
+def count_quantiles(counts, q):
+    # find the two ranks around each quantile in the cumulative counts of the sorted values (the column is never
+    # rebuilt) and interpolate between their values the way np.percentile does, so they match Series.quantile exactly
+    counts = counts[counts > 0].sort_index()
+    values = counts.index.to_numpy()
+    ends = np.cumsum(counts.to_numpy())
+    last = ends[-1] - 1
+    ranks = last * np.true_divide([100 * i for i in q], 100)
+    below = np.minimum(np.floor(ranks).astype(np.intp), last)
+    gamma = ranks - below
+    low = values[np.searchsorted(ends, below, side='right')]
+    high = values[np.searchsorted(ends, np.minimum(below + 1, last), side='right')]
+    diff = high - low
+    return np.where(gamma >= 0.5, high - diff * (1 - gamma), low + diff * gamma).tolist()
+
+# create function to build the (value, count) table explore_num_data / explore_cat_data sort for the value lists
+def count_table(counts, column):
+    table = counts.sort_index()
+    return pd.DataFrame({'count': table.to_numpy()}, index=table.index.rename(column))
+
+# create function to finish the profile of a numerical column
+def finish_num_profile(profile):
+    counts = profile['counts']
+    count, total_count = profile['count'], profile['rows']
+    values = counts.index.to_numpy()
+
+    if count:
+        quantiles = count_quantiles(counts, [0.25, 0.5, 0.75])
+        low, high = values[counts.to_numpy() > 0].min(), values[counts.to_numpy() > 0].max()
+        mean = profile['sum'] / count
+    else:
+        quantiles, low, high, mean = [np.nan] * 3, np.nan, np.nan, np.nan
+    std = np.sqrt(profile['m2'] / (count - 1)) if count > 1 else np.nan
+
+    return {'row_count': float(count),
+            'dist_num': float(len(counts)),
+            'min': low,
+            '25%': quantiles[0],
+            '50%': quantiles[1],
+            '75%': quantiles[2],
+            'max': high,
+            'mean': mean,
+            'std': std,
+            'total_sum': profile['sum'],
+            'null_perc': 100.0 * (total_count - count) / total_count,
+            'zero_perc': 100.0 * counts[values == 0].sum() / total_count,
+            'pos_perc': 100.0 * counts[values > 0].sum() / total_count,
+            'neg_perc': 100.0 * counts[values < 0].sum() / total_count
+           }
+
+# create function to finish the profile of a categorical column
+def finish_cat_profile(profile):
+    counts = profile['counts']
+    total_count = profile['rows']
+    observed = counts[counts > 0]
+    lengths = [len(str(i)) for i in observed.index] + profile['null_lengths']
+    empty = counts[counts.index == ''].sum() if len(counts) else 0
+
+    return {'row_count': int(counts.sum()),
+            'dist_num': len(counts),
+            'min_length': min(lengths) if lengths else np.nan,
+            'max_length': max(lengths) if lengths else np.nan,
+            'null_perc': 100.0 * (total_count - counts.sum()) / total_count,
+            'empty_perc': 100.0 * empty / total_count
+           }
+
+# create function to profile a list of columns of one chunk, in worker processes when the chunk is large
+def profile_chunk(data, columns, kind, processes):
+    func = profile_num_column if kind == 'num' else profile_cat_column
+    if processes is None:
+        processes = 1 if len(data) * len(columns) < parallel_min_cells else min(len(columns), os.cpu_count() or 1)
+    if processes <= 1 or len(columns) <= 1:
+        return [func(data[i]) for i in columns]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(func, [data[i] for i in columns]))
+
+# create function to profile every numerical or categorical column of a dataframe or a stream of dataframe chunks
+def profile_columns(data, kind, n=5, processes=None):
+    '''
+    Function to profile the numerical or categorical columns of a dataframe
+
+    Each column is read once by value_counts (plus one sum and one variance for numerical columns) and every other
+    statistic, as well as the most frequent, first, and last values, is derived from the value counts.
+
+    param data: pandas dataframe, or an iterable of dataframe chunks with the same columns (e.g. pd.read_csv with
+                chunksize) whose column dtypes are taken from the first chunk
+    param kind: 'num' for the float64/int64 columns or 'cat' for the string/object/category columns
+    param n: integer to determine the number of most frequent, first, and last values to return for each column
+    param processes: number of worker processes (defaults to one per column up to the cpu count for large frames and
+                     none for small ones)
+
+    returns: the same four results as explore_num_data / explore_cat_data: the summary dataframe, and lists with a
+             dataframe of the most frequent values, the first n values, and the last n values of each column
+    '''
+
+    chunks = iter([data]) if isinstance(data, pd.DataFrame) else iter(data)
+    first = next(chunks)
+    columns = [i for i in (first.select_dtypes(include=profile_dtypes[kind]).columns)]
+
+    profiles = profile_chunk(first, columns, kind, processes)
+    for chunk in chunks:
+        profiles = [merge_profiles(a, b) for a, b in zip(profiles, profile_chunk(chunk, columns, kind, processes))]
+
+    # summarize each column
+    if kind == 'num':
+        df = pd.DataFrame([finish_num_profile(i) for i in profiles], index=columns, columns=num_summary_columns,
+                          dtype=np.float64)
+        df.columns.name = 'summary'
+    else:
+        df = pd.DataFrame([finish_cat_profile(i) for i in profiles], index=columns,
+                          columns=cat_summary_rows).astype(np.float64).transpose()
+
+    # derive the most frequent, first n, and last n values from the value counts
+    freq, first_values, last_values = [], [], []
+    for col, profile in zip(columns, profiles):
+        table = count_table(profile['counts'], col)
+        total_count = profile['rows']
+        for values, sort_by, ascending in [(freq, 'count', False), (first_values, col, True), (last_values, col, False)]:
+            temp = table.sort_values(sort_by, ascending = ascending).reset_index().head(n)
+            temp['freq'] = temp['count'] / total_count
+            values.append(temp)
+
+    return df, freq, first_values, last_values
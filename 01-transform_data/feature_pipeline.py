@@ -0,0 +1,955 @@
+# content-hashed, incremental pipeline behind the feature matrices of 01-calc_adv_stats.ipynb
+#
+# the notebook's cells are split into named stages that each run on one (season, week) partition: identity resolution
+# of the roster rows (see player_identity.py), one aggregation per play-by-play stat table (rushing, receiving, passing,
+# defense, and kicking), and for each position group a merge of its roster rows with its stat tables followed by the
+# derived ratios (total_off_share, compl_rate, fg_perc, ...).  every aggregation, join, and ratio of the notebook is
+# grouped by or keyed on year and week, so the partitions are independent and concatenating them in roster order gives
+# the notebook's feature matrices.
+#
+# each stage output is saved to <cache_dir>/<stage>/<key>.pkl, the key hashing the stage's code (its source, the source
+# of the functions it calls, and the column lists it reads) and its inputs (the partition's roster or play-by-play rows,
+# or the keys of the stages it reads), so only the partitions whose rows or stage code changed are recomputed.  the
+# position groups run in parallel and the seconds spent in every stage are returned with the feature matrices:
+#
+#   features, timings = build_features(df, play_by_play_df)
+#
+# or from the command line, reading rosters_df_w_scoring.csv and writing the four *_feature_matrix.csv files:
+#
+#   python feature_pipeline.py build 2018 2019 2020
+
+# import needed packages
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pbp_cache import cache_seasons, load_play_by_play
+from player_identity import player_index, player_overrides
+
+# the rosters loader is shared with the app in the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compact_rosters import read_rosters
+
+# create list of player specific columns
+player_columns = ['year', 'week', 'player', 'short_name', 'position_name', 'pro_team', 'pro_team_abv']
+
+# create column lists of the RB/WR/TE football statistics, fantasy football statistics, and advanced metrics
+rbwrte_stats = ['rush_att', 'rush_yrd', 'rush_td', 'rush_2pt_con', 'rec_tar', 'receptions', 'rec_yrd', 'rec_td',
+                'rec_2pt_con', 'fum_lost']
+rbwrte_ff_stats = ['rush_5_yrd_ff', 'rush_yrd_100_199_ff', 'rush_yrd_200+_ff', 'rush_td_ff', 'rush_50_yrd_td_ff',
+                   'rush_2pt_con_ff', 'receptions_ff', 'rec_5_yrd_ff', 'rec_yrd_100_199_ff', 'rec_yrd_200+_ff',
+                   'rec_td_ff', 'rec_50_yrd_td_ff', 'rec_2pt_con_ff_ff', 'fum_lost_ff', 'actual_points']
+rbwrte_advanced_metrics = ['yrd_per_rush', 'rush_share', 'total_off_share', 'target_share', 'yrd_per_catch',
+                           'yards_after_catch', 'air_yards_ind', 'compl_rec_air_yrds', 'racr', 'adot', 'wopr']
+
+# create column lists of the rushing and receiving table columns joined to the RB/WR/TE rows
+rbwrte_rush_columns = ['rush_attempts_team', 'rush_share', 'yrd_per_rush']
+rbwrte_rec_columns = ['target_team', 'target_share', 'yrd_per_catch', 'yards_after_catch', 'air_yards_ind',
+                      'compl_rec_air_yrds', 'racr', 'adot', 'wopr']
+
+# create column lists of the QB football statistics, fantasy football statistics, and advanced metrics
+qb_stats = ['pass_comp', 'pass_incomp', 'pass_yrd', 'pass_td', 'pass_2pt_con', 'pass_int', 'rush_att', 'rush_yrd',
+            'rush_td', 'rush_2pt_con', 'fum_lost']
+upd_qb_stats = ['pass_comp', 'pass_incomp', 'pass_yrd', 'air_yards', 'pass_td', 'rdz_td', 'pass_2pt_con', 'pass_int',
+                'rush_att', 'rush_yrd', 'rush_td', 'rush_2pt_con', 'fum_lost']
+add_qb_stats = ['shotgun', 'no_huddle', 'qb_dropback', 'qb_kneel', 'qb_spike', 'qb_scramble', 'qb_hit', 'sack', 'ep',
+                'epa', 'air_epa', 'comp_air_epa', 'qb_epa', 'air_wpa', 'comp_air_wpa']
+qb_advanced_metrics = ['compl_rate', 'pass_yrd_per_att', 'air_yrd_per_att', 'adj_net_yrd_per_att', 'comp_air_yard',
+                       'td_to_att_ratio', 'int_to_td_ratio', 'total_to', 'yrd_per_rush', 'rush_share']
+qb_ff_stats = ['pass_comp_ff', 'pass_incomp_ff', 'pass_5_yrd_ff', 'pass_yrd_300_399_ff', 'pass_yrd_400+_ff',
+               'pass_td_ff', 'pass_50_yrd_td_ff', 'pass_2pt_con_ff', 'pass_int_ff', 'rush_5_yrd_ff',
+               'rush_yrd_100_199_ff', 'rush_yrd_200+_ff', 'rush_td_ff', 'rush_50_yrd_td_ff', 'rush_2pt_con_ff',
+               'fum_lost_ff', 'actual_points']
+
+# create column list of the passing play columns of the passing table
+passing_columns = ['passer_player_id', 'passer_player_name', 'posteam', 'year', 'week', 'incomplete_pass',
+                   'complete_pass', 'pass_attempt', 'passing_yards', 'air_yards', 'yards_after_catch', 'pass_length',
+                   'yards_gained', 'pass_location', 'touchdown', 'interception', 'fumble_lost', 'shotgun', 'no_huddle',
+                   'qb_dropback', 'qb_kneel', 'qb_spike', 'qb_scramble', 'qb_hit', 'sack', 'ep', 'epa', 'air_epa',
+                   'comp_air_epa', 'qb_epa', 'air_wpa', 'comp_air_wpa', 'yardline_100']
+
+# create column lists of the defense football statistics, fantasy football statistics, and advanced metrics
+def_stats = ['def_pts_alw', 'def_tot_yrd_alw', 'def_st_int', 'def_st_fum', 'def_st_sack', 'def_st_safety',
+             'def_st_blk_kick', 'def_st_int_td', 'def_st_fum_ret_td', 'def_st_blk_td', 'def_st_kick_ret_td',
+             'def_st_punt_ret_td']
+def_ff_stats = ['def_st_0_pts_alw_ff', 'def_st_1_6_pts_alw_ff', 'def_st_7_13_pts_alw_ff', 'def_st_14_17_pts_alw_ff',
+                'def_st_22_27_pts_alw_ff', 'def_st_28_34_pts_alw_ff', 'def_st_35_45_pts_alw_ff',
+                'def_st_46+_pts_alw_ff', 'def_st_0_99_yrd_alw_ff', 'def_st_100_199_yrd_alw_ff',
+                'def_st_200_299_yrd_alw_ff', 'def_st_350_399_yrd_alw', 'def_st_400_449_yrd_alw_ff',
+                'def_st_450_499_yrd_alw_ff', 'def_st_500_549_yrd_alw_ff', 'def_st_550+_yrd_alw_ff', 'def_st_int_ff',
+                'def_st_fum_ff', 'def_st_sack_ff', 'def_st_blk_kick_ff', 'def_st_safety_ff', 'def_st_int_td_ff',
+                'def_st_fum_ret_td_ff', 'def_st_blk_td_ff', 'def_st_kick_ret_td_ff', 'def_st_punt_ret_td_ff',
+                'actual_points']
+agst_stats = ['rush_att_agst', 'rush_yrd_agst', 'rush_yrd_gained_agst', 'rush_td_agst', 'inc_pass_agst',
+              'comp_pass_agst', 'pass_yrd_agst', 'air_yrd_agst', 'yac_agst', 'pass_yrd_gained_agst', 'pass_td_agst']
+add_def_stats = ['shotgun_agst', 'no_huddle_agst', 'qb_drop_agst', 'qb_kneel_agst', 'qb_spike_agst',
+                 'qb_scramble_agst', 'qb_hit_agst', 'ep_agst', 'epa_agst', 'air_epa_agst', 'comp_air_epa_agst',
+                 'qb_epa_agst', 'air_wpa_agst', 'comp_air_wpa_agst']
+adv_def_stats = ['plays_agst', 'rsh_yrd_per_att_agst', 'compl_perc_agst', 'pass_yrd_per_att_agst', 'yrd_per_play_agst',
+                 'compl_air_yrds_agst', 'racr_agst', 'adot_agst', 'net_yrd_per_att_agst', 'adj_net_yrd_per_att_agst',
+                 'pass_td_to_att_ratio_agst', 'rdz_td_agst', 'td_rate_agst', 'int_to_td_ratio_agst', 'total_to',
+                 'sack_yrd', 'num_penalty', 'penalty_yards', 'tot_drives_agst', 'drv_end_scr', 'drv_end_scr_perc',
+                 'drv_end_to', 'drv_end_to_perc']
+
+# create dictionary of the names of the passing play columns against each defense
+def_pass_names = {'incomplete_pass': 'inc_pass_agst', 'complete_pass': 'comp_pass_agst',
+                  'pass_attempt': 'pass_att_agst', 'passing_yards': 'pass_yrd_agst', 'air_yards': 'air_yrd_agst',
+                  'yards_after_catch': 'yac_agst',
+                  'pass_length': 'pass_len_agst', 'yards_gained': 'pass_yrd_gained_agst',
+                  'pass_location': 'pass_loc_agst', 'touchdown': 'pass_td_agst', 'interception': 'int',
+                  'fumble_lost': 'fumbles', 'shotgun': 'shotgun_agst', 'no_huddle': 'no_huddle_agst',
+                  'qb_dropback': 'qb_drop_agst', 'qb_kneel': 'qb_kneel_agst', 'qb_spike': 'qb_spike_agst',
+                  'qb_scramble': 'qb_scramble_agst', 'qb_hit': 'qb_hit_agst', 'ep': 'ep_agst', 'epa': 'epa_agst',
+                  'air_epa': 'air_epa_agst', 'comp_air_epa': 'comp_air_epa_agst', 'qb_epa': 'qb_epa_agst',
+                  'air_wpa': 'air_wpa_agst', 'comp_air_wpa': 'comp_air_wpa_agst'}
+
+# create column lists of the kicker football statistics, fantasy football statistics, and advanced metrics
+kick_stats = ['pat_con', 'pat_att', 'fg_con', 'fg_att']
+kick_ff_stats = ['pat_made_ff', 'pat_miss_ff', 'fg_made_0_39_ff', 'fg_miss_0_39_ff', 'fg_made_40_49_ff',
+                 'fg_miss_40_49_ff', 'fg_made_50_59_ff', 'actual_points']
+adv_kick_stats = ['pat_perc', 'fg_perc', 'kick_perc', 'total_plays', 'total_yards', 'total_scores', 'total_scores_rz']
+
+# create list of the roster columns any stage reads (the partitions are fingerprinted by these columns only)
+roster_columns = list(dict.fromkeys(player_columns[:3] + player_columns[4:] + rbwrte_stats + rbwrte_ff_stats + qb_stats
+                                    + qb_ff_stats + def_stats + def_ff_stats + kick_stats + kick_ff_stats))
+
+# create dictionary of the roster positions of each position group
+group_positions = {'rbwrte': ['RB', 'WR', 'TE'], 'qb': ['QB'], 'def': ['DEF'], 'kr': ['KR']}
+
+# create dictionary of the play-by-play stat tables each position group joins
+group_tables = {'rbwrte': ['rush', 'receiving'], 'qb': ['passing', 'rush'], 'def': ['defense'], 'kr': ['kicking']}
+
+# create list of the stage names, in the order the timings are reported
+stage_names = ['load', 'partition', 'identity', 'rush', 'receiving', 'passing', 'defense', 'kicking', 'merge',
+               'derive', 'read cache', 'assemble', 'write']
+
+# create function to build each roster row's short name (identity stage)
+def resolve_players(df, overrides=player_overrides):
+    return player_index(overrides).resolve(df)
+
+# create function to build the weekly rushing table of every rusher (aggregation stage)
+def rush_table(play_by_play_df):
+    '''
+    Function to sum the rushing plays of each rusher and week and compute the advanced rushing metrics
+
+    param play_by_play_df: pandas dataframe of plays with year and week columns
+
+    returns: pandas dataframe with one row per rusher, team, year, and week
+    '''
+
+    # filter for rush plays only and select relevant columns
+    rb_df = play_by_play_df.loc[play_by_play_df['rush_attempt'] == 1, ['rusher_player_id', 'rusher_player_name',
+                                                                      'posteam', 'year', 'week', 'rush_attempt',
+                                                                      'rushing_yards', 'yards_gained', 'touchdown']]
+
+    # remove rows with no rusher_player_id
+    rb_df = rb_df.loc[rb_df['rusher_player_id'].notnull()]
+
+    # group by player, team, week, year and sum the results for a weekly stat line for each player
+    rb_df = rb_df.groupby(['rusher_player_id', 'rusher_player_name', 'posteam', 'year', 'week'], as_index=False).sum()
+    rb_df = rb_df.rename({'rush_attempt': 'rush_attempts'}, axis=1)
+
+    # calculate team rushing attempts by year and week and merge them with rb_df
+    team_rush = rb_df.groupby(['posteam', 'year', 'week'], as_index=False)[['rush_attempts']].sum()
+    rb_df = rb_df.merge(team_rush, on=['posteam', 'year', 'week'], how='left', suffixes=('_ind', '_team'))
+
+    # calculate % of team rushing attempts and yards per rushing attempt
+    rb_df['rush_share'] = rb_df['rush_attempts_ind'] / rb_df['rush_attempts_team']
+    rb_df['yrd_per_rush'] = rb_df['rushing_yards'] / rb_df['rush_attempts_ind']
+
+    # remove any text after the players' last names such as Jr or II.  needed to join logic
+    rb_df['rusher_player_name'] = rb_df['rusher_player_name'].str.extract(r'(.*?)(?=$|\s)')
+    return rb_df
+
+# create function to build the weekly receiving table of every receiver (aggregation stage)
+def receiving_table(play_by_play_df):
+    '''
+    Function to sum the targets of each receiver and week and compute the advanced receiving metrics
+
+    param play_by_play_df: pandas dataframe of plays with year and week columns
+
+    returns: pandas dataframe with one row per receiver, team, year, and week
+    '''
+
+    # filter for passing plays only and select relevant columns
+    rec_df = play_by_play_df.loc[play_by_play_df['pass_attempt'] == 1, ['receiver_player_id', 'receiver_player_name',
+                                                                       'posteam', 'year', 'week', 'pass_attempt',
+                                                                       'complete_pass', 'yards_after_catch',
+                                                                       'yards_gained', 'touchdown', 'air_yards']]
+
+    # remove rows with no receiver_player_id
+    rec_df = rec_df.loc[rec_df['receiver_player_id'].notnull()]
+
+    # group by player, team, week, year and sum the results for a weekly stat line for each player
+    rec_df = rec_df.groupby(['receiver_player_id', 'receiver_player_name', 'posteam', 'year', 'week'],
+                            as_index=False).sum()
+    rec_df = rec_df.rename({'pass_attempt': 'target'}, axis=1)
+
+    # calculate team targets and air yards by year and week and merge them with rec_df
+    team_targets = rec_df.groupby(['posteam', 'year', 'week'], as_index=False)[['target']].sum()
+    team_ay = rec_df.groupby(['posteam', 'year', 'week'], as_index=False)[['air_yards']].sum()
+    rec_df = rec_df.merge(team_ay, on=['posteam', 'year', 'week'], how='left', suffixes=('_ind', '_team'))\
+                   .merge(team_targets, on=['posteam', 'year', 'week'], how='left', suffixes=('_ind', '_team'))
+
+    # calculate weighted opportunity rating, average depth of target, receiver air conversion ratio, % of team
+    # targets, completed air yards, and yards per catch
+    rec_df['wopr'] = ((rec_df['target_ind'] / rec_df['target_team']) * 1.5) +\
+                     ((rec_df['air_yards_ind'] / rec_df['air_yards_team']) * 0.7)
+    rec_df['adot'] = rec_df['air_yards_ind'] / rec_df['target_ind']
+    rec_df['racr'] = rec_df['yards_gained'] / rec_df['air_yards_ind']
+    rec_df['target_share'] = rec_df['target_ind'] / rec_df['target_team']
+    rec_df['compl_rec_air_yrds'] = rec_df['yards_gained'] - rec_df['yards_after_catch']
+    rec_df['yrd_per_catch'] = rec_df['yards_gained'] / rec_df['complete_pass']
+
+    # remove any text after the players' last names such as Jr or II.  needed to join logic
+    rec_df['receiver_player_name'] = rec_df['receiver_player_name'].str.extract(r'(.*?)(?=$|\s)')
+    return rec_df
+
+# create function to build the weekly passing table of every passer (aggregation stage)
+def passing_table(play_by_play_df):
+    '''
+    Function to sum the passing plays, sacks, and red zone touchdowns of each passer and week and compute the advanced
+    passing metrics
+
+    param play_by_play_df: pandas dataframe of plays with year and week columns
+
+    returns: pandas dataframe with one row per passer, team, year, and week
+    '''
+
+    # filter for passing plays with a passer only and select relevant columns
+    qb_play_by_play_df = play_by_play_df.loc[play_by_play_df['pass_attempt'] == 1, passing_columns]
+    qb_play_by_play_df = qb_play_by_play_df.loc[qb_play_by_play_df['passer_player_id'].notnull()]
+    key_columns = ['passer_player_id', 'passer_player_name', 'posteam', 'year', 'week']
+
+    # calculate num of sacks and sack yards lost by year, week, player
+    sacks = qb_play_by_play_df.loc[qb_play_by_play_df['sack'] == 1, key_columns + ['sack', 'yards_gained']]
+    sacks = sacks.groupby(key_columns, as_index=False)[['sack', 'yards_gained']].sum()
+    sacks = sacks.rename(columns={'yards_gained': 'sack_yrd_lost', 'sack': 'sacks'})
+
+    # calculate num of red zone TDs by year, week, player
+    red_zone_td = qb_play_by_play_df[(qb_play_by_play_df['yardline_100'] <= 20) &
+                                     (qb_play_by_play_df['touchdown'] == 1)]
+    red_zone_td = red_zone_td.groupby(key_columns, as_index=False)[['touchdown']].sum()
+    red_zone_td = red_zone_td.rename(columns={'touchdown': 'rdz_td'})
+
+    # group by player, team, week, year and sum the results, then merge the sacks and red zone TDs
+    qb_play_by_play_df = qb_play_by_play_df.groupby(key_columns, as_index=False).sum()
+    qb_play_by_play_df = qb_play_by_play_df.merge(sacks, on=key_columns, how='left')
+    qb_play_by_play_df = qb_play_by_play_df.merge(red_zone_td, on=key_columns, how='left')
+
+    # fill nulls with 0 since some players aren't sacked or have red zone TDs every game
+    qb_play_by_play_df[['sacks', 'sack_yrd_lost', 'rdz_td']] = \
+        qb_play_by_play_df[['sacks', 'sack_yrd_lost', 'rdz_td']].fillna(0)
+
+    # calculate team yards after catch by year, week and merge it
+    team_yac = qb_play_by_play_df.groupby(['posteam', 'year', 'week'], as_index=False)[['yards_after_catch']].sum()
+    qb_play_by_play_df = qb_play_by_play_df.merge(team_yac, on=['posteam', 'year', 'week'], how='left',
+                                                  suffixes=('_ind', '_team'))
+
+    # calculate completed air yards, completion percentage, adjusted net yards per attempt, TD to passing attempts
+    # ratio, INT to TD ratio, total turnovers, passing yards per attempt, and air yards per attempt
+    attempts = qb_play_by_play_df['incomplete_pass'] + qb_play_by_play_df['complete_pass']
+    qb_play_by_play_df['comp_air_yard'] = qb_play_by_play_df['yards_gained'] - \
+                                          qb_play_by_play_df['yards_after_catch_team']
+    qb_play_by_play_df['compl_rate'] = qb_play_by_play_df['complete_pass'] / attempts
+    qb_play_by_play_df['adj_net_yrd_per_att'] = (qb_play_by_play_df['yards_gained'] +
+                                                 (20 * qb_play_by_play_df['touchdown']) -
+                                                 (45 * qb_play_by_play_df['interception']) -
+                                                 qb_play_by_play_df['sack_yrd_lost']) / \
+                                                (attempts + qb_play_by_play_df['sacks'])
+    qb_play_by_play_df['td_to_att_ratio'] = qb_play_by_play_df['touchdown'] / attempts
+    qb_play_by_play_df['int_to_td_ratio'] = qb_play_by_play_df['interception'] / qb_play_by_play_df['touchdown']
+    qb_play_by_play_df['int_to_td_ratio'] = qb_play_by_play_df['int_to_td_ratio'].fillna(0)
+    qb_play_by_play_df['total_to'] = qb_play_by_play_df['interception'] + qb_play_by_play_df['fumble_lost']
+    qb_play_by_play_df['pass_yrd_per_att'] = qb_play_by_play_df['yards_gained'] / attempts
+    qb_play_by_play_df['air_yrd_per_att'] = qb_play_by_play_df['air_yards'] / attempts
+
+    # remove any text after the players' last names such as Jr or II.  needed to join logic
+    qb_play_by_play_df['passer_player_name'] = qb_play_by_play_df['passer_player_name'].str.extract(r'(.*?)(?=$|\s)')
+    return qb_play_by_play_df
+
+# create function to build the weekly table of every defense (aggregation stage)
+def defense_table(play_by_play_df):
+    '''
+    Function to sum the rushing plays, passing plays, penalties, and drives against each defense and week and compute
+    the advanced defense metrics
+
+    param play_by_play_df: pandas dataframe of plays with year and week columns
+
+    returns: pandas dataframe with one row per defense, year, and week
+    '''
+
+    key_columns = ['defteam', 'year', 'week']
+
+    # sum the rush plays against each defense and calculate rush yards per attempt against
+    def_rush_p_by_p_df = play_by_play_df.loc[play_by_play_df['rush_attempt'] == 1,
+                                             key_columns + ['rush_attempt', 'rushing_yards', 'yards_gained',
+                                                            'touchdown']]
+    def_rush_p_by_p_df = def_rush_p_by_p_df.loc[def_rush_p_by_p_df['defteam'].notnull()]
+    def_rush_p_by_p_df = def_rush_p_by_p_df.groupby(key_columns, as_index=False).sum()
+    def_rush_p_by_p_df = def_rush_p_by_p_df.rename(columns={'rush_attempt': 'rush_att_agst',
+                                                            'rushing_yards': 'rush_yrd_agst',
+                                                            'yards_gained': 'rush_yrd_gained_agst',
+                                                            'touchdown': 'rush_td_agst'})
+    def_rush_p_by_p_df['rsh_yrd_per_att_agst'] = def_rush_p_by_p_df['rush_yrd_agst'] / \
+                                                 def_rush_p_by_p_df['rush_att_agst']
+
+    # filter for passing plays against each defense
+    def_pass_p_by_p_df = play_by_play_df.loc[play_by_play_df['pass_attempt'] == 1,
+                                             ['defteam'] + passing_columns[3:] + ['drive_ended_with_score',
+                                                                                  'drive_end_transition']]
+    def_pass_p_by_p_df = def_pass_p_by_p_df.loc[def_pass_p_by_p_df['defteam'].notnull()]
+
+    # calculate num of sacks, sack yards, and red zone TDs against by year, week, team
+    def_sacks = def_pass_p_by_p_df.loc[def_pass_p_by_p_df['sack'] == 1, key_columns + ['sack', 'yards_gained']]
+    def_sacks = def_sacks.groupby(key_columns, as_index=False).sum()
+    def_sacks = def_sacks.rename(columns={'yards_gained': 'sack_yrd', 'sack': 'sacks'})
+    def_red_zone_td = def_pass_p_by_p_df[(def_pass_p_by_p_df['yardline_100'] <= 20) &
+                                         (def_pass_p_by_p_df['touchdown'] == 1)]
+    def_red_zone_td = def_red_zone_td.groupby(key_columns, as_index=False)[['touchdown']].sum()
+    def_red_zone_td = def_red_zone_td.rename(columns={'touchdown': 'rdz_td_agst'})
+
+    # group by team, week, year and sum the results, then merge the sacks and red zone TDs
+    def_pass_p_by_p_df = def_pass_p_by_p_df.groupby(key_columns, as_index=False).sum()
+    def_pass_p_by_p_df = def_pass_p_by_p_df.merge(def_sacks, on=key_columns, how='left')
+    def_pass_p_by_p_df = def_pass_p_by_p_df.merge(def_red_zone_td, on=key_columns, how='left')
+    null_to_zero = ['sacks', 'sack_yrd', 'rdz_td_agst']
+    def_pass_p_by_p_df[null_to_zero] = def_pass_p_by_p_df[null_to_zero].fillna(0)
+    def_pass_p_by_p_df = def_pass_p_by_p_df.rename(columns=def_pass_names)
+
+    # calculate the advanced passing metrics against
+    attempts = def_pass_p_by_p_df['inc_pass_agst'] + def_pass_p_by_p_df['comp_pass_agst']
+    def_pass_p_by_p_df['pass_yrd_per_att_agst'] = def_pass_p_by_p_df['pass_yrd_gained_agst'] / attempts
+    def_pass_p_by_p_df['compl_perc_agst'] = def_pass_p_by_p_df['comp_pass_agst'] / attempts
+    def_pass_p_by_p_df['adot_agst'] = def_pass_p_by_p_df['air_yrd_agst'] / attempts
+    def_pass_p_by_p_df['racr_agst'] = def_pass_p_by_p_df['pass_yrd_gained_agst'] / def_pass_p_by_p_df['air_yrd_agst']
+    def_pass_p_by_p_df['compl_air_yrds_agst'] = def_pass_p_by_p_df['pass_yrd_gained_agst'] - \
+                                                def_pass_p_by_p_df['yac_agst']
+    def_pass_p_by_p_df['net_yrd_per_att_agst'] = (def_pass_p_by_p_df['pass_yrd_gained_agst'] -
+                                                  def_pass_p_by_p_df['sack_yrd']) / \
+                                                 (attempts + def_pass_p_by_p_df['sacks'])
+    def_pass_p_by_p_df['adj_net_yrd_per_att_agst'] = (def_pass_p_by_p_df['pass_yrd_gained_agst'] +
+                                                      (20 * def_pass_p_by_p_df['pass_td_agst']) -
+                                                      (45 * def_pass_p_by_p_df['int']) -
+                                                      def_pass_p_by_p_df['sack_yrd']) / \
+                                                     (attempts + def_pass_p_by_p_df['sacks'])
+    def_pass_p_by_p_df['pass_td_to_att_ratio_agst'] = def_pass_p_by_p_df['pass_td_agst'] / attempts
+    def_pass_p_by_p_df['int_to_td_ratio_agst'] = def_pass_p_by_p_df['int'] / def_pass_p_by_p_df['pass_td_agst']
+
+    # merge the rushing and passing plays and compute total turnovers, TD rate, yards per play, and plays against
+    def_p_by_p_df = def_rush_p_by_p_df.merge(def_pass_p_by_p_df, on=key_columns, how='left')
+    def_p_by_p_df['total_to'] = def_p_by_p_df['int'] + def_p_by_p_df['fumbles']
+    def_p_by_p_df['td_rate_agst'] = (def_p_by_p_df['pass_td_agst'] + def_p_by_p_df['rush_td_agst']) / \
+                                    (def_p_by_p_df['rush_att_agst'] + def_p_by_p_df['pass_att_agst'])
+    def_p_by_p_df['yrd_per_play_agst'] = (def_p_by_p_df['rush_yrd_agst'] + def_p_by_p_df['pass_yrd_gained_agst']) / \
+                                         (def_p_by_p_df['rush_att_agst'] + def_p_by_p_df['pass_att_agst'])
+    def_p_by_p_df['plays_agst'] = def_p_by_p_df['rush_att_agst'] + def_p_by_p_df['pass_att_agst']
+
+    # calculate num of penalties and penalty yards by year, week, team and merge them
+    def_pen = play_by_play_df.loc[play_by_play_df['penalty_team'] == play_by_play_df['defteam'],
+                                  ['defteam', 'penalty_team', 'year', 'week', 'penalty_yards']].assign(num_penalty=1)
+    def_pen = def_pen.groupby(['defteam', 'penalty_team', 'year', 'week'], as_index=False).sum()
+    def_p_by_p_df = def_p_by_p_df.merge(def_pen, on=key_columns, how='left')
+
+    # calculate total drives against and the drives that ended in a FG or TD, or an INT, fumble, or blocked kick
+    drv_columns = ['posteam', 'defteam', 'year', 'week', 'drive']
+    tot_drv_agst = play_by_play_df[drv_columns].groupby(drv_columns[:-1], as_index=False).agg({'drive': 'nunique'})
+    tot_drv_agst = tot_drv_agst.rename(columns={'drive': 'tot_drives_agst'})
+    offense_play = (play_by_play_df['rush_attempt'] == 1) | (play_by_play_df['pass_attempt'] == 1)
+    drv_end_scr = play_by_play_df.loc[(play_by_play_df['drive_ended_with_score'] == 1) &
+                                      (offense_play | (play_by_play_df['play_type'] == 'field_goal')) &
+                                      play_by_play_df['drive_end_transition'].isin(['TOUCHDOWN', 'FIELD_GOAL']),
+                                      drv_columns[1:]]
+    drv_end_scr = drv_end_scr.groupby(key_columns, as_index=False).agg({'drive': 'nunique'})
+    drv_end_scr = drv_end_scr.rename(columns={'drive': 'drv_end_scr'})
+    drv_end_to = play_by_play_df.loc[(play_by_play_df['drive_ended_with_score'] == 0) &
+                                     (offense_play | play_by_play_df['play_type'].isin(['punt', 'extra_point',
+                                                                                        'field_goal'])) &
+                                     play_by_play_df['drive_end_transition'].isin(['INTERCEPTION', 'FUMBLE',
+                                                                                   'BLOCKED_PUNT', 'BLOCKED_FG',
+                                                                                   'BLOCKED_PUNT_DOWNS',
+                                                                                   'BLOCKED_FG_DOWNS']),
+                                     drv_columns[1:]]
+    drv_end_to = drv_end_to.groupby(key_columns, as_index=False).agg({'drive': 'nunique'})
+    drv_end_to = drv_end_to.rename(columns={'drive': 'drv_end_to'})
+
+    # merge the drives and calculate the percentage of drives ending in a score or a turnover
+    def_p_by_p_df = def_p_by_p_df.merge(tot_drv_agst, on=key_columns, how='left')\
+                                 .merge(drv_end_scr, on=key_columns, how='left')\
+                                 .merge(drv_end_to, on=key_columns, how='left')
+    def_p_by_p_df['drv_end_scr_perc'] = def_p_by_p_df['drv_end_scr'] / def_p_by_p_df['tot_drives_agst']
+    def_p_by_p_df['drv_end_to_perc'] = def_p_by_p_df['drv_end_to'] / def_p_by_p_df['tot_drives_agst']
+
+    # fill nulls with 0 since defenses don't record every statistic every game
+    null_to_zero = ['int_to_td_ratio_agst', 'penalty_team', 'penalty_yards', 'num_penalty', 'drv_end_scr',
+                    'drv_end_to', 'drv_end_scr_perc', 'drv_end_to_perc']
+    def_p_by_p_df[null_to_zero] = def_p_by_p_df[null_to_zero].fillna(0)
+    return def_p_by_p_df
+
+# create function to build the weekly offense totals of every team that the kickers join (aggregation stage)
+def kicking_tables(play_by_play_df):
+    '''
+    Function to sum the offensive plays, yards, scores, and red zone scores of each team and week
+
+    param play_by_play_df: pandas dataframe of plays with year and week columns
+
+    returns: tuple of the plays and yards, total scores, and red zone scores dataframes, each with one row per team,
+             year, and week
+    '''
+
+    # sum the rush plays and the pass plays of each team, then merge them and total the plays and yards
+    kr_columns = ['posteam', 'year', 'week', 'rush_attempt', 'pass_attempt', 'yards_gained']
+    kr_rush_df = play_by_play_df.loc[play_by_play_df['rush_attempt'] == 1, kr_columns]
+    kr_rush_df = kr_rush_df.loc[kr_rush_df['posteam'].notnull()]
+    kr_rush_df = kr_rush_df.groupby(['posteam', 'year', 'week'], as_index=False)[['rush_attempt', 'yards_gained']].sum()
+    kr_rush_df = kr_rush_df.rename({'yards_gained': 'rushing_yards'}, axis=1)
+    kr_pass_df = play_by_play_df.loc[play_by_play_df['pass_attempt'] == 1, kr_columns]
+    kr_pass_df = kr_pass_df.loc[kr_pass_df['posteam'].notnull()]
+    kr_pass_df = kr_pass_df.groupby(['posteam', 'year', 'week'], as_index=False)[['pass_attempt', 'yards_gained']].sum()
+    kr_pass_df = kr_pass_df.rename({'yards_gained': 'passing_yards'}, axis=1)
+    kr_df = kr_rush_df.merge(kr_pass_df, on=kr_columns[:3], how='left')
+    kr_df['total_plays'] = kr_df['rush_attempt'] + kr_df['pass_attempt']
+    kr_df['total_yards'] = kr_df['rushing_yards'] + kr_df['passing_yards']
+
+    # create function to total the touchdowns and made field goals of each team among some plays
+    def scores(rows):
+        total_scores = play_by_play_df.loc[rows, ['posteam', 'year', 'week', 'touchdown', 'field_goal_result']]
+        total_scores['field_goal'] = [1 if x == 'made' else 0 for x in total_scores['field_goal_result']]
+        total_scores = total_scores.loc[total_scores['posteam'].notnull()]
+        total_scores = total_scores.groupby(['posteam', 'year', 'week'], as_index=False).sum()
+        return total_scores.assign(total_scores=total_scores['field_goal'] + total_scores['touchdown'])
+
+    scored = (play_by_play_df['touchdown'] == 1) | (play_by_play_df['field_goal_result'] == 'made')
+    total_scores = scores(scored)
+    total_scores_rd = scores(scored & (play_by_play_df['yardline_100'] <= 20))
+    total_scores_rd = total_scores_rd.rename(columns={'total_scores': 'total_scores_rz'})
+    return kr_df, total_scores, total_scores_rd
+
+# create function to join the rushing and receiving tables to the RB/WR/TE roster rows (merge stage)
+def merge_rbwrte(df, tables, players):
+    rbwrte_df = df.loc[df['position_name'].isin(group_positions['rbwrte']),
+                       player_columns + rbwrte_stats + rbwrte_ff_stats]
+    return players.join(rbwrte_df, [(tables['rush'], ['year', 'week', 'rusher_player_name', 'posteam'],
+                                     rbwrte_rush_columns),
+                                    (tables['receiving'], ['year', 'week', 'receiver_player_name', 'posteam'],
+                                     rbwrte_rec_columns)])
+
+# create function to join the passing and rushing tables to the QB roster rows (merge stage)
+def merge_qb(df, tables, players):
+    qb_df = df.loc[df['position_name'].isin(group_positions['qb']), player_columns + qb_stats + qb_ff_stats]
+    return players.join(qb_df, [(tables['passing'], ['year', 'week', 'passer_player_name', 'posteam'],
+                                 ['air_yards', 'rdz_td'] + qb_advanced_metrics[:-2] + add_qb_stats),
+                                (tables['rush'], ['year', 'week', 'rusher_player_name', 'posteam'],
+                                 qb_advanced_metrics[-2:])])
+
+# create function to join the defense table to the DEF roster rows (merge stage)
+def merge_def(df, tables, players):
+    def_df = df.loc[df['position_name'].isin(group_positions['def']), player_columns + def_ff_stats + def_stats]
+    return players.join(def_df, [(tables['defense'], ['year', 'week', 'defteam'],
+                                  agst_stats + adv_def_stats + add_def_stats)],
+                        left_on=['year', 'week', 'pro_team_abv'])
+
+# create function to join the offense totals to the KR roster rows (merge stage)
+def merge_kr(df, tables, players):
+    kick_df = df.loc[df['position_name'].isin(group_positions['kr']), player_columns + kick_stats + kick_ff_stats]
+    kr_df, total_scores, total_scores_rd = tables['kicking']
+    return players.join(kick_df, [(kr_df, ['posteam', 'year', 'week'], ['total_plays', 'total_yards']),
+                                  (total_scores, ['posteam', 'year', 'week'], ['total_scores']),
+                                  (total_scores_rd, ['posteam', 'year', 'week'], ['total_scores_rz'])],
+                        left_on=['pro_team_abv', 'year', 'week'])
+
+# create function to finish the RB/WR/TE feature rows (derive stage)
+def derive_rbwrte(rbwrte_df):
+    # calculate % of total offense
+    rbwrte_df['total_off_share'] = (rbwrte_df['receptions'] + rbwrte_df['rush_att']) / \
+                                   (rbwrte_df['target_team'] + rbwrte_df['rush_attempts_team'])
+
+    # fill nulls with 0 since some players don't have targets/receptions or rushing attempts every game, and replace
+    # infinite values with 0
+    null_to_zero = ['target_team', 'rush_attempts_team'] + rbwrte_advanced_metrics
+    rbwrte_df[null_to_zero] = rbwrte_df[null_to_zero].fillna(0)
+    rbwrte_df = rbwrte_df.replace([-np.inf, np.inf], 0)
+    return rbwrte_df[player_columns + rbwrte_stats + rbwrte_advanced_metrics + rbwrte_ff_stats]
+
+# create function to finish the QB feature rows (derive stage)
+def derive_qb(qb_df):
+    qb_df = qb_df[player_columns + upd_qb_stats + qb_advanced_metrics + add_qb_stats + qb_ff_stats].copy()
+
+    # fill nulls with 0 since some players didn't throw or complete any passes during a game
+    null_to_zero = ['rdz_td', 'air_yards'] + qb_advanced_metrics + add_qb_stats
+    qb_df[null_to_zero] = qb_df[null_to_zero].fillna(0)
+    return qb_df.replace([-np.inf, np.inf], 0)
+
+# create function to finish the DEF feature rows (derive stage)
+def derive_def(def_df):
+    def_df = def_df[player_columns + def_stats + agst_stats + adv_def_stats + add_def_stats + def_ff_stats]
+    return def_df.fillna(0).replace([-np.inf, np.inf], 0)
+
+# create function to finish the KR feature rows (derive stage)
+def derive_kr(kick_df):
+    # fill nulls with 0 since some teams don't score every game
+    kick_df[['total_scores', 'total_scores_rz']] = kick_df[['total_scores', 'total_scores_rz']].fillna(0)
+
+    # calculate FG, PAT, and total kicking percentage
+    kick_df['fg_perc'] = kick_df['fg_con'] / kick_df['fg_att']
+    kick_df['pat_perc'] = kick_df['pat_con'] / kick_df['pat_att']
+    kick_df['kick_perc'] = (kick_df['pat_con'] + kick_df['fg_con']) / (kick_df['pat_att'] + kick_df['fg_att'])
+
+    kick_df = kick_df[player_columns + kick_stats + adv_kick_stats + kick_ff_stats].copy()
+    kick_df[adv_kick_stats[:5]] = kick_df[adv_kick_stats[:5]].fillna(0)
+    return kick_df.replace([-np.inf, np.inf], 0)
+
+# create dictionaries of the function of each aggregation, merge, and derive stage
+table_stages = {'rush': rush_table, 'receiving': receiving_table, 'passing': passing_table, 'defense': defense_table,
+                'kicking': kicking_tables}
+merge_stages = {'rbwrte': merge_rbwrte, 'qb': merge_qb, 'def': merge_def, 'kr': merge_kr}
+derive_stages = {'rbwrte': derive_rbwrte, 'qb': derive_qb, 'def': derive_def, 'kr': derive_kr}
+
+# create function to list the global names a function's code (and the code nested in it) reads
+def code_names(code):
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names += code_names(const)
+    return names
+
+# create function to fingerprint the code of a stage
+def code_digest(func, seen=None):
+    '''
+    Function to hash a stage function's source together with the source of the functions and classes it calls and
+    the values of the module lists and dictionaries it reads, so editing any of them invalidates the stage's cache
+
+    param func: stage function
+    param seen: set of the names already hashed (used by the recursion)
+
+    returns: hex digest string
+    '''
+
+    seen = set() if seen is None else seen
+    digest = hashlib.sha1(inspect.getsource(func).encode())
+    for name in code_names(func.__code__):
+        value = func.__globals__.get(name)
+        if name in seen or value is None:
+            continue
+        seen.add(name)
+        if inspect.isfunction(value) and value.__module__ == __name__:
+            digest.update(code_digest(value, seen).encode())
+        elif inspect.isclass(value):
+            digest.update(inspect.getsource(value).encode())
+        elif isinstance(value, (list, tuple, dict, str)):
+            digest.update(repr((name, value)).encode())
+    return digest.hexdigest()
+
+# create function to build a cache key from a stage's code and inputs
+def stage_key(*parts):
+    text = json.dumps([pd.__version__, np.__version__] + list(parts))
+    return hashlib.sha1(text.encode()).hexdigest()[:24]
+
+# create function to split a dataframe into (year, week) partitions and fingerprint each one
+def partition_digests(df, columns):
+    '''
+    Function to find the rows of every (year, week) partition of a dataframe and hash their contents
+
+    param df: pandas dataframe with year and week columns
+    param columns: list of the columns hashed (columns the dataframe does not have are skipped)
+
+    returns: dictionary of each (year, week) to a tuple of its row positions (in dataframe order) and its digest
+    '''
+
+    columns = [i for i in columns if i in df]
+    hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    keys = np.asarray(df['year']).astype(np.int64) * 100 + np.asarray(df['week']).astype(np.int64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(keys) else np.array([], int)
+    header = json.dumps(columns).encode()
+
+    partitions = {}
+    for start, end in zip(starts, np.r_[starts[1:], len(order)]):
+        rows = order[start:end]
+        digest = hashlib.sha1(header)
+        digest.update(hashes[rows].tobytes())
+        partitions[(int(sorted_keys[start] // 100), int(sorted_keys[start] % 100))] = (rows, digest.hexdigest())
+    return partitions
+
+# create function to build the path of a cached stage output
+def cache_path(cache_dir, stage, key):
+    return os.path.join(cache_dir, stage, f'{key}.pkl')
+
+# create function to read a cached stage output
+def read_stage(cache_dir, stage, key):
+    path = cache_path(cache_dir, stage, key)
+    return pd.read_pickle(path) if os.path.exists(path) else None
+
+# create function to save a stage output under a temporary name and rename it so a reader never sees half a file
+def write_stage(output, cache_dir, stage, key):
+    path = cache_path(cache_dir, stage, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    pd.to_pickle(output, tmp_path)
+    os.replace(tmp_path, path)
+
+# create function to find the rows of a dataframe that are in some (year, week) partitions
+def partition_rows(df, partitions):
+    keys = np.asarray(df['year']).astype(np.int64) * 100 + np.asarray(df['week']).astype(np.int64)
+    return df.loc[np.isin(keys, [year * 100 + week for year, week in partitions])]
+
+# create function to split a stage output into the piece of each (year, week) partition
+def split_partitions(output, partitions):
+    '''
+    Function to split the output of a stage run on many partitions into one piece per partition
+
+    param output: pandas dataframe with year and week columns, or tuple of them
+    param partitions: list of the (year, week) partitions the stage ran on
+
+    returns: dictionary of each partition to its rows (in output order) or tuple of rows
+    '''
+
+    if isinstance(output, tuple):
+        pieces = [split_partitions(i, partitions) for i in output]
+        return {i: tuple(j[i] for j in pieces) for i in partitions}
+    keys = np.asarray(output['year']).astype(np.int64) * 100 + np.asarray(output['week']).astype(np.int64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    pieces = {}
+    for year, week in partitions:
+        start, end = np.searchsorted(sorted_keys, [year * 100 + week, year * 100 + week + 1])
+        pieces[(year, week)] = output.iloc[order[start:end]]
+    return pieces
+
+# create function to put the pieces of many partitions back together
+def concat_partitions(pieces):
+    if pieces and isinstance(pieces[0], tuple):
+        return tuple(concat_partitions([j[i] for j in pieces]) for i in range(len(pieces[0])))
+
+    # empty pieces are left out so a partition without rows (e.g. a week without plays) cannot change a dtype
+    filled = [i for i in pieces if len(i)] or pieces[:1]
+    return pd.concat(filled, ignore_index=True)
+
+# create function to add seconds and partition counts to a stage's timings
+def record_time(timings, stage, seconds, computed=0, cached=0):
+    totals = timings.setdefault(stage, [0.0, 0, 0])
+    totals[0] += seconds
+    totals[1] += computed
+    totals[2] += cached
+
+# create function to run a stage on many partitions, reading the cached ones and computing the rest together
+def run_stage(stage, keys, func, cache_dir, timings):
+    '''
+    Function to get the output of a stage for many partitions
+
+    The partitions missing from the cache are computed in one call (every stage is grouped by or keyed on year and
+    week, so that gives the same rows as one call per partition) and split back into one cached piece per partition.
+
+    param stage: stage name (the cache subdirectory and the timings row)
+    param keys: dictionary of each partition to its cache key
+    param func: function of the list of missing partitions that returns their output as one dataframe (or tuple)
+    param cache_dir: directory of the stage cache
+    param timings: dictionary of stage timings (see record_time)
+
+    returns: dictionary of each partition to its piece of the output
+    '''
+
+    start = time.perf_counter()
+    pieces = {}
+    for partition, key in keys.items():
+        piece = read_stage(cache_dir, stage, key)
+        if piece is not None:
+            pieces[partition] = piece
+    missing = [i for i in keys if i not in pieces]
+    if missing:
+        split = split_partitions(func(missing), missing)
+        for partition in missing:
+            write_stage(split[partition], cache_dir, stage, keys[partition])
+            pieces[partition] = split[partition]
+    record_time(timings, stage, time.perf_counter() - start, len(missing), len(keys) - len(missing))
+    return pieces
+
+# create function to build the feature rows of one position group for the partitions it is missing
+def build_group(group, keys, df, play_by_play_df, cache_dir):
+    '''
+    Function to run the aggregation, merge, and derive stages of one position group (one job of the process pool)
+
+    param group: position group name
+    param keys: dictionary of each partition missing from the derive stage's cache to its dictionary of stage keys
+    param df: roster rows of the group in those partitions, with short names, in partition order
+    param play_by_play_df: plays of those partitions (None when every stat table they need is cached)
+    param cache_dir: directory of the stage cache
+
+    returns: tuple of the dictionary of each partition to its derived dataframe and the dictionary of stage timings
+    '''
+
+    warnings.simplefilter('ignore', FutureWarning)
+    players = player_index()
+    timings = {}
+    partitions = sorted(keys)
+    unmerged = [i for i in partitions if not os.path.exists(cache_path(cache_dir, 'merge', keys[i]['merge']))]
+
+    # the stat tables are only needed for the partitions whose merge is not cached
+    tables = {}
+    for table in group_tables[group]:
+        tables[table] = run_stage(table, {i: keys[i][table] for i in unmerged},
+                                  lambda missing, table=table: table_stages[table](partition_rows(play_by_play_df,
+                                                                                                  missing)),
+                                  cache_dir, timings)
+
+    def merge(missing):
+        return merge_stages[group](partition_rows(df, missing),
+                                   {i: concat_partitions([j[k] for k in missing]) for i, j in tables.items()}, players)
+
+    merged = run_stage('merge', {i: keys[i]['merge'] for i in partitions}, merge, cache_dir, timings)
+    derived = run_stage('derive', {i: keys[i]['derive'] for i in partitions},
+                        lambda missing: derive_stages[group](concat_partitions([merged[i] for i in missing])),
+                        cache_dir, timings)
+    return derived, timings
+
+# create function to build the feature matrices of every position group
+def build_features(df, play_by_play_df, cache_dir='feature_cache', groups=None, overrides=player_overrides,
+                   processes=None, prune=True):
+    '''
+    Function to build the notebook's feature matrices, recomputing only the (year, week) partitions whose roster rows,
+    plays, or stage code changed since they were cached
+
+    The year and week columns are categories of every roster season and week, like the notebook's.
+
+    param df: pandas dataframe of rosters_df_w_scoring.csv
+    param play_by_play_df: pandas dataframe of plays with year and week columns (see pbp_cache.load_play_by_play)
+    param cache_dir: directory of the stage cache
+    param groups: list of the position groups to build (defaults to rbwrte, qb, def, and kr)
+    param overrides: list of player overrides (see player_identity.player_overrides)
+    param processes: number of worker processes (defaults to one per cpu, 1 builds every group in this process)
+    param prune: whether to delete the cached outputs no partition uses anymore when every group is built
+
+    returns: tuple of the dictionary of each position group's feature matrix and a pandas dataframe of the seconds
+             spent, partitions computed, and partitions read from the cache in each stage (the aggregation, merge, and
+             derive stages are summed over the worker processes)
+    '''
+
+    warnings.simplefilter('ignore', FutureWarning)
+    groups = list(group_positions) if groups is None else groups
+    timings = {}
+
+    # fingerprint every partition of the rosters and the plays
+    start = time.perf_counter()
+    rosters = partition_digests(df, roster_columns)
+    plays = partition_digests(play_by_play_df, list(play_by_play_df.columns))
+    no_plays = np.array([], dtype=np.int64)
+    record_time(timings, 'partition', time.perf_counter() - start)
+
+    # key every stage of every partition by its code and the keys of its inputs
+    codes = {i: code_digest(j) for i, j in [('identity', resolve_players)] + list(table_stages.items())}
+    join_code = hashlib.sha1(inspect.getsource(player_index).encode()).hexdigest()
+    codes.update({f'merge_{i}': [code_digest(merge_stages[i]), join_code] for i in groups})
+    codes.update({f'derive_{i}': code_digest(derive_stages[i]) for i in groups})
+    positions = df['position_name'].to_numpy()
+    partition_keys, keys, missing = {}, {}, {i: [] for i in groups}
+    for partition, (rows, digest) in rosters.items():
+        play_digest = plays.get(partition, (no_plays, None))[1]
+        partition_keys[partition] = {'identity': stage_key('identity', codes['identity'], repr(overrides), digest)}
+        partition_keys[partition].update({i: stage_key(i, codes[i], play_digest) for i in table_stages})
+        for group in groups:
+            if not np.isin(positions[rows], group_positions[group]).any():
+                continue
+            merge_key = stage_key(f'merge_{group}', codes[f'merge_{group}'], partition_keys[partition]['identity'],
+                                  [partition_keys[partition][i] for i in group_tables[group]])
+            keys[(group, partition)] = dict(partition_keys[partition], merge=merge_key,
+                                            derive=stage_key(f'derive_{group}', codes[f'derive_{group}'], merge_key))
+            if not os.path.exists(cache_path(cache_dir, 'derive', keys[(group, partition)]['derive'])):
+                missing[group].append(partition)
+
+    # resolve the short names of the partitions any group is missing
+    stale = sorted(set(j for i in missing.values() for j in i))
+    resolved = run_stage('identity', {i: partition_keys[i]['identity'] for i in stale},
+                         lambda partitions: resolve_players(df.iloc[np.concatenate([rosters[i][0] for i in
+                                                                                    partitions])], overrides),
+                         cache_dir, timings)
+
+    # build the missing partitions of each position group, one group per worker
+    jobs = []
+    for group in groups:
+        if not missing[group]:
+            continue
+        group_keys = {i: keys[(group, i)] for i in missing[group]}
+        roster_df = concat_partitions([resolved[i] for i in missing[group]])
+        roster_df = roster_df.loc[roster_df['position_name'].isin(group_positions[group])]
+        tables_cached = all(os.path.exists(cache_path(cache_dir, 'merge', i['merge'])) or
+                            all(os.path.exists(cache_path(cache_dir, j, i[j])) for j in group_tables[group])
+                            for i in group_keys.values())
+        group_plays = None if tables_cached else \
+            play_by_play_df.iloc[np.concatenate([no_plays] + [plays[i][0] for i in missing[group] if i in plays])]
+        jobs.append((group, group_keys, roster_df, group_plays))
+
+    start = time.perf_counter()
+    built = {}
+    processes = min(processes or os.cpu_count() or 1, max(len(jobs), 1))
+    if processes <= 1:
+        results = [build_group(*i, cache_dir) for i in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(build_group, *i, cache_dir) for i in jobs]
+            results = [i.result() for i in futures]
+    for job, (derived, group_timings) in zip(jobs, results):
+        built.update({(job[0], i): j for i, j in derived.items()})
+        for stage, (seconds, computed, cached) in group_timings.items():
+            record_time(timings, stage, seconds, computed, cached)
+    group_seconds = time.perf_counter() - start
+
+    # concatenate each group's partitions and put the rows back in roster order
+    year_categories = np.sort(pd.unique(np.asarray(df['year']).astype(np.int64)))
+    week_categories = np.sort(pd.unique(np.asarray(df['week']).astype(np.int64)))
+    row_keys = np.asarray(df['year']).astype(np.int64) * 100 + np.asarray(df['week']).astype(np.int64)
+    features = {}
+    for group in groups:
+        frames = []
+        for partition in sorted(rosters):
+            if (group, partition) not in keys:
+                continue
+            if (group, partition) not in built:
+                start = time.perf_counter()
+                built[(group, partition)] = read_stage(cache_dir, 'derive', keys[(group, partition)]['derive'])
+                record_time(timings, 'read cache', time.perf_counter() - start, cached=1)
+            frames.append(built[(group, partition)])
+
+        start = time.perf_counter()
+        group_rows = np.flatnonzero(np.isin(positions, group_positions[group]))
+        order = np.argsort(row_keys[group_rows], kind='stable')
+        feature_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if len(feature_df) != len(group_rows):
+            raise ValueError(f'{group} partitions have {len(feature_df)} rows for {len(group_rows)} roster rows')
+        if frames:
+            feature_df = feature_df.iloc[np.argsort(order)].reset_index(drop=True)
+            feature_df['year'] = pd.Categorical(feature_df['year'].astype(np.int64), categories=year_categories)
+            feature_df['week'] = pd.Categorical(feature_df['week'].astype(np.int64), categories=week_categories)
+        features[group] = feature_df
+        record_time(timings, 'assemble', time.perf_counter() - start)
+
+    # delete the cached outputs that no partition uses anymore (only when every group is built, the merge and derive
+    # outputs of the groups left out are still in use)
+    if prune and sorted(groups) == sorted(group_positions):
+        used = {}
+        for group_keys in keys.values():
+            for stage, key in group_keys.items():
+                used.setdefault(stage, set()).add(key)
+        for stage, stage_keys in used.items():
+            stage_dir = os.path.join(cache_dir, stage)
+            for name in os.listdir(stage_dir) if os.path.isdir(stage_dir) else []:
+                if name.endswith('.pkl') and name[:-4] not in stage_keys:
+                    os.remove(os.path.join(stage_dir, name))
+
+    timings = pd.DataFrame([[i] + timings[i] for i in stage_names if i in timings],
+                           columns=['stage', 'seconds', 'computed', 'cached'])
+    timings.loc[len(timings)] = ['position groups (wall)', group_seconds, len(jobs), len(groups) - len(jobs)]
+    return features, timings
+
+# create function to write a feature matrix, only rewriting the rows from the first one that changed
+def write_matrix(df, path, state_path):
+    '''
+    Function to write a feature matrix to csv like df.to_csv(path, index=False), reusing the file written last time
+
+    The line to_csv writes for a row only depends on that row, so the file written last time is cut off at the first
+    row whose contents changed and the rows from there on are appended (when the rosters are in week order and the
+    latest week changed, only that week is written).  The hash of every row and the byte offset of every line are
+    saved to state_path for the next write.
+
+    param df: pandas dataframe
+    param path: path of the csv file
+    param state_path: path of the saved row hashes and line offsets (.npz)
+
+    returns: number of rows written
+    '''
+
+    header = hashlib.sha1(json.dumps([os.path.abspath(path), list(df.columns), [str(i) for i in df.dtypes]])
+                          .encode()).hexdigest()
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+    # offsets holds the start of the header line, the start of every row's line, and the end of the file
+    first, offsets = None, None
+    if os.path.exists(state_path) and os.path.exists(path):
+        with np.load(state_path) as state:
+            if str(state['header']) == header and os.path.getsize(path) == state['offsets'][-1]:
+                num_rows = min(len(state['hashes']), len(hashes))
+                changed = np.flatnonzero(state['hashes'][:num_rows] != hashes[:num_rows])
+                first = int(changed[0]) if len(changed) else num_rows
+                if first == len(state['hashes']) == len(hashes):
+                    return 0
+                offsets = state['offsets'][:first + 2]
+
+    if first is None:
+        data = df.to_csv(index=False).encode('utf-8')
+        first, start, offsets = 0, 0, np.zeros(1, dtype=np.int64)
+        with open(path, 'wb') as f:
+            f.write(data)
+    else:
+        data = df.iloc[first:].to_csv(index=False, header=False).encode('utf-8')
+        start = int(offsets[-1])
+        with open(path, 'r+b') as f:
+            f.seek(start)
+            f.truncate()
+            f.write(data)
+    line_ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n')) + 1 + start
+    offsets = np.r_[offsets, line_ends].astype(np.int64)
+
+    # a text column with a line break in it would move the offsets, so such a file is rewritten in full next time
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    if len(offsets) == len(hashes) + 2:
+        with open(f'{state_path}.tmp-{os.getpid()}', 'wb') as f:
+            np.savez(f, hashes=hashes, offsets=offsets, header=header)
+        os.replace(f'{state_path}.tmp-{os.getpid()}', state_path)
+    elif os.path.exists(state_path):
+        os.remove(state_path)
+    return len(df) - first
+
+# create function to build and save the feature matrices from the csv files
+def build_feature_matrices(years, data_dir='.', pbp_cache_dir='pbp_cache', cache_dir='feature_cache', out_dir='.',
+                           processes=None):
+    '''
+    Function to run the whole transform stage: read rosters_df_w_scoring.csv and the cached play-by-play, build the
+    feature matrices, and write <out_dir>/<group>_feature_matrix.csv
+
+    param years: list of play-by-play season years
+    param data_dir: directory of rosters_df_w_scoring.csv and the play_by_play_<year>.csv files
+    param pbp_cache_dir: directory of the play-by-play parquet cache
+    param cache_dir: directory of the stage cache
+    param out_dir: directory the feature matrices are written to
+    param processes: number of worker processes
+
+    returns: pandas dataframe of the stage timings (see build_features)
+    '''
+
+    start = time.perf_counter()
+    df = read_rosters(os.path.join(data_dir, 'rosters_df_w_scoring.csv'))
+    cache_seasons(years, data_dir, pbp_cache_dir)
+    play_by_play_df = load_play_by_play(years, pbp_cache_dir)
+    load_seconds = time.perf_counter() - start
+
+    features, timings = build_features(df, play_by_play_df, cache_dir, processes=processes)
+
+    # only write the rows of each feature matrix from the first one that changed since it was written
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    written = sum(write_matrix(feature_df, os.path.join(out_dir, f'{group}_feature_matrix.csv'),
+                               os.path.join(cache_dir, 'written', f'{group}.npz')) > 0
+                  for group, feature_df in features.items())
+    write_seconds = time.perf_counter() - start
+
+    timings = pd.concat([pd.DataFrame([['load', load_seconds, 1, 0]], columns=timings.columns), timings,
+                         pd.DataFrame([['write', write_seconds, written, len(features) - written]],
+                                      columns=timings.columns)], ignore_index=True)
+    return timings
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        years = [int(i) for i in sys.argv[2:]] or [2018, 2019, 2020]
+        timings = build_feature_matrices(years)
+        print(timings.to_string(index=False, float_format=lambda i: f'{i:.3f}'))
+    else:
+        print('usage: python feature_pipeline.py build [years]')
+        sys.exit(1)
@@ -0,0 +1,178 @@
+# column-pruned, per-season parquet cache of the nflfastR play-by-play data used by 01-calc_adv_stats.ipynb
+#
+# each play_by_play_<year>.csv is streamed in chunks, keeping only the columns the rushing, receiving, passing,
+# defense, and kicker feature builders read (with explicit dtypes) and the plays that have a team in possession or on
+# defense, and written to <cache_dir>/play_by_play_<year>.parquet one chunk per row group.  a season is only rebuilt
+# when its csv changes, and the cache is read back one season per partition, lazily with dask or eagerly with pandas:
+#
+#   cache_seasons([2018, 2019, 2020])
+#   play_by_play_df = load_play_by_play([2018, 2019, 2020])
+
+# import needed packages
+import json
+import os
+
+import dask.dataframe as dd
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# create dictionary of the play-by-play columns the feature builders read and their dtypes (float64 for every
+# numerical column since nflfastR leaves them empty on plays they do not apply to)
+pbp_columns = {'posteam': 'object',
+               'defteam': 'object',
+               'week': 'int64',
+               'drive': 'float64',
+               'play_type': 'object',
+               'yardline_100': 'float64',
+               'yards_gained': 'float64',
+               'rush_attempt': 'float64',
+               'pass_attempt': 'float64',
+               'rusher_player_id': 'object',
+               'rusher_player_name': 'object',
+               'rushing_yards': 'float64',
+               'receiver_player_id': 'object',
+               'receiver_player_name': 'object',
+               'passer_player_id': 'object',
+               'passer_player_name': 'object',
+               'incomplete_pass': 'float64',
+               'complete_pass': 'float64',
+               'passing_yards': 'float64',
+               'air_yards': 'float64',
+               'yards_after_catch': 'float64',
+               'pass_length': 'object',
+               'pass_location': 'object',
+               'touchdown': 'float64',
+               'interception': 'float64',
+               'fumble_lost': 'float64',
+               'shotgun': 'float64',
+               'no_huddle': 'float64',
+               'qb_dropback': 'float64',
+               'qb_kneel': 'float64',
+               'qb_spike': 'float64',
+               'qb_scramble': 'float64',
+               'qb_hit': 'float64',
+               'sack': 'float64',
+               'ep': 'float64',
+               'epa': 'float64',
+               'air_epa': 'float64',
+               'comp_air_epa': 'float64',
+               'qb_epa': 'float64',
+               'air_wpa': 'float64',
+               'comp_air_wpa': 'float64',
+               'drive_ended_with_score': 'float64',
+               'drive_end_transition': 'object',
+               'penalty_team': 'object',
+               'penalty_yards': 'float64',
+               'field_goal_result': 'object'
+              }
+
+# create dictionary of the arrow type of each dtype
+arrow_types = {'object': pa.string(), 'int64': pa.int64(), 'float64': pa.float64()}
+
+# create name of the file in the cache directory that records which csv each season was built from
+manifest_name = '_pbp_manifest.json'
+
+# create function to build the path of a season's play-by-play csv
+def pbp_file(data_dir, year):
+    return os.path.join(data_dir, f'play_by_play_{year}.csv')
+
+# create function to build the path of a season's cached play-by-play
+def season_file(cache_dir, year):
+    return os.path.join(cache_dir, f'play_by_play_{year}.parquet')
+
+# create function to describe a csv so a changed file is rebuilt
+def source_signature(path):
+    stat = os.stat(path)
+    return {'bytes': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'columns': sorted(pbp_columns)}
+
+# create function to read the cache manifest
+def read_manifest(cache_dir):
+    path = os.path.join(cache_dir, manifest_name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+# create function to stream one season's csv into its parquet file
+def cache_season(year, data_dir='.', cache_dir='pbp_cache', chunksize=100000):
+    '''
+    Function to write the pruned play-by-play of one season to the cache
+
+    Only one chunk of the csv is in memory at a time.  Columns the csv does not have (older nflfastR releases) are
+    written as nulls, and the file is written under a temporary name and renamed so a reader never sees half a season.
+
+    param year: season year
+    param data_dir: directory of the play_by_play_<year>.csv files
+    param cache_dir: directory of the parquet cache
+    param chunksize: number of csv rows read at a time
+
+    returns: number of plays written
+    '''
+
+    source = pbp_file(data_dir, year)
+    header = pd.read_csv(source, nrows=0).columns
+    usecols = [i for i in pbp_columns if i in header]
+    schema = pa.schema([(i, arrow_types[pbp_columns[i]]) for i in pbp_columns] + [('year', pa.int64())])
+
+    path = season_file(cache_dir, year)
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for chunk in pd.read_csv(source, usecols=usecols, dtype={i: pbp_columns[i] for i in usecols}, chunksize=chunksize):
+
+            # keep plays with a team in possession or on defense, every feature builder groups by one of them
+            chunk = chunk.loc[chunk['posteam'].notnull() | chunk['defteam'].notnull()]
+            chunk = chunk.reindex(columns=list(pbp_columns))
+            chunk['year'] = year
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    os.replace(tmp_path, path)
+    return rows
+
+# create function to cache every season whose csv is new or changed
+def cache_seasons(years, data_dir='.', cache_dir='pbp_cache', chunksize=100000, force=False):
+    '''
+    Function to bring the play-by-play cache up to date
+
+    param years: list of season years
+    param data_dir: directory of the play_by_play_<year>.csv files
+    param cache_dir: directory of the parquet cache
+    param chunksize: number of csv rows read at a time
+    param force: whether to rebuild seasons whose csv has not changed
+
+    returns: dictionary of the number of plays written for each rebuilt season
+    '''
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = read_manifest(cache_dir)
+    written = {}
+    for year in years:
+        signature = source_signature(pbp_file(data_dir, year))
+        if not force and manifest.get(str(year)) == signature and os.path.exists(season_file(cache_dir, year)):
+            continue
+        written[year] = cache_season(year, data_dir, cache_dir, chunksize)
+        manifest[str(year)] = signature
+
+        # record each season as soon as it is cached so an interrupted run resumes where it stopped
+        with open(os.path.join(cache_dir, manifest_name), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent = 1, sort_keys = True)
+    return written
+
+# create function to read the cached play-by-play of many seasons
+def load_play_by_play(years, cache_dir='pbp_cache', columns=None, lazy=False):
+    '''
+    Function to read the cached play-by-play
+
+    param years: list of season years
+    param cache_dir: directory of the parquet cache
+    param columns: list of the columns to read (defaults to every cached column)
+    param lazy: whether to return a dask dataframe with one partition per season instead of a pandas dataframe
+
+    returns: dask or pandas dataframe of the plays of every season, in season order
+    '''
+
+    paths = [season_file(cache_dir, i) for i in years]
+    if lazy:
+        return dd.read_parquet(paths, columns=columns, engine='pyarrow', split_row_groups=False)
+    return pd.concat([pd.read_parquet(i, columns=columns) for i in paths], ignore_index=True)
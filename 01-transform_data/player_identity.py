@@ -0,0 +1,225 @@
+# player identity resolver behind the roster to play-by-play joins of 01-calc_adv_stats.ipynb
+#
+# ESPN lists players by full name and nflfastR by short name (first initial, a period, and last name), so every roster
+# row gets a short_name built from its player name, corrected by an override table for the players that rule gets
+# wrong.  the overrides are hashed by (player, team, year, week) so all roster rows are resolved in one lookup instead
+# of one full-frame scan per override, and the play-by-play stat tables are joined to the rosters through one integer
+# key per row instead of one merge per table:
+#
+#   players = player_index()
+#   df = players.resolve(df)
+#   rbwrte_df = players.join(rbwrte_df, [(rb_df, ['year', 'week', 'rusher_player_name', 'posteam'], ['rush_share'])])
+#   players.unmatched_players(rbwrte_df, [(rb_df, ['year', 'week', 'rusher_player_name', 'posteam'], ['rush_share'])])
+
+# import needed packages
+import numpy as np
+import pandas as pd
+
+# create list of the roster rows the first initial + last name rule gets wrong, as (player, pro_team_abv values, year,
+# weeks or None for the whole season, dictionary of the corrected columns).  every override matches the roster row as
+# ESPN lists it, before any other override is applied
+player_overrides = [('Damien Williams',  ['KC'],         2018, None,                     {'short_name': 'Dam.'}),
+                    ('Darrel Williams',  ['KC'],         2018, None,                     {'short_name': 'Dar.Williams'}),
+                    ('Damien Williams',  ['KC'],         2019, None,                     {'short_name': 'Dam.Williams'}),
+                    ('Trey Edmunds',     ['PIT'],        2019, [12],                     {'short_name': 'Tr.Edmunds'}),
+                    ('David Johnson',    ['HOU'],        2020, [2, 3, 13],               {'short_name': 'Da.Johnson'}),
+                    ('Duke Johnson',     ['HOU'],        2020, [13, 14],                 {'short_name': 'Du.Johnson'}),
+                    ('C.J. Anderson',    ['LV'],         2018, None,                     {'pro_team': 'Los Angeles Rams',
+                                                                                          'pro_team_abv': 'LA'}),
+                    ('Demaryius Thomas', ['HOU', 'DEN'], 2018, None,                     {'short_name': 'De.Thomas'}),
+                    ('Demaryius Thomas', ['DEN'],        2018, [9],                      {'pro_team': 'Houston Texans',
+                                                                                          'pro_team_abv': 'HOU'}),
+                    ('Tyrell Williams',  ['LAC'],        2018, None,                     {'short_name': 'Ty.Williams'}),
+                    ('Robby Anderson',   ['NYJ'],        2019, None,                     {'short_name': 'Ro.Anderson'}),
+                    ('DK Metcalf',       ['SEA'],        2019, None,                     {'short_name': 'DK.Metcalf'}),
+                    ('Delanie Walker',   ['TEN'],        2019, None,                     {'short_name': 'De.Walker'}),
+                    ('Diontae Johnson',  ['PIT'],        2020, [14, 15, 16, 17],         {'short_name': 'Di.Johnson'}),
+                    ('Tyron Johnson',    ['LAC'],        2020, [12, 13, 14, 15, 16, 17], {'short_name': 'Ty.Johnson'}),
+                    ('Josh Allen',       ['BUF'],        2019, [9, 10, 11],              {'short_name': 'Jos.Allen'})
+                   ]
+
+# create list of the roster columns the play-by-play stat tables are joined on
+join_columns = ['year', 'week', 'short_name', 'pro_team_abv']
+
+# create function to encode the key columns of two dataframes as one integer per row
+def encode_keys(left, right, left_on, right_on):
+    '''
+    Function to encode the join keys of two dataframes as dense integer codes
+
+    Each key column is factorized across both dataframes together and folded into the codes of the columns before it,
+    so equal keys get equal codes whatever the dtypes (e.g. a category year against an int64 year).  Null keys get a
+    code of their own and match each other, like they do in pd.merge.
+
+    param left: pandas dataframe
+    param right: pandas dataframe
+    param left_on: list of the key columns of left
+    param right_on: list of the key columns of right, in the same order
+
+    returns: tuple of the left codes array, the right codes array, and the number of distinct keys
+    '''
+
+    codes, num_codes = np.zeros(len(left) + len(right), dtype=np.int64), 1
+    for i, j in zip(left_on, right_on):
+        values = pd.concat([pd.Series(np.asarray(left[i])), pd.Series(np.asarray(right[j]))], ignore_index=True)
+        column_codes, uniques = pd.factorize(values)
+
+        # refactorize the combined codes so they stay below the number of rows however many columns are folded in
+        codes, uniques = pd.factorize(codes * (len(uniques) + 1) + (column_codes + 1))
+        num_codes = len(uniques)
+    return codes[:len(left)], codes[len(left):], num_codes
+
+# create class to resolve roster players to their play-by-play names and join the play-by-play stats to them
+class player_index(object):
+    '''
+    Hash index of the player overrides keyed by (player, pro_team_abv, year, week)
+
+    Season-long overrides are keyed by (player, pro_team_abv, year) and applied first, then the weekly overrides, so a
+    weekly override wins over a season-long one of the same column.
+    '''
+
+    # create __init__ function
+    def __init__(self, overrides=player_overrides):
+        season, weekly = {}, {}
+        for player, teams, year, weeks, updates in overrides:
+            for team in teams:
+                for week in (weeks or [None]):
+                    key, index = ((player, team, year), season) if week is None else ((player, team, year, week), weekly)
+                    for column, value in updates.items():
+                        if index.setdefault(key, {}).setdefault(column, value) != value:
+                            raise ValueError(f'conflicting {column} overrides for {key}')
+
+        self.players = sorted(set(i[0] for i in overrides))
+        self.columns = sorted(set(j for i in overrides for j in i[4]))
+        self.indexes = []
+        for index in [season, weekly]:
+            keys = list(index)
+            self.indexes.append((pd.MultiIndex.from_tuples(keys) if keys else None,
+                                 {i: np.array([index[j].get(i) for j in keys], dtype=object) for i in self.columns}))
+
+    # create function to build the short name of every roster row
+    def resolve(self, df):
+        '''
+        Function to add the first_initial, last_name, and short_name columns to a roster dataframe and apply the
+        overrides
+
+        param df: pandas dataframe with player, pro_team_abv, year, and week columns
+
+        returns: copy of the dataframe with the short names (and any overridden teams) resolved
+        '''
+
+        df = df.copy()
+        df['first_initial'] = df['player'].astype(str).str[0]
+        df['last_name'] = df['player'].str.extract(r'(?<=\s)(.*?)(?=$|\s)', expand=False)
+        df['short_name'] = df['first_initial'] + '.' + df['last_name']
+
+        # only the rows of overridden players are looked up in the index
+        rows = np.flatnonzero(df['player'].isin(self.players).to_numpy())
+        if len(rows) == 0:
+            return df
+        keys = [df['player'].to_numpy()[rows], np.asarray(df['pro_team_abv'])[rows],
+                np.asarray(df['year'])[rows].astype(np.int64), np.asarray(df['week'])[rows].astype(np.int64)]
+
+        updates = {i: np.full(len(rows), None, dtype=object) for i in self.columns}
+        for (index, values), num_keys in zip(self.indexes, [3, 4]):
+            if index is None:
+                continue
+            found = index.get_indexer(pd.MultiIndex.from_arrays(keys[:num_keys]))
+            for column in self.columns:
+                value = np.where(found >= 0, values[column][found], None)
+                updates[column] = np.where(pd.notna(value), value, updates[column])
+
+        for column, value in updates.items():
+            hit = pd.notna(value)
+            if hit.any():
+                if column not in df:
+                    df[column] = np.nan
+                df.iloc[rows[hit], df.columns.get_loc(column)] = value[hit]
+        return df
+
+    # create function to match every roster row to a row of each stat table
+    def match(self, left, tables, left_on=None):
+        '''
+        Function to find the row of each stat table that each roster row joins to
+
+        param left: roster dataframe
+        param tables: list of (stat dataframe, list of its key columns in left_on order, list of columns to add)
+        param left_on: list of the roster key columns (defaults to year, week, short_name, and pro_team_abv)
+
+        returns: list with a tuple for each table of the matched row positions (-1 for none) and a boolean array of the
+                 roster rows whose key more than one row of the table has
+        '''
+
+        left_on = join_columns if left_on is None else left_on
+        matches = []
+        for stats, right_on, _ in tables:
+            left_key, right_key, num_codes = encode_keys(left, stats, left_on, right_on)
+
+            # position of the first row of each key, and how many rows have it
+            first = np.full(num_codes, -1, dtype=np.int64)
+            keep = ~pd.Index(right_key).duplicated(keep='first')
+            first[right_key[keep]] = np.flatnonzero(keep)
+            counts = np.bincount(right_key, minlength=num_codes)
+            matches.append((first[left_key], counts[left_key] > 1))
+        return matches
+
+    # create function to add the columns of many stat tables to a roster dataframe
+    def join(self, left, tables, left_on=None):
+        '''
+        Function to add the columns of every stat table to a roster dataframe in one pass
+
+        This gives the columns a chain of left merges would, except a roster row whose key more than one row of a stat
+        table has takes the first one instead of being repeated (see unmatched_players).
+
+        param left: roster dataframe
+        param tables: list of (stat dataframe, list of its key columns in left_on order, list of columns to add)
+        param left_on: list of the roster key columns (defaults to year, week, short_name, and pro_team_abv)
+
+        returns: roster dataframe with a new range index and the columns of every table added (nulls where a row has
+                 no match)
+        '''
+
+        added = {}
+        for (stats, _, columns), (rows, _) in zip(tables, self.match(left, tables, left_on)):
+            for column in columns:
+                if column in left or column in added:
+                    raise ValueError(f'{column} is already a column of the joined dataframe')
+                added[column] = pd.api.extensions.take(np.asarray(stats[column]), rows, allow_fill=True)
+        return pd.concat([left.reset_index(drop=True), pd.DataFrame(added, index=pd.RangeIndex(len(left)))], axis=1)
+
+    # create function to report the roster players that never join to the play-by-play
+    def unmatched_players(self, left, tables, left_on=None):
+        '''
+        Function to list the player seasons whose short name never matches a stat table or sometimes matches more than
+        one row of one
+
+        A player without a match in some weeks just did not play, but one without a match in any week of a season
+        likely needs an override.
+
+        param left: roster dataframe
+        param tables: list of (stat dataframe, list of its key columns in left_on order, list of columns to add)
+        param left_on: list of the roster key columns (defaults to year, week, short_name, and pro_team_abv)
+
+        returns: pandas dataframe with one row per player season and its number of weeks, matched weeks, and ambiguous
+                 weeks
+        '''
+
+        left_on = join_columns if left_on is None else left_on
+        matches = self.match(left, tables, left_on)
+        matched = np.zeros(len(left), dtype=bool)
+        ambiguous = np.zeros(len(left), dtype=bool)
+        for rows, duplicate in matches:
+            matched |= rows >= 0
+            ambiguous |= duplicate
+
+        # groupby drops null keys (dropna=False needs pandas 1.1), so a player missing a key is grouped under '' and
+        # reported with the null again, sorted last
+        group_columns = [i for i in ['player'] + left_on if i != 'week' and i in left]
+        report = left[group_columns].reset_index(drop=True).assign(weeks=1, matched_weeks=matched.astype(np.int64),
+                                                                   ambiguous_weeks=ambiguous.astype(np.int64))
+        missing = [i for i in group_columns if report[i].isnull().any()]
+        report[missing] = report[missing].astype(object).fillna('')
+        report = report.groupby(group_columns, as_index=False, observed=True).sum()
+        if missing:
+            report[missing] = report[missing].replace('', np.nan)
+            report = report.sort_values(group_columns, na_position='last', kind='mergesort', ignore_index=True)
+        return report.loc[(report['matched_weeks'] == 0) | (report['ambiguous_weeks'] > 0)].reset_index(drop=True)
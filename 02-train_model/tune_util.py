@@ -0,0 +1,216 @@
+# cached, parallel hyperparameter search behind the tuning cells of 03-train_rf_model.ipynb
+#
+# every (position group, model, fold) of every tuning grid is one job in a single process pool.  the RepeatedKFold
+# fold indices of each position group are computed once and shared by every job, models that only differ by
+# n_estimators are grown tree by tree with warm_start (scored at each size) instead of refit from scratch, the same
+# model showing up in more than one grid is fit once, and each finished fold score is appended to a cache file so an
+# interrupted or extended search only fits what it has not scored yet:
+#
+#   scores = run_search({'rbwrte': (x_train_rbwrte, y_train_rbwrte), 'qb': (x_train_qb, y_train_qb)},
+#                       {'max_samples': tune_max_samples_regression(), 'n_estimators': tune_n_estimators_regression()})
+#   summarize_search(scores)
+
+# import needed packages
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import RepeatedKFold
+
+# create list of the model parameters that do not change the fitted trees and are left out of the cache keys
+ignored_params = ['n_jobs', 'verbose', 'warm_start']
+
+# create list of the columns of the scores dataframe
+score_columns = ['position', 'grid', 'setting', 'fold', 'score']
+
+# create data and fold indices of each position group (set once per worker process by set_data)
+worker_data = {}
+
+# create function to fingerprint a feature matrix and target so the cache is only reused for the same data
+def data_signature(X, y):
+    digest = hashlib.sha1()
+    digest.update(json.dumps([list(map(str, X.columns)), list(X.shape)]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+# create function to build the cache key of one fold of one model
+def score_key(signature, cv_params, params, fold):
+    text = json.dumps([signature, cv_params, sorted((k, repr(v)) for k, v in params.items()), fold])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+# create function to read the finished fold scores of a cache file
+def read_scores(path):
+    '''
+    Function to read the fold scores already in a cache file
+
+    param path: path of the cache file (one json object per line)
+
+    returns: dictionary of the score of each cache key (a line cut off by an interrupted run is skipped)
+    '''
+
+    scores = {}
+    if not os.path.exists(path):
+        return scores
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            scores[record['key']] = record['score']
+    return scores
+
+# create function to keep the data and fold indices in a worker process
+def set_data(data):
+    worker_data.clear()
+    worker_data.update(data)
+
+# create function to fit one model chain on one fold and score it at every n_estimators
+def fit_chain(position, chain, fold):
+    '''
+    Function to fit the models of a chain on one fold, growing the same forest for each larger n_estimators
+
+    Growing a forest from n to m trees with warm_start gives exactly the trees a fresh fit with m trees and the same
+    random_state gives, so each model of the chain scores like it was fit on its own.
+
+    param position: position group key of worker_data
+    param chain: list of model parameter dictionaries that only differ by n_estimators, in increasing n_estimators
+    param fold: index of the fold in the position group's fold indices
+
+    returns: list of the negative mean absolute error of each model of the chain on the fold's test rows
+    '''
+
+    X, y, folds = worker_data[position]
+    train, test = folds[fold]
+    model = RandomForestRegressor(**chain[0])
+    model.set_params(n_jobs=1, warm_start=True)
+
+    scores = []
+    for params in chain:
+        model.set_params(n_estimators=params['n_estimators'])
+        model.fit(X[train], y[train])
+        scores.append(-mean_absolute_error(y[test], model.predict(X[test])))
+    return scores
+
+# create function to run every tuning grid of every position group
+def run_search(datasets, grids, cache_dir='tune_cache', n_splits=10, n_repeats=3, random_state=1, processes=None):
+    '''
+    Function to cross validate every model of every grid on every position group, reusing any cached fold scores
+
+    Models without a random_state get random_state so a cached score can be reproduced.
+
+    param datasets: dictionary of position group name to (feature matrix dataframe, target series)
+    param grids: dictionary of grid name to the dictionary of setting name to RandomForestRegressor that the
+                 notebook's tune_*_regression functions return
+    param cache_dir: directory of the fold score cache files (one per position group)
+    param n_splits: number of RepeatedKFold splits
+    param n_repeats: number of RepeatedKFold repeats
+    param random_state: random_state of RepeatedKFold and of the models that do not set one
+    param processes: number of worker processes (defaults to one per cpu)
+
+    returns: pandas dataframe with the position, grid, setting, fold, and score (negative mean absolute error) of every
+             fold of every model
+    '''
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cv_params = {'n_splits': n_splits, 'n_repeats': n_repeats, 'random_state': random_state}
+    cv = RepeatedKFold(**cv_params)
+    num_folds = n_splits * n_repeats
+
+    data, cached, rows, chains = {}, {}, [], {}
+    for position, (X, y) in datasets.items():
+        values = X.to_numpy(dtype=np.float64)
+        data[position] = (values, np.asarray(y, dtype=np.float64), list(cv.split(values)))
+        cached[position] = read_scores(os.path.join(cache_dir, f'scores_{position}.jsonl'))
+        signature = data_signature(X, y)
+
+        for grid, models in grids.items():
+            for setting, model in models.items():
+                params = {k: v for k, v in model.get_params().items() if k not in ignored_params}
+                if params['random_state'] is None:
+                    params['random_state'] = random_state
+                for fold in range(num_folds):
+                    key = score_key(signature, cv_params, params, fold)
+                    rows.append((position, grid, setting, fold, key))
+
+                    # models that only differ by n_estimators share one forest per fold
+                    if key not in cached[position]:
+                        chain = (position, fold, json.dumps(sorted((k, repr(v)) for k, v in params.items()
+                                                                   if k != 'n_estimators')))
+                        chains.setdefault(chain, {})[key] = params
+
+    # fit the missing chains, longest first so the pool is not left waiting on one big forest at the end
+    jobs = [(position, fold, sorted(keys.items(), key=lambda i: i[1]['n_estimators']))
+            for (position, fold, _), keys in chains.items()]
+    jobs.sort(key=lambda i: -i[2][-1][1]['n_estimators'])
+    processes = min(processes or os.cpu_count() or 1, max(len(jobs), 1))
+
+    files = {i: open(os.path.join(cache_dir, f'scores_{i}.jsonl'), 'a', encoding='utf-8') for i in datasets}
+    try:
+        def record(position, chain, scores):
+            for (key, _), score in zip(chain, scores):
+                cached[position][key] = score
+                files[position].write(json.dumps({'key': key, 'score': score}) + '\n')
+            files[position].flush()
+
+        if processes <= 1:
+            set_data(data)
+            for position, fold, chain in jobs:
+                record(position, chain, fit_chain(position, [i[1] for i in chain], fold))
+        else:
+            with ProcessPoolExecutor(max_workers=processes, initializer=set_data, initargs=(data,)) as executor:
+                futures = {executor.submit(fit_chain, position, [i[1] for i in chain], fold): (position, chain)
+                           for position, fold, chain in jobs}
+                for future in as_completed(futures):
+                    record(*futures[future], future.result())
+    finally:
+        for f in files.values():
+            f.close()
+
+    scores = pd.DataFrame(rows, columns=score_columns[:-1] + ['key'])
+    scores['score'] = [cached[i][j] for i, j in zip(scores['position'], scores['key'])]
+    return scores[score_columns]
+
+# create function to summarize the fold scores of every model
+def summarize_search(scores):
+    '''
+    Function to summarize the cross validation scores of every model
+
+    param scores: pandas dataframe returned by run_search
+
+    returns: pandas dataframe with the mean and standard deviation of the scores of each position, grid, and setting in
+             the order the models were given
+    '''
+
+    # the population standard deviation like numpy.std in plot_param_tuning_regression
+    grouped = scores.groupby(['position', 'grid', 'setting'], sort=False)['score']
+    summary = pd.DataFrame({'mean': grouped.mean(), 'std': grouped.std(ddof=0)}).reset_index()
+    return summary
+
+# create function to plot the fold scores of one grid of one position group
+def plot_search(scores, position, grid):
+    '''
+    Function to print and box plot the cross validation scores of one grid like plot_param_tuning_regression does
+
+    param scores: pandas dataframe returned by run_search
+    param position: position group name
+    param grid: grid name
+    '''
+
+    from matplotlib import pyplot
+
+    scores = scores.loc[(scores['position'] == position) & (scores['grid'] == grid)]
+    results, names = list(), list()
+    for name, group in scores.groupby('setting', sort=False):
+        results.append(group['score'].to_numpy())
+        names.append(name)
+        print('>%s MAE: %.3f (%.3f)' % (name, np.mean(results[-1]), np.std(results[-1])))
+
+    pyplot.boxplot(results, labels=names, showmeans=True)
+    pyplot.show()
@@ -0,0 +1,174 @@
+# import needed packages
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# create function to fingerprint the game log rows of each week
+def week_digests(tm_game_data):
+    '''
+    Function to hash the rows of every week of the game log
+
+    param tm_game_data: pandas dataframe with a week column
+
+    returns: dictionary of week to a hex digest of that week's rows (in order)
+    '''
+
+    hashes = pd.util.hash_pandas_object(tm_game_data, index=False).to_numpy()
+    return {int(week): hashlib.sha1(hashes[rows].tobytes()).hexdigest()
+            for week, rows in tm_game_data.groupby('week', sort=False).indices.items()}
+
+# create number of decimals up to which a fractional stat (fantasy points, yards per attempt) is summed exactly
+max_decimals = 6
+
+# create function to find the power of ten that turns a float stat into integers
+def decimal_scale(values):
+    '''
+    Function to find the smallest power of ten (up to 10 ** max_decimals) that makes every value an integer, up to the
+    float error of a value summed from decimals (so a source value like 12.299999999999997 counts as 12.3)
+
+    param values: numpy float array without nans
+
+    returns: the power of ten, or None when the values have more decimals or their scaled total would not stay exact
+    '''
+
+    tolerance = 1e-9 * np.maximum(np.abs(values), 1)
+    for decimals in range(max_decimals + 1):
+        scale = 10 ** decimals
+        scaled = np.round(values * scale)
+        if (np.abs(scaled / scale - values) <= tolerance).all():
+            return scale if np.abs(scaled).sum() < 2 ** 53 else None
+    return None
+
+# create function to turn one stat into per team, per week cumulative sums
+def accumulate(values, week_pos, team_pos, rows, keep, shape, previous=None):
+    '''
+    Function to build the cumulative sum array of one stat, reusing the first keep + 1 rows of a previous array
+
+    param values: numpy array with one value per game log row
+    param week_pos: numpy array of each row's position on the week axis (1 for the first week)
+    param team_pos: numpy array of each row's position on the team axis
+    param rows: boolean numpy array of the rows in weeks after the kept rows
+    param keep: number of leading weeks taken from previous
+    param shape: (number of weeks + 1, number of teams)
+    param previous: cumulative sum array of the previous store (None when keep is 0)
+
+    returns: numpy array of shape shape
+    '''
+
+    dense = np.zeros((shape[0] - keep - 1, shape[1]), dtype=values.dtype)
+    np.add.at(dense, (week_pos[rows] - keep - 1, team_pos[rows]), values[rows])
+    head = previous[:keep + 1] if previous is not None else np.zeros((1, shape[1]), dtype=values.dtype)
+    return np.concatenate([head, head[-1] + np.cumsum(dense, axis=0)])
+
+# create class to sum team stats over any window of weeks using per team, per week cumulative sums
+class week_agg_store(object):
+    '''
+    Precomputed rolling window aggregation store for the weekly team game log
+
+    The game log is laid out once as a dense (week, team, stat) array and turned into cumulative sums over the week
+    axis, with a leading row of zeros.  The sum over any window of weeks is then a single subtraction of two rows and
+    games played comes from a cumulative games played counter built the same way.  Stats with at most max_decimals
+    decimals are rounded to that precision and summed as integers (scaled by a power of ten), so a window is the exact
+    decimal sum, never a float residue like 12.299999999999997.
+
+    Given the store built from an earlier copy of the game log, only the weeks from the first week whose rows changed
+    onward are summed again (a new week of games appends one row per array).
+
+    param tm_game_data: pandas dataframe with one row per team per game and week and team_abv columns
+    param previous: optional week_agg_store of an earlier copy of the game log
+    '''
+
+    # create __init__ function
+    def __init__(self, tm_game_data, previous=None):
+
+        # sum every numeric/bool column (including week) the same way groupby('team_abv').sum() does
+        self.columns = [i for i in tm_game_data.select_dtypes(include=['number', 'bool']).columns]
+
+        weeks = tm_game_data['week'].to_numpy()
+        self.first_week = int(weeks.min())
+        self.last_week = int(weeks.max())
+        self.teams, team_pos = np.unique(tm_game_data['team_abv'].to_numpy(dtype=str), return_inverse=True)
+        self.digests = week_digests(tm_game_data)
+        week_pos = weeks - self.first_week + 1
+
+        num_weeks = self.last_week - self.first_week + 1
+        shape = (num_weeks + 1, len(self.teams))
+
+        # convert each stat once to int64 so it stays exact under subtraction, float stats scaled by the power of ten
+        # that makes them integers (1 for integer valued ones), only stats with more decimals stay float
+        stats = {}
+        self.out_dtypes = {}
+        self.scales = {}
+        for col in self.columns:
+            values = tm_game_data[col].to_numpy()
+            if values.dtype.kind == 'f':
+                values = np.nan_to_num(values, nan=0.0)
+                self.out_dtypes[col] = np.float64
+                self.scales[col] = decimal_scale(values)
+                if self.scales[col] is not None:
+                    values = np.round(values * self.scales[col]).astype(np.int64)
+            else:
+                values = values.astype(np.int64)
+                self.out_dtypes[col] = np.int64
+                self.scales[col] = 1
+            stats[col] = values
+
+        # keep the previous store's rows of the weeks before the first week whose games changed
+        self.reused_rows = 0
+        if previous is not None and previous.columns == self.columns and previous.first_week == self.first_week \
+           and np.array_equal(previous.teams, self.teams) and previous.out_dtypes == self.out_dtypes \
+           and previous.scales == self.scales and all(previous.cum_stats[i].dtype == stats[i].dtype for i in self.columns):
+            changed = [i for i in set(self.digests) | set(previous.digests)
+                       if self.digests.get(i) != previous.digests.get(i)]
+            first_changed = min(changed + [self.last_week + 1, previous.last_week + 1])
+            self.reused_rows = first_changed - self.first_week
+        keep = self.reused_rows
+        rows = week_pos > keep
+
+        # count games per team per week then accumulate into the games played counter
+        self.cum_gp = accumulate(np.ones(len(weeks), dtype=np.int64), week_pos, team_pos, rows, keep, shape,
+                                 previous.cum_gp if keep else None)
+
+        # build one cumulative sum array per stat, continuing from the kept rows
+        self.cum_stats = {col: accumulate(stats[col], week_pos, team_pos, rows, keep, shape,
+                                          previous.cum_stats[col] if keep else None)
+                          for col in self.columns}
+
+    # create function to convert a week number to a row within the cumulative arrays (clamped to the stored weeks)
+    def _row(self, week):
+        return int(min(max(week - self.first_week + 1, 0), self.last_week - self.first_week + 1))
+
+    # create function to sum all stats within the user defined time frame
+    def window(self, num_weeks, end_week=None):
+        '''
+        Function to sum every team's stats over the num_weeks weeks ending at end_week
+
+        param num_weeks: number of weeks in the window
+        param end_week: last week of the window (defaults to the most recent week in the game log)
+
+        returns: pandas dataframe with one row per team_abv that played in the window, the summed stats, and gp
+        '''
+
+        if end_week is None:
+            end_week = self.last_week
+        end = self._row(end_week)
+        start = self._row(end_week - num_weeks)
+
+        # only keep teams that played within the window, same as grouping the filtered game log
+        gp = self.cum_gp[end] - self.cum_gp[start]
+        played = gp > 0
+
+        data = {'team_abv': self.teams[played].astype(object)}
+        for col in self.columns:
+            total = (self.cum_stats[col][end] - self.cum_stats[col][start])[played]
+            if self.scales[col] not in (None, 1):
+                total = total / self.scales[col]
+            data[col] = total.astype(self.out_dtypes[col])
+        data['gp'] = gp[played]
+
+        return pd.DataFrame(data)
+
+    # create function to report the size of the cumulative arrays
+    def nbytes(self):
+        return self.cum_gp.nbytes + sum(i.nbytes for i in self.cum_stats.values())
@@ -1,68 +1,36 @@
 ### TEST code version to run from Haroku ###
 
-import pandas as pd
-import numpy as np
+import os
 import dash
 import dash_table
 import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
-import plotly.graph_objs as go
-import plotly.express as px
+
+from callback_cache import callback_cache
+from data_snapshot import data_snapshot, snapshot_manager
+from figures import graph_options
+from metrics import metrics_registry, slow_request_profiler
+from record_book import all_seasons, h2h_columns, record_names, score_columns, standings_columns, streak_columns
 
 #from jupyter_dash import JupyterDash
 
+# time each boot phase and every callback request of this worker (served on /metrics)
+metrics = metrics_registry()
+
 ########### read in data
-win_loss_df = pd.read_csv("win_loss_df.csv").sort_values(['wins', 'points_for'], ascending = False)
-matchups_df = pd.read_csv("matchups_df.csv")
-rosters_df = pd.read_csv("rosters_df.csv")
-tm_game_data = pd.read_csv("tm_game_data.csv")
-this_week = pd.read_csv("this_week.csv")
-this_week_rank = pd.read_csv("this_week.csv")
-this_week_rank_avg = pd.read_csv("this_week.csv")
-
-########### define functions
-# create agg_week function to sum all stats within the user defined time frame
-def agg_week(weekly_boxscore, num_weeks):
-    num_weeks_limit = weekly_boxscore["week"].max() - num_weeks
-    weekly_boxscore = weekly_boxscore[(weekly_boxscore["week"] <= weekly_boxscore["week"].max()) & \
-                                      (weekly_boxscore["week"] > num_weeks_limit)]
-    gp_df = weekly_boxscore['team_abv'].value_counts().sort_index().reset_index()    
-    weekly_boxscore = weekly_boxscore.groupby(['team_abv']).sum().sort_values(['team_abv']).reset_index()
-    weekly_boxscore['gp'] = gp_df['team_abv']
-    return weekly_boxscore
-
-# create function to grab team or boxscore stat from prior_weeks dataframe
-def get_values_list(prior_weeks_df, team, column):  
-    data_list = [prior_weeks_df.loc[prior_weeks_df['team_abv'] == i, column].iloc[0] for i in team.tolist()]
-    return np.array(data_list)
-
-# create list of columns to rank in decending order
-ascending_false = ['pass_td', 'pass_yrd_per_pass', 'pass_1st_dwn', 'pass_yrd', 'rush_td', 'rush_yrd_per_rush', 
-                   'rush_1st_down', 'rush_yrd', 'rec_td', 'rec_yrd_per_tar', 'rec_1st_down', 'rec_yrd_per_gm', 
-                   'rec_per_gm', 'def_st_td', 'def_sack', 'def_int', 'def_fbml', 'kck_pts', 'rz_diff', 'to_diff']
-
-# create list of columns to rank in ascending order
-ascending_true = ['def_st_td_alw', 'def_st_yrd_alw']
-
-graph_options = ['wins/losses', 'points for/points against']
+# read the data files and build everything the callbacks serve from into one snapshot (see data_snapshot.py for the
+# boot phases), then check the data files every DATA_RELOAD_SECONDS and swap in a new snapshot when they change
+snapshots = snapshot_manager(data_snapshot(phase=metrics.phase), float(os.environ.get('DATA_RELOAD_SECONDS', 5)))
+
 columns = ['week', 'team_abv', 'oppn', 'QB', 'RB', 'WRTE', 'DEF', 'KICK']
+lineup_columns = ['owner_team', 'actual_points', 'optimal_points', 'bench_points', 'efficiency_pct', 'proj_points',
+                  'optimal_proj_points', 'proj_lineup_points', 'proj_efficiency_pct']
+lineup_season_columns = ['year', 'owner_team', 'weeks', 'actual_points', 'optimal_points', 'bench_points',
+                         'efficiency_pct', 'proj_lineup_points', 'proj_efficiency_pct']
 myheading = 'Raytonia Beach Fantasy Football League'
 tabtitle='Raytown!'
 
-weekly_points_fig = px.line(matchups_df, x = 'week', y = 'score', 
-                            color = 'owner_team_name', 
-                            title = 'Scores per Week',
-                            hover_name='owner_team_name', 
-                            hover_data={'week' : False,
-                                        'owner_team_name' : False,
-                                        'score' : True
-                                        }
-                           )
-
-weekly_points_fig.update_xaxes(range=[0.95, 14.05], dtick=1)
-weekly_points_fig.layout.update(showlegend=False)
-
 ########### Initiate the app
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
@@ -70,73 +38,182 @@ app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 server = app.server
 app.title=tabtitle
 
+# time, size, and count every callback request (before the cache's hooks so cache hits are timed too)
+metrics.init_app(app)
+
+# sample the stacks of every request and write out the ones slower than PROFILE_SLOW_MS (off when unset)
+if os.environ.get('PROFILE_SLOW_MS'):
+    slow_request_profiler(float(os.environ['PROFILE_SLOW_MS'])).init_app(app, metrics)
+
+# cache serialized callback responses keyed by callback, inputs, and the version of the served data snapshot
+cache = callback_cache(lambda: snapshots.current.version, check_interval=0)
+cache.init_app(app)
+metrics.add_collector(cache.metrics)
+
+# watch the data files from the first request on, and take POST /_reload with the RELOAD_TOKEN secret when it is set
+snapshots.init_app(app, token=os.environ.get('RELOAD_TOKEN'))
+metrics.add_collector(snapshots.metrics)
+
 
 ########### Set up the layout
-app.layout = html.Div([
-    html.H1(myheading),
-    dcc.Tabs([
-        dcc.Tab(label = 'League Overview', children = [
-            html.Div(
-                dcc.Dropdown(id = 'graph_option', 
-                             options = [{'label' : i, 'value' : i} for i in graph_options],
-                             value = 'wins/losses'
+# create function to build the layout from the current data snapshot on every page load
+def serve_layout():
+    snapshot = snapshots.current
+    return html.Div([
+        html.H1(myheading),
+        dcc.Tabs([
+            dcc.Tab(label = 'League Overview', children = [
+                html.Div(
+                    dcc.Dropdown(id = 'graph_option', 
+                                 options = [{'label' : i, 'value' : i} for i in graph_options],
+                                 value = 'wins/losses'
+                    ),
+                    style = {'width': '15%'}
                 ),
-                style = {'width': '15%'}
-            ),
-            html.Div([
                 html.Div([
-                    html.H3(),
-                    dcc.Graph(id='win_loss_fig')
-                ], className="six columns"),
-
+                    html.Div([
+                        html.H3(),
+                        dcc.Graph(id='win_loss_fig')
+                    ], className="six columns"),
+
+                    html.Div([
+                        html.H3(),
+                        dcc.Graph(id='weekly_points', figure=snapshot.figures['weekly_points'])
+                    ], className="six columns"),
+                ], className="row"),
                 html.Div([
-                    html.H3(),
-                    dcc.Graph(id='weekly_points', figure=weekly_points_fig)
-                ], className="six columns"),
-            ], className="row")
-]),
-        dcc.Tab(label = 'Weekly NFL Matchup Rankings', children = [
-            html.Div([
+                    html.H3(f"Playoff Odds (through week {snapshot.odds['week']}, "
+                            f"{snapshot.odds['num_sims']:,d} simulated seasons)"),
+                    dash_table.DataTable(id = 'playoff_odds_table',
+                                         columns=[{"name": i, "id": i} for i in snapshot.odds_columns],
+                                         data=snapshot.odds['records'],
+                                         sort_action='native'
+                                        )
+                ] if snapshot.odds is not None else [
+                    html.H3('Playoff Odds'),
+                    html.P('odds not built, run python playoff_odds.py build')
+                ])
+    ]),
+            dcc.Tab(label = 'Weekly NFL Matchup Rankings', children = [
                 html.Div([
-                    html.H3(),
-                    dcc.Dropdown(id='input_range', 
-                                 options = [{'label' : i, 'value' : i} for i in range(1, tm_game_data['week'].max() + 1)],
-                                 value = 4
-                                )
-                ], className="six columns", style = {'width': '10%'})
-            ], className="row"),
-            html.Div(
-                dash_table.DataTable(id = 'rankings_table',
-                                     columns=[{"name": i, "id": i} for i in columns],
-                                     sort_action='native'
+                    html.Div([
+                        html.H3(),
+                        dcc.Dropdown(id='input_range', 
+                                     options = [{'label' : i, 'value' : i} for i in range(1, snapshot.max_week + 1)],
+                                     value = 4
                                     )
-            )
-        ]),
-        dcc.Tab(label = 'Weekly Raytonia Beach Rosters & Predictions', children = [
-            html.Div([
+                    ], className="six columns", style = {'width': '10%'})
+                ], className="row"),
+                html.Div(
+                    dash_table.DataTable(id = 'rankings_table',
+                                         columns=snapshot.rankings_view(4).column_defs(columns),
+                                         page_action='custom', page_current=0, page_size=32,
+                                         sort_action='custom', sort_mode='multi', sort_by=[],
+                                         filter_action='custom', filter_query=''
+                                        )
+                )
+            ]),
+            dcc.Tab(label = 'Weekly Raytonia Beach Rosters & Predictions', children = [
                 html.Div([
-                    html.H3(),
-                    dcc.Dropdown(id='week', 
-                                 options = [{'label' : i, 'value' : i} for i in rosters_df['week'].unique()],
-                                 value = 1
-                                )
-                ], className="six columns", style = {'width': '5%'}),
-                html.Div([
-                    html.H3(),
-                    dcc.Dropdown(id='owner_team', 
-                                 options = [{'label' : i, 'value' : i} for i in rosters_df['owner_team'].unique()],
-                                 value = 'Happy Rock Homewreckers'
-                                )
-                ], className="six columns", style = {'width': '25%'}),
-            ], className="row"),    
-            html.Div(
-                dash_table.DataTable(id = 'roster_table',
-                                     columns=[{"name": i, "id": i} for i in rosters_df.columns]
+                    html.Div([
+                        html.H3(),
+                        dcc.Dropdown(id='week', 
+                                     options = [{'label' : i, 'value' : i}
+                                                for i in snapshot.rosters_df['week'].unique()],
+                                     value = 1
+                                    )
+                    ], className="six columns", style = {'width': '5%'}),
+                    html.Div([
+                        html.H3(),
+                        dcc.Dropdown(id='owner_team', 
+                                     options = [{'label' : i, 'value' : i}
+                                                for i in snapshot.rosters_df['owner_team'].unique()],
+                                     value = 'Happy Rock Homewreckers'
+                                    )
+                    ], className="six columns", style = {'width': '25%'}),
+                    html.Div([
+                        html.H3(),
+                        dcc.Dropdown(id='roster_columns',
+                                     options = [{'label' : i, 'value' : i} for i in snapshot.roster_view.columns],
+                                     value = snapshot.roster_columns,
+                                     multi = True
                                     )
-            )            
-        ])
-])
-])
+                    ], className="six columns", style = {'width': '60%'}),
+                ], className="row"),    
+                html.Div(
+                    dash_table.DataTable(id = 'roster_table',
+                                         columns=snapshot.roster_view.column_defs(snapshot.roster_columns),
+                                         page_action='custom', page_current=0, page_size=20,
+                                         sort_action='custom', sort_mode='multi', sort_by=[],
+                                         filter_action='custom', filter_query=''
+                                        )
+                ),
+                html.Div([
+                    html.H3('Lineup Efficiency (optimal lineup by actual and by projected points)'),
+                    dash_table.DataTable(id = 'lineup_table',
+                                         columns=snapshot.lineup_view.column_defs(lineup_columns),
+                                         page_action='custom', page_current=0, page_size=10,
+                                         sort_action='custom', sort_mode='multi', sort_by=[],
+                                         filter_action='custom', filter_query=''
+                                        ),
+                    html.H3('Season Lineup Efficiency'),
+                    dash_table.DataTable(id = 'lineup_season_table',
+                                         columns=[{"name": i, "id": i} for i in lineup_season_columns],
+                                         data=snapshot.lineup_seasons,
+                                         sort_action='native', page_size=10
+                                        )
+                ])
+            ]),
+            dcc.Tab(label = 'All-Time Records & Head-to-Head', children = [
+                html.Div([
+                    html.Div([
+                        html.H3('Head-to-Head'),
+                        dcc.Dropdown(id='h2h_owner',
+                                     options = [{'label' : i, 'value' : i} for i in snapshot.record_book.owners],
+                                     value = snapshot.record_book.owners[0] if snapshot.record_book.owners else None
+                                    ),
+                        dash_table.DataTable(id = 'h2h_table',
+                                             columns=[{"name": i, "id": i} for i in h2h_columns],
+                                             sort_action='native'
+                                            )
+                    ], className="six columns"),
+                    html.Div([
+                        html.H3('Standings'),
+                        dcc.Dropdown(id='standings_year',
+                                     options = [{'label' : i, 'value' : i}
+                                                for i in [all_seasons] + snapshot.record_book.years()],
+                                     value = all_seasons
+                                    ),
+                        dash_table.DataTable(id = 'standings_table',
+                                             columns=[{"name": i, "id": i} for i in standings_columns],
+                                             sort_action='native'
+                                            )
+                    ], className="six columns"),
+                ], className="row"),
+                html.Div([
+                    html.H3('Head-to-Head Matrix (wins-losses of each row owner against each column owner)'),
+                    dash_table.DataTable(id = 'h2h_matrix',
+                                         columns=[{"name": i, "id": i}
+                                                  for i in ['owner'] + snapshot.record_book.matrix_owners()],
+                                         data=snapshot.record_book.matrix_rows
+                                        )
+                ]),
+                html.Div([
+                    html.H3('Record Book'),
+                    html.Div(
+                        dcc.Dropdown(id='record_name',
+                                     options = [{'label' : j, 'value' : i} for i, j in record_names.items()],
+                                     value = 'highest_score'
+                                    ),
+                        style = {'width': '25%'}
+                    ),
+                    dash_table.DataTable(id = 'record_table')
+                ])
+            ])
+    ])
+    ])
+
+app.layout = serve_layout
 
 @app.callback(
     Output('win_loss_fig', 'figure'),
@@ -144,264 +221,122 @@ app.layout = html.Div([
     ])
 
 def update_graph(column_options):
+    figures = snapshots.current.figures
     if column_options == 'wins/losses':
-        win_bars = go.Bar(x=win_loss_df['owner_team_name'], y=win_loss_df['wins'],
-                          base=0,
-                          marker_color='green',
-                          name='Wins',
-                          hoverinfo='y'
-                         )
-
-        loss_bars = go.Bar(x=win_loss_df['owner_team_name'], y=win_loss_df['losses'],
-                           base= -1 * win_loss_df['losses'].astype('int'),
-                           text = 1 * win_loss_df['losses'].astype('int'),
-                           marker_color='red',
-                           name='Losses',
-                           hoverinfo='text'
-                          )
-
-        win_loss_data = [win_bars, loss_bars]
-
-        win_loss_layout = go.Layout(barmode = 'overlay',
-                                    hovermode = 'x',
-                                    title = 'Wins/Losses',
-                                    yaxis = dict(tickvals = [10, 5, 0, -5, -10],
-                                                 ticktext = [10, 5, 0, 5, 10]
-                                                )
-                                   )
-
-
-        win_loss_fig = go.Figure(data=win_loss_data, layout=win_loss_layout)
-    else:
-        win_bars = go.Bar(x=win_loss_df['owner_team_name'], y=win_loss_df['points_for'],
-                          base=0,
-                          marker_color='green',
-                          name='points_for',
-                          hoverinfo='y'
-                         )
-
-        loss_bars = go.Bar(x=win_loss_df['owner_team_name'], y=win_loss_df['points_against'],
-                           base= -1 * win_loss_df['points_against'].astype('int'),
-                           text = 1 * win_loss_df['points_against'].astype('int'),
-                           marker_color='red',
-                           name='points_against',
-                           hoverinfo='text'
-                          )
-
-        win_loss_data = [win_bars, loss_bars]
-
-        win_loss_layout = go.Layout(barmode = 'overlay',
-                                    hovermode = 'x',
-                                    title = 'points_for/points_against',
-                                    yaxis = dict(tickvals=[3000, 2000, 1000, 0, -1000, -2000, -3000], 
-                                                 ticktext = [3000, 2000, 1000, 0, 1000, 2000, 3000]
-                                                )
-                                   )
-
-
-        win_loss_fig = go.Figure(data=win_loss_data, layout=win_loss_layout)
-        
-    return win_loss_fig
+        return figures['win_loss']['wins/losses']
+    return figures['win_loss']['points for/points against']
 
 @app.callback(
-    Output('roster_table', 'data'),
+    [Output('roster_table', 'data'),
+     Output('roster_table', 'columns'),
+     Output('roster_table', 'page_count')],
     [Input('week', 'value'),
-     Input('owner_team', 'value')
+     Input('owner_team', 'value'),
+     Input('roster_columns', 'value'),
+     Input('roster_table', 'page_current'),
+     Input('roster_table', 'page_size'),
+     Input('roster_table', 'sort_by'),
+     Input('roster_table', 'filter_query')
     ])
 
-def update_table(week, team):
-    updated_df = rosters_df.loc[(rosters_df['week'] == week) & (rosters_df['owner_team'] == team)].sort_values('slot_id')
-    return updated_df.to_dict(orient='records')
+def update_table(week, team, visible_columns, page_current, page_size, sort_by, filter_query):
+    snapshot = snapshots.current
+    data, page_count = snapshot.roster_view.page((snapshot.rosters_year, week, team), visible_columns, page_current,
+                                                 page_size, sort_by, filter_query)
+    return data, snapshot.roster_view.column_defs(visible_columns), page_count
 
 @app.callback(
-    Output('rankings_table', 'data'),
-    [Input('input_range', 'value')
+    [Output('rankings_table', 'data'),
+     Output('rankings_table', 'page_count')],
+    [Input('input_range', 'value'),
+     Input('rankings_table', 'page_current'),
+     Input('rankings_table', 'page_size'),
+     Input('rankings_table', 'sort_by'),
+     Input('rankings_table', 'filter_query')
     ])
 
-def update_table(num_weeks):
-    prior_weeks = agg_week(tm_game_data, num_weeks)
-
-    # aggregate qb stats
-    prior_weeks['pass_td_per_gm'] = prior_weeks['pass_tds'] / prior_weeks['gp']
-    prior_weeks['pass_td_alw_per_gm'] = prior_weeks['pass_tds_alw'] / prior_weeks['gp']
-    prior_weeks['pass_yrd_per_gm'] = prior_weeks['tot_yrds_pass'] / prior_weeks['gp']
-    prior_weeks['pass_yrd_alw_per_gm'] = prior_weeks['tot_yrds_pass_alw'] / prior_weeks['gp']
-    prior_weeks['pass_yrd_per_pass'] = prior_weeks['tot_yrds_pass'] / prior_weeks['pass_att']
-    prior_weeks['pass_yrd_alw_per_pass_alw'] = prior_weeks['tot_yrds_pass_alw'] / prior_weeks['pass_att_alw']
-    prior_weeks['pass_1st_down_per_gm'] = prior_weeks['1st_dwn_pass'] / prior_weeks['gp']
-    prior_weeks['pass_1st_down_alw_per_gm'] = prior_weeks['1st_dwn_pass_alw'] / prior_weeks['gp']
-
-    # aggregate rb stats
-    prior_weeks['rush_td_per_gm'] = prior_weeks['rush_tds'] / prior_weeks['gp']
-    prior_weeks['rush_td_alw_per_gm'] = prior_weeks['rush_tds_alw'] / prior_weeks['gp']
-    prior_weeks['rush_yrd_per_gm'] = prior_weeks['tot_rush_yrds'] / prior_weeks['gp']
-    prior_weeks['rush_yrd_alw_per_gm'] = prior_weeks['tot_rush_yrds_alw'] / prior_weeks['gp']
-    prior_weeks['rush_yrd_per_rush'] = prior_weeks['tot_rush_yrds'] / prior_weeks['rush_att']
-    prior_weeks['rush_yrd_alw_per_rush_alw'] = prior_weeks['tot_rush_yrds_alw'] / prior_weeks['rush_att_alw']
-    prior_weeks['rush_1st_down_per_gm'] = prior_weeks['1st_dwn_rush'] / prior_weeks['gp']
-    prior_weeks['rush_1st_down_alw_per_gm'] = prior_weeks['1st_dwn_rush_alw'] / prior_weeks['gp']
-
-    # aggregate wr/te stats
-    prior_weeks['rec_yrd_per_gm'] = prior_weeks['tot_rec_yrds'] / prior_weeks['gp']
-    prior_weeks['rec_yrd_alw_per_gm'] = prior_weeks['tot_rec_yrds_alw'] / prior_weeks['gp']
-    prior_weeks['rec_yrd_per_tar'] = prior_weeks['tot_rec_yrds'] / prior_weeks['rec_targets']
-    prior_weeks['rec_yrd_alw_per_tar_alw'] = prior_weeks['tot_rec_yrds_alw'] / prior_weeks['rec_targets_alw']
-    prior_weeks['rec_tar_per_gm'] = prior_weeks['rec_targets'] / prior_weeks['gp']
-    prior_weeks['rec_tar_alw_per_gm'] = prior_weeks['rec_targets_alw'] / prior_weeks['gp']
-    prior_weeks['rec_per_gm'] = prior_weeks['tot_rec'] / prior_weeks['gp']
-    prior_weeks['rec_alw_per_gm'] = prior_weeks['tot_rec_alw'] / prior_weeks['gp']
-
-    # aggregate def stats
-    prior_weeks['def_st_td_per_gm'] = (prior_weeks['def_tds'] + prior_weeks['kick_ret_tds'] + prior_weeks['punt_ret_tds']) / \
-                                       prior_weeks['gp']
-    prior_weeks['def_st_td_alw_per_gm'] = (prior_weeks['def_tds_alw'] + prior_weeks['kick_ret_tds_alw'] + \
-                                           prior_weeks['punt_ret_tds_alw']) / prior_weeks['gp']
-    prior_weeks['fumble_per_gm'] = prior_weeks['fumble_rec'] / prior_weeks['gp']
-    prior_weeks['fumble_lost_per_gm'] = prior_weeks['fumble_lost'] / prior_weeks['gp']
-    prior_weeks['int_per_gm'] = prior_weeks['def_ints'] / prior_weeks['gp']
-    prior_weeks['int_alw_per_gm'] = prior_weeks['def_ints_alw'] / prior_weeks['gp']
-    prior_weeks['sacks_per_gm'] = prior_weeks['tot_sck'] / prior_weeks['gp']
-    prior_weeks['sacks_taken_per_gm'] = prior_weeks['sacks_taken'] / prior_weeks['gp']
-
-    # aggregate kick points stats
-    prior_weeks['kck_pts_per_gm'] = prior_weeks['kick_pts'] / prior_weeks['gp']
-    prior_weeks['kck_pts_alw_per_gm'] = prior_weeks['kick_pts_alw'] / prior_weeks['gp']
-
-    # aggregate kick & punt returns stats
-    prior_weeks['return_yrds_per_gm'] = (prior_weeks['kick_ret_yrds'] + prior_weeks['punt_ret_yrds']) / prior_weeks['gp']
-    prior_weeks['return_yrds_alw_per_gm'] = (prior_weeks['kick_ret_yrds_alw'] + prior_weeks['punt_ret_yrds_alw']) / \
-                                            prior_weeks['gp']
-    
-    # qb
-    # multiply how many TDs thrown per game by team and how many passing TDs allowed per game by opponent
-    this_week['pass_td'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'pass_td_per_gm') * 
-                                     get_values_list(prior_weeks, this_week['oppn'], 'pass_td_alw_per_gm'))
-
-    # multiply how many yards per pass by team and how many yards per pass allowed by opponent
-    this_week['pass_yrd_per_pass'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'pass_yrd_per_pass') * 
-                                               get_values_list(prior_weeks, this_week['oppn'], 'pass_yrd_alw_per_pass_alw'))
-
-    # multiply how many passing 1st downs per game by team and how many passing 1st downs per game allowed by opponent
-    this_week['pass_1st_dwn'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'pass_1st_down_per_gm') * 
-                                          get_values_list(prior_weeks, this_week['oppn'], 'pass_1st_down_alw_per_gm'))
-
-    # multiply passing yards per game by team and passing yards per game allowed by opponent
-    this_week['pass_yrd'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'pass_yrd_per_gm') * 
-                                      get_values_list(prior_weeks, this_week['oppn'], 'pass_yrd_alw_per_gm'))
-
-    # rb
-    # multiply rushing TDs per game by team and rushing TDs allowed per game by opponent
-    this_week['rush_td'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rush_td_per_gm') * 
-                                     get_values_list(prior_weeks, this_week['oppn'], 'rush_td_alw_per_gm'))
-
-    # multiply how many yards per rush by team and how many yards per rush allowed by opponent
-    this_week['rush_yrd_per_rush'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rush_yrd_per_rush') * 
-                                               get_values_list(prior_weeks, this_week['oppn'], 'rush_yrd_alw_per_rush_alw'))
-
-    # multiply how many rushing 1st downs per game by team and how many rushing 1st downs per game allowed by opponent
-    this_week['rush_1st_down'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rush_1st_down_per_gm') * 
-                                           get_values_list(prior_weeks, this_week['oppn'], 'rush_1st_down_alw_per_gm'))
-
-    # multiply rushing yards per game by team and rushing yards per game allowed by opponent
-    this_week['rush_yrd'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rush_yrd_per_gm') * 
-                                      get_values_list(prior_weeks, this_week['oppn'], 'rush_yrd_alw_per_gm'))
-
-    # wr
-    # multiply passing TDs per game by team and passing TDs allowed per game by opponent
-    this_week['rec_td'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'pass_td_per_gm') * 
-                                    get_values_list(prior_weeks, this_week['oppn'], 'pass_td_alw_per_gm'))
-
-    # multiply receiving yards per game by team and receiving yards per game allowed by opponent
-    this_week['rec_yrd_per_gm'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rec_yrd_per_gm') * 
-                                            get_values_list(prior_weeks, this_week['oppn'], 'rec_yrd_alw_per_gm'))
-
-    # multiply receiving yards per target by team and receiving yards per target allowed by opponent
-    this_week['rec_yrd_per_tar'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rec_yrd_per_tar') * 
-                                             get_values_list(prior_weeks, this_week['oppn'], 'rec_yrd_alw_per_tar_alw'))
-
-    # multiply receptions per game by team and receptions per game allowed by opponent
-    this_week['rec_per_gm'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'rec_per_gm') * 
-                                        get_values_list(prior_weeks, this_week['oppn'], 'rec_alw_per_gm'))
-
-    # multiply how many receiving 1st downs per game by team and how many receiving 1st downs per game allowed by opponent
-    this_week['rec_1st_down'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'pass_1st_down_per_gm') * 
-                                          get_values_list(prior_weeks, this_week['oppn'], 'pass_1st_down_alw_per_gm'))
-
-    # def
-    # multiply def and st TDs per game by team and def and st TDs allowed per game by opponent
-    this_week['def_st_td'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'def_st_td_per_gm') * 
-                                       get_values_list(prior_weeks, this_week['oppn'], 'def_st_td_alw_per_gm'))
-
-    # multiply def sacks per game by team and sacks taken per game by opponent
-    this_week['def_sack'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'sacks_per_gm') * 
-                                      get_values_list(prior_weeks, this_week['oppn'], 'sacks_taken_per_gm'))
-
-    # multiply def interceptions per game by team and def interceptions allowed per game by opponent
-    this_week['def_int'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'int_per_gm') * 
-                                     get_values_list(prior_weeks, this_week['oppn'], 'int_alw_per_gm'))
-
-    # multiply def fumble recoveries per game by team and fumbles lost per game by opponent
-    this_week['def_fbml'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'fumble_per_gm') * 
-                                      get_values_list(prior_weeks, this_week['oppn'], 'fumble_lost_per_gm'))
-
-    # multiply passing/rushing/def/st TDs allowed per game by team and passing/rushing/def/st TDs per game by opponent
-    this_week['def_st_td_alw'] = pd.Series((get_values_list(prior_weeks, this_week['team_abv'], 'pass_td_alw_per_gm') +
-                                            get_values_list(prior_weeks, this_week['team_abv'], 'rush_td_alw_per_gm') + 
-                                            get_values_list(prior_weeks, this_week['team_abv'], 'def_st_td_alw_per_gm')) * 
-                                            (get_values_list(prior_weeks, this_week['oppn'], 'pass_td_per_gm') + 
-                                            get_values_list(prior_weeks, this_week['oppn'], 'rush_td_per_gm') + 
-                                            get_values_list(prior_weeks, this_week['oppn'], 'def_st_td_per_gm')))
-
-    # multiply passing/rushing/return yards allowed per game by team and passing/rushing/return yards per game by opponent
-    this_week['def_st_yrd_alw'] = pd.Series((get_values_list(prior_weeks, this_week['team_abv'], 'pass_yrd_alw_per_gm') +
-                                             get_values_list(prior_weeks, this_week['team_abv'], 'rush_yrd_alw_per_gm') + 
-                                             get_values_list(prior_weeks, this_week['team_abv'], 'return_yrds_alw_per_gm')) * 
-                                             (get_values_list(prior_weeks, this_week['oppn'], 'pass_yrd_per_gm') + 
-                                             get_values_list(prior_weeks, this_week['oppn'], 'rush_yrd_per_gm') + 
-                                             get_values_list(prior_weeks, this_week['oppn'], 'return_yrds_per_gm')))
-
-    # st
-    # multiply kick points per game by team and kick points allowed per game by opponent
-    this_week['kck_pts'] = pd.Series(get_values_list(prior_weeks, this_week['team_abv'], 'kck_pts_per_gm') * 
-                                     get_values_list(prior_weeks, this_week['oppn'], 'kck_pts_alw_per_gm'))
-
-    # misc
-    # calculate redzone differential
-    # (conversions divided attempts) minus the inverse (1 minus allowed conversions divided by allowed attempts)
-    this_week['rz_diff'] = pd.Series((get_values_list(prior_weeks, this_week['team_abv'], 'redzone_con') /
-                                     get_values_list(prior_weeks, this_week['team_abv'], 'redzone_att')) -
-                                     (1 - get_values_list(prior_weeks, this_week['oppn'], 'redzone_con_alw') /
-                                     get_values_list(prior_weeks, this_week['oppn'], 'redzone_att_alw')))
-
-    # calculate turnover differential
-    # (interceptions plus fumbles) minus opponent's (interceptions thrown plus fumbles lost)
-    this_week['to_diff'] = pd.Series((get_values_list(prior_weeks, this_week['team_abv'], 'def_ints') +
-                                     get_values_list(prior_weeks, this_week['team_abv'], 'fumble_rec')) -
-                                     (get_values_list(prior_weeks, this_week['oppn'], 'int_thrown') +
-                                     get_values_list(prior_weeks, this_week['oppn'], 'fumble_lost')))
-    
-    # rank all columns in ascending_false
-    for i in ascending_false:
-        this_week_rank[i] = this_week[i].rank(method='average', ascending = False)
+def update_table(num_weeks, page_current, page_size, sort_by, filter_query):
+    return snapshots.current.rankings_view(num_weeks).page(None, columns, page_current, page_size, sort_by,
+                                                           filter_query)
 
-    # rank all columns in ascending_false
-    for i in ascending_true:
-        this_week_rank[i] = this_week[i].rank(method='average', ascending = True)
-    
-    # add "@" to oppn column since all opponents are the home teams due to how the schedule is scraped from ESPN
-    this_week_rank_avg.loc[this_week_rank_avg['home'] == False, 'oppn'] = '@' + this_week_rank_avg['oppn'].astype(str)
-    this_week_rank_avg.loc[this_week_rank_avg['home'] == True, 'team_abv'] = '@' + this_week_rank_avg['team_abv'].astype(str)
-
-    # group by QB, RB, WR/TE, DEF, and ST using row means
-    this_week_rank_avg['QB'] = this_week_rank.iloc[:, [4, 5, 6, 7, 22, 23]].mean(axis=1)
-    this_week_rank_avg['RB'] = this_week_rank.iloc[:, [8, 9, 10, 11, 22, 23]].mean(axis=1)
-    this_week_rank_avg['WRTE'] = this_week_rank.iloc[:, [12, 13, 14, 15, 16, 22, 23]].mean(axis=1)
-    this_week_rank_avg['DEF'] = this_week_rank.iloc[:, [17, 18, 19, 20, 22, 23, 24, 25]].mean(axis=1)
-    this_week_rank_avg['KICK'] = this_week_rank.iloc[:, [21, 22, 23]].mean(axis=1)
-    
-    sorted_df = this_week_rank_avg[['week', 'team_abv', 'oppn', 'QB', 'RB', 'WRTE', 'DEF', 'KICK']].round({'QB': 1, 'RB': 1, 'WRTE': 1, 'DEF': 1, 'KICK': 1})
+@app.callback(
+    [Output('lineup_table', 'data'),
+     Output('lineup_table', 'page_count')],
+    [Input('week', 'value'),
+     Input('lineup_table', 'page_current'),
+     Input('lineup_table', 'page_size'),
+     Input('lineup_table', 'sort_by'),
+     Input('lineup_table', 'filter_query')
+    ])
+
+def update_table(week, page_current, page_size, sort_by, filter_query):
+    snapshot = snapshots.current
+    return snapshot.lineup_view.page((snapshot.rosters_year, week), lineup_columns, page_current, page_size, sort_by,
+                                     filter_query)
+
+@app.callback(
+    Output('h2h_table', 'data'),
+    [Input('h2h_owner', 'value')
+    ])
+
+def update_table(owner):
+    return snapshots.current.record_book.head_to_head(owner)
+
+@app.callback(
+    Output('standings_table', 'data'),
+    [Input('standings_year', 'value')
+    ])
+
+def update_table(year):
+    return snapshots.current.record_book.standings(year)
+
+@app.callback(
+    [Output('record_table', 'data'),
+     Output('record_table', 'columns')],
+    [Input('record_name', 'value')
+    ])
 
-    return sorted_df.to_dict(orient='records')
+def update_table(name):
+    # a cleared dropdown sends None
+    if not name:
+        return [], [{"name": i, "id": i} for i in score_columns]
+    book_columns = streak_columns if name.endswith('streak') else score_columns
+    return snapshots.current.record_book.records(name), [{"name": i, "id": i} for i in book_columns]
+
+# create list of every callback request in the input domain used to warm up the cache
+def callback_domain():
+    snapshot = snapshots.current
+    requests = [('win_loss_fig.figure', [('graph_option', 'value', i)]) for i in graph_options]
+    # the tables are warmed on their first page, unsorted and unfiltered
+    rankings_page = [('page_current', 0), ('page_size', 32), ('sort_by', []), ('filter_query', '')]
+    requests += [('..rankings_table.data...rankings_table.page_count..',
+                  [('input_range', 'value', i)] + [('rankings_table', p, v) for p, v in rankings_page])
+                 for i in range(1, snapshot.max_week + 1)]
+    roster_page = [('page_current', 0), ('page_size', 20), ('sort_by', []), ('filter_query', '')]
+    requests += [('..roster_table.data...roster_table.columns...roster_table.page_count..',
+                  [('week', 'value', i), ('owner_team', 'value', j),
+                   ('roster_columns', 'value', snapshot.roster_columns)] +
+                  [('roster_table', p, v) for p, v in roster_page])
+                 for i in snapshot.rosters_df['week'].unique().tolist()
+                 for j in snapshot.rosters_df['owner_team'].unique().tolist()]
+    lineup_page = [('page_current', 0), ('page_size', 10), ('sort_by', []), ('filter_query', '')]
+    requests += [('..lineup_table.data...lineup_table.page_count..',
+                  [('week', 'value', i)] + [('lineup_table', p, v) for p, v in lineup_page])
+                 for i in snapshot.rosters_df['week'].unique().tolist()]
+    requests += [('h2h_table.data', [('h2h_owner', 'value', i)]) for i in snapshot.record_book.owners]
+    requests += [('standings_table.data', [('standings_year', 'value', i)])
+                 for i in [all_seasons] + snapshot.record_book.years()]
+    requests += [('..record_table.data...record_table.columns..', [('record_name', 'value', i)]) for i in record_names]
+    return requests
+
+# time every callback function on its own
+metrics.wrap_callbacks(app)
+
+# precompute every callback response at boot when WARM_UP_CACHE=1
+if os.environ.get('WARM_UP_CACHE') == '1':
+    with metrics.phase('warm_up_cache'):
+        cache.warm_up(app, callback_domain())
+    snapshots.on_swap(lambda snapshot: cache.warm_up(app, callback_domain()))
 
 if __name__ == '__main__':
     app.run_server()
@@ -0,0 +1,69 @@
+# benchmark the prefix sum week_agg_store against the original agg_week filter + groupby
+#
+# run from the repo root:  python benchmarks/bench_agg_store.py
+
+# import needed packages
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from synthetic import make_tm_game_data
+from agg_store import week_agg_store
+
+# create function to check every window ending at every week against the legacy filter + groupby
+def check_exact(tm_game_data, store):
+    last_week = tm_game_data['week'].max()
+    for end_week in range(1, last_week + 1):
+        log = tm_game_data[tm_game_data['week'] <= end_week]
+        for num_weeks in range(1, end_week + 1):
+            expected = legacy.agg_week(log, num_weeks)
+            got = store.window(num_weeks, end_week)
+            pd.testing.assert_frame_equal(got, expected, check_dtype=True)
+
+# create function to check every window of real fractional fantasy points: actual_points (one decimal, some values
+# stored with a float residue) sums to the exact decimal, the groupby sum rounded to one decimal, and proj_points (full
+# precision) to the groupby sum
+def check_fractional(season=2020):
+    rosters_df = pd.read_csv(os.path.join(repo_dir, 'data', str(season), f'rosters_df_w_scoring_{season}.csv'))
+    tm_game_data = rosters_df[['week', 'player', 'actual_points', 'proj_points']].rename(columns={'player': 'team_abv'})
+    store = week_agg_store(tm_game_data)
+    assert store.scales['actual_points'] == 10 and store.scales['proj_points'] is None
+    residues = 0
+    for end_week in range(1, tm_game_data['week'].max() + 1):
+        log = tm_game_data[tm_game_data['week'] <= end_week]
+        for num_weeks in range(1, end_week + 1):
+            expected = legacy.agg_week(log, num_weeks)
+            got = store.window(num_weeks, end_week)
+            pd.testing.assert_frame_equal(got.drop(columns='actual_points'), expected.drop(columns='actual_points'))
+            assert (got['actual_points'] == expected['actual_points'].round(1)).all()
+            assert (got['actual_points'] == got['actual_points'].round(1)).all()
+            residues += int((expected['actual_points'] != expected['actual_points'].round(1)).sum())
+    return len(tm_game_data), residues
+
+# create function to time both paths on one league size
+def run(num_teams, num_weeks=17, window=4, repeat=5):
+    tm_game_data = make_tm_game_data(num_teams, num_weeks)
+
+    build_s = min(timeit.repeat(lambda: week_agg_store(tm_game_data), number=1, repeat=repeat))
+    store = week_agg_store(tm_game_data)
+    check_exact(tm_game_data, store)
+
+    legacy_s = min(timeit.repeat(lambda: legacy.agg_week(tm_game_data, window), number=20, repeat=repeat)) / 20
+    store_s = min(timeit.repeat(lambda: store.window(window), number=20, repeat=repeat)) / 20
+    print(f'{num_teams:>5} teams | agg_week {legacy_s * 1e3:7.2f} ms | store.window {store_s * 1e3:6.2f} ms | '
+          f'speedup {legacy_s / store_s:6.1f}x | build {build_s * 1e3:7.2f} ms | {store.nbytes() / 1e6:6.2f} MB')
+
+if __name__ == '__main__':
+    for n in [32, 512]:
+        run(n)
+    rows, residues = check_fractional()
+    print(f'{rows:,d} rows of real fantasy points: every window matches the groupby sum, with actual_points the exact '
+          f'decimal sum ({residues:,d} groupby sums carried a float residue)')
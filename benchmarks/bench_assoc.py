@@ -0,0 +1,66 @@
+# benchmark the categorical relationships: the notebook's run_cat_rel_func (chi_squared, cramers_v, theils_u per
+# pair) vs. assoc_util
+#
+# run from the repo root:  python benchmarks/bench_assoc.py
+
+# import needed packages
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '00-ingest_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+import explore_util
+from assoc_util import cat_associations
+from synthetic import make_league_data, scales
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to check the engine's results against the notebook's
+def check(reference, result):
+    pd.testing.assert_frame_equal(reference[0], result[0], rtol=1e-9, check_dtype=False)
+    pd.testing.assert_frame_equal(reference[1], result[1], rtol=1e-9)
+    pd.testing.assert_frame_equal(reference[2], result[2], rtol=1e-9)
+
+# create function to build a frame of many categorical columns with some nulls
+def wide_frame(num_rows, num_columns, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({f'cat_{i}': rng.choice([f'v{j}' for j in range(2 + i % 12)] + [None], num_rows)
+                         for i in range(num_columns)})
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', RuntimeWarning)
+    processes_list = sorted(set([1, os.cpu_count()]))
+    print(f"{'':<40} {'pairs':>6} {'notebook (s)':>13} {'assoc_util (s)':>15}")
+
+    frames = [(name, pd.read_pickle(os.path.join(repo_dir, 'data', f'{name}.pkl')))
+              for name in ['matchups_df_all', 'rosters_df_all']]
+    frames.append(('rosters_df x100', make_league_data(**scales['x100'])['rosters_df.csv']))
+    frames.append(('wide 20,000 x 15', wide_frame(20000, 15)))
+    for name, data in frames:
+        reference, reference_s = timed(lambda: legacy.run_cat_rel_func(data))
+        for processes in processes_list:
+            result, result_s = timed(lambda: cat_associations(data, processes=processes))
+            check(reference, result)
+            print(f"{f'{name} ({processes} proc)':<40} {len(result[0]):6d} {reference_s:13.2f} {result_s:15.3f}")
+
+    # the notebook stops at 15 columns, the engine does not
+    data = wide_frame(50000, 200)
+    for processes in processes_list:
+        result, result_s = timed(lambda: cat_associations(data, processes=processes))
+        print(f"{f'wide 50,000 x 200 ({processes} proc)':<40} {len(result[0]):6d} {'-':>13} {result_s:15.3f}")
+
+    explore_util.cat_relationships(frames[0][1], frames[0][0], tempfile.mkdtemp(prefix='ff_assoc_'))
+    print('every statistic matches the notebook')
@@ -0,0 +1,85 @@
+# benchmark the exploration charts: the original plot_hist / corr_matrix vs. chart_util
+#
+# run from the repo root:  python benchmarks/bench_charts.py
+
+# import needed packages
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from pypdf import PdfReader
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '00-ingest_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+import explore_util
+from chart_util import hist_bins
+from synthetic import make_league_data, scales
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to widen a frame to about num_columns numerical columns of perturbed copies
+def widen(data, num_columns, seed=0):
+    rng = np.random.default_rng(seed)
+    numeric = data.select_dtypes(include=['float64', 'int64'])
+    copies = {}
+    for i in range(num_columns):
+        col = numeric.columns[i % numeric.shape[1]]
+        noise = rng.normal(scale=numeric[col].std() or 1.0, size=len(numeric)) * 0.1
+        copies[f'{col}_{i}'] = np.where(rng.random(len(numeric)) < 0.05, np.nan, numeric[col] + noise)
+    return pd.DataFrame(copies)
+
+# create function to compare the outputs of both implementations of plot_hist / corr_matrix for one frame
+def compare(name, data, processes_list):
+    columns = list(data.select_dtypes(include=['float64', 'int64']).columns)
+    print(f'\n{name}: {len(data):,} rows x {len(columns)} numerical columns')
+    print(f"{'':<30} {'plot_hist (s)':>14} {'corr_matrix (s)':>16}")
+
+    legacy_dir = tempfile.mkdtemp(prefix='ff_charts_')
+    _, hist_s = timed(lambda: legacy.plot_hist(data, name, legacy_dir))
+    _, corr_s = timed(lambda: legacy.corr_matrix(data, name, legacy_dir))
+    print(f"{'original':<30} {hist_s:14.2f} {corr_s:16.2f}")
+
+    for processes in processes_list:
+        new_dir = tempfile.mkdtemp(prefix='ff_charts_')
+        _, hist_s = timed(lambda: explore_util.plot_hist(data, name, new_dir, processes=processes))
+        _, corr_s = timed(lambda: explore_util.corr_matrix(data, name, new_dir))
+        print(f"{f'chart_util ({processes} proc)':<30} {hist_s:14.2f} {corr_s:16.2f}")
+
+        # one page per column in the same order (the title is the last text of a page), and the same correlations
+        pdf = f'/{name}_histograms.pdf'
+        pages = [PdfReader(i + pdf).pages for i in [legacy_dir, new_dir]]
+        assert len(pages[0]) == len(pages[1]) == len(columns)
+        assert all(i.extract_text().endswith(str(j)) for i, j in zip(pages[1], columns))
+        csv = f'/{name}_correlation_analysis.csv'
+        pd.testing.assert_frame_equal(pd.read_csv(legacy_dir + csv, index_col=0), pd.read_csv(new_dir + csv, index_col=0),
+                                      atol=1e-12)
+
+    # every column's histogram counts equal np.histogram's, as drawn by plt.hist
+    values = np.column_stack([data[i].to_numpy(dtype=np.float64) for i in columns])
+    edges, counts = hist_bins(values, 50)
+    for j, col in enumerate(columns):
+        h, e = np.histogram(data[col].dropna(), bins=50)
+        assert (h == counts[j]).all() and (e == edges[j]).all(), col
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', FutureWarning)
+    processes_list = sorted(set([1, os.cpu_count()]))
+
+    for name in ['matchups_df_all', 'rosters_df_all']:
+        compare(name, pd.read_pickle(os.path.join(repo_dir, 'data', f'{name}.pkl')), processes_list)
+
+    tm_game_data = make_league_data(**scales['x100'])['tm_game_data.csv']
+    compare('tm_game_data_x100', tm_game_data, processes_list)
+    compare('wide_200', widen(tm_game_data, 200), processes_list + [4])
+    print('\npage counts, histogram counts, and correlations match the original')
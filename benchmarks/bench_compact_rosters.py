@@ -0,0 +1,60 @@
+# check the compact rosters frames: bytes per season before and after compaction, the app serving the same layout and
+# callback responses with and without it, and 01-calc_adv_stats.ipynb writing the same feature matrices with and
+# without it
+#
+# run from the repo root:  python benchmarks/bench_compact_rosters.py
+
+# import needed packages
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_feature_pipeline import run_notebook, write_data
+from bench_startup import bench_worker, make_app_dir
+from compact_rosters import rosters_memory_report
+from feature_pipeline import group_positions
+
+# create code run before app.py is imported to load the rosters with the csv dtypes
+expanded_setup = 'import compact_rosters\ncompact_rosters.compact_rosters = lambda df, schema=None: df\n'
+
+# create text of the notebook's rosters read and the same read without compaction
+compact_read = 'df = read_rosters("rosters_df_w_scoring.csv")'
+csv_read = 'df = pd.read_csv("rosters_df_w_scoring.csv")'
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', FutureWarning)
+    work_dir = tempfile.mkdtemp(prefix='ff_compact_')
+
+    for scoring in [True, False]:
+        print(f"rosters_df{'_w_scoring' if scoring else ''}_<season>.csv")
+        print(rosters_memory_report(os.path.join(repo_dir, 'data'), scoring=scoring).to_string(index=False) + '\n')
+
+    # every layout and callback response, with the figures and lineups built from the rosters as loaded
+    app_dir = make_app_dir(work_dir)
+    expanded = bench_worker(app_dir, rebuild=True, setup=expanded_setup)
+    compact = bench_worker(app_dir, rebuild=True)
+    assert compact['digests'] == expanded['digests'], 'compact rosters changed a layout or callback response'
+    print(f"app: {len(compact['digests'])} layout and callback responses identical with and without compact rosters "
+          f"(worker rss {expanded['memory']['Rss'] / 1e6:.1f} MB -> {compact['memory']['Rss'] / 1e6:.1f} MB)")
+
+    # the notebook as is reads the compact rosters, and again with pd.read_csv
+    notebook_dir = os.path.join(work_dir, 'notebook')
+    os.makedirs(notebook_dir)
+    write_data(notebook_dir, [2018, 2019, 2020], num_leagues=1)
+    run_notebook(notebook_dir)
+    names = [f'{i}_feature_matrix.csv' for i in group_positions]
+    for name in names:
+        shutil.move(os.path.join(notebook_dir, name), os.path.join(notebook_dir, 'compact_' + name))
+    run_notebook(notebook_dir, replace=[(compact_read, csv_read)])
+    for name in names:
+        assert filecmp.cmp(os.path.join(notebook_dir, name), os.path.join(notebook_dir, 'compact_' + name),
+                           shallow=False), f'compact rosters changed {name}'
+    print(f"notebook: {', '.join(names)} identical with and without compact rosters")
+    shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,167 @@
+# benchmark the transform stage: running every cell of 01-calc_adv_stats.ipynb top to bottom vs.
+# feature_pipeline.build_feature_matrices with an empty stage cache, with nothing changed, and with the latest week of
+# play-by-play and rosters changed, checking that both write byte for byte the same four feature matrices
+#
+# run from the repo root:  python benchmarks/bench_feature_pipeline.py
+
+# import needed packages
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '01-transform_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feature_pipeline import build_feature_matrices, def_ff_stats, def_stats, group_positions, kick_ff_stats, \
+                             kick_stats
+from pbp_cache import cache_seasons
+from synthetic import make_play_by_play, make_roster_scoring
+
+# create path of the notebook the pipeline replaces
+notebook_path = os.path.join(repo_dir, '01-transform_data', '01-calc_adv_stats.ipynb')
+
+# create function to add a DEF and a KR roster row for every team and week of the play-by-play
+def add_team_rows(df, play_by_play_df, num_leagues=1, seed=0):
+    rng = np.random.default_rng(seed)
+    teams = play_by_play_df[['year', 'posteam']].dropna().drop_duplicates().to_numpy()
+    weeks = np.arange(1, int(play_by_play_df['week'].max()) + 1)
+    frames = [df]
+    for position, name, columns in [('DEF', '{} D/ST', def_stats + def_ff_stats),
+                                    ('KR', 'Kicky {}', kick_stats + kick_ff_stats)]:
+        rows = np.tile(np.repeat(np.arange(len(teams)), len(weeks)), num_leagues)
+        team = teams[rows, 1]
+        team_df = pd.DataFrame({'year': teams[rows, 0].astype(np.int64),
+                                'week': np.tile(weeks, len(teams) * num_leagues),
+                                'player': [name.format(i) for i in team], 'position_name': position,
+                                'pro_team': ['Pro ' + i for i in team], 'pro_team_abv': team})
+        stats = rng.integers(0, 4, size=(len(team_df), len(columns))).astype(float)
+        frames.append(pd.concat([team_df, pd.DataFrame(stats, columns=columns)], axis=1))
+    return pd.concat(frames, ignore_index=True)
+
+# create function to write the play-by-play csvs of three synthetic seasons and a roster csv with every position
+def write_data(work_dir, years, num_leagues):
+    '''
+    Function to write play_by_play_<year>.csv and rosters_df_w_scoring.csv to work_dir, with one roster week past the
+    last week of plays and the rows in season and week order like the scraped rosters
+
+    param work_dir: directory to write the csv files to
+    param years: list of season years
+    param num_leagues: number of synthetic leagues rostering every player
+
+    returns: dictionary of each season's play-by-play dataframe, and the roster dataframe
+    '''
+
+    seasons = {i: make_play_by_play(i, num_columns=60) for i in years}
+    for year, play_by_play_df in seasons.items():
+        play_by_play_df.to_csv(os.path.join(work_dir, f'play_by_play_{year}.csv'), index=False)
+    play_by_play_df = pd.concat([j.assign(year=i) for i, j in seasons.items()], ignore_index=True)
+    df = add_team_rows(make_roster_scoring(play_by_play_df, num_leagues), play_by_play_df, num_leagues)
+    last_week = df.loc[(df['year'] == years[-1]) & (df['week'] == df['week'].max())]
+    df = pd.concat([df, last_week.assign(week=last_week['week'] + 1)], ignore_index=True)
+    df = df.sort_values(['year', 'week'], kind='mergesort', ignore_index=True)
+    df.to_csv(os.path.join(work_dir, 'rosters_df_w_scoring.csv'), index=False)
+    return seasons, df
+
+# create function to run the notebook's cells up to the last feature matrix it saves
+def run_notebook(work_dir, replace=()):
+    '''
+    Function to run the code cells of 01-calc_adv_stats.ipynb in work_dir
+
+    param work_dir: directory holding the notebook's input files, where it writes the feature matrices
+    param replace: list of (old, new) text replaced in every cell before it runs
+    '''
+
+    with open(notebook_path, encoding='utf-8') as f:
+        cells = [''.join(i['source']) for i in json.load(f)['cells'] if i['cell_type'] == 'code']
+    last = [n for n, i in enumerate(cells) if 'kr_feature_matrix.csv' in i][0]
+    for old, new in replace:
+        cells = [i.replace(old, new) for i in cells]
+
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            namespace = {}
+            for cell in cells[:last + 1]:
+                exec(cell, namespace)
+    finally:
+        os.chdir(cwd)
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to check the pipeline wrote the notebook's feature matrices
+def same_matrices(work_dir, out_dir):
+    for group in group_positions:
+        name = f'{group}_feature_matrix.csv'
+        assert filecmp.cmp(os.path.join(work_dir, name), os.path.join(out_dir, name), shallow=False), \
+               f'{name} differs from the notebook'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--leagues', type=int, default=10, help='synthetic leagues rostering every player')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes of the pipeline')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', FutureWarning)
+
+    years = [2018, 2019, 2020]
+    work_dir = tempfile.mkdtemp(prefix='ff_features_')
+    seasons, df = write_data(work_dir, years, args.leagues)
+    play_by_play_df = pd.concat(seasons.values(), ignore_index=True)
+
+    # both read the same up to date play-by-play cache, so neither time includes building it
+    pbp_cache_dir = os.path.join(work_dir, 'pbp_cache')
+    feature_cache_dir = os.path.join(work_dir, 'feature_cache')
+    out_dir = os.path.join(work_dir, 'pipeline')
+    cache_seasons(years, work_dir, pbp_cache_dir)
+
+    def pipeline():
+        return build_feature_matrices(years, work_dir, pbp_cache_dir, feature_cache_dir, out_dir, args.processes)
+
+    print(f'{len(df):,d} roster rows ({args.leagues} leagues), {len(play_by_play_df):,d} plays of '
+          f'{len(years)} seasons\n')
+    print(f"{'run':<40} {'notebook s':>11} {'pipeline s':>11} {'speedup':>8}")
+    _, notebook_s = timed(lambda: run_notebook(work_dir))
+    _, cold_s = timed(pipeline)
+    same_matrices(work_dir, out_dir)
+    print(f"{'full build (empty stage cache)':<40} {notebook_s:11.2f} {cold_s:11.2f} {notebook_s / cold_s:7.1f}x")
+
+    timings, warm_s = timed(pipeline)
+    same_matrices(work_dir, out_dir)
+    assert timings.loc[timings['stage'] == 'derive', 'computed'].sum() == 0
+    print(f"{'nothing changed':<40} {notebook_s:11.2f} {warm_s:11.2f} {notebook_s / warm_s:7.1f}x")
+
+    # change the plays and the roster points of the latest week
+    latest = seasons[years[-1]]
+    rows = latest['week'] == latest['week'].max()
+    latest.loc[rows, 'yards_gained'] += 1
+    latest.to_csv(os.path.join(work_dir, f'play_by_play_{years[-1]}.csv'), index=False)
+    rows = (df['year'] == years[-1]) & (df['week'] >= latest['week'].max())
+    df.loc[rows, 'actual_points'] += 0.5
+    df.to_csv(os.path.join(work_dir, 'rosters_df_w_scoring.csv'), index=False)
+    cache_seasons(years, work_dir, pbp_cache_dir)
+
+    _, notebook_s = timed(lambda: run_notebook(work_dir))
+    timings, changed_s = timed(pipeline)
+    same_matrices(work_dir, out_dir)
+    print(f"{'latest week changed':<40} {notebook_s:11.2f} {changed_s:11.2f} {notebook_s / changed_s:7.1f}x")
+
+    print('\nstages of the latest week changed run (aggregation, merge, and derive seconds summed over the groups):')
+    print(timings.to_string(index=False, float_format=lambda i: f'{i:.3f}'))
+    shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,71 @@
+# benchmark the League Overview figures: building with plotly per request vs. loading the pre-rendered payloads
+#
+# run from the repo root:  python benchmarks/bench_figures.py
+
+# import needed packages
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import write_app_data
+
+# create function to time the best of several runs of a function
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# create function to time a fresh python process running some code from the app directory
+def bench_process(app_dir, code, repeat=3):
+    env = dict(os.environ, PYTHONPATH=repo_dir, PYTHONWARNINGS='ignore')
+    code = 'import time; t = time.perf_counter(); ' + code + '; print(time.perf_counter() - t)'
+    runs = [float(subprocess.run([sys.executable, '-c', code], cwd=app_dir, env=env, check=True,
+                                 capture_output=True, text=True).stdout.split()[-1]) for _ in range(repeat)]
+    return min(runs)
+
+if __name__ == '__main__':
+    import pandas as pd
+    from plotly.utils import PlotlyJSONEncoder
+
+    import figures
+
+    app_dir = write_app_data(os.path.join(tempfile.mkdtemp(prefix='ff_figures_'), 'app'))
+    os.makedirs(os.path.join(app_dir, 'data'))
+    os.chdir(app_dir)
+
+    win_loss_df = pd.read_csv('win_loss_df.csv').sort_values(['wins', 'points_for'], ascending = False)
+    matchups_df = pd.read_csv('matchups_df.csv')
+
+    # build time: every figure with plotly vs. reading the saved payloads
+    figures.build_figures(win_loss_df, matchups_df)
+    figure_dir = os.path.join(app_dir, 'figures')
+    figures.load_figures(win_loss_df, matchups_df, version='bench', figure_dir=figure_dir)
+    print(f"{'figure':<28} {'build ms':>9} {'full bytes':>11} {'lean bytes':>11}")
+    builders = {i: (lambda i=i: figures.win_loss_figure(win_loss_df, i)) for i in figures.graph_options}
+    builders['weekly_points'] = lambda: figures.weekly_points_figure(matchups_df)
+    for name, build in builders.items():
+        fig = build()
+        full = len(json.dumps(fig.to_plotly_json(), cls=PlotlyJSONEncoder))
+        lean = len(json.dumps(figures.lean_figure(fig), separators=(',', ':')))
+        print(f'{name:<28} {best_of(build) * 1e3:9.2f} {full:11d} {lean:11d}')
+
+    load_s = best_of(lambda: figures.load_figures(win_loss_df, matchups_df, version='bench', figure_dir=figure_dir))
+    print(f'load every saved payload: {load_s * 1e3:.2f} ms')
+
+    # import time: plotly.express alone, then the whole app (figures already saved for this data version)
+    print(f"import plotly.express:        {bench_process(app_dir, 'import plotly.express') * 1e3:7.1f} ms")
+    subprocess.run([sys.executable, os.path.join(repo_dir, 'figures.py'), 'build'], cwd=app_dir, check=True,
+                   stdout=subprocess.DEVNULL, env=dict(os.environ, PYTHONPATH=repo_dir, PYTHONWARNINGS='ignore'))
+    print(f"import app (saved figures):   {bench_process(app_dir, 'import app') * 1e3:7.1f} ms")
+    print(f"import app (plotly express loaded too): "
+          f"{bench_process(app_dir, 'import plotly.express, app') * 1e3:7.1f} ms")
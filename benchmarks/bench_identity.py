@@ -0,0 +1,137 @@
+# benchmark the roster to play-by-play joins of 01-calc_adv_stats.ipynb: the notebook's row by row short names, one
+# full-frame scan per override, and one merge per stat table vs. player_identity.player_index
+#
+# run from the repo root:  python benchmarks/bench_identity.py
+
+# import needed packages
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '01-transform_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from player_identity import player_index, player_overrides
+from synthetic import make_play_by_play, make_roster_scoring
+
+# create list of the rushing and receiving columns the notebook adds to the RB/WR/TE dataframe
+rbwrte_rush_columns = ['rush_attempts_team', 'rush_share', 'yrd_per_rush']
+rbwrte_rec_columns = ['target_team', 'target_share', 'yrd_per_catch', 'yards_after_catch', 'air_yards_ind',
+                      'compl_rec_air_yrds', 'racr', 'adot', 'wopr']
+
+# create list of the passing columns checked for the QB dataframe
+qb_pass_columns = ['air_yards', 'complete_pass', 'incomplete_pass', 'interception', 'compl_rate']
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to build the notebook's weekly rushing, receiving, and passing tables from the play-by-play
+def stat_tables(play_by_play_df):
+    rb_df = play_by_play_df.loc[play_by_play_df['rush_attempt'] == 1, ['rusher_player_id', 'rusher_player_name', 'posteam',
+                                                                       'year', 'week', 'rush_attempt', 'rushing_yards',
+                                                                       'yards_gained', 'touchdown']]
+    rb_df = rb_df.loc[rb_df['rusher_player_id'].notnull()]
+    rb_df = rb_df.groupby(['rusher_player_id', 'rusher_player_name', 'posteam', 'year', 'week'], as_index=False).sum()
+    rb_df = rb_df.rename({'rush_attempt': 'rush_attempts'}, axis=1)
+    team_rush = rb_df.groupby(['posteam', 'year', 'week'], as_index=False)[['rush_attempts']].sum()
+    rb_df = rb_df.merge(team_rush, on=['posteam', 'year', 'week'], how='left', suffixes=('_ind', '_team'))
+    rb_df['rush_share'] = rb_df['rush_attempts_ind'] / rb_df['rush_attempts_team']
+    rb_df['yrd_per_rush'] = rb_df['rushing_yards'] / rb_df['rush_attempts_ind']
+    rb_df['rusher_player_name'] = rb_df['rusher_player_name'].str.extract(r'(.*?)(?=$|\s)')
+
+    rec_df = play_by_play_df.loc[play_by_play_df['pass_attempt'] == 1, ['receiver_player_id', 'receiver_player_name',
+                                                                        'posteam', 'year', 'week', 'pass_attempt',
+                                                                        'complete_pass', 'yards_after_catch',
+                                                                        'yards_gained', 'touchdown', 'air_yards']]
+    rec_df = rec_df.loc[rec_df['receiver_player_id'].notnull()]
+    rec_df = rec_df.groupby(['receiver_player_id', 'receiver_player_name', 'posteam', 'year', 'week'], as_index=False).sum()
+    rec_df = rec_df.rename({'pass_attempt': 'target'}, axis=1)
+    team_targets = rec_df.groupby(['posteam', 'year', 'week'], as_index=False)[['target']].sum()
+    team_ay = rec_df.groupby(['posteam', 'year', 'week'], as_index=False)[['air_yards']].sum()
+    rec_df = rec_df.merge(team_ay, on=['posteam', 'year', 'week'], how='left', suffixes=('_ind', '_team'))\
+                   .merge(team_targets, on=['posteam', 'year', 'week'], how='left', suffixes=('_ind', '_team'))
+    rec_df['wopr'] = ((rec_df['target_ind'] / rec_df['target_team']) * 1.5) +\
+                     ((rec_df['air_yards_ind'] / rec_df['air_yards_team']) * 0.7)
+    rec_df['adot'] = rec_df['air_yards_ind'] / rec_df['target_ind']
+    rec_df['racr'] = rec_df['yards_gained'] / rec_df['air_yards_ind']
+    rec_df['target_share'] = rec_df['target_ind'] / rec_df['target_team']
+    rec_df['compl_rec_air_yrds'] = rec_df['yards_gained'] - rec_df['yards_after_catch']
+    rec_df['yrd_per_catch'] = rec_df['yards_gained'] / rec_df['complete_pass']
+    rec_df['receiver_player_name'] = rec_df['receiver_player_name'].str.extract(r'(.*?)(?=$|\s)')
+
+    qb_df = play_by_play_df.loc[(play_by_play_df['pass_attempt'] == 1) & play_by_play_df['passer_player_id'].notnull(),
+                                ['passer_player_id', 'passer_player_name', 'posteam', 'year', 'week'] + qb_pass_columns[:-1]]
+    qb_df = qb_df.groupby(['passer_player_id', 'passer_player_name', 'posteam', 'year', 'week'], as_index=False).sum()
+    qb_df['compl_rate'] = qb_df['complete_pass'] / (qb_df['incomplete_pass'] + qb_df['complete_pass'])
+    qb_df['passer_player_name'] = qb_df['passer_player_name'].str.extract(r'(.*?)(?=$|\s)')
+    return rb_df, rec_df, qb_df
+
+# create function to finish the RB/WR/TE feature matrix after the rushing and receiving columns are added
+def finish_rbwrte(rbwrte_df):
+    rbwrte_df['total_off_share'] = (rbwrte_df['receptions'] + rbwrte_df['rush_att']) /\
+                                   (rbwrte_df['target_team'] + rbwrte_df['rush_attempts_team'])
+    null_to_zero = rbwrte_rush_columns + rbwrte_rec_columns + ['total_off_share']
+    rbwrte_df[null_to_zero] = rbwrte_df[null_to_zero].fillna(0)
+    rbwrte_df = rbwrte_df.replace([-np.inf, np.inf], 0)
+    columns = ['year', 'week', 'player', 'short_name', 'position_name', 'pro_team', 'pro_team_abv', 'rush_att',
+               'receptions'] + null_to_zero
+    rbwrte_df = rbwrte_df[columns].reset_index(drop=True)
+    rbwrte_df['year'] = rbwrte_df['year'].astype('category')
+    rbwrte_df['week'] = rbwrte_df['week'].astype('category')
+    return rbwrte_df
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', FutureWarning)
+    years = [2018, 2019, 2020]
+    play_by_play_df = pd.concat([make_play_by_play(i, num_columns=60).assign(year=i) for i in years], ignore_index=True)
+    rb_df, rec_df, qb_pbp_df = stat_tables(play_by_play_df)
+
+    # roster every override player for every week of the season it covers
+    extra_players = [(player, team, year, 'RB') for player, teams, year, _, _ in player_overrides for team in teams]
+    players = player_index()
+
+    print(f"{'':<30} {'rows':>9} {'step':<26} {'notebook (s)':>13} {'player_index (s)':>17}")
+    for num_leagues in [1, 15]:
+        df = make_roster_scoring(play_by_play_df, num_leagues, extra_players)
+        df['year'] = df['year'].astype('category')
+        df['week'] = df['week'].astype('category')
+        name = f'{num_leagues} league(s), {len(years)} seasons'
+
+        old_df, old_s = timed(lambda: legacy.resolve_short_names(df))
+        new_df, new_s = timed(lambda: players.resolve(df))
+        pd.testing.assert_frame_equal(old_df, new_df)
+        print(f"{name:<30} {len(df):9,d} {'short names + overrides':<26} {old_s:13.3f} {new_s:17.3f}")
+
+        # RB/WR/TE stats: two merges vs. one join, checked through the rest of the notebook cell
+        rbwrte_df = new_df.loc[new_df['position_name'].isin(['RB', 'WR', 'TE'])]
+        rbwrte_tables = [(rb_df, ['year', 'week', 'rusher_player_name', 'posteam'], rbwrte_rush_columns),
+                         (rec_df, ['year', 'week', 'receiver_player_name', 'posteam'], rbwrte_rec_columns)]
+        old_rbwrte, old_s = timed(lambda: legacy.merge_rbwrte(rbwrte_df, rb_df, rec_df))
+        new_rbwrte, new_s = timed(lambda: players.join(rbwrte_df, rbwrte_tables))
+        pd.testing.assert_frame_equal(finish_rbwrte(old_rbwrte), finish_rbwrte(new_rbwrte))
+        print(f"{'':<30} {len(rbwrte_df):9,d} {'RB/WR/TE stat joins':<26} {old_s:13.3f} {new_s:17.3f}")
+
+        # QB passing and rushing columns: two merges vs. one join
+        qb_df = new_df.loc[new_df['position_name'] == 'QB']
+        tables = [(qb_pbp_df, ['year', 'week', 'passer_player_name', 'posteam'], qb_pass_columns),
+                  (rb_df, ['year', 'week', 'rusher_player_name', 'posteam'], ['yrd_per_rush', 'rush_share'])]
+        old_qb, old_s = timed(lambda: legacy.merge_qb(qb_df, qb_pbp_df, rb_df))
+        new_qb, new_s = timed(lambda: players.join(qb_df, tables))
+        columns = [j for i in tables for j in i[2]]
+        pd.testing.assert_frame_equal(old_qb[columns], new_qb[columns])
+        print(f"{'':<30} {len(qb_df):9,d} {'QB stat joins':<26} {old_s:13.3f} {new_s:17.3f}")
+
+        unmatched, unmatched_s = timed(lambda: players.unmatched_players(rbwrte_df, rbwrte_tables))
+        print(f"{'':<30} {'':>9} {'unmatched report':<26} {'-':>13} {unmatched_s:17.3f}")
+
+    print(f'\nshort names, RB/WR/TE feature matrix, and QB joins match the notebook; {len(unmatched)} player seasons '
+          f'never matched the play-by-play (the override players, who have no plays in the synthetic data)')
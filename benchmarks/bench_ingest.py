@@ -0,0 +1,112 @@
+# benchmark the espn scraper against the local mock server: sequential vs. concurrent downloads, resume, and retries
+#
+# run from the repo root:  python benchmarks/bench_ingest.py
+
+# import needed packages
+import json
+import os
+import sys
+import tempfile
+import time
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '00-ingest_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from espn_ingest import scrape_weeks, week_file
+from espn_mock_server import mock_espn_server
+from synthetic import make_espn_week
+
+# create function to write the synthetic espn responses the mock server replays
+def write_source_weeks(source_dir, seasons, num_weeks, latest_week=None):
+    for season in seasons:
+        os.makedirs(os.path.join(source_dir, str(season)), exist_ok=True)
+        for week in range(1, num_weeks + 1):
+            payload = make_espn_week(season, week, num_weeks=num_weeks, latest_week=latest_week, seed=0)
+            with open(week_file(source_dir, season, week), 'w', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+
+# create function to check every downloaded week matches the source
+def check_weeks(source_dir, target_dir, pairs):
+    last_week = {}
+    for season, week in pairs:
+        last_week[season] = max(week, last_week.get(season, 0))
+    for season, week in pairs:
+        with open(week_file(source_dir, season, week), encoding='utf-8') as f, \
+             open(week_file(target_dir, season, week), encoding='utf-8') as g:
+            source, target = json.load(f), json.load(g)
+
+        # a skipped finished week keeps the schedule it was downloaded with, the rosters never change
+        if week == last_week[season]:
+            assert source == target, (season, week)
+        else:
+            assert source['teams'] == target['teams'], (season, week)
+
+# create function to total the bytes of the downloaded week files
+def disk_bytes(target_dir, pairs):
+    return sum(os.path.getsize(week_file(target_dir, season, week)) for season, week in pairs)
+
+# create function to print a summary line for one scrape
+def report(label, summary, server):
+    counts = ', '.join(f'{k}: {v}' for k, v in sorted(server.counts.items()))
+    print(f"{label:<38} {summary['seconds']:7.2f}s  written {len(summary['written']):3d}  unchanged "
+          f"{len(summary['unchanged']):3d}  skipped {len(summary['skipped']):3d}  failed {len(summary['failed']):3d}  "
+          f"requests [{counts}]")
+    server.counts.clear()
+
+if __name__ == '__main__':
+    work_dir = tempfile.mkdtemp(prefix='ff_ingest_')
+    source_dir = os.path.join(work_dir, 'source')
+    seasons, num_weeks, league_id, latency = [2019, 2020, 2021], 17, 169073, 0.05
+    pairs = [(season, week) for season in seasons for week in range(1, num_weeks + 1)]
+    write_source_weeks(source_dir, seasons[:-1], num_weeks)
+    write_source_weeks(source_dir, seasons[-1:], num_weeks, latest_week=10)
+    print(f'{len(pairs)} weeks of {len(seasons)} seasons, {latency * 1e3:.0f} ms server latency')
+
+    with mock_espn_server(source_dir, latency=latency) as server:
+
+        # original notebook loop: one week at a time, a new connection per request, indented json
+        target = os.path.join(work_dir, 'legacy')
+        start = time.perf_counter()
+        for season in seasons:
+            legacy.scrape_espn_data(server.url, league_id, season, num_weeks, 'swid', 'espn_s2', target)
+        print(f"{'legacy loop':<38} {time.perf_counter() - start:7.2f}s  {disk_bytes(target, pairs) / 1e6:.1f} MB on disk")
+        server.counts.clear()
+
+        for max_workers in [1, 8, 16]:
+            target = os.path.join(work_dir, f'workers_{max_workers}')
+            summary = scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url, max_workers=max_workers)
+            report(f'cold, max_workers={max_workers}', summary, server)
+        check_weeks(source_dir, target, pairs)
+        print(f'{"":<38} {disk_bytes(target, pairs) / 1e6:.1f} MB on disk')
+
+        # finished weeks are skipped and the weeks of the season in progress are revalidated with conditional requests
+        report('resume, nothing changed', scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url), server)
+
+        # once espn scores another week only the weeks of the season in progress are downloaded and rewritten
+        write_source_weeks(source_dir, seasons[-1:], num_weeks, latest_week=11)
+        report('resume, one more week scored', scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url),
+               server)
+        check_weeks(source_dir, target, pairs)
+
+        # when only the newest week changes, the weeks it shows espn finished scoring are marked final even though
+        # they answer 304, and are skipped from then on
+        season, week = seasons[-1], 12
+        with open(week_file(source_dir, season, week), 'w', encoding='utf-8') as f:
+            json.dump(make_espn_week(season, week, num_weeks=num_weeks, latest_week=week, seed=0), f,
+                      separators=(',', ':'))
+        report('resume, newest week scored only', scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url),
+               server)
+        summary = scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url)
+        assert (season, week - 1) in summary['skipped'], 'a final week answering 304 was not marked final'
+        report('resume, nothing changed', summary, server)
+
+        report('force', scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url, force=True), server)
+
+    # a flaky server: every failed request is retried with backoff until it succeeds
+    with mock_espn_server(source_dir, latency=latency, fail_rate=0.2) as server:
+        target = os.path.join(work_dir, 'flaky')
+        summary = scrape_weeks(pairs, league_id, data_dir=target, base_url=server.url, max_workers=8, backoff_factor=0.05)
+        report('cold, 20% 503s, max_workers=8', summary, server)
+        check_weeks(source_dir, target, pairs)
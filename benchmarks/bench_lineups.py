@@ -0,0 +1,116 @@
+# benchmark the optimal lineup solver: one dataframe filter and greedy fill per team week vs. lineups.solve_lineups
+# over every team week at once, checked against an exact assignment solver
+#
+# run from the repo root:  python benchmarks/bench_lineups.py
+
+# import needed packages
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lineups import load_lineups, lineup_rules, positions, reserve_slots, slot_positions, solve_lineups
+from roster_index import roster_index
+from synthetic import make_rosters_df
+
+# create function to solve each team week with its own dataframe filter, the way a per team loop would
+def loop_lineups(rosters_df, num_team_weeks=None):
+    keys = rosters_df[['year', 'week', 'owner_team']].drop_duplicates().itertuples(index=False)
+    rows = []
+    for n, (year, week, team) in enumerate(keys):
+        if num_team_weeks is not None and n == num_team_weeks:
+            break
+        df = rosters_df.loc[(rosters_df['year'] == year) & (rosters_df['week'] == week) &
+                            (rosters_df['owner_team'] == team)]
+        season = rosters_df.loc[(rosters_df['year'] == year) & (rosters_df['owner_team'] == team)]
+        starters = season.loc[~season['slot_id'].isin(reserve_slots)]
+        slots = starters.groupby(['week', 'slot_id']).size().groupby('slot_id').max()
+        left = df.assign(points=df['actual_points'].fillna(0))
+        left['position_name'] = [i if i in slot_positions.get(j, [i]) else slot_positions[j][0]
+                                 for i, j in zip(left['position_name'], left['slot_id'])]
+        optimal = 0.0
+        for slot in sorted(slots.index, key=lambda i: len(slot_positions[i])):
+            best = left.loc[left['position_name'].isin(slot_positions[slot])].nlargest(slots[slot], 'points')
+            optimal += best['points'].sum()
+            left = left.drop(best.index)
+        rows.append((year, week, team, round(optimal, 1)))
+    return pd.DataFrame(rows, columns=['year', 'week', 'owner_team', 'optimal_points'])
+
+# create function to solve team weeks exactly as an assignment of players to slots
+def exact_lineups(rosters_df, team_weeks):
+    from scipy.optimize import linear_sum_assignment
+
+    team_week, _, position, dedicated, flex = lineup_rules(rosters_df)
+    points = np.nan_to_num(rosters_df['actual_points'].to_numpy(dtype=np.float64))
+    optimal = []
+    for i in team_weeks:
+        rows = np.flatnonzero(team_week == i)
+        slots = [[j] for j in range(len(positions)) for _ in range(dedicated[i, j])]
+        slots += [list(eligible) for eligible, counts in flex for _ in range(counts[i])]
+        value = np.array([[points[r] if position[r] in slot else -1e6 for slot in slots] for r in rows])
+        players, chosen_slots = linear_sum_assignment(value, maximize=True)
+        chosen = value[players, chosen_slots]
+        optimal.append(round(chosen[chosen > -1e6].sum(), 1))
+    return np.array(optimal)
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--leagues', type=int, nargs='*', default=[100], help='synthetic leagues (4 seasons)')
+    parser.add_argument('--solver-leagues', type=int, nargs='*', default=[1000],
+                        help='synthetic leagues (4 seasons) only timed with the solver')
+    parser.add_argument('--loop-team-weeks', type=int, default=100, help='team weeks timed with the per team loop')
+    parser.add_argument('--exact-team-weeks', type=int, default=300, help='team weeks checked against the exact solver')
+    args = parser.parse_args()
+
+    history = roster_index.from_data_dir(os.path.join(repo_dir, 'data')).to_frame()
+    cases = [('data/ (every season)', history)]
+    cases += [(f'{i:,d} synthetic leagues x 4 seasons',
+               make_rosters_df(num_leagues=i, num_seasons=4, first_season=2018)) for i in args.leagues]
+
+    print(f"{'rosters':<34} {'team weeks':>11} {'loop s':>9} {'solver s':>9} {'team weeks/s':>13} {'speedup':>8}")
+    for label, rosters_df in cases:
+        lineups, solve_s = timed(lambda: solve_lineups(rosters_df))
+        num_loop = min(args.loop_team_weeks, len(lineups))
+        loop, loop_s = timed(lambda: loop_lineups(rosters_df, num_loop))
+        loop_s = loop_s / num_loop * len(lineups)
+
+        # the per team loop and the exact assignment agree with the solver
+        merged = loop.merge(lineups, on=['year', 'week', 'owner_team'], suffixes=('_loop', ''))
+        assert np.allclose(merged['optimal_points_loop'], merged['optimal_points']), 'loop and solver differ'
+        sample = np.random.default_rng(0).choice(len(lineups), min(args.exact_team_weeks, len(lineups)), replace=False)
+        assert np.allclose(exact_lineups(rosters_df, sample), lineups['optimal_points'].to_numpy()[sample]), \
+               'solver is not optimal'
+        assert (lineups['bench_points'] >= 0).all()
+
+        print(f'{label:<34} {len(lineups):11,d} {loop_s:9.2f} {solve_s:9.3f} {len(lineups) / solve_s:13,.0f} '
+              f'{loop_s / solve_s:7.0f}x')
+
+    # the per team loop scans the whole frame for every team week, so the largest cases only time the solver
+    for num_leagues in args.solver_leagues:
+        rosters_df = make_rosters_df(num_leagues=num_leagues, num_seasons=4, first_season=2018)
+        lineups, solve_s = timed(lambda: solve_lineups(rosters_df))
+        assert (lineups['bench_points'] >= 0).all()
+        label = f'{num_leagues:,d} synthetic leagues x 4 seasons'
+        print(f"{label:<34} {len(lineups):11,d} {'-':>9} {solve_s:9.3f} {len(lineups) / solve_s:13,.0f} {'-':>8}")
+        del rosters_df, lineups
+
+    lineup_dir = tempfile.mkdtemp(prefix='ff_lineups_')
+    _, cold_s = timed(lambda: load_lineups(history, lineup_dir))
+    _, warm_s = timed(lambda: load_lineups(history, lineup_dir))
+    print(f'load_lineups of data/: solve and save {cold_s:.3f} s, saved copy {warm_s:.3f} s; the loop times are '
+          f'extrapolated from {args.loop_team_weeks} team weeks and {args.exact_team_weeks} team weeks per case match '
+          f'an exact assignment solver')
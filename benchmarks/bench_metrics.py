@@ -0,0 +1,98 @@
+# benchmark the overhead of the /metrics instrumentation and the PROFILE_SLOW_MS sampling profiler on callback requests
+#
+# run from the repo root:  python benchmarks/bench_metrics.py
+#
+# each mode imports app.py in its own process (the profiler is switched on by an environment variable at import)
+
+# import needed packages
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, bench_dir)
+
+from synthetic import write_app_data
+
+# create dictionary of each mode and the label it is printed with
+modes = {'off': 'no instrumentation (hooks removed)',
+         'metrics': 'metrics (default)',
+         'profiler': 'metrics + PROFILE_SLOW_MS=1000'}
+
+# create function to take the median of many timed calls in microseconds
+def median_us(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+# create function run inside the process of one mode
+def run_mode(mode, repeat):
+    import app
+
+    if mode == 'off':
+        for hook in app.metrics.hooks:
+            for funcs in list(app.server.before_request_funcs.values()) + list(app.server.after_request_funcs.values()):
+                if hook in funcs:
+                    funcs.remove(hook)
+        for callback in app.app.callback_map.values():
+            callback['callback'] = getattr(callback['callback'], '__wrapped__', callback['callback'])
+
+    client = app.server.test_client()
+    team = app.snapshots.current.rosters_df['owner_team'].iloc[0]
+    body = {'output': '..roster_table.data...roster_table.columns...roster_table.page_count..',
+            'outputs': [{'id': 'roster_table', 'property': i} for i in ['data', 'columns', 'page_count']],
+            'inputs': [{'id': 'week', 'property': 'value', 'value': 3},
+                       {'id': 'owner_team', 'property': 'value', 'value': team},
+                       {'id': 'roster_columns', 'property': 'value', 'value': app.snapshots.current.roster_columns},
+                       {'id': 'roster_table', 'property': 'page_current', 'value': 0},
+                       {'id': 'roster_table', 'property': 'page_size', 'value': 20},
+                       {'id': 'roster_table', 'property': 'sort_by', 'value': []},
+                       {'id': 'roster_table', 'property': 'filter_query', 'value': ''}],
+            'changedPropIds': ['week.value']}
+
+    def post():
+        assert client.post('/_dash-update-component', json=body).status_code == 200
+
+    def miss():
+        app.cache.invalidate()
+        post()
+
+    results = {'hit_us': median_us(post, repeat), 'miss_us': median_us(miss, repeat // 4)}
+    if mode != 'off':
+        results['scrape_us'] = median_us(lambda: client.get('/metrics'), 50)
+        results['observe_us'] = median_us(lambda: app.metrics.observe('dash_request_seconds', (('callback', 'x'),),
+                                                                      0.003), repeat)
+    print(json.dumps(results))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=2000, help='requests timed per mode')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.repeat)
+        sys.exit(0)
+
+    data_dir = write_app_data(tempfile.mkdtemp(prefix='ff_metrics_'))
+    print(f"{'mode':<36} {'cache hit us':>13} {'cache miss us':>14} {'/metrics us':>12} {'observe us':>11}")
+    for mode, label in modes.items():
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([repo_dir, bench_dir]), PYTHONWARNINGS='ignore')
+        env.pop('PROFILE_SLOW_MS', None)
+        if mode == 'profiler':
+            env['PROFILE_SLOW_MS'] = '1000'
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, '--repeat', str(args.repeat)],
+                             cwd=data_dir, env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(f"{label:<36} {result['hit_us']:13.1f} {result['miss_us']:14.1f} {result.get('scrape_us', 0):12.1f} "
+              f"{result.get('observe_us', 0):11.2f}")
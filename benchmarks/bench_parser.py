@@ -0,0 +1,83 @@
+# benchmark parsing the espn week json files: the notebook's create_rosters / create_matchups vs. espn_parser
+#
+# run from the repo root:  python benchmarks/bench_parser.py
+
+# import needed packages
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '00-ingest_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from espn_ingest import week_file
+from espn_parser import parse_season, parse_seasons
+from synthetic import make_espn_week
+
+# create function to load a season's week files the way data_ingest.load_data_from_disk does
+def load_weeks(data_dir, season, weeks):
+    matchups_list = []
+    for i in range(1, weeks + 1):
+        with open(week_file(data_dir, season, i), encoding='utf-8') as f:
+            matchups_list.append(json.load(f))
+    return matchups_list
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    data_dir = tempfile.mkdtemp(prefix='ff_parser_')
+    seasons, num_weeks = [2018, 2019, 2020, 2021], 17
+    for season in seasons:
+        os.makedirs(os.path.join(data_dir, str(season)))
+        for week in range(1, num_weeks + 1):
+            with open(week_file(data_dir, season, week), 'w', encoding='utf-8') as f:
+                json.dump(make_espn_week(season, week, num_weeks=num_weeks), f, separators=(',', ':'))
+
+    # notebook path without scoring: load every season, then create_weekly_rosters and create_weekly_matchups
+    def run_legacy():
+        frames = {}
+        for season in seasons:
+            matchups_list = load_weeks(data_dir, season, num_weeks)
+            rosters_df = legacy.create_rosters(matchups_list, season).create_weekly_rosters()
+            frames[season] = (rosters_df, legacy.create_matchups(season).create_weekly_matchups(matchups_list[-1]))
+        return frames
+
+    legacy_frames, legacy_s = timed(run_legacy)
+    entries = sum(len(i[0]) for i in legacy_frames.values())
+    print(f'{entries} roster entries in {len(seasons)} seasons x {num_weeks} weeks')
+    print(f"{'':<44} {'seconds':>8} {'entries/s':>11}")
+    print(f"{'notebook rosters + matchups (1 process)':<44} {legacy_s:8.2f} {entries / legacy_s:11,.0f}")
+    _, load_s = timed(lambda: [load_weeks(data_dir, season, num_weeks) for season in seasons])
+    print(f"{'json.load of every week file alone':<44} {load_s:8.2f} {entries / load_s:11,.0f}")
+
+    # create_weekly_rosters_w_scoring runs a .loc assignment per stat, so it is timed on a few weeks only
+    sample_weeks = 2
+    matchups_list = load_weeks(data_dir, seasons[0], sample_weeks)
+    sample_rosters = legacy.create_rosters(matchups_list, seasons[0])
+    rosters_df = sample_rosters.create_weekly_rosters()
+    legacy_scoring, legacy_scoring_s = timed(lambda: sample_rosters.create_weekly_rosters_w_scoring(rosters_df))
+    print(f"{f'notebook w_scoring only ({sample_weeks} weeks, 1 process)':<44} {legacy_scoring_s:8.2f} "
+          f"{len(rosters_df) / legacy_scoring_s:11,.0f}")
+
+    for processes in [1, len(seasons)]:
+        frames, parse_s = timed(lambda: parse_seasons(seasons, data_dir, processes=processes, scoring=False))
+        print(f"{f'espn_parser rosters + matchups ({processes} proc)':<44} {parse_s:8.2f} {entries / parse_s:11,.0f}")
+        frames, parse_s = timed(lambda: parse_seasons(seasons, data_dir, processes=processes))
+        print(f"{f'espn_parser + scoring ({processes} proc)':<44} {parse_s:8.2f} {entries / parse_s:11,.0f}")
+
+    # every dataframe matches the notebook's
+    for season in seasons:
+        pd.testing.assert_frame_equal(legacy_frames[season][0], frames[season]['rosters'])
+        pd.testing.assert_frame_equal(legacy_frames[season][1], frames[season]['matchups'])
+    pd.testing.assert_frame_equal(legacy_scoring, parse_season(seasons[0], data_dir, weeks=sample_weeks)['rosters_w_scoring'])
+    print('rosters, matchups, and rosters_w_scoring match the notebook')
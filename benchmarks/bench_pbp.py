@@ -0,0 +1,133 @@
+# benchmark loading the play-by-play seasons: the notebook's read_csv + DataFrame.append vs. the pbp_cache parquet cache
+#
+# run from the repo root:  python benchmarks/bench_pbp.py
+#
+# every step runs in its own process so its peak memory (max rss) is measured on its own
+
+# import needed packages
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '01-transform_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from feature_pipeline import defense_table, kicking_tables, passing_table
+from pbp_cache import cache_seasons, load_play_by_play, pbp_file
+from synthetic import make_play_by_play
+
+# create function to build the notebook's play-by-play features (rushing, receiving, drives, penalties, and scores,
+# plus the passing, defense, and kicking tables of feature_pipeline, which match the notebook byte for byte) to check
+# both loaders feed the feature builders the same plays
+def notebook_features(play_by_play_df):
+    rb_df = play_by_play_df.loc[play_by_play_df['rush_attempt'] == 1, ['rusher_player_id', 'rusher_player_name', 'posteam',
+                                                                       'year', 'week', 'rush_attempt', 'rushing_yards',
+                                                                       'yards_gained', 'touchdown']]
+    rb_df = rb_df.loc[rb_df['rusher_player_id'].notnull()]
+    rb_df = rb_df.groupby(['rusher_player_id', 'rusher_player_name', 'posteam', 'year', 'week'], as_index=False).sum()
+
+    rec_df = play_by_play_df.loc[play_by_play_df['pass_attempt'] == 1, ['receiver_player_id', 'receiver_player_name',
+                                                                        'posteam', 'year', 'week', 'pass_attempt',
+                                                                        'complete_pass', 'yards_after_catch',
+                                                                        'yards_gained', 'touchdown', 'air_yards']]
+    rec_df = rec_df.loc[rec_df['receiver_player_id'].notnull()]
+    rec_df = rec_df.groupby(['receiver_player_id', 'receiver_player_name', 'posteam', 'year', 'week'], as_index=False).sum()
+
+    drv_columns = ['posteam', 'defteam', 'year', 'week', 'drive']
+    tot_drv_agst = play_by_play_df[drv_columns].groupby(drv_columns[:-1], as_index=False).agg({'drive': 'nunique'})
+
+    def_pen = play_by_play_df.loc[play_by_play_df['penalty_team'] == play_by_play_df['defteam'],
+                                  ['defteam', 'penalty_team', 'year', 'week', 'penalty_yards']]
+    def_pen = def_pen.groupby(['defteam', 'penalty_team', 'year', 'week'], as_index=False).sum()
+
+    total_scores = play_by_play_df.loc[(play_by_play_df['touchdown'] == 1) | (play_by_play_df['field_goal_result'] == 'made'),
+                                       ['posteam', 'year', 'week', 'touchdown']]
+    total_scores = total_scores.loc[total_scores['posteam'].notnull()].groupby(['posteam', 'year', 'week'], as_index=False).sum()
+    kr_df, kr_scores, kr_scores_rz = kicking_tables(play_by_play_df)
+    return {'rb_df': rb_df, 'rec_df': rec_df, 'tot_drv_agst': tot_drv_agst, 'def_pen': def_pen, 'total_scores': total_scores,
+            'qb_df': passing_table(play_by_play_df), 'def_df': defense_table(play_by_play_df), 'kr_df': kr_df,
+            'kr_scores': kr_scores, 'kr_scores_rz': kr_scores_rz}
+
+# create function to run one step in this process and print its seconds and peak memory as json
+def run_step(step, years, data_dir, cache_dir):
+    start = time.perf_counter()
+    if step == 'setup':
+
+        # write the csv files, then check both loaders feed the feature builders the same plays
+        for year in years:
+            make_play_by_play(year).to_csv(pbp_file(data_dir, year))
+        cache_seasons(years[:2], data_dir, cache_dir)
+        old = notebook_features(legacy.load_play_by_play(years[:2], data_dir))
+        new = notebook_features(load_play_by_play(years[:2], cache_dir))
+        for name in old:
+            pd.testing.assert_frame_equal(old[name], new[name])
+        rows = 0
+    elif step == 'legacy':
+        rows = len(legacy.load_play_by_play(years, data_dir))
+    elif step == 'cache':
+        rows = sum(cache_seasons(years, data_dir, cache_dir, force=True).values())
+    elif step == 'load':
+        rows = len(load_play_by_play(years, cache_dir))
+    else:
+        # lazily: filter and aggregate season by season, only the weekly rushing lines are materialized
+        pbp = load_play_by_play(years, cache_dir, lazy=True)
+        rush = pbp.loc[pbp['rush_attempt'] == 1, ['rusher_player_id', 'posteam', 'year', 'week', 'rushing_yards']]
+        rows = len(rush.groupby(['rusher_player_id', 'posteam', 'year', 'week'])['rushing_yards'].sum().compute())
+    print(json.dumps({'seconds': time.perf_counter() - start, 'rows': rows,
+                      'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seasons', type=int, default=4, help='most seasons to load')
+    parser.add_argument('--step', help=argparse.SUPPRESS)
+    parser.add_argument('--years', type=int, nargs='*', help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--cache-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', FutureWarning)
+
+    if args.step:
+        run_step(args.step, args.years, args.data_dir, args.cache_dir)
+        sys.exit(0)
+
+    work_dir = tempfile.mkdtemp(prefix='ff_pbp_')
+    years = list(range(2018, 2018 + args.seasons))
+    cache_dir = os.path.join(work_dir, 'pbp_cache')
+
+    # linux carries max rss over into child processes, so this process stays small and the data is made in a child
+    def run(step, step_years):
+        out = subprocess.run([sys.executable, __file__, '--step', step, '--years'] + [str(i) for i in step_years]
+                             + ['--data-dir', work_dir, '--cache-dir', cache_dir],
+                             check=True, capture_output=True, text=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    run('setup', years)
+    csv_mb = os.path.getsize(pbp_file(work_dir, years[0])) / 1e6
+    print(f'{len(years)} synthetic seasons of play-by-play, {csv_mb:.0f} MB of csv per season')
+    print('rushing, receiving, passing, defense, kicking, drive, penalty, and scoring features match the notebook '
+          'loader\n')
+
+    print(f"{'seasons':>7}  {'step':<36} {'seconds':>8} {'peak MB':>8} {'rows':>9}")
+    labels = {'legacy': 'notebook read_csv + append', 'cache': 'pbp_cache build (chunked csv)',
+              'load': 'pbp_cache eager load (pandas)', 'lazy': 'pbp_cache lazy rushing lines (dask)'}
+    for num_seasons in sorted(set([1, len(years) // 2, len(years)])):
+        for step in ['legacy', 'cache', 'load', 'lazy']:
+            result = run(step, years[:num_seasons])
+            print(f"{num_seasons:7d}  {labels[step]:<36} {result['seconds']:8.2f} {result['max_rss_mb']:8.0f} "
+                  f"{result['rows']:9,d}")
+
+    # an unchanged season is not rebuilt
+    start = time.perf_counter()
+    written = cache_seasons(years, work_dir, cache_dir)
+    print(f'\nre-running cache_seasons with no csv changed: {len(written)} seasons rebuilt in '
+          f'{time.perf_counter() - start:.3f}s')
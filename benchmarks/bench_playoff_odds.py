@@ -0,0 +1,94 @@
+# benchmark the playoff odds simulator: a python loop over simulated seasons vs. the vectorized batches of
+# playoff_odds.simulate_odds, in this process and across a process pool
+#
+# run from the repo root:  python benchmarks/bench_playoff_odds.py
+
+# import needed packages
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from playoff_odds import fit_score_distributions, load_odds, remaining_schedule, simulate_odds, team_standings
+from synthetic import make_matchups_df
+
+# create function to simulate seasons one game at a time, the way a python loop would
+def loop_odds(matchups_df, num_sims, num_playoff_teams=4, seed=0):
+    rng = random.Random(seed)
+    standings = team_standings(matchups_df)
+    fit = fit_score_distributions(matchups_df)
+    games = list(remaining_schedule(matchups_df)[['owner_team_name', 'opp_owner_team_name']].itertuples(index=False))
+    league = {i: i.split(' Team ')[0] for i in standings.index}
+    made = dict.fromkeys(standings.index, 0)
+    mean, std = fit['mean'].to_dict(), fit['std'].to_dict()
+    base_wins, base_points = standings['wins'].to_dict(), standings['points_for'].to_dict()
+
+    for _ in range(num_sims):
+        wins, points = dict(base_wins), dict(base_points)
+        for a, b in games:
+            score_a = rng.gauss(mean[a], std[a])
+            score_b = rng.gauss(mean[b], std[b])
+            points[a] += score_a
+            points[b] += score_b
+            wins[a if score_a > score_b else b] += 1
+        for name in set(league.values()):
+            teams = sorted([i for i in wins if league[i] == name], key=lambda i: (wins[i], points[i]), reverse=True)
+            for i in teams[:num_playoff_teams]:
+                made[i] += 1
+    return {i: j / num_sims * 100 for i, j in made.items()}
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sims', type=int, default=1000000, help='seasons simulated by simulate_odds')
+    parser.add_argument('--loop-sims', type=int, default=20000, help='seasons simulated by the python loop')
+    parser.add_argument('--week', type=int, default=8, help='last completed week')
+    parser.add_argument('--leagues', type=int, nargs='*', default=[1, 10])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='worker processes of the pool')
+    args = parser.parse_args()
+    processes = max(args.processes, 2)
+
+    for num_leagues in args.leagues:
+        matchups_df = make_matchups_df(num_leagues=num_leagues)
+        matchups_df = matchups_df.loc[matchups_df['week'] <= args.week]
+        num_games = len(remaining_schedule(matchups_df))
+        print(f'{num_leagues} league(s), {num_leagues * 10} teams, through week {args.week}: {num_games} games left')
+
+        loop_sims = args.loop_sims // num_leagues
+        loop, loop_s = timed(lambda: loop_odds(matchups_df, loop_sims))
+        single, single_s = timed(lambda: simulate_odds(matchups_df, num_sims=args.sims, processes=1))
+        pooled, pooled_s = timed(lambda: simulate_odds(matchups_df, num_sims=args.sims, processes=processes))
+        assert single.equals(pooled), 'result depends on the number of processes'
+        assert simulate_odds(matchups_df, num_sims=args.sims // 10, seed=1).equals(
+               simulate_odds(matchups_df, num_sims=args.sims // 10, seed=1)), 'result is not stable under a seed'
+
+        # the loop's odds carry a sampling error of about sqrt(p (1 - p) / loop_sims)
+        pct = single.set_index('owner_team_name')['playoff_pct']
+        error = max(abs(pct[i] - j) / max(np.sqrt(j * (100 - j) / loop_sims), 0.05) for i, j in loop.items())
+
+        odds_dir = tempfile.mkdtemp(prefix='ff_odds_')
+        _, cold_s = timed(lambda: load_odds(matchups_df, num_sims=args.sims, odds_dir=odds_dir))
+        _, warm_s = timed(lambda: load_odds(matchups_df, num_sims=args.sims, odds_dir=odds_dir))
+
+        print(f"  {'step':<46} {'seconds':>9} {'seasons/s':>12}")
+        print(f"  {f'python loop ({loop_sims:,d} seasons)':<46} {loop_s:9.3f} {loop_sims / loop_s:12,.0f}")
+        print(f"  {f'simulate_odds, 1 process ({args.sims:,d} seasons)':<46} {single_s:9.3f} "
+              f"{args.sims / single_s:12,.0f}")
+        print(f"  {f'simulate_odds, {processes} processes ({args.sims:,d} seasons)':<46} {pooled_s:9.3f} "
+              f"{args.sims / pooled_s:12,.0f}")
+        print(f"  {'load_odds, first call of the week (simulates)':<46} {cold_s:9.3f} {'-':>12}")
+        print(f"  {'load_odds, cached':<46} {warm_s:9.3f} {'-':>12}")
+        print(f'  largest playoff odds gap to the loop: {error:.1f} standard errors; same odds with 1 and '
+              f'{processes} processes and under a repeated seed\n')
@@ -0,0 +1,127 @@
+# benchmark weekly point predictions for the roster tab: a model call per roster request or per week vs. the
+# batched, incremental prediction_store
+#
+# run from the repo root:  python benchmarks/bench_predictions.py
+
+# import needed packages
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prediction_store import build_features, key_columns, position_groups, prediction_store
+from roster_index import roster_index
+from synthetic import make_feature_matrix, make_rosters_df, scales
+
+# create dictionary of the number of feature columns of each position group (as in the training notebook)
+num_features = {'rbwrte': 15, 'qb': 21, 'def': 29, 'kr': 15}
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to build the rosters, feature matrices, and fitted models of one benchmark scale
+def make_scale(scale, num_trees, seed=0):
+    params = {k: v for k, v in scales[scale].items() if k != 'num_nfl_teams'}
+    rosters_df = make_rosters_df(first_season=2020 - params['num_seasons'] + 1, seed=seed, **params)
+
+    # keep each player at one position so every (year, week, player) belongs to one position group
+    rosters_df['player'] = rosters_df['position_name'] + ' ' + rosters_df['player']
+
+    features, models = {}, {}
+    for i, (group, positions) in enumerate(position_groups.items()):
+        features[group] = make_feature_matrix(rosters_df, positions, num_features[group], seed=seed + i)
+        columns = [f'fx_{j}' for j in range(num_features[group])]
+        train = features[group].sample(n=min(len(features[group]), 5000), random_state=seed)
+        models[group] = RandomForestRegressor(n_estimators=num_trees, max_samples=0.8, random_state=1)\
+                            .fit(train[columns], train['actual_points'])
+    return rosters_df, features, models
+
+# create function to predict one roster the way a callback without the store would (reading only its players' games)
+def predict_roster(records, features, models):
+    rows = pd.DataFrame(records)
+    preds = {}
+    for group, model in models.items():
+        keys = rows.loc[rows['position_name'].isin(position_groups[group]), key_columns]
+        if len(keys) == 0:
+            continue
+        columns = list(model.feature_names_in_)
+        group_df = features[group].loc[features[group]['player'].isin(keys['player'])]
+        df = build_features(group_df, keys, columns)
+        if len(df):
+            preds.update(zip(df['player'], model.predict(df[columns]).tolist()))
+    return [dict(i, pred=None if preds.get(i['player']) is None else round(preds[i['player']], 2)) for i in records]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', nargs='*', default=['current', 'x100'], choices=list(scales))
+    parser.add_argument('--trees', type=int, default=100, help='n_estimators of the position group models')
+    parser.add_argument('--requests', type=int, default=200, help='roster requests timed without the store')
+    args = parser.parse_args()
+
+    for scale in args.scale:
+        rosters_df, features, models = make_scale(scale, args.trees)
+        index = roster_index()
+        index.add(rosters_df)
+        year = int(rosters_df['year'].max())
+        requests = [(year, i, j) for i in rosters_df['week'].unique().tolist()
+                    for j in rosters_df['owner_team'].unique().tolist()]
+        requests = [requests[i] for i in np.random.default_rng(0).permutation(len(requests))[:args.requests]]
+        num_keys = len(rosters_df[key_columns].drop_duplicates())
+        print(f'{scale}: {len(rosters_df):,d} roster rows, {num_keys:,d} player weeks, {args.trees} trees per model')
+
+        # a model call per roster request
+        def per_request():
+            return [predict_roster(index.lookup(*i), features, models) for i in requests]
+        naive, naive_s = timed(per_request)
+        naive_rows = sum(len(i) for i in naive)
+
+        # a model call per week of the current season (one batch of every rostered player of the week), like the
+        # notebook's predict_2020_season loop
+        def per_week():
+            preds = 0
+            for _, week_df in rosters_df.loc[rosters_df['year'] == year].groupby('week'):
+                for group, model in models.items():
+                    keys = week_df.loc[week_df['position_name'].isin(position_groups[group]), key_columns]
+                    df = build_features(features[group], keys, list(model.feature_names_in_))
+                    preds += len(model.predict(df[list(model.feature_names_in_)])) if len(df) else 0
+            return preds
+        week_preds, week_s = timed(per_week)
+
+        store = prediction_store(models)
+        _, cold_s = timed(lambda: store.update(rosters_df, features))
+        _, warm_s = timed(lambda: store.update(rosters_df, features))
+        served, served_s = timed(lambda: [store.annotate(index.lookup(*i), i[0], i[1]) for i in requests])
+        assert served == naive, 'store predictions differ from per request predictions'
+
+        # one week of qb stats is corrected and only the later weeks of those qbs are scored again
+        changed = {i: j.copy() for i, j in features.items()}
+        changed['qb'].loc[(changed['qb']['year'] == year) & (changed['qb']['week'] == 14), 'fx_0'] += 1.0
+        updated, incr_s = timed(lambda: store.update(rosters_df, changed))
+        fresh = prediction_store(models)
+        fresh.update(rosters_df, changed)
+        assert store.predictions == fresh.predictions, 'incremental update differs from a full update'
+        num_changed = updated['qb']
+
+        print(f"  {'step':<50} {'seconds':>9} {'predictions/s':>14}")
+        print(f"  {f'model call per roster request ({len(requests)} requests)':<50} {naive_s:9.3f} "
+              f"{naive_rows / naive_s:14,.0f}")
+        print(f"  {'model call per week (current season)':<50} {week_s:9.3f} {week_preds / week_s:14,.0f}")
+        print(f"  {'prediction_store.update, cold (every week)':<50} {cold_s:9.3f} "
+              f"{len(store.predictions) / cold_s:14,.0f}")
+        print(f"  {'prediction_store.update, nothing changed':<50} {warm_s:9.3f} {'-':>14}")
+        print(f"  {f'prediction_store.update, qb week 14 changed ({num_changed} wk)':<50} {incr_s:9.3f} {'-':>14}")
+        print(f"  {f'roster callback lookups ({len(requests)} requests)':<50} {served_s:9.3f} "
+              f"{naive_rows / served_s:14,.0f}")
+        print(f'  per request: {naive_s / len(requests) * 1e3:.2f} ms with a model call vs. '
+              f'{served_s / len(requests) * 1e3:.3f} ms from the store (same predictions)\n')
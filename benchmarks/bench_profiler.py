@@ -0,0 +1,71 @@
+# benchmark the column profiler: the original explore_num_data / explore_cat_data vs. profile_util
+#
+# run from the repo root:  python benchmarks/bench_profiler.py
+
+# import needed packages
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '00-ingest_data'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+import explore_util
+from synthetic import make_league_data, scales
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to read every csv run_explore_func writes to a directory
+def read_outputs(output_dir):
+    return {i: open(os.path.join(output_dir, i), 'rb').read() for i in sorted(os.listdir(output_dir))}
+
+if __name__ == '__main__':
+
+    # run_explore_func writes the same csv files with either implementation
+    rosters_df = make_league_data(**scales['current'])['rosters_df.csv']
+    outputs = []
+    for funcs in [(legacy.explore_num_data, legacy.explore_cat_data),
+                  (explore_util.explore_num_data, explore_util.explore_cat_data)]:
+        output_dir = tempfile.mkdtemp(prefix='ff_profiler_')
+        for func, func_var in zip(funcs, ['num', 'cat']):
+            explore_util.run_explore_func(rosters_df, func, func_var, 'all', False, output_dir)
+        outputs.append(read_outputs(output_dir))
+    assert outputs[0] == outputs[1]
+    print(f'run_explore_func writes identical csv files ({len(outputs[0])} files)')
+
+    for scale in ['current', 'x100']:
+        data = make_league_data(**scales[scale])['rosters_df.csv']
+        print(f'\n{scale}: rosters_df with {len(data):,} rows x {data.shape[1]} columns')
+        print(f"{'':<34} {'num (s)':>8} {'cat (s)':>8}")
+
+        legacy_num, legacy_num_s = timed(lambda: legacy.explore_num_data(data, 5))
+        legacy_cat, legacy_cat_s = timed(lambda: legacy.explore_cat_data(data, 5))
+        print(f"{'original explore_*_data':<34} {legacy_num_s:8.2f} {legacy_cat_s:8.2f}")
+
+        for processes in sorted(set([1, os.cpu_count()])):
+            num, num_s = timed(lambda: explore_util.explore_num_data(data, 5, processes=processes))
+            cat, cat_s = timed(lambda: explore_util.explore_cat_data(data, 5, processes=processes))
+            print(f"{f'profile_util ({processes} proc)':<34} {num_s:8.2f} {cat_s:8.2f}")
+            for a, b in [(legacy_num, num), (legacy_cat, cat)]:
+                pd.testing.assert_frame_equal(a[0], b[0])
+                for x, y in zip(a[1:], b[1:]):
+                    for p, q in zip(x, y):
+                        pd.testing.assert_frame_equal(p, q)
+
+        # the same frame streamed in chunks, as read_csv(chunksize=...) would
+        chunks = [data.iloc[i:i + 100000] for i in range(0, len(data), 100000)]
+        num, num_s = timed(lambda: explore_util.explore_num_data(iter(chunks), 5))
+        cat, cat_s = timed(lambda: explore_util.explore_cat_data(iter(chunks), 5))
+        print(f"{f'profile_util ({len(chunks)} chunks)':<34} {num_s:8.2f} {cat_s:8.2f}")
+        pd.testing.assert_frame_equal(legacy_num[0], num[0], rtol=1e-9)
+        pd.testing.assert_frame_equal(legacy_cat[0], cat[0])
+    print('\nevery summary and value list matches the original')
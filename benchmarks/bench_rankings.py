@@ -0,0 +1,54 @@
+# benchmark the matchup rankings engine against the original get_values_list lookups
+#
+# run from the repo root:  python benchmarks/bench_rankings.py
+
+# import needed packages
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from synthetic import make_tm_game_data, make_this_week
+from rankings import add_team_rates, calc_matchup_stats, rank_matchup_stats, avg_position_ranks, position_groups
+
+# create function to run the engine over the same aggregated stats as the legacy path
+def engine_rankings(tm_game_data, this_week, num_weeks):
+    prior_weeks = add_team_rates(legacy.agg_week(tm_game_data, num_weeks))
+    matchups = calc_matchup_stats(prior_weeks, this_week)
+    rank_avg = avg_position_ranks(rank_matchup_stats(matchups))
+    return rank_avg.round(1), matchups
+
+# create function to check the engine reproduces the legacy output exactly
+def check_exact(tm_game_data, this_week, num_weeks):
+    legacy_records, legacy_this_week = legacy.update_rankings_table(tm_game_data, this_week, num_weeks)
+    rank_avg, matchups = engine_rankings(tm_game_data, this_week, num_weeks)
+
+    for col in matchups.columns:
+        np.testing.assert_array_equal(matchups[col].to_numpy(), legacy_this_week[col].to_numpy(), err_msg=col)
+    legacy_avg = pd.DataFrame(legacy_records)
+    for col in position_groups:
+        np.testing.assert_array_equal(rank_avg[col].to_numpy(), legacy_avg[col].to_numpy(), err_msg=col)
+
+# create function to time both paths on one slate
+def run(num_teams, num_weeks=17, window=4, repeat=5):
+    tm_game_data = make_tm_game_data(num_teams, num_weeks)
+    this_week = make_this_week(num_teams, num_weeks + 1)
+    check_exact(tm_game_data, this_week, window)
+
+    legacy_number = 1 if num_teams > 100 else 5
+    legacy_s = min(timeit.repeat(lambda: legacy.update_rankings_table(tm_game_data, this_week, window),
+                                 number=legacy_number, repeat=2 if num_teams > 100 else repeat)) / legacy_number
+    engine_s = min(timeit.repeat(lambda: engine_rankings(tm_game_data, this_week, window),
+                                 number=20, repeat=repeat)) / 20
+    print(f'{num_teams:>5} teams | legacy {legacy_s * 1e3:9.2f} ms | engine {engine_s * 1e3:7.2f} ms | '
+          f'speedup {legacy_s / engine_s:7.1f}x')
+
+if __name__ == '__main__':
+    for n in [32, 128, 512]:
+        run(n)
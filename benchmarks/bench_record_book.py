@@ -0,0 +1,89 @@
+# benchmark the all-time record book: recomputing head-to-head records, standings, and record books from every game
+# with dataframe filters and python loops vs. record_book.record_book built from scratch and appending one week
+#
+# run from the repo root:  python benchmarks/bench_record_book.py
+
+# import needed packages
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from record_book import all_seasons, read_matchups, record_book
+from synthetic import make_matchups_df
+
+# create function to recompute the head-to-head records, standings, and record books from every game
+def loop_records(matchups_df, top_n=10):
+    h2h = {}
+    for (owner, opp), df in matchups_df.groupby(['owner', 'opp_owner']):
+        h2h[(owner, opp)] = (len(df), int(df['win'].sum()), round(df['score'].sum(), 1))
+    standings = {}
+    for year in matchups_df['year'].unique():
+        df = matchups_df.loc[matchups_df['year'] == year]
+        standings[int(year)] = df.groupby('owner')['win'].sum().sort_values(ascending=False)
+    highest = matchups_df.sort_values('score', ascending=False).head(top_n)['score'].tolist()
+
+    # walk each owner's games in order counting the current run of wins
+    longest = []
+    for owner, df in matchups_df.sort_values(['year', 'week'], kind='mergesort').groupby('owner'):
+        run = 0
+        for win in df['win']:
+            run = run + 1 if win == 1 else 0
+            longest.append(run)
+    return h2h, standings, highest, sorted(longest, reverse=True)[0]
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--leagues', type=int, nargs='*', default=[1, 100], help='synthetic leagues')
+    parser.add_argument('--seasons', type=int, default=20, help='seasons per synthetic league')
+    parser.add_argument('--lookups', type=int, default=100000, help='lookups timed')
+    args = parser.parse_args()
+
+    cases = [('data/ (every season)', read_matchups(os.path.join(repo_dir, 'data')))]
+    cases += [(f'{i:,d} synthetic leagues x {args.seasons} seasons',
+               make_matchups_df(num_leagues=i, num_seasons=args.seasons, first_season=2000)) for i in args.leagues]
+
+    print(f"{'matchups':<34} {'games':>9} {'loop s':>8} {'build s':>8} {'add week ms':>12} {'lookup us':>10}")
+    for label, matchups_df in cases:
+        keys = matchups_df['year'].to_numpy() * 100 + matchups_df['week'].to_numpy()
+        before = matchups_df.loc[keys < keys.max()]
+
+        (h2h, standings, highest, longest), loop_s = timed(lambda: loop_records(matchups_df))
+        book, build_s = timed(lambda: record_book(matchups_df))
+        previous = record_book(before)
+        added, add_s = timed(lambda: record_book(matchups_df, previous))
+
+        # appending the last week matches the book built from scratch, and both match the loops
+        assert added.added_weeks == 1 and added.h2h_rows == book.h2h_rows
+        assert added.standings_rows == book.standings_rows and added.book_rows == book.book_rows
+        for owner, rows in book.h2h_rows.items():
+            for row in rows:
+                assert h2h[(owner, row['opp_owner'])][:2] == (row['games'], row['wins'])
+        year = int(matchups_df['year'].max())
+        assert [i['wins'] for i in book.standings(year)] == standings[year].tolist()
+        assert [i['score'] for i in book.records('highest_score')] == highest
+        assert book.records('longest_win_streak')[0]['games'] == longest
+
+        owners = book.owners
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            book.head_to_head(owners[i % len(owners)])
+            book.standings(all_seasons)
+        lookup_us = (time.perf_counter() - start) / args.lookups / 2 * 1e6
+
+        print(f'{label:<34} {len(matchups_df) // 2:9,d} {loop_s:8.2f} {build_s:8.3f} {add_s * 1e3:12.1f} '
+              f'{lookup_us:10.2f}')
+    print('add week: record_book of the last week from the one without it (only that week is indexed)')
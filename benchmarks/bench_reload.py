@@ -0,0 +1,149 @@
+# benchmark a hot data reload: request latency while the next week of data is loaded in the background and swapped in,
+# and the snapshot build time from scratch (a worker restart) vs. from the previous snapshot
+#
+# run from the repo root:  python benchmarks/bench_reload.py
+
+# import needed packages
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from synthetic import make_this_week, make_win_loss_df, write_app_data
+
+# create function to write the app's data files as they stood after a given week (each file replaced atomically)
+def write_week(data_dir, full, week, num_teams):
+    tables = {'matchups_df': full['matchups_df'].loc[full['matchups_df']['week'] <= week],
+              'rosters_df': full['rosters_df'].loc[full['rosters_df']['week'] <= week],
+              'tm_game_data': full['tm_game_data'].loc[full['tm_game_data']['week'] <= week],
+              'this_week': make_this_week(num_teams, week + 1)}
+    tables['win_loss_df'] = make_win_loss_df(tables['matchups_df'])
+    for name, df in tables.items():
+        path = os.path.join(data_dir, f'{name}.csv')
+        df.to_csv(f'{path}.tmp', index=False)
+        os.replace(f'{path}.tmp', path)
+
+# create function to summarize request latencies in milliseconds
+def summary(latencies):
+    if not latencies:
+        return '-'
+    latencies = sorted(latencies)
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    return f'{len(latencies):>7,d} {statistics.median(latencies) * 1e3:9.2f} {p99 * 1e3:9.2f} {latencies[-1] * 1e3:9.2f}'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--week', type=int, default=8, help='last week on disk at boot (the reload adds the next one)')
+    parser.add_argument('--teams', type=int, default=32, help='nfl teams in tm_game_data')
+    parser.add_argument('--seconds', type=float, default=3.0, help='seconds of steady load before and after')
+    args = parser.parse_args()
+
+    data_dir = write_app_data(tempfile.mkdtemp(prefix='ff_reload_'), num_teams=args.teams)
+    full = {i: pd.read_csv(os.path.join(data_dir, f'{i}.csv')) for i in ['matchups_df', 'rosters_df', 'tm_game_data']}
+    write_week(data_dir, full, args.week, args.teams)
+    os.chdir(data_dir)
+    os.environ['DATA_RELOAD_SECONDS'] = '0.2'
+
+    import app
+    from data_snapshot import data_snapshot
+
+    # mix cache hits with misses: two pages of every roster and the rankings windows of 4 or more weeks (a shorter one
+    # can miss a team on bye and raise), unsorted and sorted
+    team = app.snapshots.current.rosters_df['owner_team'].iloc[0]
+    outputs = ['data', 'columns', 'page_count']
+
+    def roster_body(page, sort_by):
+        return {'output': '..roster_table.data...roster_table.columns...roster_table.page_count..',
+                'outputs': [{'id': 'roster_table', 'property': i} for i in outputs],
+                'inputs': [{'id': 'week', 'property': 'value', 'value': 1 + page % args.week},
+                           {'id': 'owner_team', 'property': 'value', 'value': team},
+                           {'id': 'roster_columns', 'property': 'value', 'value': app.snapshots.current.roster_columns},
+                           {'id': 'roster_table', 'property': 'page_current', 'value': page % 2},
+                           {'id': 'roster_table', 'property': 'page_size', 'value': 10},
+                           {'id': 'roster_table', 'property': 'sort_by', 'value': sort_by},
+                           {'id': 'roster_table', 'property': 'filter_query', 'value': ''}]}
+
+    def rankings_body(num_weeks, sort_by):
+        return {'output': '..rankings_table.data...rankings_table.page_count..',
+                'outputs': [{'id': 'rankings_table', 'property': i} for i in ['data', 'page_count']],
+                'inputs': [{'id': 'input_range', 'property': 'value', 'value': num_weeks},
+                           {'id': 'rankings_table', 'property': 'page_current', 'value': 0},
+                           {'id': 'rankings_table', 'property': 'page_size', 'value': 32},
+                           {'id': 'rankings_table', 'property': 'sort_by', 'value': sort_by},
+                           {'id': 'rankings_table', 'property': 'filter_query', 'value': ''}]}
+
+    sorts = [[], [{'column_id': 'proj_points', 'direction': 'desc'}]]
+    rank_sorts = [[], [{'column_id': 'QB', 'direction': 'desc'}]]
+    bodies = [roster_body(i, j) for i in range(2 * args.week) for j in sorts] + \
+             [rankings_body(i, j) for i in range(4, args.week + 1) for j in rank_sorts]
+
+    results = []
+    errors = []
+    stop = threading.Event()
+
+    def load():
+        client = app.server.test_client()
+        n = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.post('/_dash-update-component', json=bodies[n % len(bodies)])
+            results.append((start, time.perf_counter() - start))
+            if response.status_code != 200:
+                errors.append(response.status_code)
+            n += 1
+
+    thread = threading.Thread(target=load)
+    thread.start()
+    time.sleep(0.5)
+    del results[:]
+    time.sleep(args.seconds)
+
+    # the next week lands on disk, the watcher builds the new snapshot and swaps it in
+    written_at = time.perf_counter()
+    write_week(data_dir, full, args.week + 1, args.teams)
+    while app.snapshots.reloads == 0 and time.perf_counter() - written_at < 120:
+        time.sleep(0.01)
+    swapped_at = time.perf_counter()
+    time.sleep(args.seconds)
+    stop.set()
+    thread.join()
+    app.snapshots.stop()
+
+    snapshot = app.snapshots.current
+    assert snapshot.max_week == args.week + 1 and not errors, 'reload did not swap in the new week cleanly'
+    print(f'{args.teams} nfl teams, week {args.week} -> {args.week + 1}: new snapshot swapped in '
+          f'{swapped_at - written_at:.2f} s after the files were written (build {app.snapshots.last_build_seconds:.2f} s)'
+          f", rebuilt: {', '.join(snapshot.rebuilt)}")
+    print(f"  {'requests':<34} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print(f"  {'before the reload':<34} {summary([j for i, j in results if i < written_at])}")
+    print(f"  {'while the snapshot builds':<34} {summary([j for i, j in results if written_at <= i < swapped_at])}")
+    print(f"  {'after the swap':<34} {summary([j for i, j in results if i >= swapped_at])}")
+
+    # build time of a worker restart vs. a reload of one more week from the current snapshot (both finding the figures
+    # already saved)
+    write_week(data_dir, full, args.week + 2, args.teams)
+    data_snapshot()
+    start = time.perf_counter()
+    incremental = data_snapshot(snapshot)
+    incremental_s = time.perf_counter() - start
+    start = time.perf_counter()
+    fresh = data_snapshot()
+    fresh_s = time.perf_counter() - start
+    for name in ['win_loss_df', 'matchups_df', 'rosters_df', 'tm_game_data', 'this_week']:
+        assert getattr(fresh, name).equals(getattr(incremental, name))
+    assert all((fresh.week_store.cum_stats[i] == incremental.week_store.cum_stats[i]).all()
+               for i in fresh.week_store.columns)
+    assert fresh.rankings_view(4).page(None, app.columns, 0, 100) == incremental.rankings_view(4).page(None, app.columns,
+                                                                                                      0, 100)
+    print(f'  snapshot build from scratch (worker restart): {fresh_s:.2f} s; from the previous snapshot: '
+          f'{incremental_s:.2f} s ({incremental.week_store.reused_rows} of {args.week + 2} weeks of sums reused); '
+          f'same tables, sums, and rankings')
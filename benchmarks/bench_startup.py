@@ -0,0 +1,173 @@
+# benchmark data loading at startup: csv parsing vs. pickle vs. the memory-mapped columnar store, and worker boot
+# with gunicorn --preload (a worker forked from the booted master) vs. importing app.py, checking that the app serves
+# the same layout and callback responses with the csv files and the store
+#
+# run from the repo root:  python benchmarks/bench_startup.py
+
+# import needed packages
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import data_store
+from synthetic import write_app_data
+
+# create function to time the best of several runs of a function
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# create function to time loading every data file in each format
+def bench_formats(sources, work_dir):
+    store_dir = os.path.join(work_dir, 'store')
+    pickle_dir = os.path.join(work_dir, 'pickle')
+    os.makedirs(pickle_dir, exist_ok=True)
+
+    # write the pickle and store copies of every source
+    frames = {i: data_store.read_source(i) for i in sources}
+    for source, df in frames.items():
+        df.to_pickle(os.path.join(pickle_dir, data_store.table_name(source) + '.pkl'))
+        data_store.write_table(df, data_store.table_name(source), store_dir, source=source)
+
+    csv_sources = [i for i in sources if i.endswith('.csv')]
+    totals = {'csv': 0.0, 'pickle': 0.0, 'store': 0.0, 'store (no mmap)': 0.0}
+    print(f"{'table':<30} {'MB':>6} {'csv ms':>8} {'pickle ms':>9} {'store ms':>8}")
+    for source in sources:
+        name = data_store.table_name(source)
+        csv_s = best_of(lambda: pd.read_csv(source)) if source in csv_sources else float('nan')
+        pickle_s = best_of(lambda: pd.read_pickle(os.path.join(pickle_dir, name + '.pkl')))
+        store_s = best_of(lambda: data_store.open_table(name, store_dir))
+        totals['csv'] += 0.0 if source not in csv_sources else csv_s
+        totals['pickle'] += pickle_s
+        totals['store'] += store_s
+        totals['store (no mmap)'] += best_of(lambda: data_store.open_table(name, store_dir, mmap=False))
+        print(f'{name:<30} {os.path.getsize(source) / 1e6:6.2f} {csv_s * 1e3:8.2f} {pickle_s * 1e3:9.2f} '
+              f'{store_s * 1e3:8.2f}')
+
+    print('totals: ' + ', '.join(f'{k} {v * 1e3:.1f} ms' for k, v in totals.items()) +
+          ' (csv total excludes .pkl sources)')
+
+# create code run in a fresh python process: import app.py (the gunicorn master with --preload), then fork a worker
+# that answers every callback request once and reports its first response time, memory, and response digests
+boot_code = '''
+import hashlib, json, os, time
+import plotly
+start = time.perf_counter()
+import app
+boot_s = time.perf_counter() - start
+
+path = app.app.config.routes_pathname_prefix + '_dash-update-component'
+bodies = []
+for output, inputs in app.callback_domain():
+    outputs = [dict(zip(['id', 'property'], i.split('.', 1))) for i in output.strip('.').split('...')]
+    bodies.append({'output': output, 'outputs': outputs if output.startswith('..') else outputs[0],
+                   'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+                   'changedPropIds': [f'{i}.{p}' for i, p, v in inputs]})
+
+read_fd, write_fd = os.pipe()
+start = time.perf_counter()
+if os.fork() == 0:
+    client = app.server.test_client()
+    client.post(path, json=bodies[0])
+    first_s = time.perf_counter() - start
+    layout = json.dumps(app.app.layout(), cls=plotly.utils.PlotlyJSONEncoder, sort_keys=True)
+    digests = {'layout': hashlib.sha1(layout.encode()).hexdigest()}
+    for body in bodies:
+        response = client.post(path, json=body)
+        digests[json.dumps(body, sort_keys=True)] = hashlib.sha1(response.get_data()).hexdigest()
+    with open('/proc/self/smaps_rollup') as f:
+        memory = {i.split(':')[0]: int(i.split()[1]) * 1024 for i in f if i.split(':')[0] in
+                  ('Rss', 'Private_Clean', 'Private_Dirty')}
+    os.write(write_fd, json.dumps({'first_s': first_s, 'memory': memory, 'digests': digests}).encode())
+    os._exit(0)
+os.close(write_fd)
+with os.fdopen(read_fd) as f:
+    worker = json.loads(f.read())
+os.wait()
+print(json.dumps(dict(worker, boot_s=boot_s)))
+'''
+
+# create function to time a fresh python process importing app.py
+def bench_import(app_dir):
+    env = dict(os.environ, PYTHONPATH=repo_dir, PYTHONWARNINGS='ignore')
+    code = 'import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)'
+    runs = [float(subprocess.run([sys.executable, '-c', code], cwd=app_dir, env=env, check=True,
+                                 capture_output=True, text=True).stdout.split()[-1]) for _ in range(3)]
+    return min(runs)
+
+# create function to boot app.py and fork one worker from it (gunicorn --preload)
+def bench_worker(app_dir, rebuild=False, setup=''):
+    '''
+    Function to import app.py in a fresh process, fork a worker, and answer every callback request from the worker
+
+    param app_dir: directory app.py is run from
+    param rebuild: whether to remove the saved figures and lineups first, so they are built from the tables as loaded
+    param setup: python code run before app.py is imported
+
+    returns: dictionary of boot_s (import app), first_s (fork to the worker's first response), memory (the worker's
+             Rss, Private_Clean, and Private_Dirty bytes after every request), and digests (sha1 of the layout and
+             of each response)
+    '''
+
+    if rebuild:
+        for name in ['figures', 'lineups']:
+            shutil.rmtree(os.path.join(app_dir, 'data', 'store', name), ignore_errors=True)
+    env = dict(os.environ, PYTHONPATH=repo_dir, PYTHONWARNINGS='ignore')
+    result = subprocess.run([sys.executable, '-c', setup + boot_code], cwd=app_dir, env=env, check=True,
+                            capture_output=True, text=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+# create function to write the app's csv files to a directory with links to every season under data/
+def make_app_dir(work_dir):
+    # app.py reads its csv files and builds the roster index from data/, so run it from a copy with a data link
+    app_dir = write_app_data(os.path.join(work_dir, 'app'))
+    os.makedirs(os.path.join(app_dir, 'data'))
+    for season in os.listdir(os.path.join(repo_dir, 'data')):
+        if season.isdigit() or season.endswith('_all.pkl'):
+            os.symlink(os.path.join(repo_dir, 'data', season), os.path.join(app_dir, 'data', season))
+    return app_dir
+
+if __name__ == '__main__':
+    work_dir = tempfile.mkdtemp(prefix='ff_startup_')
+    bench_formats(data_store.find_sources(os.path.join(repo_dir, 'data'), repo_dir), work_dir)
+    app_dir = make_app_dir(work_dir)
+
+    # the app only opens saved playoff odds, so simulate them ahead of time like a deploy does
+    env = dict(os.environ, PYTHONPATH=repo_dir, PYTHONWARNINGS='ignore')
+    subprocess.run([sys.executable, os.path.join(repo_dir, 'playoff_odds.py'), 'build'], cwd=app_dir, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+
+    # every layout and callback response must be the same whether the tables are parsed or opened from the store
+    results = {'csv': bench_worker(app_dir, rebuild=True)}
+    results['csv'].update(bench_worker(app_dir), import_s=bench_import(app_dir))
+    subprocess.run([sys.executable, os.path.join(repo_dir, 'data_store.py'), 'convert'], cwd=app_dir, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+    results['store'] = bench_worker(app_dir, rebuild=True)
+    assert results['store']['digests'] == results['csv']['digests'], 'the store changed a layout or callback response'
+    results['store'].update(bench_worker(app_dir), import_s=bench_import(app_dir))
+    print(f"\n{len(results['csv']['digests'])} layout and callback responses identical with the csv files and the "
+          f"store")
+
+    # without --preload every worker imports app.py itself, with it the worker is forked from the booted master
+    print(f"\n{'tables':<8} {'import app ms':>14} {'forked worker first response ms':>32} "
+          f"{'worker private MB':>18} {'worker rss MB':>14}")
+    for name, result in results.items():
+        memory = result['memory']
+        private = (memory['Private_Clean'] + memory['Private_Dirty']) / 1e6
+        print(f"{name:<8} {result['import_s'] * 1e3:14.1f} {result['first_s'] * 1e3:32.1f} {private:18.1f} "
+              f"{memory['Rss'] / 1e6:14.1f}")
+    shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,270 @@
+# benchmark suite for the dashboard hot paths at the current league size and 100x larger
+#
+# run from the repo root:  python benchmarks/bench_suite.py
+#                          python benchmarks/bench_suite.py --scale current --output before.json
+#                          python benchmarks/bench_suite.py --compare before.json
+#
+# every run generates its own synthetic league data, so it needs no network access and no scraped files
+
+# import needed packages
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, bench_dir)
+
+import legacy
+from synthetic import make_league_data, scales
+
+# create default location of the results files
+default_results_dir = os.path.join(bench_dir, 'results')
+
+# create ratio of new to old median time reported as a regression by --compare
+regression_ratio = 1.2
+
+# create function to time a function until it has run min_repeat times and used up the time budget
+def time_calls(func, min_repeat=3, max_repeat=50, budget=0.5):
+    '''
+    Function to time repeated calls of a function
+
+    param func: function taking no arguments
+    param min_repeat: fewest calls to time
+    param max_repeat: most calls to time
+    param budget: seconds after which no more calls are started once min_repeat is reached
+
+    returns: dictionary with the number of calls and the min, median, and mean milliseconds per call
+    '''
+
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeat and (len(times) < min_repeat or time.perf_counter() - start < budget):
+        t = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t)
+    times = np.array(times) * 1e3
+    return {'n': len(times), 'min_ms': float(times.min()), 'median_ms': float(np.median(times)),
+            'mean_ms': float(times.mean())}
+
+# create function to write one scale's data files
+def write_scale_data(scale, output_dir, seed=0):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, df in make_league_data(seed=seed, **scales[scale]).items():
+        df.to_csv(os.path.join(output_dir, name), index=False)
+    return output_dir
+
+# create function to time every loader and callback called directly
+def bench_direct(data_dir):
+    '''
+    Function to time the data loaders and the callback code of the app, both the original versions and the current
+    ones, against the data files in data_dir
+
+    param data_dir: directory holding the five csv files app.py reads
+
+    returns: list of result dictionaries with group, name, and the time_calls timings
+    '''
+
+    import data_store
+    import figures
+    from agg_store import week_agg_store
+    from rankings import rankings_table
+    from roster_index import roster_index
+
+    results = []
+
+    def record(group, name, func, **kwargs):
+        results.append(dict(group=group, name=name, **time_calls(func, **kwargs)))
+
+    paths = {i: os.path.join(data_dir, i) for i in data_store.app_files}
+    store_dir = os.path.join(data_dir, 'store')
+
+    # loaders: csv parsing, the columnar store, and the structures app.py builds at startup
+    for name, path in paths.items():
+        record('load', f'read_csv {name}', lambda: pd.read_csv(path))
+        data_store.write_table(pd.read_csv(path), data_store.table_name(path), store_dir, source=path)
+        record('load', f'read_table {name}', lambda: data_store.read_table(path, store_dir))
+
+    tm_game_data = pd.read_csv(paths['tm_game_data.csv'])
+    this_week = pd.read_csv(paths['this_week.csv'])
+    rosters_df = pd.read_csv(paths['rosters_df.csv'])
+    matchups_df = pd.read_csv(paths['matchups_df.csv'])
+    win_loss_df = pd.read_csv(paths['win_loss_df.csv']).sort_values(['wins', 'points_for'], ascending = False)
+
+    def build_roster_index():
+        index = roster_index()
+        index.add(rosters_df)
+        return index
+
+    figure_dir = os.path.join(data_dir, 'figures')
+    figures.load_figures(win_loss_df, matchups_df, version='bench', figure_dir=figure_dir)
+
+    record('startup', 'week_agg_store', lambda: week_agg_store(tm_game_data))
+    record('startup', 'roster_index', build_roster_index)
+    record('startup', 'build_figures', lambda: figures.build_figures(win_loss_df, matchups_df))
+    record('startup', 'load_figures', lambda: figures.load_figures(win_loss_df, matchups_df, version='bench',
+                                                                   figure_dir=figure_dir))
+
+    # callbacks: pick a window, week, and team in the middle of the data
+    num_weeks = 4
+    week = int(rosters_df['week'].median())
+    team = rosters_df['owner_team'].iloc[len(rosters_df) // 2]
+    year = int(rosters_df['year'].max())
+    prior_weeks = legacy.agg_week(tm_game_data, num_weeks)
+    store = week_agg_store(tm_game_data)
+    index = build_roster_index()
+
+    record('legacy', 'agg_week', lambda: legacy.agg_week(tm_game_data, num_weeks))
+    record('legacy', 'get_values_list', lambda: legacy.get_values_list(prior_weeks, this_week['team_abv'], 'pass_tds'))
+    record('legacy', 'rankings update_table', lambda: legacy.update_rankings_table(tm_game_data, this_week, num_weeks))
+    record('legacy', 'roster update_table', lambda: legacy.update_roster_table(rosters_df, week, team))
+    record('legacy', 'update_graph', lambda: legacy.update_graph(win_loss_df, 'wins/losses'))
+
+    record('current', 'week_agg_store.window', lambda: store.window(num_weeks))
+    record('current', 'rankings_table', lambda: rankings_table(store, this_week, num_weeks))
+    record('current', 'roster_index.lookup', lambda: index.lookup(year, week, team), min_repeat=100, max_repeat=1000)
+    return results
+
+# create function to time importing app.py and serving each callback through the flask test client
+def bench_end_to_end(data_dir):
+    '''
+    Function to time app.py end to end in a fresh python process run from data_dir
+
+    param data_dir: directory holding the five csv files app.py reads
+
+    returns: list of result dictionaries with group, name, and the time_calls timings
+    '''
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([repo_dir, bench_dir]), PYTHONWARNINGS='ignore')
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--end-to-end', data_dir], cwd=data_dir, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+# create function run inside the fresh process started by bench_end_to_end
+def run_end_to_end():
+    start = time.perf_counter()
+    import app
+    import_ms = (time.perf_counter() - start) * 1e3
+    results = [{'group': 'end_to_end', 'name': 'import app', 'n': 1, 'min_ms': import_ms, 'median_ms': import_ms,
+                'mean_ms': import_ms}]
+
+    client = app.server.test_client()
+    rosters_df = app.snapshots.current.rosters_df
+    table_page = [('page_current', 0), ('sort_by', []), ('filter_query', '')]
+    requests = {'rankings update_table': ('..rankings_table.data...rankings_table.page_count..',
+                                          [('input_range', 'value', 4), ('rankings_table', 'page_size', 32)] +
+                                          [('rankings_table', p, v) for p, v in table_page]),
+                'roster update_table': ('..roster_table.data...roster_table.columns...roster_table.page_count..',
+                                        [('week', 'value', int(rosters_df['week'].median())),
+                                         ('owner_team', 'value', rosters_df['owner_team'].iloc[len(rosters_df) // 2]),
+                                         ('roster_columns', 'value', app.snapshots.current.roster_columns),
+                                         ('roster_table', 'page_size', 20)] +
+                                        [('roster_table', p, v) for p, v in table_page]),
+                'update_graph': ('win_loss_fig.figure', [('graph_option', 'value', 'wins/losses')])
+               }
+
+    def post(output, inputs):
+        outputs = [dict(zip(['id', 'property'], i.split('.', 1))) for i in output.strip('.').split('...')]
+        body = {'output': output, 'outputs': outputs if output.startswith('..') else outputs[0],
+                'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs], 'changedPropIds': []}
+        response = client.post('/_dash-update-component', json=body)
+        assert response.status_code == 200, response.status_code
+
+    # a miss runs the callback and serializes its response, a hit replays the cached response
+    for name, (output, inputs) in requests.items():
+        def miss():
+            app.cache.invalidate()
+            post(output, inputs)
+        results.append(dict(group='end_to_end', name=f'{name} (miss)', **time_calls(miss)))
+        results.append(dict(group='end_to_end', name=f'{name} (hit)',
+                            **time_calls(lambda: post(output, inputs), min_repeat=20)))
+
+    print(json.dumps(results))
+
+# create function to describe the machine and code a run was made on
+def run_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir, check=True, capture_output=True,
+                                text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scales': scales
+           }
+
+# create function to print the change in median time of every benchmark found in both runs
+def compare_results(old, new):
+    '''
+    Function to compare two results files
+
+    param old: dictionary loaded from the earlier results file
+    param new: dictionary loaded from the later results file
+
+    returns: list of (scale, group, name) keys whose median time grew by more than regression_ratio
+    '''
+
+    old_times = {(i['scale'], i['group'], i['name']): i['median_ms'] for i in old['results']}
+    regressions = []
+    print(f"{'scale':<8} {'group':<11} {'name':<40} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for i in new['results']:
+        key = (i['scale'], i['group'], i['name'])
+        if key not in old_times:
+            continue
+        ratio = i['median_ms'] / old_times[key] if old_times[key] else float('inf')
+        flag = '  slower' if ratio > regression_ratio else ''
+        print(f'{key[0]:<8} {key[1]:<11} {key[2]:<40} {old_times[key]:10.3f} {i["median_ms"]:10.3f} {ratio:7.2f}{flag}')
+        if flag:
+            regressions.append(key)
+    return regressions
+
+if __name__ == '__main__':
+    warnings.filterwarnings('ignore')
+    parser = argparse.ArgumentParser(description='time the dashboard loaders and callbacks on synthetic league data')
+    parser.add_argument('--scale', nargs='+', choices=list(scales), default=list(scales))
+    parser.add_argument('--output', help='results file (defaults to benchmarks/results/bench_suite_<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare this run against')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--end-to-end', metavar='DATA_DIR', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.end_to_end:
+        run_end_to_end()
+        sys.exit(0)
+
+    work_dir = tempfile.mkdtemp(prefix='ff_bench_suite_')
+    results = []
+    for scale in args.scale:
+        data_dir = write_scale_data(scale, os.path.join(work_dir, scale), seed=args.seed)
+        for result in bench_direct(data_dir) + bench_end_to_end(data_dir):
+            results.append(dict(scale=scale, **result))
+            print(f"{scale:<8} {result['group']:<11} {result['name']:<40} {result['median_ms']:10.3f} ms")
+
+    run = {'metadata': run_metadata(), 'results': results}
+    output = args.output
+    if output is None:
+        os.makedirs(default_results_dir, exist_ok=True)
+        output = os.path.join(default_results_dir, f"bench_suite_{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=1)
+    print(f'wrote {output}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare_results(json.load(f), run)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,148 @@
+# benchmark the roster and rankings DataTable responses: every row and column sent to the browser (sorted there with
+# sort_action='native') vs. server-side paged, sorted, filtered, and projected table_view pages
+#
+# run from the repo root:  python benchmarks/bench_tables.py
+#
+# the scoring enriched rosters are read from data/<season>/rosters_df_w_scoring_<season>.csv (236 columns) and copied
+# into earlier seasons for the larger cases
+
+# import needed packages
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agg_store import week_agg_store
+from rankings import rankings_frame, rankings_table
+from roster_index import roster_index
+from synthetic import make_rosters_df, make_tm_game_data, make_this_week
+from table_view import table_view
+
+# create list of the roster columns shown by default (data_snapshot.roster_columns) and a narrower set picked with the chooser
+default_columns = ['year', 'week', 'owner_team', 'owner', 'player', 'pro_team', 'pro_team_abv', 'current_inj_status',
+                   'lineup_slot_name', 'position_name', 'proj_points', 'actual_points', 'slot_id', 'pred']
+chosen_columns = ['player', 'lineup_slot_name', 'proj_points', 'actual_points', 'pred']
+
+# create function to measure a callback response the way dash serializes it
+def payload_bytes(response):
+    return len(json.dumps(response, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8'))
+
+# create function to take the median of many timed calls in microseconds
+def median_us(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+# create function to read the scoring enriched rosters of every season on disk, copied num_copies times
+def read_enriched_rosters(num_copies=1):
+    paths = sorted(glob.glob(os.path.join(repo_dir, 'data', '[0-9]' * 4, 'rosters_df_w_scoring_[0-9]*.csv')))
+    if paths:
+        df = pd.concat([pd.read_csv(i) for i in paths], ignore_index=True)
+    else:
+        df = make_rosters_df()
+        df = pd.concat([df, pd.DataFrame(np.zeros((len(df), 223)), columns=[f'stat_{i}' for i in range(223)])], axis=1)
+    num_seasons = df['year'].nunique()
+    df = pd.concat([df.assign(year=df['year'] - i * num_seasons) for i in range(num_copies)], ignore_index=True)
+    df['pred'] = np.round(df['proj_points'] * 0.9, 2)
+    return df
+
+# create function to compare the roster responses of one rosters dataframe
+def roster_case(label, rosters_df, repeat):
+    index = roster_index()
+    index.add(rosters_df)
+    year = int(rosters_df['year'].max())
+    keys = rosters_df.loc[rosters_df['year'] == year, ['week', 'owner_team']].drop_duplicates()
+    requests = [(year, int(i), j) for i, j in keys.itertuples(index=False)][:50]
+
+    start = time.perf_counter()
+    view = table_view(index.to_frame(), ['year', 'week', 'owner_team'], rank_columns=default_columns)
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    table_view(index.to_frame(), ['year', 'week', 'owner_team'])
+    build_all_s = time.perf_counter() - start
+
+    # before: every column of the team's roster, sorted by the browser
+    def before(key):
+        return {'roster_table': {'data': index.lookup(*key)}}
+
+    # after: the first page of the shown columns, sorted on the server
+    def after(key, columns, sort_by=()):
+        data, page_count = view.page(key, columns, 0, 20, list(sort_by), '')
+        return {'roster_table': {'data': data, 'columns': view.column_defs(columns), 'page_count': page_count}}
+
+    sort_by = [{'column_id': 'proj_points', 'direction': 'desc'}]
+    rows = [
+        ('all columns, every row', lambda key: before(key)),
+        ('default columns, page of 20', lambda key: after(key, default_columns)),
+        (f'{len(chosen_columns)} chosen columns, page of 20', lambda key: after(key, chosen_columns)),
+        ('default columns, sorted by proj_points', lambda key: after(key, default_columns, sort_by)),
+    ]
+    print(f'{label}: {len(rosters_df):,d} roster rows x {rosters_df.shape[1]} columns, {rosters_df["year"].nunique()} '
+          f'season(s), table_view built in {build_s:.2f} s ({build_all_s:.2f} s ranking every column)')
+    print(f"  {'roster response':<44} {'bytes':>9} {'build + json us':>16}")
+    for name, func in rows:
+        size = statistics.mean(payload_bytes(func(i)) for i in requests)
+        us = median_us(lambda: [payload_bytes(func(i)) for i in requests], repeat) / len(requests)
+        print(f'  {name:<44} {size:9,.0f} {us:16.1f}')
+
+# create function to compare the rankings responses of one slate
+def rankings_case(num_teams, repeat):
+    tm_game_data = make_tm_game_data(num_teams, 17)
+    this_week = make_this_week(num_teams, 18)
+    store = week_agg_store(tm_game_data)
+    columns = ['week', 'team_abv', 'oppn', 'QB', 'RB', 'WRTE', 'DEF', 'KICK']
+    frame = rankings_frame(store, this_week, 4)
+    view = table_view(frame)
+    sort_by = [{'column_id': 'QB', 'direction': 'desc'}, {'column_id': 'team_abv', 'direction': 'asc'}]
+
+    before = {'rankings_table': {'data': rankings_table(store, this_week, 4)}}
+    assert view.page(None, columns, 0, len(frame) + 1)[0] == before['rankings_table']['data']
+    sorted_rows = view.page(None, columns, 0, len(frame) + 1, sort_by)[0]
+    expected = frame.sort_values(['QB', 'team_abv'], ascending=[False, True], kind='mergesort').to_dict('records')
+    assert sorted_rows == expected, 'table_view sort differs from pandas'
+
+    def after(sort=(), filter_query=''):
+        data, page_count = view.page(None, columns, 0, 32, list(sort), filter_query)
+        return {'rankings_table': {'data': data, 'page_count': page_count}}
+
+    pandas_us = median_us(lambda: frame.sort_values(['QB', 'team_abv'], ascending=[False, True], kind='mergesort'),
+                          repeat)
+    rank_us = median_us(lambda: view.sort_rows(np.arange(len(frame)), sort_by), repeat)
+    print(f'rankings, {num_teams} nfl teams: {len(frame)} matchups, sort QB desc + team_abv: pandas sort_values '
+          f'{pandas_us:.1f} us, table_view ranks {rank_us:.1f} us')
+    print(f"  {'rankings response':<44} {'bytes':>9} {'build + json us':>16}")
+    for name, func in [('every row (native sort)', lambda: before),
+                       ('page of 32', lambda: after()),
+                       ('page of 32, sorted', lambda: after(sort_by)),
+                       ('page of 32, filtered {QB} > 16', lambda: after(sort_by, '{QB} > 16'))]:
+        print(f'  {name:<44} {payload_bytes(func()):9,d} {median_us(lambda: payload_bytes(func()), repeat):16.1f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, nargs='*', default=[1, 10], help='copies of the enriched rosters')
+    parser.add_argument('--teams', type=int, nargs='*', default=[32, 320], help='nfl teams of the rankings slates')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    current_path = os.path.join(repo_dir, 'data', '2020', 'rosters_df_2020.csv')
+    current = pd.read_csv(current_path) if os.path.exists(current_path) else make_rosters_df()
+    current['pred'] = np.round(current['proj_points'] * 0.9, 2)
+    roster_case('rosters_df (current columns)', current, args.repeat)
+    for num_copies in args.copies:
+        roster_case(f'rosters_df_w_scoring x{num_copies}', read_enriched_rosters(num_copies), args.repeat)
+    for num_teams in args.teams:
+        rankings_case(num_teams, args.repeat * 10)
@@ -0,0 +1,98 @@
+# benchmark the random forest hyperparameter tuning: the notebook's plot_param_tuning_regression run grid by grid and
+# position group by position group vs. tune_util.run_search
+#
+# run from the repo root:  python benchmarks/bench_tune.py
+
+# import needed packages
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_dir, '02-train_model'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import legacy
+from tune_util import plot_search, run_search
+
+# create dictionary of the number of rows and features of each synthetic position group
+positions = {'rbwrte': (400, 15), 'qb': (200, 21), 'def': (200, 29), 'kr': (200, 15)}
+
+# create function to time a function once
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+# create function to build a synthetic feature matrix and fantasy points target
+def make_position_data(num_rows, num_features, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.gamma(2.0, 3.0, size=(num_rows, num_features)), columns=[f'fx_{i}' for i in range(num_features)])
+    y = pd.Series(X.iloc[:, :4].to_numpy() @ np.array([1.5, 0.8, 0.4, 0.2]) + rng.normal(0, 3, num_rows),
+                  name='actual_points')
+    return X, y
+
+# create functions to build the notebook's n_estimators and max_depth grids (random_state set so both sides fit the
+# same trees)
+def tune_n_estimators_regression(num_trees):
+    return {str(n): RandomForestRegressor(n_estimators=n, random_state=1) for n in num_trees}
+
+def tune_max_depth_regression(tree_depth):
+    return {str(n): RandomForestRegressor(max_depth=n, random_state=1) for n in tree_depth + [None]}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='worker processes of run_search')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', FutureWarning)
+
+    datasets = {name: make_position_data(*shape, seed=i) for i, (name, shape) in enumerate(positions.items())}
+    grids = {'n_estimators': tune_n_estimators_regression([10, 50, 100]),
+             'max_depth': tune_max_depth_regression([3, 5])}
+    num_fits = len(datasets) * sum(len(i) for i in grids.values()) * 30
+    print(f'{len(datasets)} position groups x {sum(len(i) for i in grids.values())} models x 30 folds = {num_fits} fits\n')
+
+    # the notebook: one plot_param_tuning_regression call per grid per position group
+    def notebook():
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for name, (X, y) in datasets.items():
+                for models in grids.values():
+                    legacy.plot_param_tuning_regression(X, y, models)
+        return output.getvalue()
+    reference, notebook_s = timed(notebook)
+    print(f"{'notebook (serial grids, fresh fit per model and fold)':<60} {notebook_s:8.2f}s")
+
+    cache_dir = tempfile.mkdtemp(prefix='ff_tune_')
+    scores, cold_s = timed(lambda: run_search(datasets, grids, cache_dir, processes=args.processes))
+    print(f"{f'run_search, empty cache ({args.processes} proc)':<60} {cold_s:8.2f}s")
+
+    # the same summaries and box plots as the notebook
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for name in datasets:
+            for grid in grids:
+                plot_search(scores, name, grid)
+    assert output.getvalue() == reference, 'fold scores differ from the notebook'
+
+    _, warm_s = timed(lambda: run_search(datasets, grids, cache_dir, processes=args.processes))
+    print(f"{'run_search, rerun from the cache':<60} {warm_s:8.2f}s")
+
+    # extend the search by one more n_estimators value, only the new model is fit
+    grids['n_estimators'] = tune_n_estimators_regression([10, 50, 100, 200])
+    _, extend_s = timed(lambda: run_search(datasets, grids, cache_dir, processes=args.processes))
+    print(f"{'run_search, n_estimators extended to 200 trees':<60} {extend_s:8.2f}s")
+
+    print('\nthe mean and standard deviation of every model match the notebook')
@@ -0,0 +1,206 @@
+# legacy (pre-engine) implementations of the dashboard hot paths, loaded from the baseline commit with git show so they
+# cannot drift from the original code. the benchmarks time them and check the new implementations against them
+
+# import needed packages
+import ast
+import functools
+import json
+import os
+import subprocess
+import types
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+baseline_commit = '13f2f14'
+
+# create function to read a file as of the baseline commit
+def baseline_source(path):
+    return subprocess.run(['git', 'show', f'{baseline_commit}:{path}'], cwd=repo_dir, capture_output=True, check=True,
+                          text=True).stdout
+
+# create function to read one code cell of a notebook as of the baseline commit
+def baseline_cell(path, cell):
+    return ''.join(json.loads(baseline_source(path))['cells'][cell]['source'])
+
+# create function to list the names a top level statement binds
+def bound_names(node):
+    if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [(i.asname or i.name).split('.')[0] for i in node.names]
+    if isinstance(node, ast.Assign):
+        return [i.id for i in node.targets if isinstance(i, ast.Name)]
+    return []
+
+# create class to blank out the statements that only print, display, or write to csv
+class drop_output(ast.NodeTransformer):
+
+    # create function to replace one expression statement calling an output function with pass
+    def visit_Expr(self, node):
+        func = node.value.func if isinstance(node.value, ast.Call) else None
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        return ast.copy_location(ast.Pass(), node) if name in ('print', 'display', 'to_csv') else node
+
+# create function to run baseline code in a new module
+def baseline_module(name, sources, keep, replace=(), returns=None, callbacks=False, quiet=False):
+    '''
+    Function to run the definitions of some baseline sources in a new module
+
+    param name: module name
+    param sources: list of source strings, from baseline_source or baseline_cell
+    param keep: names of the functions, classes, and assignments to run. only the imported names they use are run
+                with them, and decorators are dropped
+    param replace: (old, new) source replacements, each of which must match at least one source
+    param returns: dictionary of function name to the expression its last statement is replaced with a return of
+    param callbacks: rename each dash callback to update_ + the id of the component it updates
+    param quiet: replace the statements that print, display, or write to csv with pass
+
+    returns: module
+    '''
+
+    module = types.ModuleType(name)
+    trees, matched = [], set()
+    for source in sources:
+        for old, new in replace:
+            if old in source:
+                source = source.replace(old, new)
+                matched.add(old)
+        tree = drop_output().visit(ast.parse(source)) if quiet else ast.parse(source)
+        for node in tree.body:
+            if callbacks and isinstance(node, ast.FunctionDef) and node.decorator_list:
+                node.name = 'update_' + node.decorator_list[0].args[0].args[0].value
+        trees.append(tree)
+
+    # a notebook imports in one cell what the functions of the others use
+    imports = [[i for i in tree.body if isinstance(i, (ast.Import, ast.ImportFrom))] for tree in trees]
+    kept = [[i for i in tree.body if set(bound_names(i)) & set(keep) and i not in j] for tree, j in zip(trees, imports)]
+    for node in [i for nodes in kept for i in nodes if isinstance(i, ast.FunctionDef)]:
+        node.decorator_list = []
+        if returns and node.name in returns:
+            node.body[-1] = ast.copy_location(ast.parse(f'return {returns[node.name]}').body[0], node.body[-1])
+    used = {i.id for nodes in kept for node in nodes for i in ast.walk(node) if isinstance(i, ast.Name)}
+    for tree, tree_imports, nodes in zip(trees, imports, kept):
+        for node in tree_imports:
+            node.names = [i for i in node.names if (i.asname or i.name).split('.')[0] in used]
+        tree.body = [i for i in tree_imports if i.names] + nodes
+        exec(compile(ast.fix_missing_locations(tree), f'{baseline_commit}:{name}', 'exec'), module.__dict__)
+    missing = [i for i in keep if i not in module.__dict__] + [i for i, _ in replace if i not in matched]
+    assert not missing, f'{missing} not found in the baseline {name}'
+    return module
+
+# create function to load the rankings helpers of app.py, and its callbacks named after the component each one updates
+# (both tables are updated by a function named update_table there)
+@functools.lru_cache(maxsize=None)
+def app_module():
+    return baseline_module('app', [baseline_source('app.py')],
+                           ['agg_week', 'get_values_list', 'ascending_false', 'ascending_true', 'update_win_loss_fig',
+                            'update_roster_table', 'update_rankings_table'], callbacks=True)
+
+# create function to load the ingestion, roster, and matchup classes of 00-scrape_espn_ff_api_v3_util.ipynb without the
+# csv writes and notebook displays, with the espn host and the data directory pointed at scrape_espn_data's arguments
+@functools.lru_cache(maxsize=None)
+def espn_module():
+    return baseline_module('espn_util', [baseline_cell('00-ingest_data/00-scrape_espn_ff_api_v3_util.ipynb', i)
+                                         for i in [3, 5, 7, 9, 11]],
+                           ['data_ingest', 'create_rosters', 'create_matchups', 'owner_team_codes', 'lineup_slot_codes',
+                            'position_codes', 'pro_team_codes', 'player_stat_codes', 'ff_scoring_codes'],
+                           replace=[("'https://fantasy.espn.com/apis/v3/games/ffl/", "base_url + '/"),
+                                    ('../data/', '{data_dir}/')], quiet=True)
+
+# create function to load the explore functions of 00-ingest_data/explore_util.py
+@functools.lru_cache(maxsize=None)
+def explore_module():
+    return baseline_module('explore_util', [baseline_source('00-ingest_data/explore_util.py')],
+                           ['explore_num_data', 'explore_cat_data', 'plot_hist', 'corr_matrix'])
+
+# create function to load the categorical relationship functions of 00-data_audit-pandas-util.ipynb: run_cat_rel_func
+# returns its frames in place of the heatmaps and files, and chi_squared reads p_value where the notebook reads an
+# undefined p
+@functools.lru_cache(maxsize=None)
+def audit_module():
+    return baseline_module('audit_util', [baseline_cell('00-ingest_data/00-data_audit-pandas-util.ipynb', i)
+                                          for i in [2, 22, 24, 26, 28, 30, 32]],
+                           ['run_cat_rel_func', 'chi_squared', 'cramers_v', 'theils_u', 'conditional_entropy',
+                            'remove_incomplete_samples', 'replace_nan_with_value'],
+                           replace=[('p <= alpha', 'p_value <= alpha')],
+                           returns={'run_cat_rel_func': 'df, cramers_df, theils_df'})
+
+# create function to load the hyperparameter tuning of 02-train_model/03-train_rf_model.ipynb: each grid of each
+# position group cross validated on its own, every model refit from scratch on every fold
+@functools.lru_cache(maxsize=None)
+def train_rf_module():
+    return baseline_module('train_rf_model', [baseline_cell('02-train_model/03-train_rf_model.ipynb', 13)],
+                           ['plot_param_tuning_regression'])
+
+# create dictionary of each baseline function the benchmarks use as is and the loader of its module
+baseline_functions = {'agg_week': app_module, 'get_values_list': app_module, 'create_rosters': espn_module,
+                      'create_matchups': espn_module, 'explore_num_data': explore_module,
+                      'explore_cat_data': explore_module, 'plot_hist': explore_module, 'corr_matrix': explore_module,
+                      'run_cat_rel_func': audit_module, 'plot_param_tuning_regression': train_rf_module}
+
+# create function to load a baseline module the first time a benchmark uses one of its functions
+def __getattr__(name):
+    if name not in baseline_functions:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return getattr(baseline_functions[name](), name)
+
+# create function to run the original rankings update_table against fresh copies of this_week.csv
+def update_rankings_table(tm_game_data, this_week_csv, num_weeks):
+    app = app_module()
+    app.tm_game_data = tm_game_data
+    app.this_week, app.this_week_rank, app.this_week_rank_avg = [this_week_csv.copy() for _ in range(3)]
+    return app.update_rankings_table(num_weeks), app.this_week
+
+# create function to run the original roster update_table against rosters_df
+def update_roster_table(rosters_df, week, team):
+    app = app_module()
+    app.rosters_df = rosters_df
+    return app.update_roster_table(week, team)
+
+# create function to run the original update_graph against win_loss_df
+def update_graph(win_loss_df, column_options):
+    app = app_module()
+    app.win_loss_df = win_loss_df
+    return app.update_win_loss_fig(column_options)
+
+# create function to run the original data_ingest.scrape_espn_data loop (one week at a time, indented json)
+def scrape_espn_data(base_url, league_id, season, week, swid, espn_s2, data_dir):
+    espn_util = espn_module()
+    espn_util.base_url, espn_util.data_dir = base_url, data_dir
+    espn_util.data_ingest(swid, espn_s2, league_id, season, week).scrape_espn_data()
+
+# create function to run cells of 01-calc_adv_stats.ipynb against the given frames and return one of them
+def run_adv_stats_cell(cell, result, num_statements=None, **frames):
+    tree = ast.parse(baseline_cell('01-transform_data/01-calc_adv_stats.ipynb', cell))
+    tree.body = tree.body[:num_statements]
+    namespace = {'np': np, 'pd': pd, **frames}
+    exec(compile(tree, f'{baseline_commit}:01-calc_adv_stats', 'exec'), namespace)
+    return namespace[result]
+
+# create function to load the play-by-play csv files the way 01-calc_adv_stats.ipynb does (every column of each csv,
+# then DataFrame.append across the seasons), for any list of seasons where the notebook names 2018 to 2020
+def load_play_by_play(years, data_dir):
+    play_by_play_df = None
+    for year in years:
+        play_by_play = pd.read_csv(os.path.join(data_dir, f'play_by_play_{year}.csv'), low_memory=False)
+        play_by_play['year'] = year
+        if play_by_play_df is None:
+            play_by_play_df = play_by_play
+        else:
+            play_by_play_df = play_by_play_df.append(play_by_play, ignore_index=True)
+    return play_by_play_df
+
+# create function to run the short name cell of 01-calc_adv_stats.ipynb: first initial + last name joined row by row,
+# then one full-frame scan per player override
+def resolve_short_names(df):
+    return run_adv_stats_cell(5, 'df', df=df.copy())
+
+# create function to run the two merges that open the RB/WR/TE feature cell of 01-calc_adv_stats.ipynb
+def merge_rbwrte(rbwrte_df, rb_df, rec_df):
+    return run_adv_stats_cell(20, 'rbwrte_df', 2, rbwrte_df=rbwrte_df, rb_df=rb_df, rec_df=rec_df)
+
+# create function to run the two merges that open the QB feature cell of 01-calc_adv_stats.ipynb
+def merge_qb(qb_df, qb_play_by_play_df, rb_df):
+    return run_adv_stats_cell(42, 'qb_df', 2, qb_df=qb_df, qb_play_by_play_df=qb_play_by_play_df, rb_df=rb_df)
@@ -0,0 +1,75 @@
+# concurrency stress check for the rankings callback
+#
+# fires many parallel rankings requests with mixed num_weeks values through the flask server and checks every
+# response against a single-threaded reference
+#
+# run from the repo root:  python benchmarks/stress_rankings.py [num_requests] [num_threads]
+
+# import needed packages
+import json
+import os
+import random
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import write_app_data
+
+# create function to post one rankings request and return the table rows
+def post_rankings(client, prefix, num_weeks):
+    # one page large enough for every matchup, in the default order
+    body = {'output': '..rankings_table.data...rankings_table.page_count..',
+            'outputs': [{'id': 'rankings_table', 'property': 'data'}, {'id': 'rankings_table', 'property': 'page_count'}],
+            'inputs': [{'id': 'input_range', 'property': 'value', 'value': num_weeks},
+                       {'id': 'rankings_table', 'property': 'page_current', 'value': 0},
+                       {'id': 'rankings_table', 'property': 'page_size', 'value': 1000},
+                       {'id': 'rankings_table', 'property': 'sort_by', 'value': []},
+                       {'id': 'rankings_table', 'property': 'filter_query', 'value': ''}],
+            'changedPropIds': ['input_range.value']
+           }
+    r = client.post(prefix + '_dash-update-component', json=body)
+    if r.status_code != 200:
+        raise RuntimeError(f'num_weeks={num_weeks}: status {r.status_code}')
+    return json.loads(r.get_data())['response']['rankings_table']['data']
+
+def main(num_requests=2000, num_threads=32):
+    os.chdir(write_app_data(tempfile.mkdtemp(prefix='ff_stress_')))
+    import app
+    from rankings import rankings_table
+
+    # turn the response cache off so every request runs the callback
+    app.cache.max_size = 0
+
+    # build the single-threaded reference for every window size
+    snapshot = app.snapshots.current
+    max_week = int(snapshot.tm_game_data['week'].max())
+    reference = {n: json.loads(json.dumps(rankings_table(snapshot.week_store, snapshot.this_week, n)))
+                 for n in range(1, max_week + 1)}
+
+    rng = random.Random(0)
+    windows = [rng.randint(1, max_week) for _ in range(num_requests)]
+    prefix = app.app.config.routes_pathname_prefix
+
+    # give each thread its own test client, same as separate gunicorn worker threads
+    def worker(chunk):
+        client = app.server.test_client()
+        return [(n, post_rankings(client, prefix, n)) for n in chunk]
+
+    chunks = [windows[i::num_threads] for i in range(num_threads)]
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        results = [row for rows in pool.map(worker, chunks) for row in rows]
+
+    mismatches = [n for n, rows in results if rows != reference[n]]
+    print(f'{len(results)} requests on {num_threads} threads, {len(mismatches)} mismatches')
+
+    # make sure repeated requests never stack the "@" prefix
+    assert not any(r['team_abv'].startswith('@@') or r['oppn'].startswith('@@') for _, rows in results for r in rows)
+    return len(mismatches) == 0
+
+if __name__ == '__main__':
+    args = [int(i) for i in sys.argv[1:3]]
+    sys.exit(0 if main(*args) else 1)
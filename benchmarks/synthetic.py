@@ -0,0 +1,589 @@
+# synthetic data generators for the benchmarks, shaped like the csv files the app reads
+
+# import needed packages
+import numpy as np
+import pandas as pd
+
+# create list of nfl team abbreviations used for a full 32 team slate
+nfl_teams = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
+             'LA', 'LAC', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG', 'NYJ', 'PHI', 'PIT', 'SEA', 'SF', 'TB', 'TEN', 'WAS']
+
+# create dictionary of tm_game_data stat columns and the (low, high) range of their weekly values
+tm_game_stat_ranges = {'pass_tds': (0, 5), 'pass_tds_alw': (0, 5),
+                       'tot_yrds_pass': (100, 450), 'tot_yrds_pass_alw': (100, 450),
+                       'pass_att': (20, 50), 'pass_att_alw': (20, 50),
+                       '1st_dwn_pass': (5, 25), '1st_dwn_pass_alw': (5, 25),
+                       'rush_tds': (0, 4), 'rush_tds_alw': (0, 4),
+                       'tot_rush_yrds': (40, 250), 'tot_rush_yrds_alw': (40, 250),
+                       'rush_att': (15, 40), 'rush_att_alw': (15, 40),
+                       '1st_dwn_rush': (2, 15), '1st_dwn_rush_alw': (2, 15),
+                       'tot_rec_yrds': (100, 450), 'tot_rec_yrds_alw': (100, 450),
+                       'rec_targets': (20, 50), 'rec_targets_alw': (20, 50),
+                       'tot_rec': (12, 35), 'tot_rec_alw': (12, 35),
+                       'def_tds': (0, 2), 'def_tds_alw': (0, 2),
+                       'kick_ret_tds': (0, 1), 'kick_ret_tds_alw': (0, 1),
+                       'punt_ret_tds': (0, 1), 'punt_ret_tds_alw': (0, 1),
+                       'kick_ret_yrds': (0, 150), 'kick_ret_yrds_alw': (0, 150),
+                       'punt_ret_yrds': (0, 80), 'punt_ret_yrds_alw': (0, 80),
+                       'fumble_rec': (0, 3), 'fumble_lost': (0, 3),
+                       'def_ints': (0, 3), 'def_ints_alw': (0, 3), 'int_thrown': (0, 3),
+                       'tot_sck': (0, 6), 'sacks_taken': (0, 6),
+                       'kick_pts': (0, 15), 'kick_pts_alw': (0, 15),
+                       'redzone_con': (0, 5), 'redzone_att': (1, 7),
+                       'redzone_con_alw': (0, 5), 'redzone_att_alw': (1, 7)
+}
+
+# create function to build a list of team abbreviations of any size
+def make_teams(num_teams):
+    if num_teams <= len(nfl_teams):
+        return nfl_teams[:num_teams]
+    return [f'T{i:04d}' for i in range(num_teams)]
+
+# create function to build a synthetic tm_game_data dataframe (one row per team per week)
+def make_tm_game_data(num_teams=32, num_weeks=17, bye_rate=0.06, seed=0):
+    '''
+    Function to create a synthetic team game log shaped like tm_game_data.csv
+
+    param num_teams: number of nfl teams
+    param num_weeks: number of weeks in the season
+    param bye_rate: fraction of team weeks dropped to mimic bye weeks
+    param seed: random seed
+
+    returns: pandas dataframe with week, team_abv, and every stat column read by the rankings table
+    '''
+
+    rng = np.random.default_rng(seed)
+    teams = make_teams(num_teams)
+
+    # create every team/week pair then drop a few to mimic byes, keeping the first and last weeks complete since the
+    # nfl schedules no byes there (so every window has a game for every team)
+    week = np.repeat(np.arange(1, num_weeks + 1), num_teams)
+    team_abv = np.tile(np.array(teams, dtype=object), num_weeks)
+    keep = (rng.random(len(week)) >= bye_rate) | (week == 1) | (week == num_weeks)
+
+    data = {'week': week[keep], 'team_abv': team_abv[keep]}
+    for col, (low, high) in tm_game_stat_ranges.items():
+        data[col] = rng.integers(low, high + 1, size=keep.sum())
+
+    return pd.DataFrame(data)
+
+# create function to build a synthetic this_week dataframe pairing every team with an opponent
+def make_this_week(num_teams=32, week=18, seed=0):
+    '''
+    Function to create a synthetic weekly schedule shaped like this_week.csv
+
+    param num_teams: number of nfl teams (must be even)
+    param week: week number of the schedule
+    param seed: random seed
+
+    returns: pandas dataframe with week, team_abv, oppn, and home with one row per team
+    '''
+
+    rng = np.random.default_rng(seed)
+    teams = np.array(make_teams(num_teams), dtype=object)
+    order = rng.permutation(num_teams)
+    away, home = teams[order[0::2]], teams[order[1::2]]
+
+    # list each game from both sides so every team has its own row
+    return pd.DataFrame({'week': week,
+                         'team_abv': np.concatenate([away, home]),
+                         'oppn': np.concatenate([home, away]),
+                         'home': np.concatenate([np.zeros(len(away), dtype=bool), np.ones(len(home), dtype=bool)])
+                        })
+
+# create list of (lineup_slot_name, slot_id, position_name) for each of the 20 roster spots in a weekly lineup
+roster_slots = [('QB', 0, 'QB'), ('RB', 2, 'RB'), ('RB', 2, 'RB'), ('WR', 4, 'WR'), ('WR', 4, 'WR'), ('WR', 4, 'WR'),
+                ('TE', 6, 'TE'), ('Flex', 3, 'RB'), ('Def', 16, 'DEF'), ('K', 17, 'KR'),
+                ('Bench', 20, 'QB'), ('Bench', 20, 'RB'), ('Bench', 20, 'RB'), ('Bench', 20, 'RB'),
+                ('Bench', 20, 'WR'), ('Bench', 20, 'WR'), ('Bench', 20, 'WR'), ('Bench', 20, 'TE'),
+                ('Bench', 20, 'DEF'), ('Bench', 20, 'RB')]
+
+# create list of injury statuses and how often each shows up on a roster
+inj_statuses = ['ACTIVE', 'QUESTIONABLE', 'SUSPENSION', 'OUT']
+inj_status_rates = [0.725, 0.19, 0.05, 0.035]
+
+# create dictionary of the league sizes the benchmarks run at
+scales = {'current': {'num_leagues': 1, 'num_teams': 10, 'num_seasons': 1, 'num_weeks': 17, 'num_nfl_teams': 32},
+          'x100': {'num_leagues': 10, 'num_teams': 10, 'num_seasons': 10, 'num_weeks': 17, 'num_nfl_teams': 320}
+}
+
+# create function to name every fantasy team in every league
+def make_owner_teams(num_leagues=1, num_teams=10):
+    return [(f'League {i:03d} Team {j:02d}', f'Owner {i:03d}-{j:02d}') for i in range(num_leagues) for j in range(num_teams)]
+
+# create function to build a synthetic rosters_df dataframe (one row per roster spot per team per week)
+def make_rosters_df(num_leagues=1, num_teams=10, num_seasons=1, num_weeks=17, first_season=2020, seed=0):
+    '''
+    Function to create synthetic weekly rosters shaped like rosters_df.csv
+
+    param num_leagues: number of fantasy leagues
+    param num_teams: number of fantasy teams per league
+    param num_seasons: number of seasons per league
+    param num_weeks: number of weeks per season
+    param first_season: year of the first season
+    param seed: random seed
+
+    returns: pandas dataframe with the rosters_df.csv columns and 20 rows per team per week
+    '''
+
+    rng = np.random.default_rng(seed)
+    owner_teams = make_owner_teams(num_leagues, num_teams)
+    num_slots = len(roster_slots)
+    num_rows = num_seasons * num_weeks * len(owner_teams) * num_slots
+
+    # lay out every (season, week, team, slot) in the order the scraper writes them
+    year = np.repeat(np.arange(first_season, first_season + num_seasons), num_weeks * len(owner_teams) * num_slots)
+    week = np.tile(np.repeat(np.arange(1, num_weeks + 1), len(owner_teams) * num_slots), num_seasons)
+    team = np.tile(np.repeat(np.arange(len(owner_teams)), num_slots), num_seasons * num_weeks)
+    slot = np.tile(np.arange(num_slots), num_seasons * num_weeks * len(owner_teams))
+
+    # draw players from a pool that grows with the number of teams, each player sticking to one pro team
+    players = np.array([f'Player {i:05d}' for i in range(max(num_leagues * num_teams * 32, 1))], dtype=object)
+    player = rng.integers(0, len(players), size=num_rows)
+    nfl_abv = np.array(nfl_teams, dtype=object)
+
+    slot_name, slot_id, position_name = (np.array(i, dtype=object) for i in zip(*roster_slots))
+    owner_team, owner = (np.array(i, dtype=object) for i in zip(*owner_teams))
+
+    return pd.DataFrame({'year': year,
+                         'week': week,
+                         'owner_team': owner_team[team],
+                         'owner': owner[team],
+                         'player': players[player],
+                         'pro_team': 'Pro ' + nfl_abv[player % len(nfl_abv)],
+                         'pro_team_abv': nfl_abv[player % len(nfl_abv)],
+                         'current_inj_status': rng.choice(np.array(inj_statuses, dtype=object), size=num_rows,
+                                                          p=inj_status_rates),
+                         'lineup_slot_name': slot_name[slot],
+                         'position_name': position_name[slot],
+                         'proj_points': rng.gamma(2.0, 5.0, size=num_rows),
+                         'actual_points': np.round(rng.gamma(1.5, 6.0, size=num_rows), 1),
+                         'slot_id': slot_id[slot].astype(np.int64)
+                        })
+
+# create function to build a synthetic matchups_df dataframe (one row per team per week, both sides of every game)
+def make_matchups_df(num_leagues=1, num_teams=10, num_seasons=1, num_weeks=16, first_season=2020, seed=0):
+    '''
+    Function to create synthetic weekly matchups shaped like matchups_df.csv
+
+    param num_leagues: number of fantasy leagues
+    param num_teams: number of fantasy teams per league (must be even)
+    param num_seasons: number of seasons per league
+    param num_weeks: number of weeks per season
+    param first_season: year of the first season
+    param seed: random seed
+
+    returns: pandas dataframe with the matchups_df.csv columns (plus year when there is more than one season)
+    '''
+
+    rng = np.random.default_rng(seed)
+    owner_team, owner = (np.array(i, dtype=object) for i in zip(*make_owner_teams(num_leagues, num_teams)))
+    frames = []
+    for season in range(first_season, first_season + num_seasons):
+        for week in range(1, num_weeks + 1):
+            # pair up the teams of each league at random
+            order = np.concatenate([i * num_teams + rng.permutation(num_teams) for i in range(num_leagues)])
+            home, away = order[0::2], order[1::2]
+            team = np.concatenate([home, away])
+            opp = np.concatenate([away, home])
+            score = np.round(rng.normal(125, 25, size=len(owner_team)), 1)
+            frames.append(pd.DataFrame({'year': season,
+                                        'week': week,
+                                        'owner_team_name': owner_team[team],
+                                        'owner': owner[team],
+                                        'score': score[team],
+                                        'win': (score[team] > score[opp]).astype(np.int64),
+                                        'opp_owner_team_name': owner_team[opp],
+                                        'opp_owner': owner[opp],
+                                        'opp_score': score[opp]
+                                       }))
+
+    matchups_df = pd.concat(frames, ignore_index=True)
+    return matchups_df if num_seasons > 1 else matchups_df.drop(columns='year')
+
+# create function to build win_loss_df from a matchups dataframe the way the transform notebook does
+def make_win_loss_df(matchups_df):
+    '''
+    Function to total each team's record shaped like win_loss_df.csv
+
+    param matchups_df: pandas dataframe returned by make_matchups_df
+
+    returns: pandas dataframe with owner_team_name, wins, losses, points_for, and points_against
+    '''
+
+    win_loss_df = matchups_df.groupby('owner_team_name').agg(wins=('win', 'sum'), games=('win', 'size'),
+                                                             points_for=('score', 'sum'),
+                                                             points_against=('opp_score', 'sum')).reset_index()
+    win_loss_df['losses'] = win_loss_df['games'] - win_loss_df['wins']
+    win_loss_df[['points_for', 'points_against']] = win_loss_df[['points_for', 'points_against']].round(1)
+    return win_loss_df[['owner_team_name', 'wins', 'losses', 'points_for', 'points_against']]
+
+# create function to build every app data file at one of the benchmark scales
+def make_league_data(num_leagues=1, num_teams=10, num_seasons=1, num_weeks=17, num_nfl_teams=32, seed=0):
+    '''
+    Function to create every data file app.py reads at a given scale
+
+    tm_game_data has no season column, so extra seasons are laid end to end as later weeks.
+
+    param num_leagues: number of fantasy leagues
+    param num_teams: number of fantasy teams per league
+    param num_seasons: number of seasons per league
+    param num_weeks: number of weeks per season
+    param num_nfl_teams: number of nfl teams in tm_game_data and this_week
+    param seed: random seed
+
+    returns: dictionary of csv file name to pandas dataframe
+    '''
+
+    matchups_df = make_matchups_df(num_leagues, num_teams, num_seasons, num_weeks - 1, seed=seed)
+    total_weeks = num_seasons * num_weeks
+    return {'win_loss_df.csv': make_win_loss_df(matchups_df),
+            'matchups_df.csv': matchups_df,
+            'rosters_df.csv': make_rosters_df(num_leagues, num_teams, num_seasons, num_weeks, seed=seed),
+            'tm_game_data.csv': make_tm_game_data(num_nfl_teams, total_weeks, seed=seed),
+            'this_week.csv': make_this_week(num_nfl_teams, total_weeks + 1, seed=seed)
+           }
+
+# create list of the espn team ids of the league's owners (the keys of owner_team_codes in the ingest notebook)
+espn_team_ids = [1, 2, 4, 6, 7, 8, 9, 10, 11, 15]
+
+# create dictionary of espn lineup slot id to the position id of the players that fill it
+espn_slot_positions = {0: 1, 2: 2, 3: 2, 4: 3, 6: 4, 16: 16, 17: 5, 20: 2}
+
+# create list of espn pro team ids (the keys of pro_team_codes in the ingest notebook, minus free agents)
+espn_pro_team_ids = list(range(1, 31)) + [33, 34]
+
+# create function to build one week of an espn league api response (view=mMatchup&view=mMatchupScore)
+def make_espn_week(season=2020, week=1, num_teams=10, num_weeks=17, latest_week=None, num_stats=40, seed=0):
+    '''
+    Function to create a synthetic espn fantasy api response for one scoring period
+
+    Only the keys the ingest notebooks read are filled in: seasonId, scoringPeriodId, status, each team's roster
+    entries with their player stats, and the season schedule.  Players keep the same team, name, and position every
+    week so rosters line up across weeks.
+
+    param season: season year
+    param week: scoring period of the response
+    param num_teams: number of fantasy teams (up to len(espn_team_ids))
+    param num_weeks: number of scoring periods in the season schedule
+    param latest_week: latest scoring period espn has played (defaults to num_weeks, a finished season)
+    param num_stats: number of stat codes on each player stat line
+    param seed: random seed
+
+    returns: dictionary shaped like the json the espn api returns
+    '''
+
+    latest_week = num_weeks if latest_week is None else latest_week
+    team_ids = espn_team_ids[:num_teams]
+    week_rng = np.random.default_rng([seed, season, week])
+
+    teams = []
+    for team_id in team_ids:
+        # draw the team's players from a generator seeded by team so the roster is the same every week
+        team_rng = np.random.default_rng([seed, season, team_id])
+        entries = []
+        for slot, (_, slot_id, _) in enumerate(roster_slots):
+            slot_id = int(slot_id)
+            pro_team_id = int(team_rng.choice(espn_pro_team_ids))
+            stats = []
+
+            # espn also lists the player's season totals and the previous week, which the parsers skip
+            for stat_week, source in [(week, 0), (week, 1), (0, 0), (week - 1, 0)]:
+                codes = sorted(week_rng.choice(120, size=num_stats, replace=False).tolist())
+                values = np.round(week_rng.gamma(1.5, 4.0, size=num_stats), 1).tolist()
+                stats.append({'scoringPeriodId': stat_week,
+                              'seasonId': season,
+                              'statSourceId': source,
+                              'statSplitTypeId': 1,
+                              # bye weeks and free agents show up as a stat line without a pro team
+                              'proTeamId': 0 if week_rng.random() < 0.05 else pro_team_id,
+                              'appliedTotal': float(np.round(week_rng.gamma(1.5, 6.0), 2)),
+                              'appliedStats': {str(c): v for c, v in zip(codes[:num_stats // 2], values)},
+                              'stats': {str(c): v for c, v in zip(codes, values)}
+                             })
+
+            player = {'fullName': f'Player {team_id:02d}-{slot:02d}',
+                      'defaultPositionId': espn_slot_positions[slot_id],
+                      'injuryStatus': str(week_rng.choice(inj_statuses, p=inj_status_rates)),
+                      'proTeamId': pro_team_id,
+                      'stats': stats
+                     }
+
+            # team defenses carry no injury status
+            if slot_id == 16:
+                del player['injuryStatus']
+            entries.append({'lineupSlotId': slot_id,
+                            'playerId': int(team_id * 1000 + slot),
+                            'playerPoolEntry': {'player': player}
+                           })
+        teams.append({'id': team_id, 'roster': {'entries': entries}})
+
+    # pair the teams the same way every week of a season and decide every game played so far, the last matchup period
+    # being a two week playoff matchup
+    schedule_rng = np.random.default_rng([seed, season])
+    schedule = []
+    for period in range(1, num_weeks):
+        periods = [period, period + 1] if period == num_weeks - 1 else [period]
+        played = periods[-1] <= latest_week
+        order = schedule_rng.permutation(team_ids).tolist()
+        for away, home in zip(order[0::2], order[1::2]):
+            away_points = {str(i): float(np.round(schedule_rng.normal(125, 25), 1)) for i in periods}
+            home_points = {str(i): float(np.round(schedule_rng.normal(125, 25), 1)) for i in periods}
+            winner = 'AWAY' if sum(away_points.values()) > sum(home_points.values()) else 'HOME'
+            schedule.append({'matchupPeriodId': period,
+                             'winner': winner if played else 'UNDECIDED',
+                             'away': {'teamId': away, 'pointsByScoringPeriod': away_points if played else {}},
+                             'home': {'teamId': home, 'pointsByScoringPeriod': home_points if played else {}}
+                            })
+
+    return {'gameId': 1,
+            'seasonId': season,
+            'scoringPeriodId': week,
+            'segmentId': 0,
+            'status': {'isActive': latest_week < num_weeks, 'latestScoringPeriod': latest_week,
+                       'finalScoringPeriod': num_weeks},
+            'teams': teams,
+            'schedule': schedule
+           }
+
+# create list of nflfastR play types and how often they occur
+pbp_play_types = ['pass', 'run', 'punt', 'field_goal', 'extra_point', 'kickoff', 'no_play', None]
+pbp_play_type_rates = [0.40, 0.30, 0.05, 0.02, 0.03, 0.06, 0.06, 0.08]
+
+# create list of nflfastR drive end transitions
+pbp_drive_ends = ['TOUCHDOWN', 'FIELD_GOAL', 'PUNT', 'INTERCEPTION', 'FUMBLE', 'DOWNS', 'END_GAME', 'BLOCKED_FG']
+
+# create function to make a season of play-by-play shaped like an nflfastR play_by_play_<year>.csv
+def make_play_by_play(season=2020, num_weeks=17, num_teams=32, plays_per_game=170, num_columns=371, seed=0):
+    '''
+    Function to make one season of synthetic play-by-play data
+
+    Besides the columns 01-calc_adv_stats.ipynb reads, the frame is padded with numerical and text columns up to the
+    width of the real files, and plays without a team in possession (timeouts, quarter ends) have no posteam/defteam.
+
+    param season: season year
+    param num_weeks: number of weeks
+    param num_teams: number of nfl teams (each plays once a week)
+    param plays_per_game: number of plays per game
+    param num_columns: total number of columns
+    param seed: random seed
+
+    returns: pandas dataframe with one row per play
+    '''
+
+    rng = np.random.default_rng(seed + season)
+    teams = (nfl_teams * (num_teams // len(nfl_teams) + 1))[:num_teams]
+    if num_teams > len(nfl_teams):
+        teams = [f'{j}{i // len(nfl_teams)}' if i >= len(nfl_teams) else j for i, j in enumerate(teams)]
+
+    # pair the teams of each week into games and repeat each game's teams once per play
+    games = []
+    for week in range(1, num_weeks + 1):
+        order = rng.permutation(num_teams)
+        games += [(week, teams[order[i]], teams[order[i + 1]]) for i in range(0, num_teams - 1, 2)]
+    n = len(games) * plays_per_game
+    game = np.repeat(np.arange(len(games)), plays_per_game)
+    week = np.array([i[0] for i in games])[game]
+    home, away = np.array([i[1] for i in games])[game], np.array([i[2] for i in games])[game]
+
+    play_type = rng.choice(np.array(pbp_play_types, dtype=object), n, p=pbp_play_type_rates)
+    offense = rng.random(n) < 0.5
+    posteam = np.where(offense, home, away).astype(object)
+    defteam = np.where(offense, away, home).astype(object)
+    no_team = pd.isna(play_type) & (rng.random(n) < 0.7)
+    posteam[no_team], defteam[no_team] = np.nan, np.nan
+
+    rush = (play_type == 'run').astype(float)
+    pass_ = (play_type == 'pass').astype(float)
+    sack = pass_ * (rng.random(n) < 0.07)
+    complete = pass_ * (1 - sack) * (rng.random(n) < 0.64)
+    yards = np.round(rng.normal(5, 8, n)).clip(-15, 99)
+    air_yards = np.where(pass_ == 1, np.round(rng.normal(8, 9, n)).clip(-5, 60), np.nan)
+    touchdown = (rng.random(n) < 0.04) * ((rush == 1) | (complete == 1))
+
+    # players are numbered within their team so names and ids repeat across weeks
+    def players(prefix, mask, num):
+        number = rng.integers(0, num, n)
+        ids = np.array([f'00-{prefix}{t}{i:02d}' for t, i in zip(posteam, number)], dtype=object)
+        names = np.array([f'{chr(65 + i % 26)}.{prefix}{t}{i}' for t, i in zip(posteam, number)], dtype=object)
+        ids[~mask], names[~mask] = np.nan, np.nan
+        return ids, names
+
+    has_team = pd.notna(posteam)
+    rusher_id, rusher_name = players('R', (rush == 1) & has_team, 4)
+    receiver_id, receiver_name = players('C', (pass_ == 1) & (sack == 0) & has_team & (rng.random(n) < 0.95), 8)
+    passer_id, passer_name = players('P', (pass_ == 1) & has_team, 2)
+
+    def flag(p, mask=None):
+        values = (rng.random(n) < p).astype(float)
+        return np.where(mask, values, np.nan) if mask is not None else values
+
+    penalty = rng.random(n) < 0.07
+    df = pd.DataFrame({'play_id': np.arange(1, n + 1),
+                       'game_id': [f'{season}_{w:02d}_{a}_{h}' for w, h, a in games for _ in range(plays_per_game)],
+                       'home_team': home,
+                       'away_team': away,
+                       'week': week,
+                       'posteam': posteam,
+                       'defteam': defteam,
+                       'yardline_100': rng.integers(1, 100, n).astype(float),
+                       'drive': (np.arange(n) % plays_per_game) // 6 + 1.0,
+                       'play_type': play_type,
+                       'yards_gained': yards,
+                       'shotgun': flag(0.6),
+                       'no_huddle': flag(0.1),
+                       'qb_dropback': pass_,
+                       'qb_kneel': flag(0.01),
+                       'qb_spike': flag(0.005),
+                       'qb_scramble': flag(0.03),
+                       'pass_length': np.where(pass_ == 1, np.where(air_yards > 15, 'deep', 'short'), np.nan).astype(object),
+                       'pass_location': np.where(pass_ == 1, rng.choice(['left', 'middle', 'right'], n), np.nan).astype(object),
+                       'air_yards': air_yards,
+                       'yards_after_catch': np.where(complete == 1, np.round(rng.exponential(5, n)), np.nan),
+                       'field_goal_result': np.where(play_type == 'field_goal', rng.choice(['made', 'missed'], n, p=[0.85, 0.15]),
+                                                     np.nan).astype(object),
+                       'incomplete_pass': pass_ * (1 - sack) * (1 - complete),
+                       'complete_pass': complete,
+                       'pass_attempt': pass_,
+                       'rush_attempt': rush,
+                       'touchdown': touchdown.astype(float),
+                       'interception': pass_ * (rng.random(n) < 0.025),
+                       'fumble_lost': flag(0.005),
+                       'qb_hit': pass_ * (rng.random(n) < 0.15),
+                       'sack': sack,
+                       'ep': rng.normal(1.5, 1.5, n),
+                       'epa': rng.normal(0, 1.4, n),
+                       'air_epa': np.where(pass_ == 1, rng.normal(0.5, 1.2, n), np.nan),
+                       'comp_air_epa': np.where(pass_ == 1, rng.normal(0.3, 1.0, n), np.nan),
+                       'qb_epa': np.where(pass_ == 1, rng.normal(0, 1.4, n), np.nan),
+                       'air_wpa': np.where(pass_ == 1, rng.normal(0.01, 0.03, n), np.nan),
+                       'comp_air_wpa': np.where(pass_ == 1, rng.normal(0.01, 0.02, n), np.nan),
+                       'penalty_team': np.where(penalty, np.where(rng.random(n) < 0.5, posteam, defteam), np.nan).astype(object),
+                       'penalty_yards': np.where(penalty, rng.choice([5.0, 10.0, 15.0], n), np.nan),
+                       'passer_player_id': passer_id,
+                       'passer_player_name': passer_name,
+                       'passing_yards': np.where(complete == 1, yards, np.nan),
+                       'receiver_player_id': receiver_id,
+                       'receiver_player_name': receiver_name,
+                       'rushing_yards': np.where(rush == 1, yards, np.nan),
+                       'rusher_player_id': rusher_id,
+                       'rusher_player_name': rusher_name,
+                       'drive_ended_with_score': flag(0.35),
+                       'drive_end_transition': rng.choice(np.array(pbp_drive_ends, dtype=object), n)
+                      })
+
+    # pad with the other columns of the real files, mostly numerical with some text
+    extra = {}
+    for i in range(num_columns - df.shape[1]):
+        if i % 5 == 0:
+            extra[f'extra_text_{i}'] = rng.choice(np.array(['a', 'bb', 'ccc', np.nan], dtype=object), n)
+        else:
+            extra[f'extra_{i}'] = np.where(rng.random(n) < 0.3, np.nan, rng.normal(0, 10, n).round(3))
+    return pd.concat([df, pd.DataFrame(extra)], axis=1)
+
+# create list of the roster stat columns 01-calc_adv_stats.ipynb reads for RBs, WRs, TEs, and QBs
+roster_stat_columns = ['pass_comp', 'pass_incomp', 'pass_yrd', 'pass_td', 'pass_2pt_con', 'pass_int', 'rush_att', 'rush_yrd',
+                       'rush_td', 'rush_2pt_con', 'rec_tar', 'receptions', 'rec_yrd', 'rec_td', 'rec_2pt_con', 'fum_lost',
+                       'pass_comp_ff', 'pass_incomp_ff', 'pass_5_yrd_ff', 'pass_yrd_300_399_ff', 'pass_yrd_400+_ff',
+                       'pass_td_ff', 'pass_50_yrd_td_ff', 'pass_2pt_con_ff', 'pass_int_ff', 'rush_5_yrd_ff',
+                       'rush_yrd_100_199_ff', 'rush_yrd_200+_ff', 'rush_td_ff', 'rush_50_yrd_td_ff', 'rush_2pt_con_ff',
+                       'receptions_ff', 'rec_5_yrd_ff', 'rec_yrd_100_199_ff', 'rec_yrd_200+_ff', 'rec_td_ff',
+                       'rec_50_yrd_td_ff', 'rec_2pt_con_ff_ff', 'fum_lost_ff', 'actual_points']
+
+# create function to build a synthetic rosters_df_w_scoring dataframe whose players are the play-by-play players
+def make_roster_scoring(play_by_play_df, num_leagues=1, extra_players=(), seed=0):
+    '''
+    Function to create synthetic weekly RB/WR/TE/QB roster rows shaped like rosters_df_w_scoring.csv
+
+    Every rusher (RB), receiver (WR/TE), and passer (QB) of each team season of the play-by-play is rostered every week,
+    with an ESPN style full name whose first initial and last name give back the play-by-play name (some with a Jr.
+    suffix), once per league.
+
+    param play_by_play_df: pandas dataframe returned by make_play_by_play (with a year column) for one or more seasons
+    param num_leagues: number of leagues rostering every player
+    param extra_players: list of (player, pro_team_abv, year, position_name) rows rostered every week on top
+    param seed: random seed
+
+    returns: pandas dataframe with the player, team, year, week, position, and roster_stat_columns columns
+    '''
+
+    rng = np.random.default_rng(seed)
+    players = []
+    for name_column, positions in [('rusher_player_name', ['RB']), ('receiver_player_name', ['WR', 'TE']),
+                                   ('passer_player_name', ['QB'])]:
+        found = play_by_play_df[['year', 'posteam', name_column]].dropna().drop_duplicates()
+        suffix = np.where(rng.random(len(found)) < 0.1, ' Jr.', '')
+        players += [(f'{n[0]}ndy {n[2:]}{s}', t, y, positions[i % len(positions)])
+                    for i, (y, t, n, s) in enumerate(zip(found['year'], found['posteam'], found[name_column], suffix))]
+    players += list(extra_players)
+
+    player, team, year, position = (np.array(i, dtype=object) for i in zip(*players))
+    num_weeks = int(play_by_play_df['week'].max())
+    rows = np.tile(np.repeat(np.arange(len(players)), num_weeks), num_leagues)
+    week = np.tile(np.arange(1, num_weeks + 1), len(players) * num_leagues)
+
+    df = pd.DataFrame({'year': year[rows].astype(np.int64),
+                       'week': week,
+                       'player': player[rows],
+                       'position_name': position[rows],
+                       'pro_team': 'Pro ' + team[rows],
+                       'pro_team_abv': team[rows]
+                      })
+    stats = pd.DataFrame(rng.integers(0, 10, size=(len(df), len(roster_stat_columns))).astype(float),
+                         columns=roster_stat_columns)
+    return pd.concat([df, stats], axis=1)
+
+# create function to build a synthetic position group feature matrix for the players of a rosters dataframe
+def make_feature_matrix(rosters_df, positions, num_features=15, play_rate=0.85, seed=0):
+    '''
+    Function to create a synthetic <group>_feature_matrix.csv for the rostered players of some positions
+
+    param rosters_df: pandas dataframe returned by make_rosters_df
+    param positions: list of the position_name values of the position group
+    param num_features: number of feature columns (fx_0, fx_1, ...)
+    param play_rate: share of rostered player weeks with a game
+    param seed: random seed
+
+    returns: pandas dataframe with year, week, player, position_name, the feature columns, and actual_points, one row
+             per player per week played
+    '''
+
+    rng = np.random.default_rng(seed)
+    df = rosters_df.loc[rosters_df['position_name'].isin(positions), ['year', 'week', 'player', 'position_name']]
+    df = df.drop_duplicates(['year', 'week', 'player']).sort_values(['year', 'week', 'player'])
+    df = df.loc[rng.random(len(df)) < play_rate].reset_index(drop=True)
+
+    features = pd.DataFrame(rng.gamma(2.0, 3.0, size=(len(df), num_features)).round(2),
+                            columns=[f'fx_{i}' for i in range(num_features)])
+    weights = np.linspace(1.5, 0.0, num_features)
+    features['actual_points'] = (features.to_numpy() @ weights / weights.sum() * 4 + rng.normal(0, 3, len(df))).round(1)
+    return pd.concat([df, features], axis=1)
+
+# create function to write a full set of app csv files so app.py can be imported offline
+def write_app_data(output_dir, num_teams=32, num_weeks=17, season=2020, seed=0):
+    '''
+    Function to write the csv files app.py reads at import time into output_dir
+
+    The league files (win_loss_df, matchups_df, rosters_df) are copied from data/<season> and the nfl team files
+    (tm_game_data, this_week) are synthetic since they are not kept in the repo.
+
+    param output_dir: directory to write the csv files to
+    param num_teams: number of nfl teams in tm_game_data and this_week
+    param num_weeks: number of weeks in tm_game_data
+    param season: season folder under data/ to copy the league files from
+    param seed: random seed
+
+    returns: output_dir
+    '''
+
+    import os
+    import shutil
+
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', str(season))
+    os.makedirs(output_dir, exist_ok=True)
+    for name in ['win_loss_df', 'matchups_df', 'rosters_df']:
+        shutil.copyfile(os.path.join(data_dir, f'{name}_{season}.csv'), os.path.join(output_dir, f'{name}.csv'))
+
+    make_tm_game_data(num_teams, num_weeks, seed=seed).to_csv(os.path.join(output_dir, 'tm_game_data.csv'), index=False)
+    make_this_week(num_teams, num_weeks + 1, seed=seed).to_csv(os.path.join(output_dir, 'this_week.csv'), index=False)
+    return output_dir
@@ -0,0 +1,176 @@
+# import needed packages
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import flask
+
+# create function to build a version token from the size and modified time of each data file
+def file_version(paths):
+    '''
+    Function to create a data version token for a list of data files
+
+    param paths: list of file paths
+
+    returns: short hex string that changes whenever any file is added, removed, or rewritten
+    '''
+
+    h = hashlib.sha1()
+    for path in paths:
+        try:
+            st = os.stat(path)
+            h.update(f'{path}:{st.st_mtime_ns}:{st.st_size};'.encode())
+        except OSError:
+            h.update(f'{path}:missing;'.encode())
+    return h.hexdigest()[:16]
+
+# create class to cache serialized dash callback responses
+class callback_cache(object):
+    '''
+    Memoized, versioned cache of Dash callback responses
+
+    Every callback in the app is a pure function of its inputs and the loaded data, so the already-serialized JSON
+    response of /_dash-update-component is stored under a key of (callback output, input values, data version) and
+    replayed on later requests without running the callback or re-serializing its figure/table.  Entries are evicted
+    least recently used first once max_size is reached and the whole cache is dropped when the data version changes.
+
+    param version_func: function returning the current data version token
+    param max_size: maximum number of cached responses
+    param check_interval: minimum seconds between data version checks
+    '''
+
+    # create __init__ function
+    def __init__(self, version_func, max_size=512, check_interval=1.0):
+        self.version_func = version_func
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.version = version_func()
+        self.checked_at = time.monotonic()
+
+    # create function to drop every entry when the data version token changes
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return self.version
+        self.checked_at = now
+        version = self.version_func()
+        if version != self.version:
+            with self.lock:
+                self.entries.clear()
+                self.version = version
+        return version
+
+    # create function to force the next request to re-check the data version
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.version = self.version_func()
+            self.checked_at = time.monotonic()
+
+    # create function to build a cache key from a dash callback request body
+    def make_key(self, body):
+        inputs = json.dumps([body.get('inputs'), body.get('state')], sort_keys=True, separators=(',', ':'))
+        return (json.dumps(body.get('output')), inputs, self._check_version())
+
+    # create function to look up a serialized response
+    def get(self, key):
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    # create function to store a serialized response and evict the least recently used entries
+    def put(self, key, payload):
+        with self.lock:
+            if key[2] != self.version:
+                return
+            self.entries[key] = payload
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    # create function to report the cache counters
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / total if total else 0.0,
+                    'evictions': self.evictions,
+                    'entries': len(self.entries),
+                    'bytes': sum(len(i) for i in self.entries.values()),
+                    'version': self.version
+                   }
+
+    # create function to report the cache counters as metrics_registry collector samples
+    def metrics(self):
+        stats = self.stats()
+        return [('callback_cache_hits_total', (), stats['hits'], 'counter', 'Callback responses replayed from the cache'),
+                ('callback_cache_misses_total', (), stats['misses'], 'counter', 'Callback requests not in the cache'),
+                ('callback_cache_evictions_total', (), stats['evictions'], 'counter', 'Cached responses evicted'),
+                ('callback_cache_entries', (), stats['entries'], 'gauge', 'Cached responses'),
+                ('callback_cache_bytes', (), stats['bytes'], 'gauge', 'Bytes of cached responses')]
+
+    # create function to hook the cache into the dash app's flask server
+    def init_app(self, app):
+        server = app.server
+        path = app.config.routes_pathname_prefix + '_dash-update-component'
+
+        @server.before_request
+        def _serve_cached_response():
+            if flask.request.method != 'POST' or flask.request.path != path:
+                return None
+            body = flask.request.get_json(silent=True)
+            if body is None:
+                return None
+            key = self.make_key(body)
+            payload = self.get(key)
+            if payload is None:
+                flask.g.callback_cache_key = key
+                return None
+            return flask.Response(payload, mimetype='application/json')
+
+        @server.after_request
+        def _store_response(response):
+            key = flask.g.pop('callback_cache_key', None)
+            if key is not None and response.status_code == 200 and not response.direct_passthrough:
+                self.put(key, response.get_data())
+            return response
+
+    # create function to precompute every response in the callback input domain
+    def warm_up(self, app, requests):
+        '''
+        Function to run every callback request once so the cache starts full
+
+        param app: dash app the cache was added to with init_app
+        param requests: list of (output, [(component id, property, value), ...]) for each callback input combination
+                        (output as dash names it, e.g. "..table.data...table.page_count.." for several outputs)
+
+        returns: number of responses cached
+        '''
+
+        client = app.server.test_client()
+        path = app.config.routes_pathname_prefix + '_dash-update-component'
+        for output, inputs in requests:
+            # a callback with several outputs is named "..id.prop...id.prop.." and takes a list of outputs
+            outputs = [dict(zip(['id', 'property'], i.split('.', 1))) for i in output.strip('.').split('...')]
+            body = {'output': output,
+                    'outputs': outputs if output.startswith('..') else outputs[0],
+                    'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+                    'changedPropIds': [f'{i}.{p}' for i, p, v in inputs]
+                   }
+            client.post(path, json=body)
+        return len(self.entries)
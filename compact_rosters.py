@@ -0,0 +1,163 @@
+# compact in-memory representation for the weekly rosters frames (with or without the scoring columns)
+
+# import needed packages
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_table
+
+# create list of repeated string columns stored as categoricals
+category_columns = ['owner_team', 'owner', 'player', 'pro_team', 'pro_team_abv', 'current_inj_status',
+                    'lineup_slot_name', 'position_name']
+
+# create list of key columns kept as int64 so sort_values breaks ties in the same order as the csv frames
+int_columns = ['year', 'week', 'slot_id']
+
+# create list of point columns kept as float64 since they are not whole numbers
+point_columns = ['proj_points', 'actual_points']
+
+# create list of integer dtypes tried from smallest to largest
+small_ints = [np.int8, np.int16, np.int32, np.int64]
+
+# create function to find the smallest integer dtype that holds every value in an array
+def smallest_int(values):
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for dtype in small_ints:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+# create function to build the storage schema of a rosters frame
+def rosters_schema(df):
+    '''
+    Function to pick a compact dtype for every column of a rosters dataframe
+
+    param df: pandas dataframe read from rosters_df_<season>.csv or rosters_df_w_scoring_<season>.csv
+
+    returns: dictionary of column name to compact dtype.  Repeated strings become categoricals and the mostly zero
+             scoring event / player stat columns become sparse columns (filled with 0) of the smallest integer type
+             when every value is a whole number and float64 otherwise
+    '''
+
+    schema = {}
+    for col in df.columns:
+        values = df[col]
+        if col in category_columns:
+            schema[col] = 'category'
+        elif col in int_columns or col in point_columns or values.dtype.kind not in 'iuf' or values.isna().any():
+            schema[col] = values.dtype
+        else:
+            # every remaining numeric column is a scoring event or player stat column
+            array = values.to_numpy()
+            if np.array_equal(array, np.round(array)):
+                schema[col] = pd.SparseDtype(smallest_int(array), 0)
+            else:
+                schema[col] = pd.SparseDtype(np.float64, 0.0)
+    return schema
+
+# create function to shrink a rosters frame
+def compact_rosters(df, schema=None):
+    '''
+    Function to convert a rosters dataframe to its compact representation
+
+    param df: pandas dataframe with the original csv dtypes
+    param schema: dictionary returned by rosters_schema (built from df when None)
+
+    returns: pandas dataframe holding the same values in compact dtypes
+    '''
+
+    if schema is None:
+        schema = rosters_schema(df)
+    # columns already in their compact dtype (e.g. categoricals opened from the columnar store) are not copied
+    return df.astype(schema, copy=False)
+
+# create function to restore the original csv dtypes of a compact rosters frame
+def expand_rosters(df):
+    '''
+    Function to convert a compact rosters dataframe back to the dtypes pd.read_csv gives
+
+    Use it before handing a compact frame to code that selects float64/int64 columns (e.g. explore_util) or writes
+    new values into the categorical columns.
+
+    param df: pandas dataframe returned by compact_rosters
+
+    returns: pandas dataframe with object string columns and dense float64 stat columns
+    '''
+
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+        elif isinstance(values.dtype, pd.SparseDtype):
+            values = values.sparse.to_dense().astype(np.float64)
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+# create function to read a rosters file in compact form
+def read_rosters(source, compact=True):
+    '''
+    Function to read a rosters csv or pickle file, through the columnar store when it holds a current copy
+
+    param source: path to a rosters_df*.csv file or rosters_df_all.pkl
+    param compact: whether to return the compact representation
+
+    returns: pandas dataframe
+    '''
+
+    df = read_table(source)
+    return compact_rosters(df) if compact else df
+
+# create function to load one season's rosters in compact form
+def load_rosters(season, data_dir='data', scoring=True, compact=True):
+    '''
+    Function to load a season of weekly rosters
+
+    param season: season year
+    param data_dir: data directory
+    param scoring: whether to load rosters_df_w_scoring_<season>.csv instead of rosters_df_<season>.csv
+    param compact: whether to return the compact representation
+
+    returns: pandas dataframe
+    '''
+
+    name = f'rosters_df_w_scoring_{season}.csv' if scoring else f'rosters_df_{season}.csv'
+    return read_rosters(os.path.join(data_dir, str(season), name), compact)
+
+# create function to report the memory held by each season before and after compaction
+def rosters_memory_report(data_dir='data', scoring=True):
+    '''
+    Function to measure the bytes each season's rosters frame takes before and after compaction
+
+    param data_dir: data directory
+    param scoring: whether to measure the rosters_df_w_scoring_<season>.csv frames
+
+    returns: pandas dataframe with season, rows, columns, bytes_before, bytes_after, and ratio (plus a total row)
+    '''
+
+    seasons = sorted(int(os.path.basename(i)) for i in glob.glob(os.path.join(data_dir, '[0-9]' * 4)))
+    rows = []
+    for season in seasons:
+        df = load_rosters(season, data_dir, scoring=scoring, compact=False)
+        compact = compact_rosters(df)
+        rows.append({'season': season,
+                     'rows': len(df),
+                     'columns': len(df.columns),
+                     'bytes_before': int(df.memory_usage(deep=True).sum()),
+                     'bytes_after': int(compact.memory_usage(deep=True).sum())
+                    })
+
+    report = pd.DataFrame(rows)
+    total = report[['rows', 'bytes_before', 'bytes_after']].sum()
+    report = pd.concat([report, pd.DataFrame([{'season': 'total', 'rows': total['rows'], 'columns': np.nan,
+                                               'bytes_before': total['bytes_before'],
+                                               'bytes_after': total['bytes_after']}])], ignore_index=True)
+    report['ratio'] = report['bytes_before'] / report['bytes_after']
+    return report
+
+if __name__ == '__main__':
+    print(rosters_memory_report().to_string(index=False))
@@ -0,0 +1,370 @@
+# immutable snapshots of the app's data, reloaded in the background while the workers keep serving
+#
+# a data_snapshot holds the tables read from the data files and everything the callbacks serve from (aggregation
+# store, roster index and table view, predictions, rankings views, optimal lineups, figures, playoff odds, and the
+# all-time record book).  a snapshot_manager polls the data files, builds the next snapshot on a background thread
+# from the previous one (recomputing only what depends on the files and weeks that changed), then swaps it in with a
+# single reference assignment.  each request reads snapshot_manager.current once, so it sees one complete snapshot
+# from start to finish.
+#
+# touch the RELOAD file to have every worker rebuild its snapshot from scratch, or (with RELOAD_TOKEN set) POST /_reload
+# with that token to have one worker check its data files right away
+
+# import needed packages
+import contextlib
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+import flask
+import numpy as np
+
+from agg_store import week_agg_store, week_digests
+from compact_rosters import read_rosters
+from data_store import read_table
+from figures import load_figures
+from lineups import load_lineups, season_summary
+from playoff_odds import load_odds, regular_season_weeks
+from prediction_store import prediction_files, prediction_store
+from rankings import rankings_frame
+from record_book import all_matchups, read_matchups, record_book
+from roster_index import roster_index
+from table_view import table_view
+
+# create logger of the snapshot swaps and failed builds
+logger = logging.getLogger(__name__)
+
+# create dictionary of each table of a snapshot and the data file it is read from
+table_files = {'win_loss_df': 'win_loss_df.csv', 'matchups_df': 'matchups_df.csv', 'rosters_df': 'rosters_df.csv',
+               'tm_game_data': 'tm_game_data.csv', 'this_week': 'this_week.csv'}
+data_files = list(table_files.values())
+
+# create name of the file touched to force every worker to reload
+reload_file = 'RELOAD'
+
+# create list of the roster columns shown by default (the column chooser offers every column)
+roster_columns = ['year', 'week', 'owner_team', 'owner', 'player', 'pro_team', 'pro_team_abv', 'current_inj_status',
+                  'lineup_slot_name', 'position_name', 'proj_points', 'actual_points', 'slot_id', 'pred']
+
+# create function to read the size and modified time of each file
+def file_signatures(paths):
+    signatures = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signatures[path] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            signatures[path] = None
+    return signatures
+
+# create function to fingerprint the rows of each (year, week) of a rosters dataframe
+def roster_week_digests(rosters_df):
+    return {(int(year), week): digest for year, df in rosters_df.groupby('year', sort=False)
+            for week, digest in week_digests(df).items()}
+
+# create function used when no boot phase timer is given
+@contextlib.contextmanager
+def no_phase(name):
+    yield
+
+# create class to hold one version of the app's data and everything built from it
+class data_snapshot(object):
+    '''
+    One immutable version of the app's data and the structures the callbacks serve from
+
+    The file signatures are read before any file, so a file rewritten during the build reads as changed again on the
+    next check.  Given the previous snapshot, unchanged files are not read again and anything built only from
+    unchanged files is shared with it; the aggregation store, roster index, and predictions are updated for the weeks
+    whose rows changed.  Nothing is modified after __init__ returns.
+
+    param previous: optional data_snapshot of the data currently served
+    param phase: optional function returning a context manager that times a named build step (metrics.phase)
+    param data_dir: data directory holding the data/<season>/ roster files
+    '''
+
+    # create __init__ function
+    def __init__(self, previous=None, phase=None, data_dir='data'):
+        phase = phase or no_phase
+        self.signatures = file_signatures(data_files + prediction_files() + [reload_file])
+        self.version = hashlib.sha1(json.dumps(self.signatures, sort_keys=True).encode()).hexdigest()[:16]
+        self.created_at = time.time()
+
+        # touching the RELOAD file rebuilds everything from the files on disk
+        if previous is not None and previous.signatures.get(reload_file) != self.signatures[reload_file]:
+            previous = None
+        changed = set(i for i, j in self.signatures.items() if previous is None or previous.signatures.get(i) != j)
+        self.rebuilt = []
+
+        # create function to check whether a part built from some data files can be shared with the previous snapshot
+        def reuse(*paths):
+            return previous is not None and not changed.intersection(paths)
+
+        ########### read in data
+        # tables are opened memory mapped from the columnar store (python data_store.py convert) when it holds a
+        # current copy, and the rosters are kept in their compact form (see compact_rosters.py)
+        with phase('read_data'):
+            for name, path in table_files.items():
+                if reuse(path):
+                    setattr(self, name, getattr(previous, name))
+                    continue
+                df = read_rosters(path) if name == 'rosters_df' else read_table(path)
+                if name == 'win_loss_df':
+                    df = df.sort_values(['wins', 'points_for'], ascending = False)
+                setattr(self, name, df)
+                self.rebuilt.append(name)
+
+        ########### build aggregation store
+        # precompute per team, per week cumulative sums so any window of weeks is a single subtraction, keeping the
+        # previous sums of the weeks before the first changed week
+        with phase('week_agg_store'):
+            if reuse('tm_game_data.csv'):
+                self.week_store = previous.week_store
+            else:
+                self.week_store = week_agg_store(self.tm_game_data, previous and previous.week_store)
+                self.rebuilt.append('week_store')
+
+        ########### build roster index
+        # map each (year, week, owner_team) to its roster rows already sorted by slot_id, adding only the weeks of
+        # rosters_df whose rows changed
+        with phase('roster_index'):
+            self.roster_weeks = previous.roster_weeks if reuse('rosters_df.csv') else \
+                                roster_week_digests(self.rosters_df)
+            if reuse('rosters_df.csv'):
+                self.rosters_index = previous.rosters_index
+            elif previous is not None and set(previous.roster_weeks) <= set(self.roster_weeks):
+                weeks = [i for i, j in self.roster_weeks.items() if previous.roster_weeks.get(i) != j]
+                self.rosters_index = previous.rosters_index.copy()
+                keys = self.rosters_df['year'].to_numpy() * 100 + self.rosters_df['week'].to_numpy()
+                self.rosters_index.add(self.rosters_df.loc[np.isin(keys, [i * 100 + j for i, j in weeks])])
+                self.rebuilt.append(f'rosters_index ({len(weeks)} weeks)')
+            else:
+                self.rosters_index = roster_index.from_data_dir(data_dir)
+                self.rosters_index.add(self.rosters_df)
+                self.rebuilt.append('rosters_index')
+            self.rosters_year = int(self.rosters_df['year'].max())
+
+        ########### build prediction store
+        # load the position group models once and score the rostered players of the weeks whose inputs changed
+        with phase('prediction_store'):
+            model_files = [i for i in prediction_files() if i.endswith('.sav')]
+            feature_files = [i for i in prediction_files() if not i.endswith('.sav')]
+            if reuse('rosters_df.csv', *prediction_files()):
+                self.predictions, self.features = previous.predictions, previous.features
+            else:
+                self.predictions = previous.predictions.copy() if reuse(*model_files) else prediction_store.from_dir()
+                self.features = previous.features if reuse(*feature_files) else self.predictions.read_features()
+                updated = self.predictions.update(self.rosters_df, self.features)
+                self.rebuilt.append(f'predictions ({sum(updated.values())} weeks)')
+
+        ########### build table views
+        # serve the roster and rankings tables a page at a time, sorted and filtered on the server over pre-ranked
+        # columns, with the rankings view of each number of prior weeks built on its first request
+        with phase('table_views'):
+            if reuse('rosters_df.csv', *prediction_files()):
+                self.roster_view = previous.roster_view
+            else:
+                roster_frame = self.rosters_index.to_frame()
+                roster_frame['pred'] = self.predictions.pred_column(roster_frame)
+                self.roster_view = table_view(roster_frame, ['year', 'week', 'owner_team'], rank_columns=roster_columns)
+                self.rebuilt.append('roster_view')
+            self.roster_columns = [i for i in roster_columns if i in self.roster_view.columns]
+
+            self.max_week = int(self.tm_game_data['week'].max())
+            if reuse('tm_game_data.csv', 'this_week.csv'):
+                self.rankings_views = previous.rankings_views
+            else:
+                self.rankings_views = {}
+                self.rebuilt.append('rankings_views')
+
+        # load the optimal lineups of every team week of every season solved for these rosters (python lineups.py
+        # build), solving them if missing
+        with phase('lineups'):
+            if reuse('rosters_df.csv'):
+                self.lineup_view, self.lineup_seasons = previous.lineup_view, previous.lineup_seasons
+            else:
+                # the rosters changed, so roster_frame was built above
+                lineups = load_lineups(roster_frame)
+                self.lineup_view = table_view(lineups, ['year', 'week'])
+                self.lineup_seasons = season_summary(lineups).to_dict(orient='records')
+                self.rebuilt.append('lineups')
+
+        # load the League Overview figures built for this data version (python figures.py build), building them if
+        # missing
+        with phase('figures'):
+            if reuse('win_loss_df.csv', 'matchups_df.csv'):
+                self.figures = previous.figures
+            else:
+                self.figures = load_figures(self.win_loss_df, self.matchups_df)
+                self.rebuilt.append('figures')
+
+        # open the playoff odds saved for the last completed week by python playoff_odds.py build, never simulating
+        # them in a worker (None when they are not built yet, looked for again on the next build)
+        with phase('playoff_odds'):
+            if reuse('matchups_df.csv') and previous.odds is not None:
+                self.odds = previous.odds
+            else:
+                self.odds = load_odds(self.matchups_df, regular_season_weeks(self.rosters_year), simulate=False)
+                self.rebuilt.append('playoff_odds')
+            self.odds_columns = [i for i in (self.odds['records'][0] if self.odds and self.odds['records'] else [])
+                                 if i not in ('points_against', 'mean', 'std')]
+
+        # index the head-to-head records, standings, and record books of every season, with the current season's
+        # matchups in place of its data/<season>/ copy, appending only the weeks after the ones already indexed
+        with phase('record_book'):
+            self.matchup_history = previous.matchup_history if previous is not None else read_matchups(data_dir)
+            if reuse('matchups_df.csv', 'rosters_df.csv'):
+                self.record_book = previous.record_book
+            else:
+                matchups = all_matchups(self.matchup_history, self.matchups_df, self.rosters_year)
+                self.record_book = record_book(matchups, previous and previous.record_book)
+                self.rebuilt.append(f'record_book ({self.record_book.added_weeks} weeks)')
+
+    # create function to grab the rankings view of a number of prior weeks
+    def rankings_view(self, num_weeks):
+        view = self.rankings_views.get(num_weeks)
+        if view is None:
+            # a window missing one of this week's teams raises its KeyError here, and is tried again next request
+            view = self.rankings_views.setdefault(num_weeks, table_view(rankings_frame(self.week_store, self.this_week,
+                                                                                       num_weeks)))
+        return view
+
+# create class to serve the current snapshot and swap in new ones as the data files change
+class snapshot_manager(object):
+    '''
+    Holder of the data_snapshot every request reads, reloaded on a background thread
+
+    A watcher thread compares the data file signatures with the current snapshot's every check_interval seconds and
+    builds a new snapshot from the current one when they differ and have not moved since the check before, so files
+    written one after another are loaded together.  Requests keep reading the old snapshot until the new one is
+    complete; the swap is one attribute assignment.  A build that fails leaves the old snapshot in place.
+
+    param snapshot: data_snapshot to serve first
+    param check_interval: seconds between checks of the data files (0 turns the watcher off)
+    param data_dir: data directory passed to data_snapshot
+    '''
+
+    # create __init__ function
+    def __init__(self, snapshot, check_interval=5.0, data_dir='data'):
+        self.current = snapshot
+        self.check_interval = check_interval
+        self.data_dir = data_dir
+        self.build_lock = threading.Lock()
+        self.swap_funcs = []
+        self.watcher = None
+        self.watcher_pid = None
+        self.stopped = threading.Event()
+        self.pending = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_build_seconds = 0.0
+
+    # create function to check whether any data file differs from the ones the current snapshot was built from
+    def changed(self):
+        signatures = self.current.signatures
+        return file_signatures(list(signatures)) != signatures
+
+    # create function to check whether the data files changed and then stayed the same for one check interval
+    def settled(self):
+        signatures = file_signatures(list(self.current.signatures))
+        pending, self.pending = self.pending, signatures
+        return signatures != self.current.signatures and signatures == pending
+
+    # create function to add a function called with each new snapshot after it is swapped in
+    def on_swap(self, func):
+        self.swap_funcs.append(func)
+
+    # create function to build and swap in a snapshot of the data files as they are now
+    def reload(self, force=False):
+        '''
+        Function to build a new snapshot from the current one and swap it in (one build at a time)
+
+        param force: whether to build even when no data file changed
+
+        returns: True when a new snapshot was swapped in
+        '''
+
+        if not self.build_lock.acquire(blocking=False):
+            return False
+        try:
+            if not force and not self.changed():
+                return False
+            start = time.perf_counter()
+            try:
+                snapshot = data_snapshot(self.current, data_dir=self.data_dir)
+            except Exception:
+                self.failures += 1
+                logger.exception('data snapshot build failed')
+                return False
+            self.current = snapshot
+            self.last_build_seconds = time.perf_counter() - start
+            self.reloads += 1
+            logger.info('data snapshot %s swapped in after %.2f s, rebuilt: %s', snapshot.version,
+                        self.last_build_seconds, ', '.join(snapshot.rebuilt) or 'nothing')
+        finally:
+            self.build_lock.release()
+
+        for func in self.swap_funcs:
+            func(snapshot)
+        return True
+
+    # create function run by the watcher thread, reloading once a set of rewritten files is complete
+    def _watch(self):
+        while not self.stopped.wait(self.check_interval):
+            try:
+                if self.settled():
+                    self.reload()
+            except Exception:
+                logger.exception('data snapshot watcher failed')
+
+    # create function to stop the watcher thread
+    def stop(self):
+        self.stopped.set()
+
+    # create function to start the watcher thread in this process (again after a fork, e.g. gunicorn --preload)
+    def start(self):
+        if self.check_interval <= 0 or self.watcher_pid == os.getpid():
+            return
+        self.watcher_pid = os.getpid()
+        self.watcher = threading.Thread(target=self._watch, name='snapshot_watcher', daemon=True)
+        self.watcher.start()
+
+    # create function to report the reload counters as metrics_registry collector samples
+    def metrics(self):
+        return [('data_reloads_total', (), self.reloads, 'counter', 'Data snapshots swapped in after boot'),
+                ('data_reload_failures_total', (), self.failures, 'counter', 'Data snapshot builds that failed'),
+                ('data_reload_seconds', (), self.last_build_seconds, 'gauge', 'Seconds the last snapshot build took'),
+                ('data_snapshot_age_seconds', (), time.time() - self.current.created_at, 'gauge',
+                 'Seconds since the served data snapshot was built')]
+
+    # create function to start the watcher with the first request and add the reload route to the flask server
+    def init_app(self, app, path='/_reload', token=None):
+        '''
+        Function to start the watcher in each worker and, when a token is given, take POST requests to reload
+
+        param app: dash app
+        param path: path of the reload route
+        param token: secret a reload request sends as "Authorization: Bearer <token>" (no route when None or empty)
+        '''
+
+        server = app.server
+
+        @server.before_request
+        def _start_watcher():
+            if self.watcher_pid != os.getpid():
+                self.start()
+
+        if not token:
+            return
+
+        def reload_page():
+            sent = flask.request.headers.get('Authorization', '')
+            if not hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode()):
+                return flask.jsonify({'error': 'unauthorized'}), 401
+            threading.Thread(target=self.reload, name='snapshot_reload', daemon=True).start()
+            return flask.jsonify({'version': self.current.version})
+
+        server.add_url_rule(path, 'reload', reload_page, methods=['POST'])
@@ -0,0 +1,244 @@
+# columnar, memory-mapped store for the app's csv/pickle data
+#
+# convert every data file once:   python data_store.py convert
+# list the converted tables:      python data_store.py list
+
+# import needed packages
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+# create default location of the columnar store
+default_store_dir = os.path.join('data', 'store')
+
+# create list of the csv files app.py reads from the working directory
+app_files = ['win_loss_df.csv', 'matchups_df.csv', 'rosters_df.csv', 'tm_game_data.csv', 'this_week.csv']
+
+# create version of the table layout, so tables written by an older version are converted again
+store_format = 2
+
+# create function to name a table after its source file (e.g. data/2020/rosters_df_2020.csv -> rosters_df_2020)
+def table_name(source):
+    return os.path.splitext(os.path.basename(source))[0]
+
+# create function to record the size and modified time of a source file so stale tables are never read
+def source_signature(source):
+    st = os.stat(source)
+    return {'path': os.path.abspath(source), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+# create function to parse a source file the way the app always has
+def read_source(source):
+    if source.endswith('.pkl'):
+        return pd.read_pickle(source)
+    return pd.read_csv(source)
+
+# create function to write a dataframe to the store as one .npy block per dtype plus a json schema
+def write_table(df, name, store_dir=default_store_dir, source=None):
+    '''
+    Function to write a dataframe to the columnar store
+
+    Numeric, bool, and datetime columns keep their exact dtype.  String (object) and categorical columns are
+    dictionary encoded into integer codes plus a list of values kept in the schema, with the values of a string column
+    in sorted order so its categoricals sort like the strings.  Columns that share a storage dtype are stacked into one
+    (columns x rows) .npy block so opening even a wide table maps only a few files.
+
+    param df: pandas dataframe
+    param name: table name
+    param store_dir: store directory
+    param source: source file the dataframe was read from (its signature is kept so stale tables can be detected)
+
+    returns: path to the table directory
+    '''
+
+    table_dir = os.path.join(store_dir, name)
+    tmp_dir = f'{table_dir}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    schema = {'name': name, 'format': store_format, 'rows': len(df), 'columns': [],
+              'source': source_signature(source) if source is not None else None}
+    blocks = {}
+
+    for col in df.columns:
+        series = df[col]
+        entry = {'name': col}
+
+        # dictionary encode strings and categoricals, -1 marks a missing value
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, values = series.cat.codes.to_numpy(), series.cat.categories
+                entry['kind'] = 'category'
+                entry['ordered'] = bool(series.cat.ordered)
+            else:
+                # values of mixed types cannot be sorted, so they keep the order they first appear in
+                try:
+                    codes, values = pd.factorize(series, sort=True)
+                except TypeError:
+                    codes, values = pd.factorize(series, sort=False)
+                entry['kind'] = 'object'
+            values = [v.item() if isinstance(v, np.generic) else v for v in values]
+            for v in values:
+                if not isinstance(v, (str, bool, int, float)):
+                    raise TypeError(f'column {col} holds a {type(v).__name__} value which the store cannot encode')
+            entry['values'] = values
+            # the same integer type pandas gives the codes of that many categories, so they are used without a copy
+            array = codes.astype(pd.Categorical.from_codes([], values).codes.dtype)
+        else:
+            entry['kind'] = 'array'
+            array = series.to_numpy()
+
+        entry['dtype'] = str(array.dtype)
+        entry['block'] = f'block_{array.dtype}.npy'
+        block = blocks.setdefault(entry['block'], [])
+        entry['pos'] = len(block)
+        block.append(array)
+        schema['columns'].append(entry)
+
+    for file, arrays in blocks.items():
+        np.save(os.path.join(tmp_dir, file), np.stack(arrays))
+
+    with open(os.path.join(tmp_dir, '_schema.json'), 'w', encoding='utf-8') as f:
+        json.dump(schema, f)
+
+    # swap the finished table into place so a reader never sees a half written table
+    old_dir = f'{table_dir}.old-{os.getpid()}'
+    if os.path.exists(table_dir):
+        os.rename(table_dir, old_dir)
+    os.rename(tmp_dir, table_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return table_dir
+
+# create function to fingerprint the source of the modules that build a saved result, so results of older code are
+# never served
+def code_version(*modules):
+    digest = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+# create function to read the schema of a stored table
+def read_schema(name, store_dir=default_store_dir):
+    path = os.path.join(store_dir, name, '_schema.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+# create function to open a stored table with every numeric column memory mapped
+def open_table(name, store_dir=default_store_dir, mmap=True, strings='category'):
+    '''
+    Function to open a table from the columnar store
+
+    Every column is memory mapped copy-on-write, string columns as categoricals over their mapped codes, so reading
+    them costs no parsing and forked gunicorn workers share the same page cache pages until a worker writes to them.
+
+    param name: table name
+    param store_dir: store directory
+    param mmap: whether to memory map the columns (False reads them into memory)
+    param strings: 'category' to keep string columns dictionary encoded as pandas categoricals or 'object' to decode
+                   them to python strings in a new array (same as pd.read_csv)
+
+    returns: pandas dataframe
+    '''
+
+    schema = read_schema(name, store_dir)
+    if schema is None:
+        raise FileNotFoundError(f'no table {name} in {store_dir}')
+
+    table_dir = os.path.join(store_dir, name)
+    blocks = {}
+    data = {}
+    for entry in schema['columns']:
+        if entry['block'] not in blocks:
+            blocks[entry['block']] = np.load(os.path.join(table_dir, entry['block']), mmap_mode='c' if mmap else None)
+
+        # each column is a row of its block so no data is copied
+        values = blocks[entry['block']][entry['pos']]
+        if entry['kind'] == 'array':
+            data[entry['name']] = values
+        elif entry['kind'] == 'category' or strings == 'category':
+            data[entry['name']] = pd.Categorical.from_codes(np.asarray(values), entry['values'],
+                                                            ordered=entry.get('ordered', False))
+        else:
+            # decode with a trailing NaN so the -1 missing code lands on it
+            lookup = np.array(entry['values'] + [np.nan], dtype=object)
+            data[entry['name']] = lookup.take(values)
+
+    return pd.DataFrame(data, columns=[i['name'] for i in schema['columns']], copy=False)
+
+# create function to check a stored table was converted from the current version of its source file
+def is_current(name, source, store_dir=default_store_dir):
+    schema = read_schema(name, store_dir)
+    if schema is None or schema.get('source') is None or not os.path.exists(source):
+        return False
+    current = source_signature(source)
+    return schema.get('format') == store_format and all(schema['source'][k] == current[k] for k in ['size', 'mtime_ns'])
+
+# create function the app uses to load a data file
+def read_table(source, store_dir=default_store_dir, mmap=True, strings='category'):
+    '''
+    Function to load a csv/pickle data file through the columnar store
+
+    param source: path to the csv or pickle file
+    param store_dir: store directory
+    param mmap: whether to memory map the columns
+    param strings: 'category' or 'object' string columns when opened from the store (see open_table)
+
+    returns: pandas dataframe, opened from the store when it holds a current copy of the source and parsed from the
+             source file otherwise
+    '''
+
+    name = table_name(source)
+    if is_current(name, source, store_dir):
+        return open_table(name, store_dir, mmap=mmap, strings=strings)
+    return read_source(source)
+
+# create function to list every data file the store should hold
+def find_sources(data_dir='data', app_dir='.'):
+    sources = sorted(glob.glob(os.path.join(data_dir, '[0-9]' * 4, '*.csv')))
+    sources += sorted(glob.glob(os.path.join(data_dir, '*_all.pkl')))
+    sources += [os.path.join(app_dir, i) for i in app_files if os.path.exists(os.path.join(app_dir, i))]
+    return sources
+
+# create function to convert every data file to the store
+def convert(data_dir='data', app_dir='.', store_dir=default_store_dir, force=False):
+    '''
+    Function to convert the data/<season>/ csv files, the data/*_all.pkl files, and the app's csv files to the store
+
+    param data_dir: data directory
+    param app_dir: directory holding the csv files app.py reads
+    param store_dir: store directory
+    param force: whether to rewrite tables that are already current
+
+    returns: list of converted table names
+    '''
+
+    converted = []
+    for source in find_sources(data_dir, app_dir):
+        name = table_name(source)
+        if not force and is_current(name, source, store_dir):
+            continue
+        write_table(read_source(source), name, store_dir, source=source)
+        converted.append(name)
+    return converted
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'convert'
+    if command == 'convert':
+        names = convert(force='--force' in sys.argv)
+        print(f'converted {len(names)} tables to {default_store_dir}: {names}')
+    elif command == 'list':
+        for name in sorted(os.listdir(default_store_dir)):
+            schema = read_schema(name)
+            if schema is not None:
+                print(f"{name:<32} {schema['rows']:>7} rows {len(schema['columns']):>4} columns")
+    else:
+        print('usage: python data_store.py [convert [--force] | list]')
+        sys.exit(1)
@@ -0,0 +1,177 @@
+# pre-rendered figures for the League Overview tab
+#
+# build the figures for the current data ahead of time:   python figures.py build
+
+# import needed packages
+import glob
+import json
+import os
+import sys
+
+from callback_cache import file_version
+from data_store import code_version
+
+# create list of win/loss graph options
+graph_options = ['wins/losses', 'points for/points against']
+
+# create list of the data files the figures are built from
+figure_files = ['win_loss_df.csv', 'matchups_df.csv']
+
+# create default location of the built figure payloads
+default_figure_dir = os.path.join('data', 'store', 'figures')
+
+# create list of template layout keys that only apply to trace/axis types the overview figures never use
+unused_template_layout = ['annotationdefaults', 'coloraxis', 'colorscale', 'geo', 'mapbox', 'polar',
+                          'scene', 'shapedefaults', 'ternary']
+
+# create function to build the win/loss (or points for/points against) bar chart
+def win_loss_figure(win_loss_df, column_options):
+    import plotly.graph_objs as go
+
+    if column_options == 'wins/losses':
+        up, down, up_name, down_name = 'wins', 'losses', 'Wins', 'Losses'
+        title = 'Wins/Losses'
+        yaxis = dict(tickvals = [10, 5, 0, -5, -10],
+                     ticktext = [10, 5, 0, 5, 10]
+                    )
+    else:
+        up, down, up_name, down_name = 'points_for', 'points_against', 'points_for', 'points_against'
+        title = 'points_for/points_against'
+        yaxis = dict(tickvals=[3000, 2000, 1000, 0, -1000, -2000, -3000],
+                     ticktext = [3000, 2000, 1000, 0, 1000, 2000, 3000]
+                    )
+
+    # convert the losses/points against to int once for both the bar base and hover text
+    down_int = win_loss_df[down].astype('int')
+
+    win_bars = go.Bar(x=win_loss_df['owner_team_name'], y=win_loss_df[up],
+                      base=0,
+                      marker_color='green',
+                      name=up_name,
+                      hoverinfo='y'
+                     )
+
+    loss_bars = go.Bar(x=win_loss_df['owner_team_name'], y=win_loss_df[down],
+                       base= -1 * down_int,
+                       text = 1 * down_int,
+                       marker_color='red',
+                       name=down_name,
+                       hoverinfo='text'
+                      )
+
+    win_loss_layout = go.Layout(barmode = 'overlay',
+                                hovermode = 'x',
+                                title = title,
+                                yaxis = yaxis
+                               )
+
+    return go.Figure(data=[win_bars, loss_bars], layout=win_loss_layout)
+
+# create function to build the weekly scores line chart
+def weekly_points_figure(matchups_df):
+    import plotly.express as px
+
+    weekly_points_fig = px.line(matchups_df, x = 'week', y = 'score',
+                                color = 'owner_team_name',
+                                title = 'Scores per Week',
+                                hover_name='owner_team_name',
+                                hover_data={'week' : False,
+                                            'owner_team_name' : False,
+                                            'score' : True
+                                            }
+                               )
+
+    weekly_points_fig.update_xaxes(range=[0.95, 14.05], dtick=1)
+    weekly_points_fig.layout.update(showlegend=False)
+    return weekly_points_fig
+
+# create function to convert a figure to a plain json-ready dict without the unused parts of its template
+def lean_figure(fig):
+    '''
+    Function to strip template bloat from a figure payload
+
+    The default plotly template carries styling for every trace type (heatmap, surface, choropleth, ...) and for
+    geo/polar/3d axes.  Only the trace types the figure actually draws are kept, so the figure looks the same while
+    the payload shrinks.
+
+    param fig: plotly figure
+
+    returns: dictionary with data and layout keys that dcc.Graph accepts as a figure
+    '''
+
+    from plotly.utils import PlotlyJSONEncoder
+
+    payload = json.loads(json.dumps(fig.to_plotly_json(), cls=PlotlyJSONEncoder))
+    template = payload['layout'].get('template')
+    if template:
+        used = set(i.get('type', 'scatter') for i in payload['data'])
+        template['data'] = {k: v for k, v in template.get('data', {}).items() if k in used}
+        template['layout'] = {k: v for k, v in template.get('layout', {}).items() if k not in unused_template_layout}
+    return payload
+
+# create function to build every League Overview figure
+def build_figures(win_loss_df, matchups_df):
+    '''
+    Function to build every League Overview figure as a lean, json-ready payload
+
+    param win_loss_df: pandas dataframe of wins, losses, points for, and points against by team (sorted for display)
+    param matchups_df: pandas dataframe of weekly matchup scores
+
+    returns: dictionary with a 'win_loss' dictionary keyed by graph option and a 'weekly_points' figure
+    '''
+
+    return {'win_loss': {i: lean_figure(win_loss_figure(win_loss_df, i)) for i in graph_options},
+            'weekly_points': lean_figure(weekly_points_figure(matchups_df))
+           }
+
+# create function to load the figures built for the current data version and figure code, building and saving them
+# when missing
+def load_figures(win_loss_df, matchups_df, version=None, figure_dir=default_figure_dir):
+    '''
+    Function to load the League Overview figures for a data version, saved under the data version and a hash of this
+    file so a change to the figure code rebuilds them
+
+    param win_loss_df: pandas dataframe the figures are built from when no saved copy exists
+    param matchups_df: pandas dataframe the figures are built from when no saved copy exists
+    param version: data version token (defaults to the version of the figure data files)
+    param figure_dir: directory of saved figure payloads
+
+    returns: dictionary returned by build_figures
+    '''
+
+    if version is None:
+        version = file_version(figure_files)
+    path = os.path.join(figure_dir, f'figures_{version}_{code_version(sys.modules[__name__])}.json')
+
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    figures = build_figures(win_loss_df, matchups_df)
+
+    # save for the next worker, skipping quietly when the directory is read only
+    try:
+        os.makedirs(figure_dir, exist_ok=True)
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(figures, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+        # drop the figures built for older data versions or figure code
+        for old_path in glob.glob(os.path.join(figure_dir, 'figures_*.json')):
+            if old_path != path:
+                os.remove(old_path)
+    except OSError:
+        pass
+    return figures
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        from data_store import read_table
+
+        win_loss_df = read_table('win_loss_df.csv').sort_values(['wins', 'points_for'], ascending = False)
+        load_figures(win_loss_df, read_table('matchups_df.csv'))
+        print(f"built figures for data version {file_version(figure_files)} in {default_figure_dir}")
+    else:
+        print('usage: python figures.py build')
+        sys.exit(1)
@@ -0,0 +1,266 @@
+# optimal lineups of every fantasy team and week: points left on the bench and manager efficiency
+#
+# the starting slots of each team's season are read off the lineups it actually started, so every season's (and every
+# league's) slot rules are followed without a settings table.  the best legal lineup is found for all
+# team weeks at once: the dedicated slots (QB, RB, WR, TE, D/ST, K) take the top players of their position, then each
+# flex slot takes the best eligible players left over.  that greedy fill is optimal because every flex slot's
+# positions have dedicated slots of their own (and flex slots with nested positions are filled narrowest first)
+#
+# build the lineups of every season ahead of time:   python lineups.py build
+
+# import needed packages
+import glob
+import hashlib
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_store import code_version, open_table, read_schema, write_table
+
+# create list of the positions a lineup slot can hold
+positions = ['QB', 'RB', 'WR', 'TE', 'DEF', 'KR']
+
+# create dictionary of each starting lineup slot id (see 00-ingest_data/espn_codes.py) and the positions it holds
+slot_positions = {0: ['QB'], 2: ['RB'], 4: ['WR'], 6: ['TE'], 16: ['DEF'], 17: ['KR'],
+                  3: ['RB', 'WR', 'TE'], 23: ['RB', 'WR', 'TE']}
+
+# create list of the slot ids that do not start (bench and injured reserve)
+reserve_slots = [20, 21]
+
+# create list of the columns a team week is keyed by
+key_columns = ['year', 'week', 'owner_team']
+
+# create default location of the saved lineups
+default_lineup_dir = os.path.join('data', 'store', 'lineups')
+
+# create function to order rows by a key and then by score (highest first) and number them within each key
+def rank_within(keys, order_rank):
+    '''
+    Function to rank rows within groups
+
+    param keys: int numpy array of each row's group
+    param order_rank: int numpy array of each row's position when every row is sorted by score, highest first (no
+                      two rows share a position)
+
+    returns: tuple of the row order (by key, then score descending) and each ordered row's zero-based rank within its
+             key
+    '''
+
+    # one argsort over a single int64 key instead of a lexsort over two arrays
+    order = np.argsort(keys * (int(order_rank.max(initial=0)) + 1) + order_rank)
+    sorted_keys = keys[order]
+    starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))
+    return order, np.arange(len(order)) - first
+
+# create function to find the slots every team week started
+def lineup_rules(rosters_df):
+    '''
+    Function to count the starting slots of each team week (the most of each slot the team started in any week of
+    that season)
+
+    param rosters_df: pandas dataframe with year, week, owner_team, slot_id, and position_name columns
+
+    returns: tuple of the team week of each row (int numpy array), the team weeks (dataframe of key_columns), each
+             row's position (index into positions, -1 for any other), the number of dedicated slots of each team week
+             and position (array of team weeks x positions), and a list of (position indexes, slots per team week) for
+             the flex slots, narrowest first
+    '''
+
+    grouped = rosters_df.groupby(key_columns, sort=True)
+    team_week = grouped.ngroup().to_numpy()
+    team_weeks = grouped.size().reset_index()[key_columns]
+    num_team_weeks = len(team_weeks)
+    position = pd.Categorical(rosters_df['position_name'], categories=positions).codes.astype(np.int64)
+
+    slot_id = rosters_df['slot_id'].to_numpy()
+    unknown = sorted(set(np.unique(slot_id).tolist()) - set(slot_positions) - set(reserve_slots))
+    if unknown:
+        raise ValueError(f'no lineup rule for slot ids: {unknown}')
+
+    # a player started in a slot outside their listed position (e.g. a QB listed player started at TE) plays the
+    # slot's first position that week, so the started lineup is always one of the legal lineups
+    for slot, eligible in slot_positions.items():
+        rows = (slot_id == slot) & ~np.isin(position, [positions.index(i) for i in eligible])
+        position[rows] = positions.index(eligible[0])
+
+    # count each team week's dedicated slots by position and its flex slots by the positions they hold
+    dedicated = np.zeros((num_team_weeks, len(positions)), dtype=np.int64)
+    flex = {}
+    for slot, eligible in slot_positions.items():
+        rows = slot_id == slot
+        if not rows.any():
+            continue
+        counts = np.bincount(team_week[rows], minlength=num_team_weeks)
+        if len(eligible) == 1:
+            dedicated[:, positions.index(eligible[0])] += counts
+        else:
+            key = tuple(positions.index(i) for i in eligible)
+            flex[key] = flex.get(key, 0) + counts
+
+    # a slot left empty has no row, so every week of a team's season gets the most of each slot it ever started
+    season = team_weeks.groupby(['year', 'owner_team'], sort=False).ngroup().to_numpy()
+
+    def season_max(counts):
+        most = np.zeros((season.max() + 1,) + counts.shape[1:], dtype=np.int64)
+        np.maximum.at(most, season, counts)
+        return most[season]
+
+    flex = sorted(((i, season_max(j)) for i, j in flex.items()), key=lambda i: len(i[0]))
+    return team_week, team_weeks, position, season_max(dedicated), flex
+
+# create function to pick the best legal lineup of every team week at once
+def best_lineups(team_week, position, dedicated, flex, points):
+    '''
+    Function to choose the rows of each team week's highest scoring legal lineup
+
+    param team_week: int numpy array of each row's team week
+    param position: int numpy array of each row's position (-1 never starts)
+    param dedicated: int numpy array of dedicated slots by team week and position
+    param flex: list of (position indexes, slots per team week) of the flex slots, narrowest first
+    param points: float numpy array of each row's points
+
+    returns: boolean numpy array of the rows in the best lineups
+    '''
+
+    chosen = np.zeros(len(points), dtype=bool)
+
+    # rank every row by points once (ties in row order) so each fill below sorts a single integer key
+    order_rank = np.empty(len(points), dtype=np.int64)
+    order_rank[np.argsort(-points, kind='stable')] = np.arange(len(points))
+
+    # fill every dedicated slot of every team week with the top players of its position
+    rows = np.flatnonzero(position >= 0)
+    order, rank = rank_within(team_week[rows] * len(positions) + position[rows], order_rank[rows])
+    rows = rows[order]
+    chosen[rows[rank < dedicated[team_week[rows], position[rows]]]] = True
+
+    # then fill the flex slots with the best eligible players left over
+    for eligible, slots in flex:
+        rows = np.flatnonzero(~chosen & np.isin(position, eligible))
+        order, rank = rank_within(team_week[rows], order_rank[rows])
+        rows = rows[order]
+        chosen[rows[rank < slots[team_week[rows]]]] = True
+    return chosen
+
+# create function to score every team week's started and optimal lineups
+def solve_lineups(rosters_df):
+    '''
+    Function to find the optimal lineup of every (year, week, owner_team) by actual and by projected points
+
+    param rosters_df: pandas dataframe with year, week, owner_team, slot_id, position_name, proj_points, and
+                      actual_points columns (any number of seasons and leagues)
+
+    returns: pandas dataframe with one row per team week: the started lineup's actual and projected points, the
+             optimal lineup's actual points, the points left on the bench, the efficiency (started / optimal actual
+             points in percent), the projected points of the lineup with the most projected points, that lineup's
+             actual points, and its efficiency
+    '''
+
+    team_week, lineups, position, dedicated, flex = lineup_rules(rosters_df)
+    actual = np.nan_to_num(rosters_df['actual_points'].to_numpy(dtype=np.float64))
+    proj = np.nan_to_num(rosters_df['proj_points'].to_numpy(dtype=np.float64))
+    started = ~rosters_df['slot_id'].isin(reserve_slots).to_numpy()
+    best = best_lineups(team_week, position, dedicated, flex, actual)
+    best_proj = best_lineups(team_week, position, dedicated, flex, proj)
+
+    # create function to total some rows' points by team week
+    def total(points, rows):
+        return np.bincount(team_week, weights=np.where(rows, points, 0.0), minlength=len(lineups))
+
+    actual_points = total(actual, started)
+    optimal_points = total(actual, best)
+    proj_lineup_points = total(actual, best_proj)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(optimal_points > 0, actual_points / optimal_points * 100, np.nan)
+        proj_efficiency = np.where(optimal_points > 0, proj_lineup_points / optimal_points * 100, np.nan)
+
+    lineups['actual_points'] = np.round(actual_points, 1)
+    lineups['optimal_points'] = np.round(optimal_points, 1)
+    lineups['bench_points'] = np.round(optimal_points - actual_points, 1)
+    lineups['efficiency_pct'] = np.round(efficiency, 1)
+    lineups['proj_points'] = np.round(total(proj, started), 1)
+    lineups['optimal_proj_points'] = np.round(total(proj, best_proj), 1)
+    lineups['proj_lineup_points'] = np.round(proj_lineup_points, 1)
+    lineups['proj_efficiency_pct'] = np.round(proj_efficiency, 1)
+    return lineups
+
+# create function to total the lineups of each team's season
+def season_summary(lineups):
+    '''
+    Function to total the started and optimal points of each (year, owner_team)
+
+    param lineups: pandas dataframe returned by solve_lineups
+
+    returns: pandas dataframe with one row per team season, the most recent season first and the most efficient
+             manager first within a season
+    '''
+
+    seasons = lineups.groupby(['year', 'owner_team'], sort=False).agg(
+        weeks=('week', 'size'), actual_points=('actual_points', 'sum'), optimal_points=('optimal_points', 'sum'),
+        bench_points=('bench_points', 'sum'), proj_lineup_points=('proj_lineup_points', 'sum')).reset_index()
+    seasons['efficiency_pct'] = np.round(seasons['actual_points'] / seasons['optimal_points'] * 100, 1)
+    seasons['proj_efficiency_pct'] = np.round(seasons['proj_lineup_points'] / seasons['optimal_points'] * 100, 1)
+    for i in ['actual_points', 'optimal_points', 'bench_points', 'proj_lineup_points']:
+        seasons[i] = seasons[i].round(1)
+    seasons = seasons.sort_values(['year', 'efficiency_pct'], ascending=False)
+    return seasons.reset_index(drop=True)
+
+# create function to fingerprint the roster columns the lineups are solved from and the code solving them
+def lineups_version(rosters_df):
+    columns = key_columns + ['slot_id', 'position_name', 'proj_points', 'actual_points']
+    hashes = pd.util.hash_pandas_object(rosters_df[columns].reset_index(drop=True), index=False).to_numpy()
+    digest = hashlib.sha1(hashes.tobytes())
+    digest.update(code_version(sys.modules[__name__]).encode())
+    return digest.hexdigest()[:16]
+
+# create function to load the lineups saved for a rosters dataframe, solving and saving them when missing
+def load_lineups(rosters_df, lineup_dir=default_lineup_dir):
+    '''
+    Function to load the solved lineups of a rosters dataframe
+
+    The lineups are saved to the columnar store under a hash of the roster columns they are solved from and of this
+    file, so every worker opens the same copy until the rosters or the solver change.
+
+    param rosters_df: pandas dataframe passed to solve_lineups
+    param lineup_dir: store directory of saved lineups
+
+    returns: pandas dataframe returned by solve_lineups
+    '''
+
+    name = f'lineups_{lineups_version(rosters_df)}'
+    if read_schema(name, lineup_dir) is not None:
+        return open_table(name, lineup_dir)
+
+    lineups = solve_lineups(rosters_df)
+
+    # save for the next worker, skipping quietly when the directory is read only
+    try:
+        os.makedirs(lineup_dir, exist_ok=True)
+        write_table(lineups, name, lineup_dir)
+
+        # drop the lineups of older rosters
+        for old_dir in glob.glob(os.path.join(lineup_dir, 'lineups_*')):
+            if os.path.basename(old_dir) != name:
+                shutil.rmtree(old_dir, ignore_errors=True)
+    except OSError:
+        pass
+    return lineups
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        from compact_rosters import read_rosters
+        from roster_index import roster_index
+
+        # the same rosters the app serves: every season under data/ plus rosters_df.csv when there is one
+        index = roster_index.from_data_dir('data')
+        if os.path.exists('rosters_df.csv'):
+            index.add(read_rosters('rosters_df.csv'))
+        lineups = load_lineups(index.to_frame())
+        print(f'solved {len(lineups):,d} team weeks of {lineups["year"].nunique()} seasons in {default_lineup_dir}')
+    else:
+        print('usage: python lineups.py build')
+        sys.exit(1)
@@ -0,0 +1,358 @@
+# request and boot instrumentation for the dash app, served in the prometheus text format on /metrics
+#
+# every /_dash-update-component request is timed and sized per callback, the values of its inputs are counted, every
+# callback function is timed on its own (a cache hit never runs it), and the boot phases of app.py are timed.  each
+# gunicorn worker keeps its own numbers, so a scrape of /metrics describes the worker that answered it.
+#
+# set PROFILE_SLOW_MS=<milliseconds> to sample the stack of every request and write the stacks of the slow ones to
+# profiles/ (collapsed stack format, e.g. for flamegraph.pl or speedscope).  unset, no hook or thread is added.
+
+# import needed packages
+import bisect
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import flask
+
+# create default latency buckets (seconds) and payload size buckets (bytes)
+latency_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+size_buckets = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# create function to write a label set in the prometheus text format
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+# create class to hold the counters, gauges, and histograms of one worker process
+class metrics_registry(object):
+    '''
+    Thread-safe store of the app's counters, gauges, and histograms keyed by metric name and label values
+
+    Histograms keep one count per bucket (not every observation), so recording a value is a bisect and a few
+    integer adds under one lock.
+
+    param max_label_values: most distinct values counted per callback input before the rest are counted as "other"
+    '''
+
+    # create __init__ function
+    def __init__(self, max_label_values=64):
+        self.max_label_values = max_label_values
+        self.lock = threading.Lock()
+        self.help = {}
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.buckets = {}
+        self.collectors = []
+        self.hooks = []
+
+    # create function to describe a metric in the /metrics output
+    def describe(self, name, kind, text, buckets=None):
+        self.help[name] = (kind, text)
+        if buckets is not None:
+            self.buckets[name] = tuple(buckets)
+
+    # create function to add to a counter
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    # create function to set a gauge
+    def set(self, name, labels=(), value=0.0):
+        with self.lock:
+            self.gauges[(name, labels)] = value
+
+    # create function to record one value in a histogram
+    def observe(self, name, labels, value):
+        buckets = self.buckets[name]
+        i = bisect.bisect_left(buckets, value)
+        with self.lock:
+            counts = self.histograms.get((name, labels))
+            if counts is None:
+                counts = self.histograms[(name, labels)] = [0] * (len(buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    # create function to time a phase of the app's startup
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''
+        Function to time a block of code as one boot phase (the app_boot_seconds gauge)
+
+        param name: phase name
+        '''
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.set('app_boot_seconds', (('phase', name),), time.perf_counter() - start)
+
+    # create function to add a function returning extra (name, labels, value, kind, help) samples to every scrape
+    def add_collector(self, func):
+        self.collectors.append(func)
+
+    # create function to write every metric in the prometheus text format
+    def render(self):
+        '''
+        Function to render every metric in the prometheus text exposition format (version 0.0.4)
+
+        returns: string
+        '''
+
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {k: list(v) for k, v in self.histograms.items()}
+        for func in self.collectors:
+            for name, labels, value, kind, text in func():
+                self.help.setdefault(name, (kind, text))
+                (counters if kind == 'counter' else gauges)[(name, labels)] = value
+
+        # one block per metric, its series sorted by label values and each histogram's buckets in order
+        samples = {}
+        for (name, labels), value in sorted(list(counters.items()) + list(gauges.items()), key=lambda i: str(i[0])):
+            samples.setdefault(name, []).append(f'{name}{format_labels(labels)} {value}')
+        for (name, labels), counts in sorted(histograms.items(), key=lambda i: str(i[0])):
+            lines, total = samples.setdefault(name, []), 0
+            for le, count in zip(self.buckets[name] + ('+Inf',), counts[:-1]):
+                total += count
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", le),))} {total}')
+            lines.append(f'{name}_sum{format_labels(labels)} {counts[-1]}')
+            lines.append(f'{name}_count{format_labels(labels)} {total}')
+
+        out = []
+        for name in sorted(samples):
+            kind, text = self.help.get(name, ('untyped', name))
+            out += [f'# HELP {name} {text}', f'# TYPE {name} {kind}'] + samples[name]
+        return '\n'.join(out) + '\n'
+
+    # create function to hook the registry into the dash app's flask server
+    def init_app(self, app, path='/metrics'):
+        '''
+        Function to time, size, and count every dash callback request and serve the metrics on path
+
+        Call it before any other before_request hook (e.g. callback_cache.init_app) so cached responses are timed too.
+
+        param app: dash app
+        param path: route of the metrics page
+        '''
+
+        self.describe('dash_request_seconds', 'histogram', 'Dash callback request latency (cache hits included)',
+                      latency_buckets)
+        self.describe('dash_response_bytes', 'histogram', 'Dash callback response payload size', size_buckets)
+        self.describe('dash_callback_input_total', 'counter', 'Dash callback requests by input value')
+        self.describe('dash_request_errors_total', 'counter', 'Dash callback requests without a 200 response')
+        self.describe('dash_callback_seconds', 'histogram', 'Dash callback function run time (cache misses only)',
+                      latency_buckets)
+        self.describe('app_boot_seconds', 'gauge', 'Seconds spent in each phase of app startup')
+
+        server = app.server
+        update_path = app.config.routes_pathname_prefix + '_dash-update-component'
+        seen_values = {}
+
+        def _start_timer():
+            if flask.request.path == update_path:
+                flask.g.metrics_start = time.perf_counter()
+
+        def _record_request(response):
+            start = flask.g.pop('metrics_start', None)
+            if start is None:
+                return response
+            elapsed = time.perf_counter() - start
+            # only outputs and inputs the app declares become label values, anything else a client posts is "other"
+            body = flask.request.get_json(silent=True) or {}
+            output = body.get('output')
+            declared = app.callback_map.get(output) if isinstance(output, str) else None
+            if declared is None:
+                output, declared_inputs = 'other', set()
+            else:
+                declared_inputs = {f"{i['id']}.{i['property']}" for i in declared.get('inputs', [])}
+            callback = (('callback', output),)
+            self.observe('dash_request_seconds', callback, elapsed)
+            size = response.calculate_content_length()
+            if size is not None:
+                self.observe('dash_response_bytes', callback, size)
+            if response.status_code != 200:
+                self.inc('dash_request_errors_total', callback + (('status', str(response.status_code)),))
+
+            # count each input value, folding values past max_label_values into "other"
+            for i in body.get('inputs') or []:
+                if not isinstance(i, dict):
+                    continue
+                input_name = f"{i.get('id')}.{i.get('property')}"
+                value = str(i.get('value'))
+                if input_name not in declared_inputs:
+                    input_name = value = 'other'
+                values = seen_values.setdefault((callback, input_name), set())
+                if value not in values:
+                    if len(values) >= self.max_label_values:
+                        value = 'other'
+                    else:
+                        values.add(value)
+                self.inc('dash_callback_input_total', callback + (('input', input_name), ('value', value)))
+            return response
+
+        def metrics_page():
+            return flask.Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+        server.before_request(_start_timer)
+        server.after_request(_record_request)
+        server.add_url_rule(path, 'metrics', metrics_page)
+        self.hooks += [_start_timer, _record_request]
+
+    # create function to time the callback functions registered so far
+    def wrap_callbacks(self, app):
+        '''
+        Function to time every callback function of a dash app on its own (call after every callback is defined)
+
+        param app: dash app
+
+        returns: number of callbacks wrapped
+        '''
+
+        # create function to time one callback function
+        def timed(output, func):
+            labels = (('callback', output),)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe('dash_callback_seconds', labels, time.perf_counter() - start)
+            wrapper.metrics_wrapped = True
+            return wrapper
+
+        wrapped = 0
+        for output, callback in app.callback_map.items():
+            if not getattr(callback['callback'], 'metrics_wrapped', False):
+                callback['callback'] = timed(output, callback['callback'])
+                wrapped += 1
+        return wrapped
+
+# create function to collapse a frame's stack into one line (outermost call first)
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+# create class to sample the stacks of requests and write out the slow ones
+class slow_request_profiler(object):
+    '''
+    Opt-in sampling profiler for slow requests
+
+    While any request is running a background thread takes its stack every interval seconds.  A request that takes
+    threshold_ms or longer has its sampled stacks written to profile_dir in collapsed stack format (one
+    "frame;frame;frame count" line per distinct stack).
+
+    param threshold_ms: request duration (milliseconds) at or above which the stacks are written
+    param profile_dir: directory the stack files are written to
+    param interval: seconds between samples
+    '''
+
+    # create __init__ function
+    def __init__(self, threshold_ms, profile_dir='profiles', interval=0.005):
+        self.threshold = threshold_ms / 1e3
+        self.profile_dir = profile_dir
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.active = {}
+        self.thread = None
+        self.thread_pid = None
+        self.hooks = []
+
+    # create function to start the sampling thread in this process (again after a fork, e.g. gunicorn --preload)
+    def start(self):
+        if self.thread_pid == os.getpid():
+            return
+        self.thread_pid = os.getpid()
+        self.thread = threading.Thread(target=self._sample, name='slow_request_profiler', daemon=True)
+        self.thread.start()
+
+    # create function run by the sampling thread
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                active = list(self.active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for ident, (_, stacks) in active:
+                frame = frames.get(ident)
+                if frame is not None:
+                    stacks[collapse_stack(frame)] += 1
+
+    # create function to write the stacks of one slow request
+    def dump(self, name, elapsed, stacks):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        safe_name = ''.join(i if i.isalnum() or i in '-_.' else '_' for i in name)[:80]
+        path = os.path.join(self.profile_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{safe_name}-'
+                                              f'{elapsed * 1e3:.0f}ms.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        return path
+
+    # create function to hook the profiler into the dash app's flask server
+    def init_app(self, app, registry=None):
+        '''
+        Function to sample every request of the app's flask server and dump the slow ones
+
+        param app: dash app
+        param registry: metrics_registry counting the slow requests (slow_requests_total), if any
+        '''
+
+        server = app.server
+        if registry is not None:
+            registry.describe('slow_requests_total', 'counter', 'Requests at or above PROFILE_SLOW_MS')
+
+        def _start_sampling():
+            if self.thread_pid != os.getpid():
+                self.start()
+            flask.g.profile_start = time.perf_counter()
+            with self.lock:
+                self.active[threading.get_ident()] = (flask.g.profile_start, Counter())
+
+        def _stop_sampling(exc=None):
+            # a teardown hook, so the request's entry is dropped even when the request raised
+            with self.lock:
+                _, stacks = self.active.pop(threading.get_ident(), (None, None))
+            start = flask.g.pop('profile_start', None)
+            if start is None or stacks is None:
+                return
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold:
+                # only declared callback outputs and routes name a slow request, anything else (404 probes) is "other"
+                body = flask.request.get_json(silent=True) if flask.request.is_json else None
+                output = body.get('output') if isinstance(body, dict) else None
+                rule = flask.request.url_rule
+                if isinstance(output, str) and output in app.callback_map:
+                    name = output
+                else:
+                    name = rule.rule if rule is not None else 'other'
+                if stacks:
+                    self.dump(name, elapsed, stacks)
+                if registry is not None:
+                    registry.inc('slow_requests_total', (('name', name),))
+
+        # sample before any other hook runs and stop after every other teardown hook ran
+        # (flask runs the teardown hooks last registered first)
+        server.before_request_funcs.setdefault(None, []).insert(0, _start_sampling)
+        server.teardown_request_funcs.setdefault(None, []).insert(0, _stop_sampling)
+        self.hooks += [_start_sampling, _stop_sampling]
+
+        self.start()
@@ -0,0 +1,322 @@
+# playoff and seeding odds for the League Overview tab, from a monte carlo simulation of the rest of the season
+#
+# every team's weekly score is drawn from a normal distribution fit to its scores in matchups_df, the remaining games
+# of a batch of seasons are drawn as one (simulations x games) array, and the standings (wins, then points_for) of
+# every simulated season are ranked with array operations.  batches are spread across a process pool and each batch
+# has its own seed spawned from the one seed, so a result only depends on the seed and the number of simulations.
+#
+# build the odds for the current data ahead of time:   python playoff_odds.py build
+
+# import needed packages
+import glob
+import hashlib
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_store import code_version
+
+# create default season settings (the regular season is 17 weeks since 2021, see regular_season_weeks)
+default_season_weeks = 17
+default_playoff_teams = 4
+
+# create default simulation settings
+default_num_sims = 1000000
+default_batch_size = 50000
+
+# create default location of the saved odds
+default_odds_dir = os.path.join('data', 'store', 'odds')
+
+# create function to give the number of regular season weeks of a season: 16 through 2020 and 17 once the nfl
+# season grew to 18 weeks in 2021 (as in data/<season>/matchups_df_<season>.csv)
+def regular_season_weeks(year):
+    return 16 if year <= 2020 else 17
+
+# create function to total each team's record over the completed games
+def team_standings(matchups_df):
+    '''
+    Function to total each team's wins, losses, points for, and points against
+
+    param matchups_df: pandas dataframe of weekly matchups (two rows per game)
+
+    returns: pandas dataframe indexed by owner_team_name with wins, losses, points_for, points_against, and games
+    '''
+
+    standings = matchups_df.groupby('owner_team_name').agg(wins=('win', 'sum'), games=('win', 'size'),
+                                                            points_for=('score', 'sum'),
+                                                            points_against=('opp_score', 'sum'))
+    standings['losses'] = standings['games'] - standings['wins']
+    return standings[['wins', 'losses', 'points_for', 'points_against', 'games']]
+
+# create function to fit each team's weekly score distribution
+def fit_score_distributions(matchups_df, prior_games=4):
+    '''
+    Function to fit a normal distribution to each team's weekly scores
+
+    Each team's mean and variance are shrunk toward the league's by prior_games games' worth of weight, so a team
+    with only a few games is not judged on them alone.
+
+    param matchups_df: pandas dataframe of weekly matchups (two rows per game)
+    param prior_games: weight of the league mean and variance, in games
+
+    returns: pandas dataframe indexed by owner_team_name with mean and std columns
+    '''
+
+    league_mean = matchups_df['score'].mean()
+    league_var = matchups_df['score'].var() if len(matchups_df) > 1 else 0.0
+    stats = matchups_df.groupby('owner_team_name')['score'].agg(['count', 'mean', 'var'])
+    stats['var'] = stats['var'].fillna(0.0)
+
+    fit = pd.DataFrame(index=stats.index)
+    fit['mean'] = (stats['count'] * stats['mean'] + prior_games * league_mean) / (stats['count'] + prior_games)
+    fit['std'] = np.sqrt(((stats['count'] - 1).clip(lower=0) * stats['var'] + prior_games * league_var) /
+                         ((stats['count'] - 1).clip(lower=0) + prior_games))
+    return fit
+
+# create function to lay out the games left in the season
+def remaining_schedule(matchups_df, season_weeks=default_season_weeks, schedule_df=None):
+    '''
+    Function to list the games after the last completed week
+
+    matchups_df only holds decided games, so without a schedule the remaining weeks repeat the league's round robin:
+    week w is paired like the completed week a whole number of num_teams - 1 week cycles before it (or, when the
+    season has not gone a full cycle yet, like week (w - 1) % last_week + 1).
+
+    param matchups_df: pandas dataframe of weekly matchups (two rows per game)
+    param season_weeks: number of regular season weeks
+    param schedule_df: optional pandas dataframe of the full schedule (week, owner_team_name, opp_owner_team_name)
+
+    returns: pandas dataframe with week, owner_team_name, and opp_owner_team_name, one row per remaining game
+    '''
+
+    columns = ['week', 'owner_team_name', 'opp_owner_team_name']
+    last_week = int(matchups_df['week'].max()) if len(matchups_df) else 0
+
+    if schedule_df is not None:
+        games = schedule_df.loc[schedule_df['week'] > last_week, columns]
+    elif last_week == 0:
+        return pd.DataFrame(columns=columns)
+    else:
+        cycle = matchups_df['owner_team_name'].nunique() - 1
+        weeks = []
+        for week in range(last_week + 1, season_weeks + 1):
+            if 0 < cycle <= last_week:
+                source = week - cycle * math.ceil((week - last_week) / cycle)
+            else:
+                source = (week - 1) % last_week + 1
+            weeks.append(matchups_df.loc[matchups_df['week'] == source, columns[1:]].assign(week=week))
+        games = pd.concat(weeks, ignore_index=True)[columns] if weeks else pd.DataFrame(columns=columns)
+
+    # keep one row per game
+    games = games.loc[games['owner_team_name'] < games['opp_owner_team_name']]
+    return games.sort_values(columns).reset_index(drop=True)
+
+# create function to number the leagues in a matchups dataframe (teams that ever played each other share a league)
+def league_ids(teams, pairs):
+    parent = list(range(len(teams)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        parent[find(a)] = find(b)
+    roots = [find(i) for i in range(len(teams))]
+    return np.unique(roots, return_inverse=True)[1]
+
+# create function to simulate one batch of seasons
+def simulate_batch(mean, std, game_a, game_b, base_wins, base_points, league, num_sims, seed):
+    '''
+    Function to simulate the remaining games of num_sims seasons and count where each team finishes
+
+    param mean: array of each team's mean weekly score
+    param std: array of each team's weekly score standard deviation
+    param game_a: array of the first team of each remaining game
+    param game_b: array of the second team of each remaining game
+    param base_wins: array of each team's wins so far
+    param base_points: array of each team's points_for so far
+    param league: array of each team's league number
+    param num_sims: number of seasons to simulate
+    param seed: numpy SeedSequence of the batch
+
+    returns: tuple of the (team x seed) array of finish counts and the array of each team's summed final wins
+    '''
+
+    rng = np.random.default_rng(seed)
+    num_teams, num_games = len(mean), len(game_a)
+
+    # give every side of every game a row, grouped by team and padded so each team has the same number of rows
+    # (a padding row scores 0 and plays itself, so it never wins)
+    sides = np.concatenate([game_a, game_b])
+    per_team = np.bincount(sides, minlength=num_teams)
+    width = int(per_team.max()) if len(sides) else 0
+    order = np.argsort(sides, kind='stable')
+    row = np.empty(len(sides), dtype=np.int64)
+    row[order] = sides[order] * width + np.arange(len(sides)) - np.repeat(np.cumsum(per_team) - per_team, per_team)
+    opponent = np.arange(num_teams * width)
+    opponent[row] = row[(np.arange(len(sides)) + num_games) % max(len(sides), 1)]
+    real = np.zeros(num_teams * width, dtype=bool)
+    real[row] = True
+    row_team = np.repeat(np.arange(num_teams), width)
+    loc = np.where(real, mean[row_team], 0.0).astype(np.float32)[:, None]
+    scale = np.where(real, std[row_team], 0.0).astype(np.float32)[:, None]
+
+    # one (rows x simulations) draw of every side's score, each team's rows summed into its wins and points_for
+    scores = rng.standard_normal((num_teams * width, num_sims), dtype=np.float32)
+    scores *= scale
+    scores += loc
+    won = scores > scores[opponent]
+    wins = base_wins[:, None] + won.reshape(num_teams, width, num_sims).sum(axis=1, dtype=np.float32)
+    points = base_points[:, None] + scores.reshape(num_teams, width, num_sims).sum(axis=1, dtype=np.float64)
+
+    # rank each league by wins, then points_for (points stay far below the 1e6 a win is worth)
+    key = (league * 1e9)[:, None] - (wins.astype(np.float64) * 1e6 + points)
+    ranked = np.argsort(key.T, axis=1, kind='stable')
+    league_start = np.searchsorted(np.sort(league), league)
+    finish = np.empty_like(ranked)
+    np.put_along_axis(finish, ranked, np.arange(num_teams), axis=1)
+    finish -= league_start
+
+    counts = np.bincount((np.arange(num_teams) * num_teams + finish).ravel(), minlength=num_teams * num_teams)
+    return counts.reshape(num_teams, num_teams), wins.sum(axis=1, dtype=np.float64)
+
+# create function to simulate the rest of the season many times over
+def simulate_odds(matchups_df, season_weeks=default_season_weeks, num_playoff_teams=default_playoff_teams,
+                  num_sims=default_num_sims, seed=0, batch_size=default_batch_size, processes=None, schedule_df=None):
+    '''
+    Function to estimate each team's playoff and seeding odds
+
+    param matchups_df: pandas dataframe of weekly matchups (two rows per game) of one season
+    param season_weeks: number of regular season weeks
+    param num_playoff_teams: number of teams per league that make the playoffs
+    param num_sims: number of seasons to simulate
+    param seed: random seed (the result only depends on the seed, num_sims, and batch_size)
+    param batch_size: seasons simulated per batch
+    param processes: number of worker processes (defaults to one per cpu, 1 runs every batch in this process)
+    param schedule_df: optional full schedule passed to remaining_schedule
+
+    returns: pandas dataframe with one row per team (record, fit, expected wins, playoff odds, and the odds of each
+             playoff seed in percent), sorted by playoff odds
+    '''
+
+    standings = team_standings(matchups_df)
+    fit = fit_score_distributions(matchups_df).reindex(standings.index)
+    games = remaining_schedule(matchups_df, season_weeks, schedule_df)
+
+    # with no games left the standings are final and one season says everything
+    if len(games) == 0:
+        num_sims = 1
+
+    teams = standings.index.tolist()
+    team_ids = {j: i for i, j in enumerate(teams)}
+    game_a = games['owner_team_name'].map(team_ids).to_numpy(dtype=np.int64)
+    game_b = games['opp_owner_team_name'].map(team_ids).to_numpy(dtype=np.int64)
+    pairs = zip(matchups_df['owner_team_name'].map(team_ids), matchups_df['opp_owner_team_name'].map(team_ids))
+    league = league_ids(teams, pairs)
+    args = (fit['mean'].to_numpy(), fit['std'].to_numpy(), game_a, game_b,
+            standings['wins'].to_numpy(dtype=np.float32), standings['points_for'].to_numpy(dtype=np.float64), league)
+
+    # every batch gets its own child seed, so the result does not depend on how the batches are spread out
+    sizes = [min(batch_size, num_sims - i) for i in range(0, num_sims, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    processes = min(processes or os.cpu_count() or 1, len(sizes))
+    if processes <= 1:
+        results = [simulate_batch(*args, size, i) for size, i in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(simulate_batch, *args, size, i) for size, i in zip(sizes, seeds)]
+            results = [i.result() for i in futures]
+
+    counts = sum(i[0] for i in results)
+    win_sums = sum(i[1] for i in results)
+
+    odds = standings.drop(columns='games').copy()
+    odds['points_for'] = odds['points_for'].round(1)
+    odds['points_against'] = odds['points_against'].round(1)
+    odds['mean'] = fit['mean'].round(1)
+    odds['std'] = fit['std'].round(1)
+    odds['exp_wins'] = np.round(win_sums / num_sims, 2)
+    odds['playoff_pct'] = np.round(counts[:, :num_playoff_teams].sum(axis=1) / num_sims * 100, 1)
+    for i in range(min(num_playoff_teams, len(teams))):
+        odds[f'seed_{i + 1}_pct'] = np.round(counts[:, i] / num_sims * 100, 1)
+    odds = odds.reset_index().sort_values(['playoff_pct', 'exp_wins', 'points_for'], ascending=False)
+    return odds.reset_index(drop=True)
+
+# create function to fingerprint the matchups, settings, and simulation code a set of odds is simulated from
+def odds_version(matchups_df, **settings):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(matchups_df.reset_index(drop=True), index=False).to_numpy()
+                          .tobytes())
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    digest.update(code_version(sys.modules[__name__]).encode())
+    return digest.hexdigest()[:16]
+
+# create function to load the odds saved for the last completed week, simulating and saving them when missing
+def load_odds(matchups_df, season_weeks=default_season_weeks, num_playoff_teams=default_playoff_teams,
+              num_sims=default_num_sims, seed=0, odds_dir=default_odds_dir, processes=None, simulate=True):
+    '''
+    Function to load the playoff odds of the last completed week
+
+    The odds are saved under the last completed week and a hash of the matchups, settings, and this file, so they are
+    simulated once per completed week (or score correction or code change) and every worker loads the same copy.
+
+    param matchups_df: pandas dataframe of weekly matchups of one season
+    param season_weeks: number of regular season weeks (regular_season_weeks of the season)
+    param num_playoff_teams: number of teams per league that make the playoffs
+    param num_sims: number of seasons to simulate
+    param seed: random seed
+    param odds_dir: directory of saved odds
+    param processes: number of worker processes used when the odds are simulated
+    param simulate: whether to simulate and save the odds when none are saved (the app passes False, so a web worker
+                    never runs the simulation)
+
+    returns: dictionary with week (last completed week), num_sims, and records (rows of simulate_odds), or None when
+             no odds are saved and simulate is False
+    '''
+
+    week = int(matchups_df['week'].max()) if len(matchups_df) else 0
+    version = odds_version(matchups_df, season_weeks=season_weeks, num_playoff_teams=num_playoff_teams,
+                           num_sims=num_sims, seed=seed)
+    path = os.path.join(odds_dir, f'playoff_odds_week{week:02d}_{version}.json')
+
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    if not simulate:
+        return None
+
+    odds = simulate_odds(matchups_df, season_weeks, num_playoff_teams, num_sims, seed, processes=processes)
+    result = {'week': week, 'num_sims': num_sims, 'records': odds.to_dict(orient='records')}
+
+    # save for the next worker, skipping quietly when the directory is read only
+    try:
+        os.makedirs(odds_dir, exist_ok=True)
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+        # drop the odds of older data
+        for old_path in glob.glob(os.path.join(odds_dir, 'playoff_odds_*.json')):
+            if old_path != path:
+                os.remove(old_path)
+    except OSError:
+        pass
+    return result
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        from data_store import read_table
+
+        year = int(read_table('rosters_df.csv')['year'].max())
+        odds = load_odds(read_table('matchups_df.csv'), regular_season_weeks(year))
+        print(f"simulated {odds['num_sims']:,d} seasons through week {odds['week']} in {default_odds_dir}")
+    else:
+        print('usage: python playoff_odds.py build')
+        sys.exit(1)
@@ -0,0 +1,316 @@
+# weekly fantasy point predictions of every rostered player, computed in batches and served from memory
+#
+# the position group random forests trained in 02-train_model/03-train_rf_model.ipynb are pickled to
+# data/models/rf_model_<group>.sav and the feature matrices written by 01-transform_data/01-calc_adv_stats.ipynb are
+# kept under data/features/<group>_feature_matrix.csv.  each model is loaded once per worker process and every
+# rostered player of every week is scored in one predict call per position group, so the roster callback only looks
+# the predictions up
+
+# import needed packages
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# create default locations of the trained models and the feature matrices
+default_model_dir = os.path.join('data', 'models')
+default_feature_dir = os.path.join('data', 'features')
+
+# create dictionary of each position group and the roster position names it scores
+position_groups = {'rbwrte': ['RB', 'WR', 'TE'], 'qb': ['QB'], 'def': ['DEF'], 'kr': ['KR']}
+
+# create list of the columns the predictions are keyed by
+key_columns = ['year', 'week', 'player']
+
+# create function to find the model and feature matrix files of each position group
+def prediction_files(model_dir=default_model_dir, feature_dir=default_feature_dir):
+    return [os.path.join(model_dir, f'rf_model_{i}.sav') for i in position_groups] + \
+           [os.path.join(feature_dir, f'{i}_feature_matrix.csv') for i in position_groups]
+
+# create function to take the exponential moving average of many groups of rows at once
+def ewm_mean(values, position, span=4):
+    '''
+    Function to compute DataFrame.ewm(span=span).mean() within each group of rows, for every group together
+
+    The rows of a group are contiguous and position counts them from 0.  The update is pandas' own (adjust=True,
+    ignore_na=False) applied to the k-th row of every group at once, so there is one numpy step per row of the
+    longest group instead of one pandas call per group.
+
+    param values: 2d float array of the rows to average
+    param position: array of each row's position within its group
+    param span: span of the exponential moving average
+
+    returns: 2d float array of the moving average as of each row
+    '''
+
+    factor = 1.0 - 2.0 / (span + 1.0)
+    weighted = values.astype(np.float64, copy=True)
+    old_wt = np.ones_like(weighted)
+    order = np.argsort(position, kind='stable')
+    bounds = np.searchsorted(position[order], np.arange(position.max() + 2 if len(position) else 1))
+
+    for k in range(1, len(bounds) - 1):
+        rows = order[bounds[k]:bounds[k + 1]]
+        prev, cur, wt = weighted[rows - 1], weighted[rows], old_wt[rows - 1]
+        seen, obs = ~np.isnan(prev), ~np.isnan(cur)
+        wt = np.where(seen, wt * factor, wt)
+        both = seen & obs
+        mean = np.where(prev != cur, (wt * prev + cur) / (wt + 1.0), prev)
+        weighted[rows] = np.where(both, mean, np.where(obs, cur, prev))
+        old_wt[rows] = np.where(both, wt + 1.0, wt)
+    return weighted
+
+# create function to build the model input of every rostered player of every week
+def build_features(feature_df, keys, columns, span=4):
+    '''
+    Function to build the model input of each (year, week, player) the way the training notebook does
+
+    A player's input for a week is the exponential moving average (span 4) of their games earlier in the same season.
+    A player with no earlier games that season (e.g. week 1) gets their average over the season before.
+
+    param feature_df: feature matrix dataframe of a position group (one row per player per week played)
+    param keys: dataframe of the (year, week, player) rows to build inputs for
+    param columns: list of the model's feature columns
+    param span: span of the exponential moving average
+
+    returns: dataframe with the key columns and the feature columns, one row per key with a complete input
+    '''
+
+    keys = keys[key_columns].drop_duplicates().astype({'year': np.int64, 'week': np.int64})
+    games = feature_df[key_columns + columns].astype({'year': np.int64, 'week': np.int64})
+    games = games.sort_values(['year', 'player', 'week']).reset_index(drop=True)
+
+    # last season's averages, taken before the games are replaced by their moving averages
+    prev = games.groupby(['year', 'player'], as_index=False)[columns].mean()
+    prev['year'] += 1
+
+    # moving average as of every game, then the last game before each week
+    position = games.groupby(['year', 'player'], sort=False).cumcount().to_numpy()
+    games[columns] = ewm_mean(games[columns].to_numpy(dtype=np.float64), position, span)
+    df = pd.merge_asof(keys.sort_values('week'), games.sort_values('week'), on='week', by=['year', 'player'],
+                       allow_exact_matches=False)
+
+    # fill the players with no earlier game that season from last season's averages
+    missing = df[columns].isnull().all(axis=1).to_numpy()
+    if missing.any():
+        filled = df.loc[missing, key_columns].merge(prev, on=['year', 'player'], how='left')
+        df.loc[missing, columns] = filled[columns].to_numpy()
+
+    df = df.loc[df[columns].notnull().all(axis=1)]
+    return df.sort_values(key_columns).reset_index(drop=True)
+
+# create function to fingerprint the inputs of every week of a position group
+def week_digests(df, columns, version):
+    '''
+    Function to hash the model inputs of each (year, week)
+
+    param df: dataframe returned by build_features (sorted by year, week, and player)
+    param columns: list of the model's feature columns
+    param version: model version string folded into every digest
+
+    returns: dictionary of (year, week) to hex digest
+    '''
+
+    row_hashes = pd.util.hash_pandas_object(df[['player'] + columns], index=False).to_numpy()
+    weeks = df['year'].to_numpy() * 100 + df['week'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, weeks[1:] != weeks[:-1]]) if len(df) else np.array([], dtype=np.int64)
+    digests = {}
+    for start, end in zip(starts, np.r_[starts[1:], len(df)]):
+        digest = hashlib.sha1(version.encode())
+        digest.update(row_hashes[start:end].tobytes())
+        digests[(int(weeks[start] // 100), int(weeks[start] % 100))] = digest.hexdigest()
+    return digests
+
+# create function to fingerprint everything the inputs of each season are built from
+def season_digests(games, keys, columns, version):
+    '''
+    Function to hash, for each season, its games, the games of the season before, and its rostered players
+
+    The inputs of a season's weeks are built from nothing else, so a season whose digest did not change does not need
+    its inputs built again.
+
+    param games: feature matrix dataframe sorted by year, player, and week
+    param keys: dataframe of the rostered (year, week, player) rows sorted by year, week, and player
+    param columns: list of the model's feature columns
+    param version: model version string folded into every digest
+
+    returns: dictionary of year to hex digest
+    '''
+
+    # create function to hash the rows of each year of a dataframe sorted by year
+    def year_bytes(df, hash_columns):
+        if len(df) == 0:
+            return {}
+        row_hashes = pd.util.hash_pandas_object(df[hash_columns], index=False).to_numpy()
+        years = df['year'].to_numpy()
+        bounds = np.flatnonzero(np.r_[True, years[1:] != years[:-1], True])
+        return {int(years[i]): row_hashes[i:j].tobytes() for i, j in zip(bounds[:-1], bounds[1:])}
+
+    game_parts, key_parts = year_bytes(games, key_columns + columns), year_bytes(keys, key_columns)
+    digests = {}
+    for year, key_bytes in key_parts.items():
+        digest = hashlib.sha1(version.encode())
+        for part in [game_parts.get(year - 1, b''), b'|', game_parts.get(year, b''), b'|', key_bytes]:
+            digest.update(part)
+        digests[year] = digest.hexdigest()
+    return digests
+
+# create class to hold the predictions of every rostered player keyed by (year, week, player)
+class prediction_store(object):
+    '''
+    In-memory table of weekly fantasy point predictions keyed by (year, week, player)
+
+    update() scores every rostered player of a position group in one batch.  On later calls it only builds the inputs
+    of the seasons whose games or rosters changed and only re-scores the weeks whose inputs (or model) changed.
+
+    param models: dictionary of position group to fitted regression model (fit on a dataframe, so it knows its
+                  feature columns); groups without a model get no predictions
+    '''
+
+    # create __init__ function
+    def __init__(self, models=None):
+        self.models = dict(models or {})
+        self.versions = {i: hashlib.sha1(pickle.dumps(j)).hexdigest() for i, j in self.models.items()}
+        self.predictions = {}
+        self.season_digests = {}
+        self.digests = {}
+        self.week_players = {}
+
+    # create function to load the models of every position group from the model directory
+    @classmethod
+    def from_dir(cls, model_dir=default_model_dir):
+        '''
+        Function to load data/models/rf_model_<group>.sav for each position group that has one
+
+        param model_dir: path to the model directory
+
+        returns: prediction_store
+        '''
+
+        models = {}
+        for group in position_groups:
+            path = os.path.join(model_dir, f'rf_model_{group}.sav')
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    models[group] = pickle.load(f)
+        return cls(models)
+
+    # create function to copy the store so it can be updated without touching the original
+    def copy(self):
+        '''
+        Function to make a new store with the same models and predictions
+
+        returns: prediction_store whose update() leaves this store as it was
+        '''
+
+        store = type(self)()
+        store.models = self.models
+        store.versions = self.versions
+        store.predictions = dict(self.predictions)
+        store.season_digests = dict(self.season_digests)
+        store.digests = {i: dict(j) for i, j in self.digests.items()}
+        store.week_players = {i: dict(j) for i, j in self.week_players.items()}
+        return store
+
+    # create function to read the feature matrices of every position group that has a model
+    def read_features(self, feature_dir=default_feature_dir):
+        features = {}
+        for group in self.models:
+            path = os.path.join(feature_dir, f'{group}_feature_matrix.csv')
+            if os.path.exists(path):
+                features[group] = pd.read_csv(path)
+        return features
+
+    # create function to score the rostered players of the weeks whose inputs changed
+    def update(self, rosters_df, features):
+        '''
+        Function to bring the predictions up to date with the rosters and feature matrices
+
+        param rosters_df: rosters dataframe with year, week, player, and position_name columns
+        param features: dictionary of position group to its feature matrix dataframe
+
+        returns: dictionary of position group to the number of (year, week) predicted again
+        '''
+
+        updated = {}
+        for group, model in self.models.items():
+            if group not in features:
+                continue
+            columns = list(model.feature_names_in_)
+            version = self.versions[group]
+            games = features[group][key_columns + columns].astype({'year': np.int64, 'week': np.int64})
+            games = games.sort_values(['year', 'player', 'week']).reset_index(drop=True)
+            keys = rosters_df.loc[rosters_df['position_name'].isin(position_groups[group]), key_columns]
+            keys = keys.drop_duplicates().astype({'year': np.int64, 'week': np.int64}).sort_values(key_columns)
+
+            # only build the inputs of the seasons whose games or rosters changed
+            seasons = season_digests(games, keys, columns, version)
+            old_seasons = self.season_digests.get(group, {})
+            changed_seasons = [i for i, j in seasons.items() if old_seasons.get(i) != j]
+            stale_seasons = set(changed_seasons) | (set(old_seasons) - set(seasons))
+            if not stale_seasons:
+                updated[group] = 0
+                continue
+            used = games['year'].isin(changed_seasons) | games['year'].isin([i - 1 for i in changed_seasons])
+            df = build_features(games.loc[used], keys.loc[keys['year'].isin(changed_seasons)], columns)
+            digests = week_digests(df, columns, version)
+
+            # drop the weeks of those seasons that are gone or changed, then score every changed week in one batch
+            old = self.digests.setdefault(group, {})
+            changed = [i for i, j in digests.items() if old.get(i) != j]
+            for week in [i for i in old if i[0] in stale_seasons and digests.get(i) != old[i]]:
+                del old[week]
+                for player in self.week_players.get(group, {}).pop(week, []):
+                    self.predictions.pop(week + (player,), None)
+
+            weeks = df['year'].to_numpy() * 100 + df['week'].to_numpy()
+            rows = np.isin(weeks, [i * 100 + j for i, j in changed])
+            if rows.any():
+                batch = df.loc[rows]
+                pred = model.predict(batch[columns])
+                year, week, player = (batch[i].tolist() for i in key_columns)
+                self.predictions.update(zip(zip(year, week, player), pred.tolist()))
+                for (i, j), group_rows in batch.groupby(['year', 'week'], sort=False).indices.items():
+                    self.week_players.setdefault(group, {})[(int(i), int(j))] = batch['player'].to_numpy()[group_rows]
+
+            old.update(digests)
+            self.season_digests[group] = seasons
+            updated[group] = len(changed)
+        return updated
+
+    # create function to grab one player's prediction
+    def get(self, year, week, player):
+        return self.predictions.get((year, week, player))
+
+    # create function to look up the prediction of every row of a dataframe
+    def pred_column(self, df):
+        '''
+        Function to grab the prediction of each row of a dataframe with year, week, and player columns
+
+        param df: pandas dataframe
+
+        returns: float numpy array of the predictions rounded to two decimals (nan without a prediction)
+        '''
+
+        preds = [self.predictions.get(i) for i in zip(df['year'].tolist(), df['week'].tolist(), df['player'].tolist())]
+        return np.array([np.nan if i is None else round(i, 2) for i in preds], dtype=np.float64)
+
+    # create function to add the predictions to a roster's rows
+    def annotate(self, records, year, week):
+        '''
+        Function to add a pred value to each row of a weekly roster
+
+        param records: list of row dictionaries (as returned by roster_index.lookup)
+        param year: season of the roster
+        param week: week of the roster
+
+        returns: new list of row dictionaries with pred rounded to two decimals (None without a prediction)
+        '''
+
+        rows = []
+        for record in records:
+            pred = self.predictions.get((year, week, record['player']))
+            rows.append(dict(record, pred=None if pred is None else round(pred, 2)))
+        return rows
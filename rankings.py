@@ -0,0 +1,284 @@
+# import needed packages
+import numpy as np
+import pandas as pd
+
+# create list of columns to rank in decending order
+ascending_false = ['pass_td', 'pass_yrd_per_pass', 'pass_1st_dwn', 'pass_yrd', 'rush_td', 'rush_yrd_per_rush',
+                   'rush_1st_down', 'rush_yrd', 'rec_td', 'rec_yrd_per_tar', 'rec_1st_down', 'rec_yrd_per_gm',
+                   'rec_per_gm', 'def_st_td', 'def_sack', 'def_int', 'def_fbml', 'kck_pts', 'rz_diff', 'to_diff']
+
+# create list of columns to rank in ascending order
+ascending_true = ['def_st_td_alw', 'def_st_yrd_alw']
+
+# create dictionary of the ranked columns averaged for each position group
+position_groups = {'QB':   ['pass_td', 'pass_yrd_per_pass', 'pass_1st_dwn', 'pass_yrd', 'rz_diff', 'to_diff'],
+                   'RB':   ['rush_td', 'rush_yrd_per_rush', 'rush_1st_down', 'rush_yrd', 'rz_diff', 'to_diff'],
+                   'WRTE': ['rec_td', 'rec_yrd_per_tar', 'rec_1st_down', 'rec_yrd_per_gm', 'rec_per_gm', 'rz_diff', 'to_diff'],
+                   'DEF':  ['def_st_td', 'def_sack', 'def_int', 'def_fbml', 'rz_diff', 'to_diff', 'def_st_td_alw',
+                            'def_st_yrd_alw'],
+                   'KICK': ['kck_pts', 'rz_diff', 'to_diff']
+}
+
+# create function to add the per game and per play rates to the aggregated team stats
+def add_team_rates(prior_weeks):
+    '''
+    Function to add the per game and per play rates used by the matchup rankings
+
+    param prior_weeks: pandas dataframe of team stats summed over the selected weeks (one row per team_abv) with a gp column
+
+    returns: the prior_weeks dataframe with the rate columns added
+    '''
+
+    # aggregate qb stats
+    prior_weeks['pass_td_per_gm'] = prior_weeks['pass_tds'] / prior_weeks['gp']
+    prior_weeks['pass_td_alw_per_gm'] = prior_weeks['pass_tds_alw'] / prior_weeks['gp']
+    prior_weeks['pass_yrd_per_gm'] = prior_weeks['tot_yrds_pass'] / prior_weeks['gp']
+    prior_weeks['pass_yrd_alw_per_gm'] = prior_weeks['tot_yrds_pass_alw'] / prior_weeks['gp']
+    prior_weeks['pass_yrd_per_pass'] = prior_weeks['tot_yrds_pass'] / prior_weeks['pass_att']
+    prior_weeks['pass_yrd_alw_per_pass_alw'] = prior_weeks['tot_yrds_pass_alw'] / prior_weeks['pass_att_alw']
+    prior_weeks['pass_1st_down_per_gm'] = prior_weeks['1st_dwn_pass'] / prior_weeks['gp']
+    prior_weeks['pass_1st_down_alw_per_gm'] = prior_weeks['1st_dwn_pass_alw'] / prior_weeks['gp']
+
+    # aggregate rb stats
+    prior_weeks['rush_td_per_gm'] = prior_weeks['rush_tds'] / prior_weeks['gp']
+    prior_weeks['rush_td_alw_per_gm'] = prior_weeks['rush_tds_alw'] / prior_weeks['gp']
+    prior_weeks['rush_yrd_per_gm'] = prior_weeks['tot_rush_yrds'] / prior_weeks['gp']
+    prior_weeks['rush_yrd_alw_per_gm'] = prior_weeks['tot_rush_yrds_alw'] / prior_weeks['gp']
+    prior_weeks['rush_yrd_per_rush'] = prior_weeks['tot_rush_yrds'] / prior_weeks['rush_att']
+    prior_weeks['rush_yrd_alw_per_rush_alw'] = prior_weeks['tot_rush_yrds_alw'] / prior_weeks['rush_att_alw']
+    prior_weeks['rush_1st_down_per_gm'] = prior_weeks['1st_dwn_rush'] / prior_weeks['gp']
+    prior_weeks['rush_1st_down_alw_per_gm'] = prior_weeks['1st_dwn_rush_alw'] / prior_weeks['gp']
+
+    # aggregate wr/te stats
+    prior_weeks['rec_yrd_per_gm'] = prior_weeks['tot_rec_yrds'] / prior_weeks['gp']
+    prior_weeks['rec_yrd_alw_per_gm'] = prior_weeks['tot_rec_yrds_alw'] / prior_weeks['gp']
+    prior_weeks['rec_yrd_per_tar'] = prior_weeks['tot_rec_yrds'] / prior_weeks['rec_targets']
+    prior_weeks['rec_yrd_alw_per_tar_alw'] = prior_weeks['tot_rec_yrds_alw'] / prior_weeks['rec_targets_alw']
+    prior_weeks['rec_tar_per_gm'] = prior_weeks['rec_targets'] / prior_weeks['gp']
+    prior_weeks['rec_tar_alw_per_gm'] = prior_weeks['rec_targets_alw'] / prior_weeks['gp']
+    prior_weeks['rec_per_gm'] = prior_weeks['tot_rec'] / prior_weeks['gp']
+    prior_weeks['rec_alw_per_gm'] = prior_weeks['tot_rec_alw'] / prior_weeks['gp']
+
+    # aggregate def stats
+    prior_weeks['def_st_td_per_gm'] = (prior_weeks['def_tds'] + prior_weeks['kick_ret_tds'] + prior_weeks['punt_ret_tds']) / \
+                                       prior_weeks['gp']
+    prior_weeks['def_st_td_alw_per_gm'] = (prior_weeks['def_tds_alw'] + prior_weeks['kick_ret_tds_alw'] + \
+                                           prior_weeks['punt_ret_tds_alw']) / prior_weeks['gp']
+    prior_weeks['fumble_per_gm'] = prior_weeks['fumble_rec'] / prior_weeks['gp']
+    prior_weeks['fumble_lost_per_gm'] = prior_weeks['fumble_lost'] / prior_weeks['gp']
+    prior_weeks['int_per_gm'] = prior_weeks['def_ints'] / prior_weeks['gp']
+    prior_weeks['int_alw_per_gm'] = prior_weeks['def_ints_alw'] / prior_weeks['gp']
+    prior_weeks['sacks_per_gm'] = prior_weeks['tot_sck'] / prior_weeks['gp']
+    prior_weeks['sacks_taken_per_gm'] = prior_weeks['sacks_taken'] / prior_weeks['gp']
+
+    # aggregate kick points stats
+    prior_weeks['kck_pts_per_gm'] = prior_weeks['kick_pts'] / prior_weeks['gp']
+    prior_weeks['kck_pts_alw_per_gm'] = prior_weeks['kick_pts_alw'] / prior_weeks['gp']
+
+    # aggregate kick & punt returns stats
+    prior_weeks['return_yrds_per_gm'] = (prior_weeks['kick_ret_yrds'] + prior_weeks['punt_ret_yrds']) / prior_weeks['gp']
+    prior_weeks['return_yrds_alw_per_gm'] = (prior_weeks['kick_ret_yrds_alw'] + prior_weeks['punt_ret_yrds_alw']) / \
+                                            prior_weeks['gp']
+
+    return prior_weeks
+
+# create class to look up every team's and every opponent's aggregated stats at once
+class team_stats_index(object):
+
+    # create __init__ function
+    def __init__(self, prior_weeks):
+
+        # index the aggregated team stats by team_abv once
+        self.stats = prior_weeks.set_index('team_abv')
+
+        # raise an error on duplicate teams since a lookup must resolve to exactly one row
+        if not self.stats.index.is_unique:
+            raise ValueError('prior_weeks has more than one row for a team_abv')
+
+    # create function to convert team abbreviations to row positions within the stats index
+    def positions(self, teams):
+        pos = self.stats.index.get_indexer(teams)
+
+        # raise an error on teams without stats, same as the scan in the original lookup
+        if (pos == -1).any():
+            missing = sorted(set(np.asarray(teams)[pos == -1].tolist()))
+            raise KeyError(f'no aggregated stats for teams: {missing}')
+        return pos
+
+    # create function to take the stat rows for a list of teams in a single pass
+    def take(self, teams):
+        return self.stats.take(self.positions(teams))
+
+# create function to multiply each team's stats by its opponent's stats for this week's matchups
+def calc_matchup_stats(prior_weeks, this_week):
+    '''
+    Function to calculate every team vs. opponent matchup stat as whole array operations
+
+    param prior_weeks: pandas dataframe returned by add_team_rates
+    param this_week: pandas dataframe of this week's matchups with team_abv and oppn columns
+
+    returns: pandas dataframe (indexed like this_week) with one column per ranked matchup stat
+    '''
+
+    # take the team rows and the opponent rows once each
+    index = team_stats_index(prior_weeks)
+    tm = index.take(this_week['team_abv'])
+    op = index.take(this_week['oppn'])
+
+    # create function to grab a column as an array so the math below is elementwise by matchup
+    def t(column):
+        return tm[column].to_numpy()
+    def o(column):
+        return op[column].to_numpy()
+
+    matchups = pd.DataFrame(index=this_week.index)
+
+    # qb
+    # multiply how many TDs thrown per game by team and how many passing TDs allowed per game by opponent
+    matchups['pass_td'] = t('pass_td_per_gm') * o('pass_td_alw_per_gm')
+
+    # multiply how many yards per pass by team and how many yards per pass allowed by opponent
+    matchups['pass_yrd_per_pass'] = t('pass_yrd_per_pass') * o('pass_yrd_alw_per_pass_alw')
+
+    # multiply how many passing 1st downs per game by team and how many passing 1st downs per game allowed by opponent
+    matchups['pass_1st_dwn'] = t('pass_1st_down_per_gm') * o('pass_1st_down_alw_per_gm')
+
+    # multiply passing yards per game by team and passing yards per game allowed by opponent
+    matchups['pass_yrd'] = t('pass_yrd_per_gm') * o('pass_yrd_alw_per_gm')
+
+    # rb
+    # multiply rushing TDs per game by team and rushing TDs allowed per game by opponent
+    matchups['rush_td'] = t('rush_td_per_gm') * o('rush_td_alw_per_gm')
+
+    # multiply how many yards per rush by team and how many yards per rush allowed by opponent
+    matchups['rush_yrd_per_rush'] = t('rush_yrd_per_rush') * o('rush_yrd_alw_per_rush_alw')
+
+    # multiply how many rushing 1st downs per game by team and how many rushing 1st downs per game allowed by opponent
+    matchups['rush_1st_down'] = t('rush_1st_down_per_gm') * o('rush_1st_down_alw_per_gm')
+
+    # multiply rushing yards per game by team and rushing yards per game allowed by opponent
+    matchups['rush_yrd'] = t('rush_yrd_per_gm') * o('rush_yrd_alw_per_gm')
+
+    # wr
+    # multiply passing TDs per game by team and passing TDs allowed per game by opponent
+    matchups['rec_td'] = t('pass_td_per_gm') * o('pass_td_alw_per_gm')
+
+    # multiply receiving yards per game by team and receiving yards per game allowed by opponent
+    matchups['rec_yrd_per_gm'] = t('rec_yrd_per_gm') * o('rec_yrd_alw_per_gm')
+
+    # multiply receiving yards per target by team and receiving yards per target allowed by opponent
+    matchups['rec_yrd_per_tar'] = t('rec_yrd_per_tar') * o('rec_yrd_alw_per_tar_alw')
+
+    # multiply receptions per game by team and receptions per game allowed by opponent
+    matchups['rec_per_gm'] = t('rec_per_gm') * o('rec_alw_per_gm')
+
+    # multiply how many receiving 1st downs per game by team and how many receiving 1st downs per game allowed by opponent
+    matchups['rec_1st_down'] = t('pass_1st_down_per_gm') * o('pass_1st_down_alw_per_gm')
+
+    # def
+    # multiply def and st TDs per game by team and def and st TDs allowed per game by opponent
+    matchups['def_st_td'] = t('def_st_td_per_gm') * o('def_st_td_alw_per_gm')
+
+    # multiply def sacks per game by team and sacks taken per game by opponent
+    matchups['def_sack'] = t('sacks_per_gm') * o('sacks_taken_per_gm')
+
+    # multiply def interceptions per game by team and def interceptions allowed per game by opponent
+    matchups['def_int'] = t('int_per_gm') * o('int_alw_per_gm')
+
+    # multiply def fumble recoveries per game by team and fumbles lost per game by opponent
+    matchups['def_fbml'] = t('fumble_per_gm') * o('fumble_lost_per_gm')
+
+    # multiply passing/rushing/def/st TDs allowed per game by team and passing/rushing/def/st TDs per game by opponent
+    matchups['def_st_td_alw'] = (t('pass_td_alw_per_gm') + t('rush_td_alw_per_gm') + t('def_st_td_alw_per_gm')) * \
+                                (o('pass_td_per_gm') + o('rush_td_per_gm') + o('def_st_td_per_gm'))
+
+    # multiply passing/rushing/return yards allowed per game by team and passing/rushing/return yards per game by opponent
+    matchups['def_st_yrd_alw'] = (t('pass_yrd_alw_per_gm') + t('rush_yrd_alw_per_gm') + t('return_yrds_alw_per_gm')) * \
+                                 (o('pass_yrd_per_gm') + o('rush_yrd_per_gm') + o('return_yrds_per_gm'))
+
+    # st
+    # multiply kick points per game by team and kick points allowed per game by opponent
+    matchups['kck_pts'] = t('kck_pts_per_gm') * o('kck_pts_alw_per_gm')
+
+    # misc
+    # calculate redzone differential
+    # (conversions divided attempts) minus the inverse (1 minus allowed conversions divided by allowed attempts)
+    matchups['rz_diff'] = (t('redzone_con') / t('redzone_att')) - (1 - o('redzone_con_alw') / o('redzone_att_alw'))
+
+    # calculate turnover differential
+    # (interceptions plus fumbles) minus opponent's (interceptions thrown plus fumbles lost)
+    matchups['to_diff'] = (t('def_ints') + t('fumble_rec')) - (o('int_thrown') + o('fumble_lost'))
+
+    return matchups
+
+# create function to rank each matchup stat across this week's teams
+def rank_matchup_stats(matchups):
+    ranks = pd.DataFrame(index=matchups.index)
+
+    # rank all columns in ascending_false
+    for i in ascending_false:
+        ranks[i] = matchups[i].rank(method='average', ascending = False)
+
+    # rank all columns in ascending_true
+    for i in ascending_true:
+        ranks[i] = matchups[i].rank(method='average', ascending = True)
+
+    return ranks
+
+# create function to average the ranks for each position group
+def avg_position_ranks(ranks):
+
+    # group by QB, RB, WR/TE, DEF, and ST using row means
+    rank_avg = pd.DataFrame(index=ranks.index)
+    for group, group_columns in position_groups.items():
+        rank_avg[group] = ranks[group_columns].mean(axis=1)
+
+    return rank_avg
+
+# create function to build the rankings table for one request without touching any shared dataframes
+def rankings_frame(week_store, this_week, num_weeks):
+    '''
+    Function to build the weekly matchup rankings table as a dataframe
+
+    Every dataframe is built fresh for the request from the read-only week_store and this_week inputs, so the
+    function has no side effects and can run from any number of threads at once.
+
+    param week_store: week_agg_store built from tm_game_data
+    param this_week: pandas dataframe of this week's matchups (week, team_abv, oppn, home)
+    param num_weeks: number of prior weeks to aggregate
+
+    returns: pandas dataframe with the week, team_abv, oppn, QB, RB, WRTE, DEF, and KICK columns
+    '''
+
+    prior_weeks = add_team_rates(week_store.window(num_weeks))
+
+    # multiply each team's stats by its opponent's stats for all of this week's matchups at once
+    matchups = calc_matchup_stats(prior_weeks, this_week)
+
+    # rank all matchup columns and group by QB, RB, WR/TE, DEF, and ST using row means
+    rank_avg = avg_position_ranks(rank_matchup_stats(matchups))
+
+    # add "@" to oppn column since all opponents are the home teams due to how the schedule is scraped from ESPN
+    table = this_week[['week', 'team_abv', 'oppn']].copy()
+    home = (this_week['home'] == True).to_numpy()
+    table['oppn'] = np.where(home, table['oppn'], '@' + table['oppn'].astype(str))
+    table['team_abv'] = np.where(home, '@' + table['team_abv'].astype(str), table['team_abv'])
+
+    for i in rank_avg.columns:
+        table[i] = rank_avg[i]
+
+    return table.round({'QB': 1, 'RB': 1, 'WRTE': 1, 'DEF': 1, 'KICK': 1})
+
+# create function to build the weekly matchup rankings table
+def rankings_table(week_store, this_week, num_weeks):
+    '''
+    Function to build the weekly matchup rankings table
+
+    param week_store: week_agg_store built from tm_game_data
+    param this_week: pandas dataframe of this week's matchups (week, team_abv, oppn, home)
+    param num_weeks: number of prior weeks to aggregate
+
+    returns: list of row dictionaries for the rankings DataTable
+    '''
+
+    return rankings_frame(week_store, this_week, num_weeks).to_dict(orient='records')
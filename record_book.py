@@ -0,0 +1,369 @@
+# all-time head-to-head records, season standings, and record books of every owner across seasons
+#
+# every game since 2018 (data/<season>/matchups_df_<season>.csv, data/matchups_df_all.pkl, and the current season's
+# matchups_df.csv) is summed into per owner pair and per (year, owner) totals with np.add.at, and each record book
+# keeps only its top entries.  given the book of an earlier copy of the matchups, only the weeks after the ones it
+# already holds are added: the totals grow, each record book merges the new weeks' candidates into its top entries,
+# and every owner's running streak carries on from where it stood.  the tables the dashboard shows are built as lists
+# of row dictionaries when the book is updated, so every lookup is a single dictionary get.
+
+# import needed packages
+import glob
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_table
+
+# create list of the matchups_df.csv columns (two rows per game, one from each side)
+matchup_columns = ['week', 'owner_team_name', 'owner', 'score', 'win', 'opp_owner_team_name', 'opp_owner', 'opp_score']
+
+# create list of the totals kept for each owner pair and each owner's season
+total_columns = ['games', 'wins', 'losses', 'ties', 'points_for', 'points_against']
+
+# create dictionary of each record book and its title
+record_names = {'highest_score': 'Highest scores', 'lowest_score': 'Lowest scores',
+                'largest_margin': 'Largest margins of victory', 'longest_win_streak': 'Longest winning streaks',
+                'longest_losing_streak': 'Longest losing streaks'}
+
+# create lists of the columns of the game and streak record books
+score_columns = ['year', 'week', 'owner', 'owner_team_name', 'score', 'opp_owner', 'opp_owner_team_name',
+                 'opp_score', 'margin']
+streak_columns = ['owner', 'games', 'start_year', 'start_week', 'end_year', 'end_week', 'active']
+
+# create list of the columns of the head-to-head and standings tables
+h2h_columns = ['opp_owner'] + total_columns + ['win_pct', 'avg_margin']
+standings_columns = ['rank', 'owner', 'owner_team_name'] + total_columns + ['win_pct']
+
+# create default number of entries in each record book and the standings key of every season together
+default_top_n = 10
+all_seasons = 'All seasons'
+
+# create function to read the matchups of every season under the data directory
+def read_matchups(data_dir='data'):
+    '''
+    Function to stack data/<season>/matchups_df_<season>.csv and data/matchups_df_all.pkl into one dataframe
+
+    param data_dir: path to the data directory
+
+    returns: pandas dataframe with year and the matchup_columns, ordered by year and week
+    '''
+
+    # season csv files take precedence, the combined pickle fills in any seasons without one
+    seasons = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, '[0-9]' * 4, 'matchups_df_[0-9][0-9][0-9][0-9].csv'))):
+        seasons[int(os.path.basename(path)[-8:-4])] = read_table(path)
+
+    all_path = os.path.join(data_dir, 'matchups_df_all.pkl')
+    if os.path.exists(all_path):
+        for year, df in read_table(all_path).groupby('year', sort=True):
+            seasons.setdefault(int(year), df)
+
+    if not seasons:
+        return pd.DataFrame(columns=['year'] + matchup_columns)
+    frames = [seasons[i].assign(year=i)[['year'] + matchup_columns] for i in sorted(seasons)]
+    return pd.concat(frames, ignore_index=True).sort_values(['year', 'week'], kind='mergesort').reset_index(drop=True)
+
+# create function to put the current season's matchups in place of that season's in the history
+def all_matchups(history, matchups_df, year):
+    '''
+    Function to add the current season to the matchups of past seasons
+
+    param history: pandas dataframe returned by read_matchups
+    param matchups_df: pandas dataframe of the current matchups_df.csv (with or without a year column)
+    param year: season of matchups_df when it has no year column
+
+    returns: pandas dataframe with year and the matchup_columns, ordered by year and week
+    '''
+
+    current = matchups_df if 'year' in matchups_df.columns else matchups_df.assign(year=year)
+    history = history.loc[~history['year'].isin(current['year'].unique())]
+    df = pd.concat([history, current[['year'] + matchup_columns]], ignore_index=True)
+    return df.sort_values(['year', 'week'], kind='mergesort').reset_index(drop=True)
+
+# create function to fingerprint the rows of each (year, week) of a matchups dataframe
+def matchup_week_digests(matchups_df):
+    hashes = pd.util.hash_pandas_object(matchups_df[['year'] + matchup_columns], index=False).to_numpy()
+    return {(int(year), int(week)): hashlib.sha1(hashes[rows].tobytes()).hexdigest()
+            for (year, week), rows in matchups_df.groupby(['year', 'week'], sort=False).indices.items()}
+
+# create function to number keys, giving each key not numbered yet the next number
+def number_keys(ids, keys):
+    for key in keys:
+        if key not in ids:
+            ids[key] = len(ids)
+    return np.array([ids[i] for i in keys], dtype=np.int64)
+
+# create function to pad an array with rows of zeros up to a number of rows
+def grow(values, num_rows):
+    if len(values) >= num_rows:
+        return values
+    return np.concatenate([values, np.zeros((num_rows - len(values),) + values.shape[1:], dtype=values.dtype)])
+
+# create function to turn total rows into dataframe columns with the win percent
+def totals_frame(totals):
+    df = pd.DataFrame(totals, columns=total_columns)
+    for i in total_columns[:4]:
+        df[i] = df[i].astype(np.int64)
+    for i in total_columns[4:]:
+        df[i] = df[i].round(1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['win_pct'] = np.round((df['wins'] + df['ties'] / 2) / df['games'], 3)
+    return df
+
+# create function to merge record book candidates into the current top entries
+def top_entries(book, candidates, sort_columns, ascending, top_n, key_columns=None):
+    '''
+    Function to keep the top entries of a record book and new candidates
+
+    param book: pandas dataframe of the current entries
+    param candidates: pandas dataframe of new entries with the same columns
+    param sort_columns: list of the columns the entries are ranked by
+    param ascending: list of whether each sort column ranks low values first
+    param top_n: number of entries kept
+    param key_columns: optional list of the columns naming an entry, a candidate replacing the entry it names
+
+    returns: pandas dataframe of the top_n entries, best first (book itself when no candidate makes it)
+    '''
+
+    # a full book only takes candidates at least as good as its last entry (a running streak only grows, so one
+    # that is in the book always passes)
+    if len(book) >= top_n and len(candidates):
+        value, last = candidates[sort_columns[0]].to_numpy(), book[sort_columns[0]].iloc[-1]
+        candidates = candidates.loc[value <= last if ascending[0] else value >= last]
+    if not len(candidates):
+        return book
+
+    df = pd.concat([book, candidates], ignore_index=True) if len(book) else candidates
+    if key_columns:
+        df = df.drop_duplicates(key_columns, keep='last')
+    return df.sort_values(sort_columns, ascending=ascending, kind='mergesort').head(top_n).reset_index(drop=True)
+
+# create function to convert a dataframe to a list of row dictionaries (without boxing every value through pandas)
+def to_records(df):
+    columns = list(df.columns)
+    return [dict(zip(columns, i)) for i in zip(*[df[j].to_numpy().tolist() for j in columns])]
+
+# create function to split the records of a dataframe ordered by group into one list per group
+def split_records(df, groups):
+    records = to_records(df)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(groups) else np.array([], dtype=np.int64)
+    ends = np.r_[starts[1:], len(groups)]
+    return [(groups[i], records[i:j]) for i, j in zip(starts, ends)]
+
+# create class to look up head-to-head records, standings, and record books across every season
+class record_book(object):
+    '''
+    All-time head-to-head, season standings, and record book index of a matchups dataframe
+
+    Wins, losses, ties, and points are summed per (owner, opponent) pair and per (year, owner) season, each record
+    book keeps its top_n entries, and every owner's running streak (result, length, and first week) is kept so later
+    weeks carry it on.  Streaks run across seasons and a tie ends one.
+
+    Given the book of an earlier copy of the matchups whose weeks are all unchanged, only the later weeks are added to
+    a copy of it; any other change builds the book from every week again.
+
+    param matchups_df: pandas dataframe with year and the matchup_columns (two rows per game), e.g. from all_matchups
+    param previous: optional record_book of an earlier copy of the matchups
+    param top_n: number of entries in each record book
+    '''
+
+    # create __init__ function
+    def __init__(self, matchups_df, previous=None, top_n=default_top_n):
+        self.top_n = top_n
+        self.digests = matchup_week_digests(matchups_df)
+
+        # weeks after the last one the previous book holds are appended to a copy of it
+        new_weeks = sorted(i for i, j in self.digests.items() if previous is None or previous.digests.get(i) != j)
+        if previous is not None and previous.top_n == top_n and \
+           all(self.digests.get(i) == j for i, j in previous.digests.items()) and \
+           (not new_weeks or not previous.digests or new_weeks[0] > max(previous.digests)):
+            self.copy_state(previous)
+        else:
+            self.copy_state(None)
+            new_weeks = sorted(self.digests)
+        self.added_weeks = len(new_weeks)
+
+        if new_weeks:
+            keys = matchups_df['year'].to_numpy() * 100 + matchups_df['week'].to_numpy()
+            self.add(matchups_df.loc[np.isin(keys, [i * 100 + j for i, j in new_weeks])])
+
+    # create function to start from the state of another book (or an empty one), copying whatever add changes in place
+    def copy_state(self, other):
+        if other is None:
+            self.owners, self.owner_ids = [], {}
+            self.pair_ids, self.pairs = {}, np.zeros((0, 2), dtype=np.int64)
+            self.pair_totals = np.zeros((0, len(total_columns)))
+            self.season_ids, self.seasons = {}, np.zeros((0, 2), dtype=np.int64)
+            self.season_totals = np.zeros((0, len(total_columns)))
+            self.season_teams = np.array([], dtype=object)
+            # result (1 win, -1 loss, 0 none), games, first year, and first week of each owner's running streak
+            self.streaks = np.zeros((0, 4), dtype=np.int64)
+            self.books = {i: pd.DataFrame(columns=streak_columns if i.endswith('streak') else score_columns)
+                          for i in record_names}
+            self.h2h_rows, self.standings_rows, self.book_rows, self.matrix_rows = {}, {}, {}, []
+            return
+
+        self.owners, self.owner_ids = list(other.owners), dict(other.owner_ids)
+        self.pair_ids, self.pairs, self.pair_totals = dict(other.pair_ids), other.pairs, other.pair_totals.copy()
+        self.season_ids, self.seasons = dict(other.season_ids), other.seasons
+        self.season_totals, self.season_teams = other.season_totals.copy(), other.season_teams.copy()
+        self.streaks = other.streaks.copy()
+        self.books = dict(other.books)
+        self.h2h_rows, self.standings_rows = dict(other.h2h_rows), dict(other.standings_rows)
+        self.book_rows, self.matrix_rows = dict(other.book_rows), other.matrix_rows
+
+    # create function to add the games of weeks after every week in the book
+    def add(self, matchups_df):
+        '''
+        Function to add weeks of games to the totals, streaks, record books, and lookup tables
+
+        param matchups_df: pandas dataframe with year and the matchup_columns of weeks after the ones in the book
+        '''
+
+        df = matchups_df.sort_values(['year', 'week'], kind='mergesort')
+        year, week = df['year'].to_numpy().astype(np.int64), df['week'].to_numpy().astype(np.int64)
+        score, opp_score = df['score'].to_numpy(dtype=np.float64), df['opp_score'].to_numpy(dtype=np.float64)
+        result = np.where(df['win'].to_numpy() == 1, 1, np.where(score == opp_score, 0, -1))
+
+        # number the owners, owner pairs, and owner seasons of these games, adding any not seen before
+        codes, uniques = pd.factorize(np.concatenate([df['owner'].to_numpy(), df['opp_owner'].to_numpy()]))
+        owner_pos = number_keys(self.owner_ids, uniques.tolist())[codes]
+        self.owners = list(self.owner_ids)
+        owner, opp = owner_pos[:len(df)], owner_pos[len(df):]
+        num_owners = len(self.owners)
+
+        pair_codes, pair_pos = np.unique(owner * num_owners + opp, return_inverse=True)
+        pair = number_keys(self.pair_ids, [(int(i // num_owners), int(i % num_owners)) for i in pair_codes])[pair_pos]
+        self.pairs = np.array(list(self.pair_ids), dtype=np.int64).reshape(-1, 2)
+
+        season_codes, season_pos = np.unique(year * num_owners + owner, return_inverse=True)
+        season = number_keys(self.season_ids, [(int(i // num_owners), int(i % num_owners))
+                                               for i in season_codes])[season_pos]
+        self.seasons = np.array(list(self.season_ids), dtype=np.int64).reshape(-1, 2)
+
+        # sum every game into its owner pair and owner season
+        values = np.column_stack([np.ones(len(df)), result == 1, result == -1, result == 0, score, opp_score])
+        self.pair_totals = grow(self.pair_totals, len(self.pair_ids))
+        np.add.at(self.pair_totals, pair, values)
+        self.season_totals = grow(self.season_totals, len(self.season_ids))
+        np.add.at(self.season_totals, season, values)
+        self.season_teams = grow(self.season_teams, len(self.season_ids))
+        last_game = pd.Series(season).drop_duplicates(keep='last')
+        self.season_teams[last_game.to_numpy()] = df['owner_team_name'].to_numpy()[last_game.index]
+
+        # merge the games' scores and margins into the record books
+        games = df[['year', 'week', 'owner', 'owner_team_name', 'score', 'opp_owner', 'opp_owner_team_name',
+                    'opp_score']].assign(margin=np.round(score - opp_score, 1)).reset_index(drop=True)
+        books = [('highest_score', games, 'score', False), ('lowest_score', games, 'score', True),
+                 ('largest_margin', games.loc[games['margin'] > 0], 'margin', False)]
+        for name, candidates, column, ascending in books:
+            sort_columns, sort_ascending = [column, 'year', 'week', 'owner'], [ascending, True, True, True]
+            candidates = candidates.sort_values(sort_columns, ascending=sort_ascending, kind='mergesort')
+            self.books[name] = top_entries(self.books[name], candidates.head(self.top_n), sort_columns,
+                                           sort_ascending, self.top_n)
+
+        # run length encode each owner's results in order, the first run continuing the owner's running streak
+        self.streaks = grow(self.streaks, num_owners)
+        order = np.argsort(owner, kind='stable')
+        o, r, y, w = owner[order], result[order], year[order], week[order]
+        new_owner = np.r_[True, o[1:] != o[:-1]]
+        new_run = new_owner | np.r_[True, r[1:] != r[:-1]]
+        run_start = np.maximum.accumulate(np.where(new_run, np.arange(len(o)), 0))
+        carried = new_owner[run_start] & (r != 0) & (r == self.streaks[o, 0])
+        length = np.arange(len(o)) - run_start + 1 + np.where(carried, self.streaks[o, 1], 0)
+        start_year = np.where(carried, self.streaks[o, 2], y[run_start])
+        start_week = np.where(carried, self.streaks[o, 3], w[run_start])
+        run_end = np.r_[new_run[1:], True]
+        last = np.r_[new_owner[1:], True]
+        self.streaks[o[last]] = np.column_stack([r, length, start_year, start_week])[last]
+
+        # every run is a streak candidate (a running streak replaces its shorter entry), marked active while running
+        runs = pd.DataFrame({'owner': np.array(self.owners, dtype=object)[o], 'games': length, 'start_year': start_year,
+                             'start_week': start_week, 'end_year': y, 'end_week': w, 'result': r})[run_end]
+        for name, sign in [('longest_win_streak', 1), ('longest_losing_streak', -1)]:
+            book = top_entries(self.books[name], runs.loc[runs['result'] == sign, streak_columns[:-1]],
+                               ['games', 'start_year', 'start_week', 'owner'], [False, True, True, True], self.top_n,
+                               key_columns=['owner', 'start_year', 'start_week'])
+            running = self.streaks[[self.owner_ids[i] for i in book['owner']]].reshape(-1, 4)
+            self.books[name] = book.assign(active=(running[:, 0] == sign) &
+                                                  (running[:, 2] == book['start_year'].to_numpy()) &
+                                                  (running[:, 3] == book['start_week'].to_numpy()))
+
+        self.update_rows(np.unique(owner), np.unique(year))
+
+    # create function to rebuild the lookup tables of the owners and seasons that gained games
+    def update_rows(self, owners, years):
+        '''
+        Function to rebuild the row dictionaries the dashboard tables read
+
+        param owners: int numpy array of the owner positions whose head-to-head rows changed
+        param years: int numpy array of the seasons whose standings changed
+        '''
+
+        # each changed owner's record against every opponent, best first, split into one list per owner
+        rows = np.flatnonzero(np.isin(self.pairs[:, 0], owners))
+        pairs = totals_frame(self.pair_totals[rows])
+        pairs['opp_owner'] = np.array(self.owners, dtype=object)[self.pairs[rows, 1]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pairs['avg_margin'] = np.round((pairs['points_for'] - pairs['points_against']) / pairs['games'], 1)
+        order = np.lexsort((-pairs['games'].to_numpy(), -pairs['win_pct'].to_numpy(), self.pairs[rows, 0]))
+        for i, records in split_records(pairs.iloc[order][h2h_columns], self.pairs[rows[order], 0]):
+            self.h2h_rows[self.owners[i]] = records
+
+        # each changed season's standings ranked by wins and then points for, and every season together
+        rows = np.flatnonzero(np.isin(self.seasons[:, 0], years))
+        seasons = totals_frame(self.season_totals[rows])
+        seasons['owner'] = np.array(self.owners, dtype=object)[self.seasons[rows, 1]]
+        seasons['owner_team_name'] = self.season_teams[rows]
+        order = np.lexsort((-seasons['points_for'].to_numpy(), -seasons['wins'].to_numpy(), self.seasons[rows, 0]))
+        year = self.seasons[rows[order], 0]
+        seasons = seasons.iloc[order].assign(rank=np.arange(len(order)) - np.searchsorted(year, year) + 1)
+        for i, records in split_records(seasons[standings_columns], year):
+            self.standings_rows[int(i)] = records
+
+        overall = totals_frame(np.stack([np.bincount(self.pairs[:, 0], weights=self.pair_totals[:, i],
+                                                     minlength=len(self.owners)) for i in range(len(total_columns))],
+                                        axis=1))
+        overall['owner'] = self.owners
+        latest_team = pd.Series(self.season_teams, index=self.seasons[:, 1]).groupby(level=0).last()
+        overall['owner_team_name'] = latest_team.reindex(np.arange(len(self.owners))).to_numpy()
+        overall = overall.sort_values(['wins', 'points_for'], ascending=False, kind='mergesort')
+        self.standings_rows[all_seasons] = to_records(overall.assign(rank=np.arange(1, len(overall) + 1))[
+            standings_columns])
+
+        for name, book in self.books.items():
+            self.book_rows[name] = to_records(book)
+
+        # wins-losses of the owners of the latest season against each other (ties added when there are any), left
+        # blank for owners who never played
+        members = np.unique(self.seasons[self.seasons[:, 0] == self.seasons[:, 0].max(), 1]) if len(self.seasons) \
+                  else np.array([], dtype=np.int64)
+        members = sorted(members.tolist(), key=self.owners.__getitem__)
+        matrix = {i: {'owner': self.owners[i]} for i in members}
+        rows = np.flatnonzero(np.isin(self.pairs[:, 0], members) & np.isin(self.pairs[:, 1], members))
+        for (i, j), (wins, losses, ties) in zip(self.pairs[rows].tolist(), self.pair_totals[rows, 1:4].tolist()):
+            matrix[i][self.owners[j]] = f'{wins:.0f}-{losses:.0f}' + (f'-{ties:.0f}' if ties else '')
+        self.matrix_rows = list(matrix.values())
+
+    # create function to list the owners of the head-to-head matrix (the owners of the latest season)
+    def matrix_owners(self):
+        return [i['owner'] for i in self.matrix_rows]
+
+    # create function to grab an owner's record against every opponent
+    def head_to_head(self, owner):
+        return self.h2h_rows.get(owner, [])
+
+    # create function to grab a season's standings (all_seasons for every season together)
+    def standings(self, year):
+        return self.standings_rows.get(year, [])
+
+    # create function to grab a record book's entries
+    def records(self, name):
+        return self.book_rows.get(name, [])
+
+    # create function to list the seasons in the book, most recent first
+    def years(self):
+        return sorted(set(self.seasons[:, 0].tolist()), reverse=True)
@@ -0,0 +1,143 @@
+# import needed packages
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from compact_rosters import read_rosters
+
+# create class to look up each fantasy team's weekly roster without any pandas work per request
+class roster_index(object):
+    '''
+    Pre-partitioned roster index keyed by (year, week, owner_team)
+
+    Each key maps to the frame and row range of that team's roster, with the rows already sorted by slot_id (sources
+    maps each key to its frame and rows), so no row is converted to a dictionary until a lookup asks for it.
+    '''
+
+    # create __init__ function
+    def __init__(self):
+        self.frames = []
+        self.sources = {}
+
+    # create function to add every (year, week, owner_team) roster within a rosters dataframe to the index
+    def add(self, rosters_df, replace=True):
+        '''
+        Function to partition a rosters dataframe into the index
+
+        param rosters_df: pandas dataframe with year, week, owner_team, and slot_id columns
+        param replace: whether rosters already in the index are replaced by the ones in rosters_df
+
+        returns: number of rosters added
+        '''
+
+        if len(rosters_df) == 0:
+            return 0
+
+        # group row positions by key in their original order
+        groups = rosters_df.groupby(['year', 'week', 'owner_team'], sort=False).indices
+        slot_id = rosters_df['slot_id'].to_numpy()
+
+        # sort each roster by slot_id the same way sort_values('slot_id') does on the filtered rows
+        order = np.concatenate([pos[np.argsort(slot_id[pos], kind='quicksort')] for pos in groups.values()])
+        sorted_df = rosters_df.iloc[order].reset_index(drop=True)
+        self.frames.append(sorted_df)
+
+        added = 0
+        start = 0
+        for key, pos in groups.items():
+            end = start + len(pos)
+            key = (int(key[0]), int(key[1]), key[2])
+            if replace or key not in self.sources:
+                self.sources[key] = (len(self.frames) - 1, start, end)
+                added += 1
+            start = end
+        return added
+
+    # create function to build the index from every season under the data directory
+    @classmethod
+    def from_data_dir(cls, data_dir='data'):
+        '''
+        Function to build the index from data/<season>/rosters_df_<season>.csv and data/rosters_df_all.pkl
+
+        param data_dir: path to the data directory
+
+        returns: roster_index
+        '''
+
+        index = cls()
+
+        # season csv files take precedence, the combined pickle fills in any seasons without one
+        for path in sorted(glob.glob(os.path.join(data_dir, '[0-9]' * 4, 'rosters_df_[0-9][0-9][0-9][0-9].csv'))):
+            index.add(read_rosters(path))
+
+        all_path = os.path.join(data_dir, 'rosters_df_all.pkl')
+        if os.path.exists(all_path):
+            index.add(read_rosters(all_path), replace=False)
+
+        return index
+
+    # create function to copy the index so rosters can be added without touching the original
+    def copy(self):
+        '''
+        Function to make a new index holding the same rosters (the dataframes are shared, not copied)
+
+        returns: roster_index without the dataframes that no longer supply any roster
+        '''
+
+        index = type(self)()
+        used = sorted(set(i[0] for i in self.sources.values()))
+        index.frames = [self.frames[i] for i in used]
+        frame_ids = {j: i for i, j in enumerate(used)}
+        index.sources = {key: (frame_ids[i], start, end) for key, (i, start, end) in self.sources.items()}
+        return index
+
+    # create function to grab one team's weekly roster as the list of row dictionaries the roster DataTable expects
+    def lookup(self, year, week, owner_team):
+        if (year, week, owner_team) not in self.sources:
+            return []
+        frame_id, start, end = self.sources[(year, week, owner_team)]
+        return self.frames[frame_id].iloc[start:end].to_dict(orient='records')
+
+    # create function to gather every indexed roster into one dataframe
+    def to_frame(self):
+        '''
+        Function to stack every roster in the index into one dataframe, ordered by key and then by slot_id
+
+        returns: pandas dataframe with one row per roster spot
+        '''
+
+        if not self.sources:
+            return pd.DataFrame()
+
+        # gather each frame's rows of the rosters it still supplies, then put every roster in key order
+        pieces = []
+        for frame_id, frame in enumerate(self.frames):
+            spans = sorted((key, start, end) for key, (i, start, end) in self.sources.items() if i == frame_id)
+            if spans:
+                rows = np.concatenate([np.arange(start, end) for _, start, end in spans])
+                pieces.append((spans, frame.iloc[rows]))
+        if len(pieces) == 1:
+            return pieces[0][1].reset_index(drop=True)
+
+        keys = [(key, n) for n, (spans, _) in enumerate(pieces) for key, start, end in spans for _ in range(end - start)]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        return pd.concat([i for _, i in pieces], ignore_index=True).iloc[order].reset_index(drop=True)
+
+    # create function to list the seasons in the index
+    def years(self):
+        return sorted(set(i[0] for i in self.sources))
+
+    # create function to report the memory footprint of the index
+    def nbytes(self):
+        '''
+        Function to estimate the memory held by the index
+
+        returns: bytes held by the sources dictionary and its keys, plus the kept dataframes
+        '''
+
+        keys = sum(sys.getsizeof(i) + sum(sys.getsizeof(j) for j in i) for i in self.sources)
+        return sys.getsizeof(self.sources) + keys + sum(int(i.memory_usage(index=True, deep=True).sum())
+                                                        for i in self.frames)
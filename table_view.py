@@ -0,0 +1,201 @@
+# server-side paging, sorting, filtering, and column projection for the dash DataTables
+#
+# a table_view holds a dataframe as one numpy array per column plus a precomputed sort rank per column, so a request
+# filters, sorts (one lexsort over integer ranks), pages, and builds row dictionaries for only the visible rows and
+# columns.  the filter_query strings are the ones a DataTable sends with filter_action='custom'
+
+# import needed packages
+import math
+
+import numpy as np
+import pandas as pd
+
+# create list of the DataTable filter operators, longest first so "<=" is found before "<"
+filter_operators = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'], ['ne ', '!='], ['eq ', '='],
+                    ['contains '], ['datestartswith ']]
+
+# create function to split one part of a DataTable filter_query into column, operator, and value
+def split_filter_part(filter_part):
+    '''
+    Function to parse one "&&" separated part of a DataTable filter_query (e.g. {proj_points} > 10)
+
+    param filter_part: string
+
+    returns: tuple of the column name, operator (one of the first entries of filter_operators without the space),
+             and value (a float when it parses as one), or (None, None, None) when the part can not be parsed
+    '''
+
+    for operator_type in filter_operators:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+                value_part = value_part.strip()
+                if value_part and value_part[0] == value_part[-1] and value_part[0] in ("'", '"', '`'):
+                    value = value_part[1:-1].replace('\\' + value_part[0], value_part[0])
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+# create function to rank the values of a column so any sort is a lexsort over integers
+def sort_ranks(values):
+    '''
+    Function to rank each value of a column in ascending order, with nulls ranked after every value
+
+    param values: numpy array
+
+    returns: int64 numpy array of dense ranks (the nulls all get the number of distinct values)
+    '''
+
+    try:
+        codes, uniques = pd.factorize(values, sort=True)
+    except TypeError:
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object).astype(str).where(pd.notnull(values)), sort=True)
+    codes = codes.astype(np.int64)
+    codes[codes < 0] = len(uniques)
+    return codes
+
+# create class to serve pages of a dataframe to a DataTable
+class table_view(object):
+    '''
+    Read-only, column oriented view of a dataframe for DataTables with page_action, sort_action, and filter_action
+    set to 'custom'
+
+    param df: pandas dataframe (its row order is the default order of the table)
+    param group_columns: optional list of columns that split the table into separately served groups (e.g. one
+                         roster per year, week, and owner_team)
+    param rank_columns: optional list of the columns ranked up front (every column when None); any other column is
+                        ranked the first time a request sorts on it
+    '''
+
+    # create __init__ function
+    def __init__(self, df, group_columns=None, rank_columns=None):
+        self.columns = list(df.columns)
+        self.values = {i: df[i].to_numpy() for i in self.columns}
+        self.numeric = {i: pd.api.types.is_numeric_dtype(df[i]) and not pd.api.types.is_bool_dtype(df[i])
+                        for i in self.columns}
+        self.num_rows = len(df)
+
+        # rank the columns up front so a request sorts nothing but integer ranks
+        self.ranks = {}
+        for i in self.columns if rank_columns is None else [i for i in rank_columns if i in self.values]:
+            self.rank(i)
+
+        self.groups = None
+        if group_columns:
+            self.groups = {}
+            for key, rows in df.groupby(group_columns, sort=False).indices.items():
+                key = tuple(int(i) if isinstance(i, (np.integer, int)) else i for i in key)
+                self.groups[key] = rows
+
+    # create function to grab a column's sort ranks and the rank of its nulls, ranking the column if needed
+    def rank(self, column):
+        ranks = self.ranks.get(column)
+        if ranks is None:
+            codes = sort_ranks(self.values[column])
+            null_rank = int(codes.max()) if pd.isnull(self.values[column]).any() else len(codes) + 1
+            ranks = self.ranks[column] = (codes, null_rank)
+        return ranks
+
+    # create function to describe the columns for the DataTable columns property
+    def column_defs(self, columns=None):
+        return [{'name': i, 'id': i, 'type': 'numeric' if self.numeric[i] else 'text'}
+                for i in (self.columns if columns is None else columns) if i in self.values]
+
+    # create function to find the rows that pass a DataTable filter_query
+    def filter_rows(self, rows, filter_query):
+        '''
+        Function to keep the rows matching every part of a filter_query
+
+        param rows: int array of row positions
+        param filter_query: DataTable filter_query string ('' or None for no filter)
+
+        returns: int array of the matching row positions in their original order
+        '''
+
+        if not filter_query:
+            return rows
+        keep = np.ones(len(rows), dtype=bool)
+        for part in filter_query.split(' && '):
+            name, operator, value = split_filter_part(part)
+            if name not in self.values:
+                continue
+            column = self.values[name][rows]
+
+            if operator in ('contains', 'datestartswith'):
+                text = pd.Series(column, dtype=object).astype(str)
+                value = str(value) if not isinstance(value, float) or not value.is_integer() else str(int(value))
+                matched = text.str.contains(value, case=False, regex=False) if operator == 'contains' else \
+                          text.str.startswith(value)
+                keep &= matched.to_numpy() & ~pd.isnull(column)
+                continue
+
+            # compare numbers as numbers and everything else as text, never matching empty cells (like contains)
+            not_null = ~pd.isnull(column)
+            if self.numeric[name] and isinstance(value, float):
+                column = column.astype(np.float64)
+            else:
+                column, value = pd.Series(column, dtype=object).astype(str).to_numpy(), \
+                                str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+            with np.errstate(invalid='ignore'):
+                keep &= {'eq': column == value, 'ne': column != value, 'lt': column < value, 'le': column <= value,
+                         'gt': column > value, 'ge': column >= value}[operator] & not_null
+        return rows[keep]
+
+    # create function to order rows by a DataTable sort_by
+    def sort_rows(self, rows, sort_by):
+        '''
+        Function to order rows by the columns of a sort_by list (stable, nulls last)
+
+        param rows: int array of row positions
+        param sort_by: DataTable sort_by list of {'column_id': ..., 'direction': 'asc' or 'desc'}
+
+        returns: int array of the row positions in sorted order
+        '''
+
+        keys = []
+        for i in sort_by or []:
+            if i.get('column_id') not in self.values:
+                continue
+            ranks, null_rank = self.rank(i['column_id'])
+            ranks = ranks[rows]
+            if i.get('direction') == 'desc':
+                ranks = np.where(ranks == null_rank, null_rank, -ranks)
+            keys.append(ranks)
+        if not keys:
+            return rows
+        return rows[np.lexsort(keys[::-1])]
+
+    # create function to serve one page of the table
+    def page(self, group=None, columns=None, page_current=0, page_size=20, sort_by=None, filter_query=None):
+        '''
+        Function to filter, sort, and page the table and build the row dictionaries of only the visible columns
+
+        param group: key of the group to serve (when the view has group_columns)
+        param columns: list of the visible columns (all columns when None)
+        param page_current: zero-based page number
+        param page_size: rows per page
+        param sort_by: DataTable sort_by list
+        param filter_query: DataTable filter_query string
+
+        returns: tuple of the list of row dictionaries and the number of pages
+        '''
+
+        if self.groups is None:
+            rows = np.arange(self.num_rows)
+        else:
+            rows = self.groups.get(group, np.array([], dtype=np.int64))
+        rows = self.sort_rows(self.filter_rows(rows, filter_query), sort_by)
+
+        page_size = max(int(page_size or 1), 1)
+        page_count = max(math.ceil(len(rows) / page_size), 1)
+        page_current = min(max(int(page_current or 0), 0), page_count - 1)
+        rows = rows[page_current * page_size:(page_current + 1) * page_size]
+
+        columns = [i for i in (self.columns if columns is None else columns) if i in self.values]
+        values = [self.values[i][rows].tolist() for i in columns]
+        return [dict(zip(columns, i)) for i in zip(*values)] if columns else [{} for _ in rows], page_count
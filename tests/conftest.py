@@ -0,0 +1,53 @@
+# shared fixtures of the tests, built from the synthetic league generators of benchmarks/synthetic.py
+#
+# run from the repo root:  python -m pytest -q
+
+# import needed packages
+import os
+import sys
+
+import numpy as np
+import pytest
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_dir)
+sys.path.insert(0, os.path.join(repo_dir, 'benchmarks'))
+
+from synthetic import make_rosters_df, make_this_week, make_tm_game_data, write_app_data
+
+# create fixture of a small slate: 12 nfl teams, 6 weeks of game logs, and the matchups of week 7
+@pytest.fixture(scope='session')
+def slate():
+    return make_tm_game_data(num_teams=12, num_weeks=6), make_this_week(num_teams=12, week=7)
+
+# create fixture of two leagues' weekly rosters over two short seasons
+@pytest.fixture(scope='session')
+def rosters_df():
+    return make_rosters_df(num_leagues=2, num_seasons=2, num_weeks=3, first_season=2019)
+
+# create fixture of a rosters_df_w_scoring.csv file: mostly zero stat columns written as floats the way the espn frames
+# are, fractional points, and missing values
+@pytest.fixture
+def rosters_scoring_csv(rosters_df, tmp_path):
+    rng = np.random.default_rng(0)
+    df = rosters_df.copy()
+    for col in ['pass_td', 'rush_yrd', 'rec_td', 'fum_lost']:
+        df[col] = np.where(rng.random(len(df)) < 0.1, rng.integers(1, 200, len(df)), 0).astype(float)
+    df['rec_yrd_per_gm'] = np.where(rng.random(len(df)) < 0.1, rng.random(len(df)).round(2), 0.0)
+    df.loc[rng.random(len(df)) < 0.05, 'actual_points'] = np.nan
+    path = os.path.join(tmp_path, 'rosters_df_w_scoring_2019.csv')
+    df.to_csv(path, index=False)
+    return path
+
+# create fixture of app.py imported from a directory of small synthetic data files
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    cwd = os.getcwd()
+    os.chdir(write_app_data(str(tmp_path_factory.mktemp('app')), num_teams=12, num_weeks=6))
+    import app
+
+    # turn the response cache off so every request runs the callback
+    app.cache.max_size = 0
+    yield app
+    os.chdir(cwd)
+
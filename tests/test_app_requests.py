@@ -0,0 +1,36 @@
+# check concurrent rankings requests through the flask server against a single-threaded reference
+
+# import needed packages
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from rankings import rankings_table
+from stress_rankings import post_rankings
+
+# create function to fire rankings requests with mixed num_weeks values from 16 threads at once
+def test_parallel_rankings_requests(app):
+    snapshot = app.snapshots.current
+    max_week = int(snapshot.tm_game_data['week'].max())
+    reference = {n: json.loads(json.dumps(rankings_table(snapshot.week_store, snapshot.this_week, n)))
+                 for n in range(1, max_week + 1)}
+
+    rng = random.Random(0)
+    windows = [rng.randint(1, max_week) for _ in range(320)]
+    prefix = app.app.config.routes_pathname_prefix
+
+    # give each thread its own test client, same as separate gunicorn worker threads
+    def worker(chunk):
+        client = app.server.test_client()
+        return [(n, post_rankings(client, prefix, n)) for n in chunk]
+
+    num_threads = 16
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        results = [row for rows in pool.map(worker, [windows[i::num_threads] for i in range(num_threads)])
+                   for row in rows]
+
+    assert len(results) == len(windows)
+    assert [n for n, rows in results if rows != reference[n]] == []
+
+    # repeated requests never stack the "@" prefix
+    assert not any(r['team_abv'].startswith('@@') or r['oppn'].startswith('@@') for _, rows in results for r in rows)
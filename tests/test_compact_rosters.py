@@ -0,0 +1,33 @@
+# check the compact rosters frames hold the same values as the csv frames they are built from
+
+# import needed packages
+import pandas as pd
+
+from compact_rosters import compact_rosters, expand_rosters, read_rosters, rosters_schema
+
+# create function to check compacting and expanding a rosters frame gives back the csv frame exactly
+def test_round_trip(rosters_scoring_csv):
+    df = pd.read_csv(rosters_scoring_csv)
+    compact = compact_rosters(df)
+    pd.testing.assert_frame_equal(expand_rosters(compact), df)
+    assert compact.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+
+# create function to check which columns are stored as categoricals, sparse integers, and sparse floats
+def test_schema(rosters_scoring_csv):
+    schema = rosters_schema(pd.read_csv(rosters_scoring_csv))
+    assert schema['player'] == 'category'
+    assert schema['pass_td'] == pd.SparseDtype('int16', 0)
+    assert schema['rec_yrd_per_gm'] == pd.SparseDtype('float64', 0.0)
+    assert schema['actual_points'] == 'float64'
+    assert schema['year'] == 'int64'
+
+# create function to check read_rosters returns the compact frame of the csv, sorted in the same order
+def test_read_rosters(rosters_scoring_csv):
+    df = pd.read_csv(rosters_scoring_csv)
+    compact = read_rosters(rosters_scoring_csv)
+    pd.testing.assert_frame_equal(expand_rosters(compact), df)
+    pd.testing.assert_frame_equal(read_rosters(rosters_scoring_csv, compact=False), df)
+
+    # ties on the int64 key columns break in the same order
+    by = ['week', 'slot_id']
+    assert (compact.sort_values(by).index == df.sort_values(by).index).all()
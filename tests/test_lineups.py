@@ -0,0 +1,29 @@
+# check the batch lineup solver finds each team week's optimal legal lineup
+
+# import needed packages
+import numpy as np
+
+from bench_lineups import exact_lineups, loop_lineups
+from lineups import season_summary, solve_lineups
+
+# create function to check every team week against an exact assignment of players to slots
+def test_optimal_matches_exact_assignment(rosters_df):
+    lineups = solve_lineups(rosters_df)
+    assert len(lineups) == len(rosters_df[['year', 'week', 'owner_team']].drop_duplicates())
+    np.testing.assert_allclose(exact_lineups(rosters_df, np.arange(len(lineups))), lineups['optimal_points'])
+
+# create function to check the solver against a per team week dataframe filter and greedy fill
+def test_optimal_matches_loop(rosters_df):
+    lineups = solve_lineups(rosters_df)
+    merged = loop_lineups(rosters_df).merge(lineups, on=['year', 'week', 'owner_team'], suffixes=('_loop', ''))
+    assert len(merged) == len(lineups)
+    np.testing.assert_allclose(merged['optimal_points_loop'], merged['optimal_points'])
+
+# create function to check no lineup scored more points than the optimal one
+def test_bench_points(rosters_df):
+    lineups = solve_lineups(rosters_df)
+    assert (lineups['bench_points'] >= 0).all()
+    assert (lineups['optimal_points'] >= lineups['actual_points']).all()
+    assert (lineups['optimal_points'] >= lineups['proj_lineup_points']).all()
+    summary = season_summary(lineups)
+    assert len(summary) == len(rosters_df[['year', 'owner_team']].drop_duplicates())
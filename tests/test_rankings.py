@@ -0,0 +1,40 @@
+# check the matchup rankings engine against the original app.py rankings callback
+
+# import needed packages
+import numpy as np
+import pandas as pd
+import pytest
+
+import legacy
+from agg_store import week_agg_store
+from rankings import add_team_rates, avg_position_ranks, calc_matchup_stats, position_groups, rank_matchup_stats, \
+                     rankings_table
+
+# create function to check every matchup stat and position rank average matches the original callback exactly
+@pytest.mark.parametrize('num_weeks', [1, 3, 6, 10])
+def test_engine_matches_legacy(slate, num_weeks):
+    tm_game_data, this_week = slate
+    legacy_records, legacy_this_week = legacy.update_rankings_table(tm_game_data, this_week, num_weeks)
+
+    matchups = calc_matchup_stats(add_team_rates(legacy.agg_week(tm_game_data, num_weeks)), this_week)
+    for col in matchups.columns:
+        np.testing.assert_array_equal(matchups[col].to_numpy(), legacy_this_week[col].to_numpy(), err_msg=col)
+    rank_avg = avg_position_ranks(rank_matchup_stats(matchups)).round(1)
+    for col in position_groups:
+        np.testing.assert_array_equal(rank_avg[col].to_numpy(), pd.DataFrame(legacy_records)[col].to_numpy(),
+                                      err_msg=col)
+
+# create function to check the table the app serves from the aggregation store is the original callback's table
+@pytest.mark.parametrize('num_weeks', [1, 3, 6])
+def test_table_matches_legacy(slate, num_weeks):
+    tm_game_data, this_week = slate
+    legacy_records, _ = legacy.update_rankings_table(tm_game_data, this_week, num_weeks)
+    assert rankings_table(week_agg_store(tm_game_data), this_week, num_weeks) == legacy_records
+
+# create function to check building a table leaves this week's matchups as they were
+def test_table_leaves_this_week_unchanged(slate):
+    tm_game_data, this_week = slate
+    before = this_week.copy()
+    store = week_agg_store(tm_game_data)
+    assert rankings_table(store, this_week, 3) == rankings_table(store, this_week, 3)
+    pd.testing.assert_frame_equal(this_week, before)